@@ -51,6 +51,16 @@ Examples:
     sync_parser = subparsers.add_parser("sync", help="Sync recordings from camera")
     sync_parser.add_argument("--days", type=int, default=1, help="Number of days to sync")
     sync_parser.add_argument("--output", "-o", default="./recordings", help="Output directory")
+    sync_parser.add_argument(
+        "--previews",
+        action="store_true",
+        help="Generate contact sheets, preview proxies and activity scores",
+    )
+    sync_parser.add_argument(
+        "--dedupe",
+        action="store_true",
+        help="Index recordings and hard-link duplicate clips",
+    )
 
     # Snapshot command
     snap_parser = subparsers.add_parser("snapshot", help="Take RTSP snapshot")
@@ -76,7 +86,7 @@ Examples:
     elif args.command == "test-android":
         test_android()
     elif args.command == "sync":
-        sync_recordings(args.days, args.output)
+        sync_recordings(args.days, args.output, args.previews, args.dedupe)
     elif args.command == "snapshot":
         take_snapshot(args.output, args.quality)
     elif args.command == "watch-android":
@@ -95,6 +105,7 @@ def run_gui():
     camera = None
     stream = None
     sync = None
+    camera_state = None
     android_ui = None
 
     try:
@@ -105,7 +116,10 @@ def run_gui():
 
     try:
         from src.tapo_c210_monitor.android.ui import UIAutomation
+        from src.tapo_c210_monitor.android.screen_stream import ScreenStream
         android_ui = UIAutomation()
+        # Started by the panel once the device is connected
+        android_ui.screen.attach_stream(ScreenStream(android_ui.controller))
     except Exception as e:
         print(f"Android init skipped: {e}")
 
@@ -124,6 +138,11 @@ def run_gui():
         except Exception as e:
             print(f"Sync init skipped: {e}")
 
+        if camera.is_connected:
+            from src.tapo_c210_monitor.camera_state import CameraStateCache
+            camera_state = CameraStateCache(camera)
+            camera_state.start()
+
     from src.tapo_c210_monitor.gui.control_panel import ControlPanel
 
     panel = ControlPanel(
@@ -131,6 +150,7 @@ def run_gui():
         camera=camera,
         stream=stream,
         sync=sync,
+        camera_state=camera_state,
     )
     panel.run()
 
@@ -202,7 +222,7 @@ def test_android():
         print("  4. Install android-tools: sudo pacman -S android-tools")
 
 
-def sync_recordings(days: int, output_dir: str):
+def sync_recordings(days: int, output_dir: str, previews: bool = False, dedupe: bool = False):
     """Sync recordings from camera."""
     from src.tapo_c210_monitor.camera import TapoCamera
     from src.tapo_c210_monitor.sync import RecordingSync
@@ -219,8 +239,24 @@ def sync_recordings(days: int, output_dir: str):
         print("Failed to connect to camera")
         return
 
-    sync = RecordingSync(camera.tapo, output_dir)
-    result = sync.sync_recent(days=days)
+    store = None
+    if dedupe:
+        from src.tapo_c210_monitor.store import RecordingStore
+
+        store = RecordingStore(output_dir)
+        store.scan()
+
+    pipeline = None
+    with RecordingSync(camera.tapo, output_dir, store=store) as sync:
+        if previews:
+            from src.tapo_c210_monitor.pipeline import RecordingPipeline
+
+            pipeline = RecordingPipeline()
+            # Pick up anything left over from earlier runs, then follow new downloads
+            pipeline.process_existing(output_dir)
+            sync.set_download_callback(pipeline.submit)
+
+        result = sync.sync_recent(days=days)
 
     total = sum(len(files) for files in result.values())
     print(f"\nSynced {total} recordings from {len(result)} days")
@@ -228,6 +264,22 @@ def sync_recordings(days: int, output_dir: str):
     for date, files in result.items():
         print(f"  {date}: {len(files)} files")
 
+    if pipeline:
+        print("\nWaiting for preview processing...")
+        processed = [r for r in pipeline.wait() if not r.get("skipped")]
+        pipeline.shutdown()
+        failed = [r for r in processed if r.get("failed")]
+        print(f"Processed {len(processed) - len(failed)} recordings")
+        for r in failed:
+            print(f"  Failed: {Path(r['recording']).name}: {r['failed']}")
+
+    if store:
+        stats = store.get_stats()
+        print(f"\nStore: {stats['file_count']} files, {stats['duplicate_groups']} duplicate groups")
+        print(f"  Reclaimed: {stats['reclaimed_mb']:.1f} MB")
+        for earlier, later in store.find_overlaps():
+            print(f"  Overlap: {Path(earlier.path).name} / {Path(later.path).name}")
+
 
 def take_snapshot(output_path: str | None, quality: str):
     """Take RTSP snapshot."""
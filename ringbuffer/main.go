@@ -487,6 +487,28 @@ func (rb *RingBuffer) GetFrames(secondsAgo []float64, outputDir string) ([]strin
 	return framePaths, nil
 }
 
+// GetSegments returns the segments currently held in the buffer
+func (rb *RingBuffer) GetSegments() []map[string]interface{} {
+	rb.mu.RLock()
+	defer rb.mu.RUnlock()
+
+	segDuration := time.Duration(rb.config.SegmentSeconds) * time.Second
+	result := make([]map[string]interface{}, 0, len(rb.segments))
+
+	for i, s := range rb.segments {
+		result = append(result, map[string]interface{}{
+			"path":  s.Path,
+			"start": s.StartTime.Unix(),
+			"end":   s.StartTime.Add(segDuration).Unix(),
+			"size":  s.Size,
+			// Newest segment is still being written by ffmpeg
+			"complete": i < len(rb.segments)-1,
+		})
+	}
+
+	return result
+}
+
 // HTTP Handlers
 
 func (rb *RingBuffer) handleStatus(w http.ResponseWriter, r *http.Request) {
@@ -494,6 +516,14 @@ func (rb *RingBuffer) handleStatus(w http.ResponseWriter, r *http.Request) {
 	json.NewEncoder(w).Encode(rb.GetStatus())
 }
 
+func (rb *RingBuffer) handleSegments(w http.ResponseWriter, r *http.Request) {
+	w.Header().Set("Content-Type", "application/json")
+	json.NewEncoder(w).Encode(map[string]interface{}{
+		"segment_seconds": rb.config.SegmentSeconds,
+		"segments":        rb.GetSegments(),
+	})
+}
+
 func (rb *RingBuffer) handleSave(w http.ResponseWriter, r *http.Request) {
 	maxSeconds, _ := strconv.Atoi(r.URL.Query().Get("seconds"))
 	maxSizeMB, _ := strconv.Atoi(r.URL.Query().Get("size_mb"))
@@ -591,6 +621,7 @@ func main() {
 	r.HandleFunc("/status", rb.handleStatus).Methods("GET")
 	r.HandleFunc("/save", rb.handleSave).Methods("POST", "GET")
 	r.HandleFunc("/frames", rb.handleFrames).Methods("GET")
+	r.HandleFunc("/segments", rb.handleSegments).Methods("GET")
 
 	// Graceful shutdown
 	go func() {
@@ -606,6 +637,7 @@ func main() {
 	log.Printf("  GET  /status - Buffer status")
 	log.Printf("  POST /save?seconds=30&size_mb=50 - Save buffer")
 	log.Printf("  GET  /frames?seconds_ago=0,5,10 - Extract frames")
+	log.Printf("  GET  /segments - List buffered segments")
 
 	log.Fatal(http.ListenAndServe(fmt.Sprintf(":%d", config.Port), r))
 }
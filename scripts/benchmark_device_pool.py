@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Benchmark DevicePool scaling.
+
+Without --live, runs against a FakeAdbServer with simulated devices whose
+jobs take a fixed time, and reports throughput for 1..N devices (ideal
+scaling is linear). One device is unplugged half-way through the largest
+run to show its jobs moving to the others.
+
+With --live, runs a short shell job (`getprop`) on every real device.
+
+Usage:
+    uv run python scripts/benchmark_device_pool.py --devices 8 --jobs 64
+    uv run python scripts/benchmark_device_pool.py --live --jobs 50
+"""
+
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from tapo_c210_monitor.android.device_pool import DevicePool
+from tapo_c210_monitor.testing.fake_adb import FakeAdbServer
+
+
+class SimulatedController:
+    """Stands in for AndroidController; shell commands take job_seconds."""
+
+    def __init__(self, serial: str, job_seconds: float):
+        self.device_serial = serial
+        self.job_seconds = job_seconds
+        self.unplugged = threading.Event()
+
+    def connect(self) -> bool:
+        return True
+
+    def shell(self, command: str) -> str:
+        if self.unplugged.is_set():
+            raise ConnectionError(f"{self.device_serial} disconnected")
+        time.sleep(self.job_seconds)
+        return "ok"
+
+
+def job(controller, index: int) -> str:
+    controller.shell(f"echo {index}")
+    return controller.device_serial
+
+
+def run_simulated(devices: int, jobs: int, job_seconds: float, unplug: bool) -> float:
+    serials = [f"emulator-{5554 + 2 * i}" for i in range(devices)]
+    controllers = {}
+
+    def factory(serial):
+        controllers[serial] = SimulatedController(serial, job_seconds)
+        return controllers[serial]
+
+    with FakeAdbServer({s: "device" for s in serials}) as server:
+        with DevicePool(port=server.port, check_interval=0.1, controller_factory=factory) as pool:
+            pool.wait_for_devices(devices, timeout=5)
+            start = time.perf_counter()
+            futures = [pool.submit(job, i, retries=2) for i in range(jobs)]
+
+            if unplug and devices > 1:
+                time.sleep(jobs * job_seconds / devices / 2)
+                controllers[serials[0]].unplugged.set()
+                server.remove_device(serials[0])
+
+            results = [f.result(timeout=60) for f in futures]
+            elapsed = time.perf_counter() - start
+            stats = pool.get_stats()
+
+    per_device = {s: results.count(s) for s in serials}
+    print(f"  {devices} device(s): {jobs / elapsed:6.1f} jobs/s  ({elapsed:.2f} s)  per device: {list(per_device.values())}")
+    if unplug and devices > 1:
+        print(f"    {serials[0]} unplugged mid-run: state {stats['devices'][serials[0]]['state']}, "
+              f"{stats['devices'][serials[0]]['failures']} job(s) retried elsewhere")
+    return jobs / elapsed
+
+
+def run_live(jobs: int) -> None:
+    with DevicePool() as pool:
+        if not pool.wait_for_devices(1, timeout=10):
+            print("No devices")
+            sys.exit(1)
+        print(f"Devices: {', '.join(pool.healthy_devices)}")
+        start = time.perf_counter()
+        pool.map(lambda c, i: c.shell("getprop ro.product.model"), range(jobs))
+        elapsed = time.perf_counter() - start
+        print(f"{jobs} jobs in {elapsed:.2f} s ({jobs / elapsed:.1f} jobs/s)")
+        for serial, info in pool.get_stats()["devices"].items():
+            print(f"  {serial}: {info['jobs_done']} jobs, {info['failures']} failures")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Device pool benchmark")
+    parser.add_argument("--devices", type=int, default=8, help="Largest simulated pool")
+    parser.add_argument("--jobs", type=int, default=64)
+    parser.add_argument("--job-seconds", type=float, default=0.05)
+    parser.add_argument("--live", action="store_true", help="Use real devices")
+    args = parser.parse_args()
+
+    if args.live:
+        run_live(args.jobs)
+        return
+
+    print(f"{args.jobs} jobs of {args.job_seconds * 1000:.0f} ms each\n")
+    sizes = sorted({1, 2, 4, args.devices} & set(range(1, args.devices + 1)))
+    baseline = None
+    for size in sizes:
+        rate = run_simulated(size, args.jobs, args.job_seconds, unplug=size == sizes[-1])
+        baseline = baseline or rate
+        print(f"    scaling: {rate / baseline:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Benchmark how fast DeviceMonitor notices device changes.
+
+Without --live, a FakeAdbServer flips a device between "device" and
+"offline" and the script measures how long each change takes to reach
+the state callbacks of a tracker-driven DeviceMonitor, against polling
+the device list every --interval seconds (the old monitor loop).
+
+With --live, compares the cost of one health check on a real device:
+`adb devices` + `adb shell getprop` forks against the socket listing and
+a heartbeat over the persistent shell.
+
+Usage:
+    uv run python scripts/benchmark_device_tracking.py --changes 50
+    uv run python scripts/benchmark_device_tracking.py --live
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from tapo_c210_monitor.android.adb_protocol import DeviceTracker, list_devices
+from tapo_c210_monitor.testing.fake_adb import FakeAdbServer
+from tapo_c210_monitor.android.device_monitor import DeviceMonitor, DeviceState
+from tapo_c210_monitor.android.shell_session import ShellSession
+
+SERIAL = "emulator-5554"
+
+
+def summarize(name: str, latencies: list[float]) -> None:
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) >= 20 else latencies[-1]
+    print(f"  {name:<28} median {statistics.median(latencies) * 1000:8.2f} ms   "
+          f"p95 {p95 * 1000:8.2f} ms   ({len(latencies)} changes)")
+
+
+def run_tracked(changes: int) -> list[float]:
+    """Disconnects reaching a tracker-driven DeviceMonitor."""
+    latencies = []
+    with FakeAdbServer({SERIAL: "device"}) as server, DeviceTracker(port=server.port) as tracker:
+        tracker.wait_connected(timeout=2)
+        monitor = DeviceMonitor(device_serial=SERIAL, tracker=tracker, auto_recover=False)
+        seen = threading.Event()
+        monitor.add_state_callback(lambda old, new: new == DeviceState.OFFLINE and seen.set())
+        # Same wiring as DevicePool
+        tracker.add_callback(lambda serial, old, new: monitor.apply_adb_state(new))
+
+        with contextlib.redirect_stdout(io.StringIO()):  # State change logs
+            monitor.apply_adb_state("device")
+            for _ in range(changes):
+                seen.clear()
+                start = time.perf_counter()
+                server.set_device(SERIAL, "offline")
+                seen.wait(timeout=2)
+                latencies.append(time.perf_counter() - start)
+
+                server.set_device(SERIAL, "device")
+                tracker.wait_for(SERIAL, timeout=2)
+    return latencies
+
+
+def run_polled(changes: int, interval: float) -> list[float]:
+    """Disconnects noticed by listing devices every interval."""
+    latencies = []
+    with FakeAdbServer({SERIAL: "device"}) as server:
+        for _ in range(changes):
+            # Changes land at a random point of the polling cycle
+            next_poll = time.perf_counter() + random.uniform(0, interval)
+            server.set_device(SERIAL, "offline")
+            start = time.perf_counter()
+            time.sleep(max(0.0, next_poll - time.perf_counter()))
+            if list_devices(port=server.port).get(SERIAL) != "device":
+                latencies.append(time.perf_counter() - start)
+            server.set_device(SERIAL, "device")
+    return latencies
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def run_live(repeat: int) -> None:
+    devices = list_devices()
+    serial = next((s for s, state in devices.items() if state == "device"), None)
+    if serial is None:
+        print("No devices")
+        sys.exit(1)
+    print(f"Device: {serial}\n")
+
+    fork_list = timed(lambda: subprocess.run(["adb", "devices"], capture_output=True), repeat)
+    socket_list = timed(list_devices, repeat)
+    fork_shell = timed(
+        lambda: subprocess.run(["adb", "-s", serial, "shell", "getprop", "sys.boot_completed"], capture_output=True),
+        repeat,
+    )
+    with ShellSession(serial) as shell:
+        shell.run("true")
+        heartbeat = timed(lambda: shell.run("getprop sys.boot_completed"), repeat)
+
+    print(f"  adb devices (fork)       {fork_list * 1000:8.2f} ms")
+    print(f"  host:devices (socket)    {socket_list * 1000:8.2f} ms")
+    print(f"  adb shell getprop (fork) {fork_shell * 1000:8.2f} ms")
+    print(f"  heartbeat (open shell)   {heartbeat * 1000:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Device tracking benchmark")
+    parser.add_argument("--changes", type=int, default=50)
+    parser.add_argument("--interval", type=float, default=5.0,
+                        help="Polling interval to compare against (the old default check_interval)")
+    parser.add_argument("--poll-changes", type=int, default=5, help="Changes to time when polling")
+    parser.add_argument("--live", action="store_true", help="Use a real device")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.live:
+        run_live(args.repeat)
+        return
+
+    print("Time from a device going offline to the monitor knowing:\n")
+    summarize("track-devices callback", run_tracked(args.changes))
+    summarize(f"polling every {args.interval:g} s", run_polled(args.poll_changes, args.interval))
+
+
+if __name__ == "__main__":
+    main()
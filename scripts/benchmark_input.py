@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""Benchmark Android input injection latency.
+
+Compares a one-shot `adb shell input tap` (JVM start per tap) with taps
+written to the touch node through the persistent shell, and with a batch
+of taps sent in one round-trip.
+
+Taps land on the given point, so pick somewhere harmless (e.g. an empty
+area of the home screen).
+
+--simulate runs the generated scripts in the local /bin/sh instead, with
+the touch node redirected to a temporary file and stand-ins for the
+device tools (dumpsys, getprop, sendevent), to compare script cost
+without a device.
+
+Usage:
+    uv run python scripts/benchmark_input.py --count 10 --x 540 --y 100
+    uv run python scripts/benchmark_input.py --dry-run   # show generated scripts only
+    uv run python scripts/benchmark_input.py --simulate --count 50
+"""
+
+import argparse
+import os
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from tapo_c210_monitor.android.input_injector import InputInjector
+
+SAMPLE_GETEVENT = """add device 1: /dev/input/event1
+  name:     "sample_touchscreen"
+  events:
+    KEY (0001): 014a
+    ABS (0003): 002f  : value 0, min 0, max 9, fuzz 0, flat 0, resolution 0
+                0030  : value 0, min 0, max 255, fuzz 0, flat 0, resolution 0
+                0035  : value 0, min 0, max 4095, fuzz 0, flat 0, resolution 0
+                0036  : value 0, min 0, max 4095, fuzz 0, flat 0, resolution 0
+                0039  : value 0, min 0, max 65535, fuzz 0, flat 0, resolution 0
+                003a  : value 0, min 0, max 255, fuzz 0, flat 0, resolution 0
+"""
+
+
+class RecordingController:
+    """Stand-in controller that records scripts instead of running them."""
+
+    def __init__(self):
+        self.scripts = []
+
+    def shell(self, command: str) -> str:
+        if command == "getevent -p":
+            return SAMPLE_GETEVENT
+        if command.startswith("getprop"):
+            return "arm64-v8a\n"
+        if command.startswith("dumpsys input"):
+            return "    SurfaceOrientation: 0\n"
+        if command.endswith("&& echo ok"):
+            return "ok\n"
+        self.scripts.append(command)
+        return ""
+
+    def get_screen_size(self) -> tuple[int, int]:
+        return (1080, 2400)
+
+
+class SimulatedController(RecordingController):
+    """Runs the injector's scripts in the local shell.
+
+    /dev/input/event1 is redirected to a temporary file, and the device
+    tools the scripts call are small stand-in scripts on PATH.
+    """
+
+    NODE = "/dev/input/event1"
+
+    def __init__(self, workdir: Path):
+        super().__init__()
+        self.node = workdir / "event1"
+        self.node.touch()
+        bin_dir = workdir / "bin"
+        bin_dir.mkdir()
+        tools = {
+            "dumpsys": "echo '    SurfaceOrientation: 0'",
+            "getprop": "echo arm64-v8a",
+            "sendevent": ":",
+            "input": ":",
+        }
+        for name, body in tools.items():
+            tool = bin_dir / name
+            tool.write_text(f"#!/bin/sh\n{body}\n")
+            tool.chmod(tool.stat().st_mode | stat.S_IEXEC)
+        self.env = {**os.environ, "PATH": f"{bin_dir}{os.pathsep}{os.environ['PATH']}"}
+
+    def shell(self, command: str) -> str:
+        if command == "getevent -p":
+            return SAMPLE_GETEVENT
+        self.scripts.append(command)
+        command = command.replace(self.NODE, str(self.node))
+        result = subprocess.run(["/bin/sh", "-c", command], capture_output=True, text=True, env=self.env)
+        return result.stdout
+
+
+def timed(label: str, fn, count: int) -> float:
+    fn()  # Warm up
+    start = time.perf_counter()
+    for _ in range(count):
+        fn()
+    per_tap = (time.perf_counter() - start) / count * 1000
+    print(f"  {label:32s} {per_tap:7.1f} ms")
+    return per_tap
+
+
+def run_device(args) -> None:
+    from tapo_c210_monitor.android.controller import AndroidController
+
+    controller = AndroidController(device_serial=args.serial)
+    if not controller.connect():
+        sys.exit(1)
+
+    injector = controller.input
+    print(f"Direct touch injection: {'yes' if injector.available else 'no (input fallback)'}")
+    if injector.device:
+        print(f"Touch device: {injector.device.path} ({injector.device.name})")
+    print(f"Tapping ({args.x}, {args.y}), {args.count} times each\n")
+
+    serial = ["-s", controller.device_serial] if controller.device_serial else []
+    before = timed(
+        "adb shell input tap (old)",
+        lambda: subprocess.run(["adb", *serial, "shell", "input", "tap", str(args.x), str(args.y)], capture_output=True),
+        args.count,
+    )
+    after = timed("injector tap", lambda: injector.tap(args.x, args.y), args.count)
+
+    def batched():
+        with injector.batch() as b:
+            for _ in range(args.batch):
+                b.tap(args.x, args.y)
+
+    per_batch = timed(f"batch of {args.batch} taps", batched, max(1, args.count // args.batch))
+    print(f"  {'  per tap in batch':32s} {per_batch / args.batch:7.1f} ms")
+    print(f"\nSpeed-up per tap: {before / after:.1f}x (batched: {before * args.batch / per_batch:.1f}x)")
+    controller.close()
+
+
+def run_dry(args) -> None:
+    controller = RecordingController()
+    injector = InputInjector(controller)
+
+    injector.tap(args.x, args.y)
+    print("Single tap:\n" + controller.scripts[-1] + "\n")
+
+    with injector.batch() as b:
+        b.tap(args.x, args.y).wait(0.2).text("hello world").key("KEYCODE_TAB").key("KEYCODE_ENTER")
+    print("Batch (tap, wait, text, two keys):\n" + controller.scripts[-1] + "\n")
+
+    injector.swipe(540, 1800, 540, 600, 300)
+    lines = controller.scripts[-1].splitlines()
+    writes = sum(line.startswith("printf") for line in lines)
+    print(f"300 ms swipe: {writes} writes to {injector.device.path}, one round-trip")
+
+
+def run_simulated(args) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        controller = SimulatedController(Path(tmp))
+        injector = InputInjector(controller)
+        print(f"Touch device: {'yes' if injector.available else 'no (input fallback)'}")
+        print(f"Local shell, {args.count} runs each\n")
+
+        timed("tap", lambda: injector.tap(args.x, args.y), args.count)
+        timed("300 ms swipe", lambda: injector.swipe(540, 1800, 540, 600, 300), max(1, args.count // 5))
+
+        def batched():
+            with injector.batch() as b:
+                for _ in range(args.batch):
+                    b.tap(args.x, args.y)
+
+        timed(f"batch of {args.batch} taps", batched, max(1, args.count // args.batch))
+        print(f"\nBytes written to the stand-in node: {controller.node.stat().st_size}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Input injection benchmark")
+    parser.add_argument("--count", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=5, help="Taps per batch")
+    parser.add_argument("--x", type=int, default=540)
+    parser.add_argument("--y", type=int, default=100)
+    parser.add_argument("--serial", help="Device serial (default: first device)")
+    parser.add_argument("--dry-run", action="store_true", help="Print generated scripts without a device")
+    parser.add_argument("--simulate", action="store_true", help="Time generated scripts in the local shell")
+    args = parser.parse_args()
+
+    if args.dry_run:
+        run_dry(args)
+    elif args.simulate:
+        run_simulated(args)
+    else:
+        run_device(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""Benchmark PTZ control protocols against the live video.
+
+Replaces the one-off protocol scripts (test_all_ptz_protocols.py,
+test_pytapo_pan.py, pan_experiment_v2.py): every protocol is timed the
+same way, with ack, motion onset and settle measured from the RTSP
+stream, and results written as JSON with percentiles.
+
+Protocols: pytapo-motor, pytapo-step, onvif-continuous, onvif-relative,
+onvif-absolute, android
+
+Usage:
+    # Live camera (credentials from .env)
+    uv run python scripts/benchmark_ptz.py --protocols pytapo-motor,onvif-continuous --repeats 5
+
+    # Offline: simulated camera, or a recorded video with command times
+    uv run python scripts/benchmark_ptz.py --simulate
+    uv run python scripts/benchmark_ptz.py --fixture pan.mp4 --commands pan.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import cv2
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from tapo_c210_monitor.experiments.ptz_benchmark import (
+    AndroidPan,
+    ONVIFAbsolute,
+    ONVIFContinuous,
+    ONVIFRelative,
+    PTZBenchmark,
+    PytapoMoveMotor,
+    PytapoMoveMotorStep,
+    SimulatedAdapter,
+    SimulatedPTZ,
+    StreamFrameSource,
+    analyze_fixture,
+    save_results,
+    summarize,
+)
+
+PROTOCOLS = (
+    "pytapo-motor",
+    "pytapo-step",
+    "onvif-continuous",
+    "onvif-relative",
+    "onvif-absolute",
+    "android",
+)
+
+
+def build_adapters(names: list[str], args):
+    """Connect only the backends the requested protocols need."""
+    from tapo_c210_monitor.camera import TapoCamera
+
+    camera = TapoCamera.from_env()
+    adapters = []
+
+    if any(n.startswith("pytapo") for n in names):
+        if not camera.connect():
+            print("ERROR: pytapo connection failed")
+            sys.exit(1)
+
+    controller = None
+    if any(n.startswith("onvif") for n in names):
+        from tapo_c210_monitor.ptz_mapper import ONVIFPTZController
+        controller = ONVIFPTZController(camera.host, username=camera.username, password=camera.password)
+        if not controller.connect():
+            print("ERROR: ONVIF connection failed")
+            sys.exit(1)
+
+    controls = None
+    if "android" in names:
+        from tapo_c210_monitor.android.camera_controls import CameraControls
+        controls = CameraControls()
+        if not controls.connect() or not controls.open_camera_live():
+            print("ERROR: Android emulator not ready")
+            sys.exit(1)
+
+    factories = {
+        "pytapo-motor": lambda: PytapoMoveMotor(camera, degrees=args.degrees),
+        "pytapo-step": lambda: PytapoMoveMotorStep(camera),
+        "onvif-continuous": lambda: ONVIFContinuous(controller, duration=args.duration),
+        "onvif-relative": lambda: ONVIFRelative(controller),
+        "onvif-absolute": lambda: ONVIFAbsolute(controller),
+        "android": lambda: AndroidPan(controls, duration=args.duration),
+    }
+    for name in names:
+        adapters.append(factories[name]())
+    return camera, adapters
+
+
+def print_summary(summary: dict) -> None:
+    def fmt(stats: dict, scale: float = 1000, unit: str = "ms") -> str:
+        if not stats.get("count"):
+            return "-"
+        return f"p50 {stats['p50'] * scale:.0f}{unit} p95 {stats['p95'] * scale:.0f}{unit}"
+
+    print("\n" + "=" * 60)
+    print("SUMMARY")
+    print("=" * 60)
+    for protocol, s in summary.items():
+        print(f"{protocol}: {s['moved']}/{s['trials']} moved, {s['errors']} errors")
+        print(f"  ack:    {fmt(s['ack_s'])}")
+        print(f"  onset:  {fmt(s['onset_s'])}")
+        print(f"  settle: {fmt(s['settle_s'])}")
+        print(f"  travel: {fmt(s['abs_travel_deg'], 1, '°')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PTZ protocol benchmark")
+    parser.add_argument("--protocols", default="pytapo-motor,onvif-continuous",
+                        help=f"Comma-separated list of: {', '.join(PROTOCOLS)}")
+    parser.add_argument("--directions", default="left,right")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--degrees", type=float, default=20.0, help="moveMotor step size")
+    parser.add_argument("--duration", type=float, default=0.5,
+                        help="Continuous move / long-press duration")
+    parser.add_argument("--hfov", type=float, default=100.0)
+    parser.add_argument("--simulate", action="store_true", help="Use a simulated camera")
+    parser.add_argument("--fixture", help="Recorded video to analyze offline")
+    parser.add_argument("--commands",
+                        help='JSON list of [seconds, direction] command times for --fixture')
+    parser.add_argument("--output", default=f"/tmp/ptz_benchmark/{time.strftime('%Y%m%d_%H%M%S')}.json")
+    args = parser.parse_args()
+
+    cv2.setNumThreads(1)
+    directions = tuple(args.directions.split(","))
+    metadata = {"repeats": args.repeats, "directions": directions, "hfov_deg": args.hfov}
+
+    if args.fixture:
+        if not args.commands:
+            print("ERROR: --fixture needs --commands")
+            sys.exit(1)
+        commands = [tuple(c) for c in json.loads(Path(args.commands).read_text())]
+        results = analyze_fixture(args.fixture, commands, protocol=Path(args.fixture).stem, hfov_deg=args.hfov)
+        metadata["fixture"] = args.fixture
+    elif args.simulate:
+        sim = SimulatedPTZ(hfov_deg=args.hfov)
+        bench = PTZBenchmark(sim, hfov_deg=args.hfov, rest=0.2)
+        bench.start()
+        try:
+            bench.run(SimulatedAdapter(sim), directions, args.repeats)
+        finally:
+            bench.stop()
+        results = bench.results
+        metadata["simulated"] = {
+            "ack_latency": sim.ack_latency,
+            "onset_delay": sim.onset_delay,
+            "speed_deg_s": sim.speed_deg_s,
+        }
+    else:
+        names = args.protocols.split(",")
+        unknown = [n for n in names if n not in PROTOCOLS]
+        if unknown:
+            print(f"ERROR: unknown protocols {unknown}")
+            sys.exit(1)
+
+        from tapo_c210_monitor.stream import StreamCapture
+        camera, adapters = build_adapters(names, args)
+        stream = StreamCapture(camera.get_rtsp_url("sd"))
+        bench = PTZBenchmark(StreamFrameSource(stream), hfov_deg=args.hfov)
+        bench.start()
+        try:
+            for adapter in adapters:
+                print(f"\n=== {adapter.name} ===")
+                bench.run(adapter, directions, args.repeats)
+        finally:
+            bench.stop()
+            for adapter in adapters:
+                adapter.close()
+        results = bench.results
+        metadata["protocols"] = names
+
+    path = save_results(args.output, results, metadata)
+    print_summary(summarize(results))
+    print(f"\nResults saved to: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Benchmark Android screen capture paths.
+
+Compares the old file-based screenshot (screencap -p to /sdcard, adb pull,
+rm, reopen and resize in PIL) with the in-memory raw path
+(exec-out screencap into a NumPy buffer).
+
+Usage:
+    uv run python scripts/benchmark_screencap.py --count 20
+    uv run python scripts/benchmark_screencap.py --offline   # host-side decode only
+"""
+
+import argparse
+import io
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from tapo_c210_monitor.android.framebuffer import decode_png, make_frame, parse_screencap
+
+
+def legacy_capture(controller, max_dimension) -> Image.Image:
+    """The previous ScreenCapture.capture path, kept here for comparison."""
+    remote_path = "/sdcard/screenshot_temp.png"
+    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
+        local_path = Path(f.name)
+    try:
+        controller.shell(f"screencap -p {remote_path}")
+        subprocess.run(
+            ["adb", "-s", controller.device_serial, "pull", remote_path, str(local_path)],
+            capture_output=True,
+            timeout=30,
+        )
+        controller.shell(f"rm {remote_path}")
+        img = Image.open(local_path)
+        if max_dimension and max(img.size) > max_dimension:
+            scale = max_dimension / max(img.size)
+            img = img.resize((int(img.width * scale), int(img.height * scale)), Image.Resampling.LANCZOS)
+            img.save(local_path)
+        img = Image.open(local_path)
+        img.load()
+        return img
+    finally:
+        local_path.unlink(missing_ok=True)
+
+
+def timed(label: str, fn, count: int) -> float:
+    fn()  # Warm up
+    start = time.perf_counter()
+    for _ in range(count):
+        fn()
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed
+    print(f"  {label:28s} {rate:7.1f} captures/s ({elapsed / count * 1000:7.1f} ms each)")
+    return rate
+
+
+def run_device(args) -> None:
+    from tapo_c210_monitor.android.controller import AndroidController
+
+    controller = AndroidController(device_serial=args.serial)
+    if not controller.connect():
+        sys.exit(1)
+
+    frame = controller.capture_frame()
+    print(f"Screen: {frame.width}x{frame.height}, {args.count} captures each\n")
+
+    before = timed("file-based (old)", lambda: legacy_capture(controller, args.max_dimension), args.count)
+    after = timed("in-memory raw", lambda: controller.capture_frame(args.max_dimension).image, args.count)
+    timed("in-memory raw, ndarray only", lambda: controller.capture_frame(args.max_dimension).array, args.count)
+    print(f"\nSpeed-up: {after / before:.1f}x")
+
+
+def run_offline(args) -> None:
+    """Host-side cost only: PNG decode + resize vs raw parse + resize."""
+    width, height = 1080, 2400
+    rng = np.random.default_rng(0)
+    rgba = rng.integers(0, 255, (height // 8, width // 8, 4), dtype=np.uint8)
+    rgba = np.kron(rgba, np.ones((8, 8, 1), dtype=np.uint8))
+    rgba[..., 3] = 255
+
+    raw = np.array([width, height, 1, 0], dtype="<u4").tobytes() + rgba.tobytes()
+    buffer = io.BytesIO()
+    Image.fromarray(rgba[..., :3]).save(buffer, format="PNG")
+    png = buffer.getvalue()
+
+    print(f"Synthetic {width}x{height}: raw {len(raw) / 1e6:.1f} MB, PNG {len(png) / 1e6:.1f} MB\n")
+
+    def png_path():
+        img = Image.open(io.BytesIO(png))
+        scale = args.max_dimension / max(img.size)
+        return img.resize((int(img.width * scale), int(img.height * scale)), Image.Resampling.LANCZOS)
+
+    before = timed("PNG decode + Lanczos", png_path, args.count)
+    after = timed("raw parse + INTER_AREA", lambda: make_frame(parse_screencap(raw), args.max_dimension).image, args.count)
+    timed("PNG fallback decode", lambda: decode_png(png), args.count)
+    print(f"\nSpeed-up (host side): {after / before:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Screen capture benchmark")
+    parser.add_argument("--count", type=int, default=20)
+    parser.add_argument("--serial", help="Device serial (default: first device)")
+    parser.add_argument("--max-dimension", type=int, default=1900)
+    parser.add_argument("--offline", action="store_true", help="Benchmark decoding without a device")
+    args = parser.parse_args()
+
+    if args.offline:
+        run_offline(args)
+    else:
+        run_device(args)
+
+
+if __name__ == "__main__":
+    main()
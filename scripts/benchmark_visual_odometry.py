@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Benchmark the visual odometry pan/tilt estimator.
+
+Two modes:
+
+- synthetic (default): slides a window across a wide image (or random
+  texture) at a known rate, treating the image as a cylindrical panorama,
+  so the estimate can be checked against ground truth
+- --video: runs over a recorded pan sequence and reports throughput and
+  the final integrated angle
+
+Usage:
+    uv run python scripts/benchmark_visual_odometry.py
+    uv run python scripts/benchmark_visual_odometry.py --image panorama.jpg --step 3
+    uv run python scripts/benchmark_visual_odometry.py --video recordings/pan_right.mp4
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from tapo_c210_monitor.ptz_mapper.visual_odometry import VisualOdometry
+
+
+def synthetic_frames(image: np.ndarray, view_width: int, step: int, frames: int):
+    """Yield (frame, true_shift_px) sliding right across the image, then back."""
+    max_x = image.shape[1] - view_width
+    x = 0
+    direction = 1
+    for _ in range(frames):
+        yield image[:, x:x + view_width], x
+        if not 0 <= x + direction * step <= max_x:
+            direction = -direction
+        x += direction * step
+
+
+def run_synthetic(args) -> None:
+    if args.image:
+        image = cv2.imread(args.image)
+        if image is None:
+            print(f"Could not read {args.image}")
+            sys.exit(1)
+    else:
+        rng = np.random.default_rng(0)
+        noise = rng.integers(0, 255, (90, 640), dtype=np.uint8)
+        image = cv2.resize(noise, (6400, 900), interpolation=cv2.INTER_CUBIC)
+        image = cv2.GaussianBlur(image, (0, 0), 3)
+
+    view_width = min(args.view_width, image.shape[1] // 2)
+    odo = VisualOdometry(hfov_deg=args.hfov, width=args.width)
+    deg_per_px = args.hfov / view_width
+
+    errors = []
+    start = time.perf_counter()
+    for frame, true_x in synthetic_frames(image, view_width, args.step, args.frames):
+        est = odo.update(frame)
+        true_pan = true_x * deg_per_px
+        errors.append(est.pan - true_pan)
+    elapsed = time.perf_counter() - start
+
+    errors = np.abs(np.array(errors))
+    print(f"Frames:      {args.frames} ({view_width}x{image.shape[0]} -> width {args.width})")
+    print(f"Throughput:  {args.frames / elapsed:.0f} fps ({elapsed / args.frames * 1000:.2f} ms/frame)")
+    print(f"Pan error:   mean {errors.mean():.2f}°, p95 {np.percentile(errors, 95):.2f}°, max {errors.max():.2f}°")
+    print(f"Keyframes:   {odo.keyframes}, rejected: {odo.rejected}")
+
+
+def run_video(args) -> None:
+    cap = cv2.VideoCapture(args.video)
+    if not cap.isOpened():
+        print(f"Could not open {args.video}")
+        sys.exit(1)
+
+    odo = VisualOdometry(hfov_deg=args.hfov, width=args.width)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 15.0
+
+    frames = 0
+    busy = 0.0
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        t = time.perf_counter()
+        est = odo.update(frame)
+        busy += time.perf_counter() - t
+        frames += 1
+        if args.verbose and frames % int(fps) == 0:
+            print(f"  t={frames / fps:6.1f}s pan={est.pan:7.2f}° tilt={est.tilt:6.2f}° r={est.response:.2f}")
+    cap.release()
+
+    if not frames:
+        print("No frames decoded")
+        sys.exit(1)
+
+    est = odo.estimate
+    print(f"Frames:      {frames} ({frames / fps:.1f}s of video at {fps:.0f} fps)")
+    print(f"Throughput:  {frames / busy:.0f} fps estimator-only ({busy / frames * 1000:.2f} ms/frame)")
+    print(f"Realtime:    {frames / busy / fps:.1f}x stream rate")
+    print(f"Final angle: pan {est.pan:.2f}°, tilt {est.tilt:.2f}°")
+    print(f"Keyframes:   {odo.keyframes}, rejected: {odo.rejected}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Visual odometry benchmark")
+    parser.add_argument("--video", help="Recorded pan sequence to process")
+    parser.add_argument("--image", help="Wide image for the synthetic pan (default: random texture)")
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--step", type=int, default=4, help="Synthetic pan speed in px/frame")
+    parser.add_argument("--view-width", type=int, default=1280)
+    parser.add_argument("--width", type=int, default=160, help="Estimator working width")
+    parser.add_argument("--hfov", type=float, default=100.0)
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+
+    cv2.setNumThreads(1)
+
+    if args.video:
+        run_video(args)
+    else:
+        run_synthetic(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,20 +2,38 @@
 
 from .controller import AndroidController
 from .screen import ScreenCapture
+from .framebuffer import ScreenFrame
+from .screen_stream import ScreenStream
+from .ocr import IncrementalOCR, WordBox
+from .templates import TemplateRegistry, TemplateMatch
 from .ui import UIAutomation
+from .element_locator import ElementLocator, UINode
 from .file_transfer import FileTransfer
 from .intelligent_screen import IntelligentScreen
+from .screen_classifier import ScreenClassifier, ScreenMatch
 from .tapo_automator import TapoAutomator, TapoCredentials, CameraConfig
 from .session import Session, SessionManager, SessionEvent
 from .device_monitor import DeviceMonitor, DeviceState, EmulatorConfig
+from .device_pool import DevicePool
+from .adb_protocol import DeviceTracker, list_devices
 from .app_installer import AppInstaller, InstallMethod, InstallResult, InstallStatus
 
 __all__ = [
     "AndroidController",
     "ScreenCapture",
+    "ScreenFrame",
+    "ScreenStream",
+    "IncrementalOCR",
+    "WordBox",
+    "TemplateRegistry",
+    "TemplateMatch",
     "UIAutomation",
+    "ElementLocator",
+    "UINode",
     "FileTransfer",
     "IntelligentScreen",
+    "ScreenClassifier",
+    "ScreenMatch",
     "TapoAutomator",
     "TapoCredentials",
     "CameraConfig",
@@ -25,6 +43,9 @@ __all__ = [
     "DeviceMonitor",
     "DeviceState",
     "EmulatorConfig",
+    "DevicePool",
+    "DeviceTracker",
+    "list_devices",
     "AppInstaller",
     "InstallMethod",
     "InstallResult",
@@ -0,0 +1,273 @@
+"""Minimal client for the ADB server's socket protocol.
+
+The adb server (port 5037) speaks a simple protocol: the client sends a
+service name prefixed with its length as four hex digits, the server
+answers "OKAY" or "FAIL" followed by a length-prefixed message. Talking
+to it directly lists devices without forking `adb devices`, and makes the
+device layer testable against an in-process server (see
+tapo_c210_monitor.testing.fake_adb).
+
+host:track-devices keeps the connection open and the server pushes the
+whole device list every time it changes; DeviceTracker follows that
+stream so device changes are seen within milliseconds instead of at the
+next poll.
+"""
+
+import socket
+import threading
+import time
+from typing import Callable
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 5037
+
+
+class AdbProtocolError(Exception):
+    """The ADB server refused a request or sent something unexpected."""
+
+
+def encode_request(service: str) -> bytes:
+    """Frame a service request ("host:devices" -> b"000chost:devices")."""
+    data = service.encode()
+    return f"{len(data):04x}".encode() + data
+
+
+def recv_exact(sock: socket.socket, size: int) -> bytes:
+    """Read exactly size bytes (raises ConnectionError on EOF)."""
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("ADB server closed the connection")
+        data += chunk
+    return data
+
+
+def read_message(sock: socket.socket) -> str:
+    """Read one length-prefixed message."""
+    size = int(recv_exact(sock, 4), 16)
+    return recv_exact(sock, size).decode("utf-8", errors="replace")
+
+
+def open_service(
+    service: str,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    timeout: float | None = 10.0,
+) -> socket.socket:
+    """Connect and request a service; returns the socket after OKAY.
+
+    Raises:
+        AdbProtocolError: If the server answers FAIL
+        OSError: If the server can't be reached
+    """
+    sock = socket.create_connection((host, port), timeout=timeout)
+    try:
+        sock.sendall(encode_request(service))
+        status = recv_exact(sock, 4)
+        if status == b"FAIL":
+            raise AdbProtocolError(read_message(sock))
+        if status != b"OKAY":
+            raise AdbProtocolError(f"Unexpected ADB status: {status!r}")
+        return sock
+    except Exception:
+        sock.close()
+        raise
+
+
+def parse_devices(payload: str) -> dict[str, str]:
+    """Parse a device list ("serial\\tstate" lines) into {serial: state}."""
+    devices = {}
+    for line in payload.splitlines():
+        parts = line.split()
+        if len(parts) >= 2:
+            devices[parts[0]] = parts[1]
+    return devices
+
+
+def list_devices(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, timeout: float = 10.0) -> dict[str, str]:
+    """Devices known to the ADB server.
+
+    Returns:
+        {serial: state}, where state is "device", "offline",
+        "unauthorized", ...
+    """
+    with open_service("host:devices", host, port, timeout) as sock:
+        return parse_devices(read_message(sock))
+
+
+DeviceCallback = Callable[[str, str | None, str | None], None]
+
+
+class DeviceTracker:
+    """Follows host:track-devices and reports device state changes.
+
+    Callbacks run on the tracker thread as callback(serial, old_state,
+    new_state), where a state of None means the device is not listed.
+    If the server goes away the last known list is kept and the tracker
+    reconnects; the first list after reconnecting is diffed as usual.
+
+    Usage:
+        tracker = DeviceTracker().start()
+        tracker.add_callback(lambda serial, old, new: print(serial, old, "->", new))
+        serial = tracker.wait_for(timeout=30)
+    """
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, reconnect_delay: float = 1.0):
+        """Initialize tracker (call start(), or use as a context manager).
+
+        Args:
+            host: ADB server host
+            port: ADB server port
+            reconnect_delay: Seconds between connection attempts
+        """
+        self.host = host
+        self.port = port
+        self.reconnect_delay = reconnect_delay
+
+        self.devices: dict[str, str] = {}
+        self.connected = False
+        self.updates = 0
+
+        self._cond = threading.Condition()
+        self._callbacks: list[DeviceCallback] = []
+        self._sock: socket.socket | None = None
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._warned = False
+
+    def add_callback(self, callback: DeviceCallback) -> None:
+        """Add callback(serial, old_state, new_state) for device changes."""
+        self._callbacks.append(callback)
+
+    def remove_callback(self, callback: DeviceCallback) -> None:
+        if callback in self._callbacks:
+            self._callbacks.remove(callback)
+
+    def _apply(self, devices: dict[str, str]) -> None:
+        with self._cond:
+            old = self.devices
+            self.devices = devices
+            self.connected = True
+            self.updates += 1
+            self._cond.notify_all()
+
+        for serial in sorted(old.keys() | devices.keys()):
+            before, after = old.get(serial), devices.get(serial)
+            if before == after:
+                continue
+            for callback in list(self._callbacks):
+                try:
+                    callback(serial, before, after)
+                except Exception as e:
+                    print(f"Device tracker callback error: {e}")
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                sock = open_service("host:track-devices", self.host, self.port, timeout=self.reconnect_delay + 1)
+            except (OSError, AdbProtocolError) as e:
+                if not self._warned:
+                    print(f"Device tracker: ADB server unavailable ({e}), retrying")
+                    self._warned = True
+                self._stop_event.wait(self.reconnect_delay)
+                continue
+
+            self._warned = False
+            sock.settimeout(None)  # Updates arrive whenever devices change
+            self._sock = sock
+            try:
+                while not self._stop_event.is_set():
+                    self._apply(parse_devices(read_message(sock)))
+            except (OSError, ValueError):
+                pass
+            finally:
+                self._sock = None
+                sock.close()
+                with self._cond:
+                    self.connected = False
+                    self._cond.notify_all()
+
+            if not self._stop_event.is_set():
+                self._stop_event.wait(self.reconnect_delay)
+
+    def wait_connected(self, timeout: float | None = None) -> bool:
+        """Wait for the first device list from the server.
+
+        Returns:
+            True if connected within timeout
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self.connected, timeout)
+
+    def wait_for(
+        self,
+        serial: str | None = None,
+        state: str | None = "device",
+        timeout: float | None = None,
+    ) -> str | None:
+        """Wait until a device reaches a state.
+
+        Args:
+            serial: Device to watch (None = any device)
+            state: State to wait for (None = device gone; needs a serial,
+                see wait_until_empty() for all devices)
+            timeout: Maximum seconds to wait (None = forever)
+
+        Returns:
+            Serial of the matching device (for state None, the serial
+            given), or None on timeout
+        """
+        if serial is None and state is None:
+            raise ValueError("wait_for needs a serial or a state; use wait_until_empty() to wait for no devices")
+
+        def match() -> str | None:
+            if serial is not None:
+                return serial if self.devices.get(serial) == state else None
+            return next((s for s, st in self.devices.items() if st == state), None)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while (found := match()) is None:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            return found
+
+    def wait_until_empty(self, timeout: float | None = None) -> bool:
+        """Wait until no devices are listed.
+
+        Returns:
+            True if the list was empty within timeout
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: not self.devices, timeout)
+
+    def start(self) -> "DeviceTracker":
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="adb-track-devices")
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        """Stop tracking."""
+        self._stop_event.set()
+        sock = self._sock
+        if sock is not None:
+            try:
+                # Unblocks the reader thread
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def __enter__(self) -> "DeviceTracker":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
@@ -375,16 +375,20 @@ class CameraControls:
         # Set to landscape (rotation 1 = 90 degrees)
         self.controller.shell("settings put system user_rotation 1")
         time.sleep(0.5)
+        # Touches written to the panel need the new orientation
+        self.controller.input.refresh_orientation()
 
     def set_portrait_mode(self) -> None:
         """Force portrait mode."""
         self.controller.shell("settings put system accelerometer_rotation 0")
         self.controller.shell("settings put system user_rotation 0")
         time.sleep(0.5)
+        self.controller.input.refresh_orientation()
 
     def enable_auto_rotate(self) -> None:
         """Enable auto-rotation."""
         self.controller.shell("settings put system accelerometer_rotation 1")
+        self.controller.input.refresh_orientation()
 
 
 def quick_test():
@@ -5,6 +5,10 @@ import time
 from pathlib import Path
 from typing import Callable
 
+from .framebuffer import ScreenFrame, decode_png, make_frame, parse_screencap
+from .input_injector import InputBatch, InputInjector
+from .shell_session import ShellSession
+
 try:
     from ppadb.client import Client as AdbClient
     PPADB_AVAILABLE = True
@@ -35,6 +39,8 @@ class AndroidController:
         self.device_serial = device_serial
         self._client = None
         self._device = None
+        self._session: ShellSession | None = None
+        self.input = InputInjector(self)
 
     def connect(self) -> bool:
         """Connect to ADB and device.
@@ -96,6 +102,9 @@ class AndroidController:
     def shell(self, command: str) -> str:
         """Execute shell command on device.
 
+        Without ppadb, commands go through a persistent ShellSession
+        instead of forking `adb shell` each time.
+
         Args:
             command: Shell command to execute
 
@@ -105,6 +114,13 @@ class AndroidController:
         if self._device and PPADB_AVAILABLE:
             return self._device.shell(command)
 
+        try:
+            return self._shell_session().run(command)
+        except TimeoutError:
+            raise
+        except (ConnectionError, OSError) as e:
+            print(f"Shell session failed, falling back to one-shot adb: {e}")
+
         result = subprocess.run(
             ["adb", "-s", self.device_serial, "shell", command],
             capture_output=True,
@@ -113,6 +129,32 @@ class AndroidController:
         )
         return result.stdout
 
+    def shell_many(self, commands: list[str]) -> list[str]:
+        """Execute several shell commands, pipelined in one write when possible.
+
+        Args:
+            commands: Shell commands, run in order
+
+        Returns:
+            Output of each command
+        """
+        if self._device and PPADB_AVAILABLE:
+            return [self._device.shell(c) for c in commands]
+        return self._shell_session().run_many(commands)
+
+    def _shell_session(self) -> ShellSession:
+        if self._session is None or self._session.serial != self.device_serial:
+            if self._session is not None:
+                self._session.close()
+            self._session = ShellSession(self.device_serial)
+        return self._session
+
+    def close(self) -> None:
+        """Close the persistent shell session (reopened on next use)."""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
     def tap(self, x: int, y: int) -> None:
         """Simulate screen tap at coordinates.
 
@@ -120,7 +162,7 @@ class AndroidController:
             x: X coordinate
             y: Y coordinate
         """
-        self.shell(f"input tap {x} {y}")
+        self.input.tap(x, y)
 
     def swipe(
         self,
@@ -137,7 +179,7 @@ class AndroidController:
             x2, y2: End coordinates
             duration_ms: Swipe duration in milliseconds
         """
-        self.shell(f"input swipe {x1} {y1} {x2} {y2} {duration_ms}")
+        self.input.swipe(x1, y1, x2, y2, duration_ms)
 
     def long_press(self, x: int, y: int, duration_ms: int = 1000) -> None:
         """Simulate long press.
@@ -147,7 +189,7 @@ class AndroidController:
             y: Y coordinate
             duration_ms: Press duration
         """
-        self.shell(f"input swipe {x} {y} {x} {y} {duration_ms}")
+        self.input.long_press(x, y, duration_ms)
 
     def key_event(self, keycode: int | str) -> None:
         """Send key event.
@@ -155,7 +197,7 @@ class AndroidController:
         Args:
             keycode: Android keycode (number or name like KEYCODE_HOME)
         """
-        self.shell(f"input keyevent {keycode}")
+        self.input.key_event(keycode)
 
     def text(self, text: str) -> None:
         """Type text.
@@ -163,9 +205,16 @@ class AndroidController:
         Args:
             text: Text to type (spaces will be encoded)
         """
-        # Escape special characters for shell
-        escaped = text.replace(" ", "%s").replace("'", "\\'")
-        self.shell(f"input text '{escaped}'")
+        self.input.text(text)
+
+    def batch(self) -> InputBatch:
+        """Collect several gestures and send them in one round-trip.
+
+        Usage:
+            with controller.batch() as b:
+                b.tap(100, 200).wait(0.3).text("hello").key(66)
+        """
+        return self.input.batch()
 
     def back(self) -> None:
         """Press back button."""
@@ -191,12 +240,56 @@ class AndroidController:
         """Press power button."""
         self.key_event(26)  # KEYCODE_POWER
 
+    def exec_out(self, command: str, timeout: float = 30) -> bytes:
+        """Run a command and return its raw stdout (no PTY, no newline mangling).
+
+        Args:
+            command: Command to execute
+
+        Returns:
+            Command output bytes
+        """
+        if self._device and PPADB_AVAILABLE:
+            conn = self._device.create_connection(timeout=timeout)
+            try:
+                conn.send(f"exec:{command}")
+                return conn.read_all()
+            finally:
+                conn.close()
+
+        result = subprocess.run(
+            ["adb", "-s", self.device_serial, "exec-out", command],
+            capture_output=True,
+            timeout=timeout,
+        )
+        return result.stdout
+
+    def capture_frame(self, max_dimension: int | None = None) -> ScreenFrame:
+        """Capture the screen into memory.
+
+        Streams raw `screencap` pixels over one ADB call, with no PNG
+        encoding and no files on either side. Falls back to in-memory PNG
+        if the device doesn't produce a raw dump.
+
+        Args:
+            max_dimension: Downscale so neither side exceeds this
+                (None = native resolution)
+
+        Returns:
+            ScreenFrame with ndarray and PIL views
+        """
+        try:
+            rgb = parse_screencap(self.exec_out("screencap"))
+        except ValueError:
+            rgb = decode_png(self.exec_out("screencap -p"))
+        return make_frame(rgb, max_dimension)
+
     def screenshot(
         self,
         local_path: str | Path,
         max_dimension: int | None = 1900,
     ) -> Path:
-        """Take screenshot and pull to local machine.
+        """Take screenshot and save it on the local machine.
 
         Args:
             local_path: Local path to save screenshot
@@ -208,44 +301,10 @@ class AndroidController:
         Returns:
             Path to saved screenshot
         """
-        from PIL import Image
-
         local_path = Path(local_path)
         local_path.parent.mkdir(parents=True, exist_ok=True)
 
-        remote_path = "/sdcard/screenshot_temp.png"
-
-        # Take screenshot
-        self.shell(f"screencap -p {remote_path}")
-
-        # Pull to local
-        if self._device and PPADB_AVAILABLE:
-            self._device.pull(remote_path, str(local_path))
-        else:
-            subprocess.run(
-                ["adb", "-s", self.device_serial, "pull", remote_path, str(local_path)],
-                capture_output=True,
-                timeout=30,
-            )
-
-        # Clean up remote file
-        self.shell(f"rm {remote_path}")
-
-        # Resize if needed to stay under API limits
-        if max_dimension is not None:
-            img = Image.open(local_path)
-            width, height = img.size
-            if width > max_dimension or height > max_dimension:
-                # Calculate new dimensions maintaining aspect ratio
-                if width > height:
-                    new_width = max_dimension
-                    new_height = int(height * (max_dimension / width))
-                else:
-                    new_height = max_dimension
-                    new_width = int(width * (max_dimension / height))
-                img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-                img.save(local_path)
-
+        self.capture_frame(max_dimension).save(local_path)
         return local_path
 
     def screen_record(
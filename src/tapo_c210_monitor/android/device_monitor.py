@@ -1,4 +1,11 @@
-"""Device monitoring and auto-recovery for Android emulators."""
+"""Device monitoring and auto-recovery for Android emulators.
+
+Connection changes come from the adb server's host:track-devices stream
+(DeviceTracker), so a disconnect reaches the state callbacks within
+milliseconds; while the device is listed, a heartbeat over a persistent
+shell checks that it still responds. Without a reachable adb server the
+monitor falls back to polling `adb devices`.
+"""
 
 import subprocess
 import threading
@@ -8,7 +15,9 @@ from enum import Enum
 from pathlib import Path
 from typing import Callable
 
+from .adb_protocol import DeviceTracker
 from .session import Session
+from .shell_session import ShellSession
 
 
 class DeviceState(Enum):
@@ -42,6 +51,11 @@ class DeviceMonitor:
         check_interval: float = 5.0,
         max_recovery_attempts: int = 3,
         session: Session | None = None,
+        device_serial: str | None = None,
+        auto_recover: bool = True,
+        tracker: DeviceTracker | None = None,
+        use_tracker: bool = True,
+        heartbeat_timeout: float = 5.0,
     ):
         """Initialize device monitor.
 
@@ -50,14 +64,26 @@ class DeviceMonitor:
             check_interval: Seconds between health checks
             max_recovery_attempts: Max consecutive recovery attempts
             session: Session for logging events
+            device_serial: Device to watch (None = first device found)
+            auto_recover: Restart adb/the emulator when the device is lost.
+                Off when several devices share the adb server, since
+                restarting it drops all of them
+            tracker: Shared DeviceTracker (default: one of its own)
+            use_tracker: Follow host:track-devices (False = poll `adb devices`)
+            heartbeat_timeout: Seconds a heartbeat may take before the
+                device counts as unresponsive
         """
         self.emulator_config = emulator_config
         self.check_interval = check_interval
         self.max_recovery_attempts = max_recovery_attempts
         self.session = session
+        self.auto_recover = auto_recover
+        self.use_tracker = use_tracker or tracker is not None
+        self.heartbeat_timeout = heartbeat_timeout
 
         self.state = DeviceState.DISCONNECTED
-        self.device_serial: str | None = None
+        self.device_serial: str | None = device_serial
+        self._pinned = device_serial is not None
         self.emulator_pid: int | None = None
         self.recovery_attempts = 0
 
@@ -65,6 +91,11 @@ class DeviceMonitor:
         self._stop_event = threading.Event()
         self._state_callbacks: list[Callable[[DeviceState, DeviceState], None]] = []
 
+        self.tracker = tracker
+        self._owns_tracker = tracker is None
+        self._shell: ShellSession | None = None
+        self._wake = threading.Event()
+
     def _log(self, event_type: str, data: dict | None = None, success: bool = True, error: str | None = None) -> None:
         """Log event to session if available."""
         if self.session:
@@ -111,21 +142,41 @@ class DeviceMonitor:
         """
         self._state_callbacks.append(callback)
 
+    def apply_adb_state(self, adb_state: str | None) -> None:
+        """Update state from a device list seen elsewhere (no ADB call).
+
+        Args:
+            adb_state: The device's state as the adb server reports it
+                ("device", "offline", ...), or None if it is not listed
+        """
+        if adb_state == "device":
+            self._set_state(DeviceState.CONNECTED)
+        elif adb_state is None:
+            self._set_state(DeviceState.DISCONNECTED)
+        else:
+            self._set_state(DeviceState.OFFLINE)
+
     def check_device_connected(self) -> bool:
         """Check if device is connected and responsive.
 
         Returns:
             True if device is connected and responding
         """
-        code, stdout, stderr = self._run_adb("devices", timeout=10)
-        if code != 0:
-            return False
-
-        lines = stdout.strip().split("\n")[1:]  # Skip header
-        for line in lines:
-            parts = line.split()
-            if len(parts) >= 2 and parts[1] == "device":
-                self.device_serial = parts[0]
+        tracker = self._tracking()
+        if tracker:
+            devices = dict(tracker.devices)
+        else:
+            code, stdout, stderr = self._run_adb("devices", timeout=10)
+            if code != 0:
+                return False
+            lines = stdout.strip().split("\n")[1:]  # Skip header
+            devices = dict(line.split()[:2] for line in lines if len(line.split()) >= 2)
+
+        for serial, state in devices.items():
+            if state == "device":
+                if self._pinned and serial != self.device_serial:
+                    continue
+                self.device_serial = serial
                 return True
 
         return False
@@ -139,12 +190,41 @@ class DeviceMonitor:
         if not self.device_serial:
             return False
 
-        code, stdout, _ = self._run_adb(
-            "-s", self.device_serial,
-            "shell", "getprop", "sys.boot_completed",
-            timeout=10,
-        )
-        return code == 0 and stdout.strip() == "1"
+        if self._shell is None or self._shell.serial != self.device_serial:
+            if self._shell:
+                self._shell.close()
+            self._shell = ShellSession(self.device_serial, timeout=self.heartbeat_timeout)
+
+        # One round-trip on the open shell (it respawns after a reconnect)
+        try:
+            return self._shell.run("getprop sys.boot_completed").strip() == "1"
+        except (OSError, TimeoutError, EOFError):
+            return False
+
+    # -- device tracking --
+
+    def _tracking(self) -> DeviceTracker | None:
+        """The tracker, if it has a live connection to the adb server."""
+        if not self.use_tracker:
+            return None
+        if self.tracker is None:
+            self.tracker = DeviceTracker().start()
+            self.tracker.wait_connected(timeout=1.0)
+        return self.tracker if self.tracker.connected else None
+
+    def _on_device_event(self, serial: str, old: str | None, new: str | None) -> None:
+        """Tracker callback: react to our device changing state."""
+        if self.device_serial is None and not self._pinned and new == "device":
+            self.device_serial = serial
+        if serial != self.device_serial:
+            return
+
+        if new != "device" and self.state == DeviceState.CONNECTED:
+            self.apply_adb_state(new)
+            self._log("device_disconnected", {"adb_state": new}, success=False, error="Device went offline")
+        # The monitor loop re-checks right away (heartbeat for a device
+        # that came back, recovery for one that left)
+        self._wake.set()
 
     def wait_for_device(self, timeout: int = 120) -> bool:
         """Wait for device to become available.
@@ -160,6 +240,12 @@ class DeviceMonitor:
 
         start = time.time()
         while time.time() - start < timeout:
+            tracker = self._tracking()
+            if tracker:
+                # Sleep until the server lists the device (or stops answering)
+                remaining = timeout - (time.time() - start)
+                serial = self.device_serial if self._pinned else None
+                tracker.wait_for(serial, "device", timeout=min(remaining, self.check_interval))
             if self.check_device_connected():
                 # Wait for boot completion
                 boot_start = time.time()
@@ -168,8 +254,9 @@ class DeviceMonitor:
                         self._set_state(DeviceState.CONNECTED)
                         self._log("device_ready", {"serial": self.device_serial})
                         return True
-                    time.sleep(2)
-            time.sleep(2)
+                    time.sleep(0.5 if tracker else 2)
+            elif not tracker:
+                time.sleep(2)
 
         self._set_state(DeviceState.DISCONNECTED)
         self._log("wait_timeout", {"timeout": timeout}, success=False)
@@ -301,10 +388,17 @@ class DeviceMonitor:
                     self._log("device_unresponsive", success=False, error="Device not responding")
 
             elif self.state in (DeviceState.OFFLINE, DeviceState.DISCONNECTED):
-                # Try to recover
-                self.recover()
-
-            self._stop_event.wait(self.check_interval)
+                if self.check_device_connected() and self.check_device_responsive():
+                    # Came back by itself
+                    self._set_state(DeviceState.CONNECTED)
+                    self.recovery_attempts = 0
+                elif self.auto_recover:
+                    # Try to recover
+                    self.recover()
+
+            # Tracker events cut the wait short
+            self._wake.wait(self.check_interval)
+            self._wake.clear()
 
     def start_monitoring(self) -> None:
         """Start background monitoring thread."""
@@ -312,6 +406,9 @@ class DeviceMonitor:
             return
 
         self._stop_event.clear()
+        if self.use_tracker:
+            self._tracking()
+            self.tracker.add_callback(self._on_device_event)
         self._monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
         self._monitor_thread.start()
         self._log("monitoring_started")
@@ -319,8 +416,17 @@ class DeviceMonitor:
     def stop_monitoring(self) -> None:
         """Stop background monitoring thread."""
         self._stop_event.set()
+        self._wake.set()
         if self._monitor_thread:
             self._monitor_thread.join(timeout=10)
+        if self.tracker:
+            self.tracker.remove_callback(self._on_device_event)
+            if self._owns_tracker:
+                self.tracker.close()
+                self.tracker = None
+        if self._shell:
+            self._shell.close()
+            self._shell = None
         self._log("monitoring_stopped")
 
     def ensure_connected(self, timeout: int = 120) -> bool:
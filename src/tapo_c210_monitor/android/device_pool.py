@@ -0,0 +1,433 @@
+"""Run Android automations on several devices at once.
+
+A DevicePool lists the devices the adb server knows about and gives each
+one a worker thread, an AndroidController and a DeviceMonitor. Jobs go
+into a shared queue and whichever device is free and healthy takes the
+next one, so throughput grows with the number of phones or emulators.
+Jobs can also be pinned to one device, and a device can be leased
+exclusively outside the queue.
+
+Device health comes from the monitors' state callbacks, fed by the adb
+server's track-devices stream: a device that goes offline stops taking
+jobs within milliseconds (a job that fails on it is retried elsewhere)
+and picks up work again when it comes back. New devices join as they
+are plugged in.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import CancelledError, Future
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator
+
+from .adb_protocol import DEFAULT_HOST, DEFAULT_PORT, DeviceTracker, list_devices
+from .controller import AndroidController
+from .device_monitor import DeviceMonitor, DeviceState
+from .session import Session
+
+
+@dataclass
+class Job:
+    """A queued automation: fn(controller, *args, **kwargs)."""
+    fn: Callable[..., Any]
+    args: tuple = ()
+    kwargs: dict = field(default_factory=dict)
+    name: str = ""
+    serial: str | None = None  # Pinned device
+    retries: int = 0
+    attempts: int = 0
+    future: Future = field(default_factory=Future, repr=False)
+
+
+@dataclass
+class DeviceLease:
+    """One pooled device and its worker's bookkeeping."""
+    serial: str
+    controller: AndroidController
+    monitor: DeviceMonitor
+    jobs: "queue.Queue[Job]" = field(default_factory=queue.Queue, repr=False)  # Pinned jobs
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    connected: bool = False
+    busy: bool = False
+    jobs_done: int = 0
+    failures: int = 0
+    busy_seconds: float = 0.0
+    suspended_until: float = 0.0  # Set when a job lost the connection
+
+    @property
+    def healthy(self) -> bool:
+        return self.monitor.state == DeviceState.CONNECTED
+
+
+class DevicePool:
+    """Shared job queue over all connected ADB devices.
+
+    Usage:
+        with DevicePool() as pool:
+            futures = [pool.submit(pan_sweep, angle) for angle in range(0, 360, 30)]
+            results = [f.result() for f in futures]
+
+            with pool.lease() as controller:
+                controller.tap(100, 200)
+    """
+
+    def __init__(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        serials: Iterable[str] | None = None,
+        check_interval: float = 2.0,
+        controller_factory: Callable[[str], AndroidController] | None = None,
+        session: Session | None = None,
+    ):
+        """Initialize pool (call start(), or use as a context manager).
+
+        Args:
+            host: ADB server host
+            port: ADB server port
+            serials: Only use these devices (None = every device)
+            check_interval: Seconds a device that lost a job's connection
+                sits out before its adb state is trusted again
+            controller_factory: Builds the controller for a serial
+                (default: AndroidController on the same adb server)
+            session: Session for logging device events
+        """
+        self.host = host
+        self.port = port
+        self.serials = set(serials) if serials else None
+        self.check_interval = check_interval
+        self.controller_factory = controller_factory or (
+            lambda serial: AndroidController(host=host, port=port, device_serial=serial)
+        )
+        self.session = session
+
+        self._leases: dict[str, DeviceLease] = {}
+        self._queue: "queue.Queue[Job]" = queue.Queue()
+        self._cond = threading.Condition()
+        self._lock = threading.Lock()
+        self._running = False
+        self._threads: list[threading.Thread] = []
+        self.tracker = DeviceTracker(host, port)
+
+    # -- devices --
+
+    def refresh(self) -> dict[str, str]:
+        """Read the device list once, adding workers for new devices.
+
+        Not needed while the pool runs: the tracker applies changes as
+        the server reports them.
+
+        Returns:
+            {serial: adb state} as reported by the server
+        """
+        try:
+            devices = list_devices(self.host, self.port)
+        except OSError as e:
+            # Says nothing about the devices themselves; jobs that
+            # fail on a lost device take it offline anyway
+            print(f"Device pool: ADB server unreachable: {e}")
+            return {}
+
+        for serial in devices.keys() | self._leases.keys():
+            self._on_device_event(serial, None, devices.get(serial))
+        return devices
+
+    def _on_device_event(self, serial: str, old: str | None, new: str | None) -> None:
+        """Tracker callback (also used by refresh)."""
+        if self.serials is not None and serial not in self.serials:
+            return
+        with self._lock:
+            lease = self._leases.get(serial)
+            if lease is None:
+                if new != "device":
+                    return
+                lease = self._add_device(serial)
+        if new == "device" and time.monotonic() < lease.suspended_until:
+            # Sitting out after a lost connection; the worker goes back
+            # to the server's listing once the suspension ends
+            return
+        lease.monitor.apply_adb_state(new)
+
+    def _add_device(self, serial: str) -> DeviceLease:
+        monitor = DeviceMonitor(
+            device_serial=serial,
+            check_interval=self.check_interval,
+            session=self.session,
+            auto_recover=False,
+            tracker=self.tracker,
+        )
+        lease = DeviceLease(serial, self.controller_factory(serial), monitor)
+        monitor.add_state_callback(lambda old, new: self._on_state(serial, old, new))
+        self._leases[serial] = lease
+
+        if self._running:
+            self._start_worker(lease)
+        return lease
+
+    def _on_state(self, serial: str, old: DeviceState, new: DeviceState) -> None:
+        if new != DeviceState.CONNECTED:
+            self._leases[serial].connected = False
+        with self._cond:
+            # Wake idle workers: one may be able to work again
+            self._cond.notify_all()
+
+    @property
+    def devices(self) -> list[str]:
+        """Serials in the pool."""
+        return list(self._leases)
+
+    @property
+    def healthy_devices(self) -> list[str]:
+        """Serials currently able to take jobs."""
+        return [serial for serial, lease in self._leases.items() if lease.healthy]
+
+    def wait_for_devices(self, count: int = 1, timeout: float = 30.0) -> bool:
+        """Wait until at least count devices are healthy.
+
+        Returns:
+            True if enough devices became available in time
+        """
+        deadline = time.monotonic() + timeout
+        while len(self.healthy_devices) < count:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            with self._cond:
+                self._cond.wait(min(remaining, self.check_interval))
+        return True
+
+    # -- jobs --
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args,
+        serial: str | None = None,
+        name: str | None = None,
+        retries: int = 0,
+        **kwargs,
+    ) -> Future:
+        """Queue fn(controller, *args, **kwargs) for the next free device.
+
+        Args:
+            fn: Automation taking an AndroidController first
+            serial: Run only on this device
+            name: Label for logs
+            retries: Extra attempts if the job raises
+
+        Returns:
+            Future with the job's return value
+        """
+        job = Job(fn, args, kwargs, name or getattr(fn, "__name__", "job"), serial, retries)
+        if serial is not None:
+            if serial not in self._leases:
+                raise KeyError(f"Device not in pool: {serial}")
+            self._leases[serial].jobs.put(job)
+        else:
+            self._queue.put(job)
+        with self._cond:
+            self._cond.notify_all()
+        return job.future
+
+    def map(self, fn: Callable[..., Any], items: Iterable, timeout: float | None = None) -> list:
+        """Run fn(controller, item) for every item across the pool.
+
+        Returns:
+            Results in item order (re-raises the first job error)
+        """
+        futures = [self.submit(fn, item) for item in items]
+        return [f.result(timeout=timeout) for f in futures]
+
+    def _next_job(self, lease: DeviceLease) -> Job | None:
+        try:
+            return lease.jobs.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return self._queue.get(timeout=0.05)
+        except queue.Empty:
+            return None
+
+    def _run_job(self, lease: DeviceLease, job: Job) -> None:
+        """Run a job; the caller holds lease.lock."""
+        if job.attempts == 0 and not job.future.set_running_or_notify_cancel():
+            return
+        job.attempts += 1
+
+        lease.busy = True
+        start = time.monotonic()
+        try:
+            result = job.fn(lease.controller, *job.args, **job.kwargs)
+        except Exception as e:
+            lease.failures += 1
+            print(f"Device pool: {job.name} failed on {lease.serial}: {e}")
+            if isinstance(e, OSError):
+                # Connection trouble: stop feeding this device for a
+                # while even if the server still lists it
+                lease.suspended_until = time.monotonic() + self.check_interval
+                lease.monitor.apply_adb_state("offline")
+            if job.attempts <= job.retries:
+                # Retried by whichever device is free (or the same
+                # one, for pinned jobs)
+                self._requeue(job)
+            else:
+                job.future.set_exception(e)
+        else:
+            lease.jobs_done += 1
+            job.future.set_result(result)
+        finally:
+            lease.busy = False
+            lease.busy_seconds += time.monotonic() - start
+
+    def _requeue(self, job: Job) -> None:
+        (self._leases[job.serial].jobs if job.serial else self._queue).put(job)
+
+    def _worker(self, lease: DeviceLease) -> None:
+        while self._running and lease.serial in self._leases:
+            if not lease.healthy:
+                if lease.suspended_until and time.monotonic() >= lease.suspended_until:
+                    # Sat out long enough; go by the server's listing again
+                    lease.suspended_until = 0.0
+                    lease.monitor.apply_adb_state(self.tracker.devices.get(lease.serial))
+                    continue
+                with self._cond:
+                    self._cond.wait(self.check_interval)
+                continue
+
+            if not lease.connected:
+                lease.connected = lease.controller.connect()
+                if not lease.connected:
+                    time.sleep(self.check_interval)
+                    continue
+
+            if lease.lock.locked():
+                # Leased out; leave the queue to the other devices
+                time.sleep(0.05)
+                continue
+
+            job = self._next_job(lease)
+            if job is None:
+                continue
+            if not lease.lock.acquire(blocking=False):
+                # Leased between the check and the get
+                self._requeue(job)
+                continue
+            if not lease.healthy:
+                # Went away while waiting on the queue
+                lease.lock.release()
+                self._requeue(job)
+                continue
+            try:
+                self._run_job(lease, job)
+            finally:
+                lease.lock.release()
+
+    def _start_worker(self, lease: DeviceLease) -> None:
+        thread = threading.Thread(target=self._worker, args=(lease,), daemon=True, name=f"pool-{lease.serial}")
+        thread.start()
+        self._threads.append(thread)
+
+    # -- leases --
+
+    @contextmanager
+    def lease(self, serial: str | None = None, timeout: float | None = None) -> Iterator[AndroidController]:
+        """Borrow a device exclusively (its worker pauses meanwhile).
+
+        Args:
+            serial: Device to borrow (None = any healthy device, idle first)
+            timeout: Seconds to wait for it (None = forever)
+
+        Yields:
+            The device's AndroidController
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            candidates = [self._leases[serial]] if serial else sorted(
+                (l for l in self._leases.values() if l.healthy), key=lambda l: l.busy
+            )
+            for lease in candidates:
+                if lease.healthy and lease.lock.acquire(blocking=False):
+                    try:
+                        if not lease.connected:
+                            lease.connected = lease.controller.connect()
+                        yield lease.controller
+                    finally:
+                        lease.lock.release()
+                    return
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError("No device available to lease")
+            time.sleep(0.05)
+
+    # -- lifecycle --
+
+    def start(self) -> "DevicePool":
+        """Find devices and start the workers."""
+        if self._running:
+            return self
+        self.refresh()
+        self._running = True
+        for lease in list(self._leases.values()):
+            self._start_worker(lease)
+        self.tracker.add_callback(self._on_device_event)
+        self.tracker.start()
+        return self
+
+    def close(self, cancel_pending: bool = True) -> None:
+        """Stop the workers and close device connections.
+
+        Args:
+            cancel_pending: Cancel jobs that have not started (retries
+                waiting for another attempt fail with CancelledError)
+        """
+        self._running = False
+        self.tracker.close()
+        self.tracker.remove_callback(self._on_device_event)
+        with self._cond:
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=10)
+        self._threads = []
+
+        if cancel_pending:
+            queues = [self._queue] + [lease.jobs for lease in self._leases.values()]
+            for q in queues:
+                while True:
+                    try:
+                        job = q.get_nowait()
+                    except queue.Empty:
+                        break
+                    if job.attempts == 0:
+                        job.future.cancel()
+                    else:
+                        # A retry waiting for its next attempt: its future
+                        # is already running, so cancel() would be a no-op
+                        job.future.set_exception(CancelledError("Device pool closed before retry"))
+
+        for lease in self._leases.values():
+            close = getattr(lease.controller, "close", None)
+            if close:
+                close()
+
+    def __enter__(self) -> "DevicePool":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def get_stats(self) -> dict:
+        """Queue length and per-device state, jobs and utilisation."""
+        return {
+            "queued": self._queue.qsize(),
+            "devices": {
+                serial: {
+                    "state": lease.monitor.state.value,
+                    "busy": lease.busy,
+                    "jobs_done": lease.jobs_done,
+                    "failures": lease.failures,
+                    "busy_seconds": round(lease.busy_seconds, 3),
+                }
+                for serial, lease in self._leases.items()
+            },
+        }
@@ -0,0 +1,373 @@
+"""UI element lookup from the accessibility hierarchy.
+
+The view hierarchy already knows where every native widget is, by
+resource-id, text and content description, in exact screen pixels. The
+ElementLocator dumps it once (through uiautomator2 when available, which
+answers in a few hundred milliseconds, else `uiautomator dump`), indexes
+the nodes, and answers lookups from the index until the focused window or
+activity changes. Hard-coded coordinates, OCR and the LLM are left as
+fallbacks for what the hierarchy cannot see (video surfaces, canvases).
+"""
+
+import re
+import threading
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from typing import Callable
+
+# Role words dropped from free-form queries ("settings button" -> "settings")
+ROLE_WORDS = {"button", "icon", "tab", "field", "link", "text", "the"}
+
+
+@dataclass(frozen=True)
+class UINode:
+    """A node of the view hierarchy, in screen pixels."""
+    resource_id: str
+    text: str
+    content_desc: str
+    class_name: str
+    package: str
+    bounds: tuple[int, int, int, int]  # left, top, right, bottom
+    clickable: bool = False
+    enabled: bool = True
+
+    @property
+    def x(self) -> int:
+        return self.bounds[0]
+
+    @property
+    def y(self) -> int:
+        return self.bounds[1]
+
+    @property
+    def width(self) -> int:
+        return self.bounds[2] - self.bounds[0]
+
+    @property
+    def height(self) -> int:
+        return self.bounds[3] - self.bounds[1]
+
+    @property
+    def center_x(self) -> int:
+        return (self.bounds[0] + self.bounds[2]) // 2
+
+    @property
+    def center_y(self) -> int:
+        return (self.bounds[1] + self.bounds[3]) // 2
+
+    @property
+    def short_id(self) -> str:
+        """resource-id without the package prefix ("pkg:id/play" -> "play")."""
+        return self.resource_id.rsplit("/", 1)[-1]
+
+    @property
+    def label(self) -> str:
+        """Best human-readable name for the node."""
+        return self.text or self.content_desc or self.short_id or self.class_name
+
+
+def parse_hierarchy(xml: str) -> list[UINode]:
+    """Parse a uiautomator hierarchy dump.
+
+    Args:
+        xml: Dump XML (leading non-XML output is ignored)
+
+    Returns:
+        Nodes with non-empty bounds, in document order
+    """
+    start = xml.find("<?xml")
+    if start < 0:
+        start = xml.find("<hierarchy")
+    if start < 0:
+        return []
+    root = ET.fromstring(xml[start:].strip())
+
+    nodes = []
+    for element in root.iter("node"):
+        match = re.match(r"\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]", element.get("bounds", ""))
+        if not match:
+            continue
+        bounds = tuple(int(v) for v in match.groups())
+        if bounds[2] <= bounds[0] or bounds[3] <= bounds[1]:
+            continue
+        nodes.append(UINode(
+            resource_id=element.get("resource-id", ""),
+            text=element.get("text", ""),
+            content_desc=element.get("content-desc", ""),
+            class_name=element.get("class", ""),
+            package=element.get("package", ""),
+            bounds=bounds,
+            clickable=element.get("clickable") == "true",
+            enabled=element.get("enabled", "true") == "true",
+        ))
+    return nodes
+
+
+def _normalize(value: str) -> str:
+    return " ".join(re.sub(r"[_\-]+", " ", value).lower().split())
+
+
+class ElementLocator:
+    """Cached index of the on-screen view hierarchy.
+
+    Usage:
+        locator = ElementLocator(controller)
+        node = locator.find(resource_id="com.tplink.iot:id/play_btn")
+        node = locator.find(text="Playback")
+        node = locator.locate("settings button")  # id, text or description
+        locator.tap(text="Live View")
+    """
+
+    def __init__(
+        self,
+        controller,
+        dump: Callable[[], str] | None = None,
+        use_uiautomator2: bool = True,
+        check_interval: float = 0.5,
+    ):
+        """Initialize locator (nothing is dumped until the first lookup).
+
+        Args:
+            controller: Connected AndroidController
+            dump: Function returning hierarchy XML (e.g.
+                CameraControls.get_ui_dump); default: uiautomator2, then
+                `uiautomator dump`
+            use_uiautomator2: Try a uiautomator2 session for dumps
+            check_interval: Seconds between focus checks; lookups in
+                between are served from the index without any device I/O
+        """
+        self.controller = controller
+        self._dump = dump
+        self.use_uiautomator2 = use_uiautomator2
+        self.check_interval = check_interval
+
+        self._u2 = None
+        self._lock = threading.Lock()
+        self._nodes: list[UINode] = []
+        self._by_id: dict[str, list[UINode]] = {}
+        self._by_text: dict[str, list[UINode]] = {}
+        self._by_desc: dict[str, list[UINode]] = {}
+        self._focus: str | None = None
+        self._checked_at = 0.0
+        self._valid = False
+        self.dumps = 0
+
+    # -- hierarchy source --
+
+    def _dump_xml(self) -> str:
+        if self._dump is not None:
+            return self._dump()
+
+        if self.use_uiautomator2:
+            if self._u2 is None:
+                try:
+                    import uiautomator2 as u2
+                    self._u2 = u2.connect(self.controller.device_serial)
+                except Exception as e:
+                    print(f"uiautomator2 unavailable, using uiautomator dump: {e}")
+                    self.use_uiautomator2 = False
+            if self._u2 is not None:
+                return self._u2.dump_hierarchy()
+
+        return self.controller.shell(
+            "uiautomator dump /sdcard/ui.xml >/dev/null && cat /sdcard/ui.xml"
+        )
+
+    def _current_focus(self) -> str:
+        """Focused window (changes with activities, dialogs and popups)."""
+        return self.controller.shell("dumpsys window | grep -m1 mCurrentFocus").strip()
+
+    def _index(self, nodes: list[UINode]) -> None:
+        by_id: dict[str, list[UINode]] = {}
+        by_text: dict[str, list[UINode]] = {}
+        by_desc: dict[str, list[UINode]] = {}
+        for node in nodes:
+            if node.resource_id:
+                by_id.setdefault(node.resource_id, []).append(node)
+                by_id.setdefault(node.short_id, []).append(node)
+            if node.text:
+                by_text.setdefault(_normalize(node.text), []).append(node)
+            if node.content_desc:
+                by_desc.setdefault(_normalize(node.content_desc), []).append(node)
+        self._nodes, self._by_id, self._by_text, self._by_desc = nodes, by_id, by_text, by_desc
+
+    def refresh(self) -> list[UINode]:
+        """Dump and re-index the hierarchy now.
+
+        Returns:
+            All nodes
+        """
+        with self._lock:
+            focus = self._current_focus()
+            try:
+                nodes = parse_hierarchy(self._dump_xml())
+            except Exception as e:
+                print(f"UI hierarchy dump failed: {e}")
+                nodes = []
+            self._index(nodes)
+            self.dumps += 1
+            self._focus = focus
+            self._checked_at = time.monotonic()
+            self._valid = True
+            return nodes
+
+    def invalidate(self) -> None:
+        """Drop the index (next lookup dumps again)."""
+        self._valid = False
+
+    def nodes(self, refresh: bool = False) -> list[UINode]:
+        """Current nodes, re-dumping only if the focused window changed.
+
+        Args:
+            refresh: Dump even if nothing seems to have changed
+
+        Returns:
+            All nodes
+        """
+        if refresh or not self._valid:
+            return self.refresh()
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            if self._current_focus() != self._focus:
+                return self.refresh()
+        return self._nodes
+
+    @property
+    def available(self) -> bool:
+        """True if the hierarchy has any nodes (False for dump failures)."""
+        return bool(self.nodes())
+
+    # -- lookups --
+
+    def find_all(
+        self,
+        resource_id: str | None = None,
+        text: str | None = None,
+        content_desc: str | None = None,
+        contains: bool = False,
+        clickable: bool | None = None,
+        refresh: bool = False,
+    ) -> list[UINode]:
+        """Find nodes matching all given criteria.
+
+        Args:
+            resource_id: Full ("pkg:id/name") or short ("name") resource-id
+            text: Node text (case- and whitespace-insensitive)
+            content_desc: Content description (same matching as text)
+            contains: Substring match for text and content_desc
+            clickable: Only (non-)clickable nodes
+            refresh: Dump the hierarchy first
+
+        Returns:
+            Matching nodes in document order
+        """
+        self.nodes(refresh)
+
+        candidates: list[UINode] | None = None
+        if resource_id is not None:
+            candidates = self._by_id.get(resource_id, [])
+        for value, index, attribute in (
+            (text, self._by_text, "text"),
+            (content_desc, self._by_desc, "content_desc"),
+        ):
+            if value is None:
+                continue
+            wanted = _normalize(value)
+            if contains:
+                found = [n for n in (candidates if candidates is not None else self._nodes)
+                         if wanted in _normalize(getattr(n, attribute))]
+            else:
+                found = index.get(wanted, [])
+                if candidates is not None:
+                    found = [n for n in found if n in candidates]
+            candidates = found
+
+        if candidates is None:
+            candidates = self._nodes
+        if clickable is not None:
+            candidates = [n for n in candidates if n.clickable == clickable]
+        return list(candidates)
+
+    def find(self, **criteria) -> UINode | None:
+        """First node matching find_all() criteria, or None."""
+        found = self.find_all(**criteria)
+        return found[0] if found else None
+
+    def locate(self, query: str, refresh: bool = False, fuzzy: bool = True) -> UINode | None:
+        """Find a node from a free-form name.
+
+        Tries, in order: resource-id, exact text, exact content-desc, then
+        (if fuzzy) the same by substring with role words ("button", "icon")
+        removed.
+
+        Args:
+            query: Resource-id, visible text or description
+            refresh: Dump the hierarchy first
+            fuzzy: Allow the substring fallback
+
+        Returns:
+            Best matching node, or None
+        """
+        self.nodes(refresh)
+        for criteria in (
+            {"resource_id": query},
+            {"text": query},
+            {"content_desc": query},
+        ):
+            node = self.find(**criteria)
+            if node:
+                return node
+        if not fuzzy:
+            return None
+
+        words = [w for w in _normalize(query).split() if w not in ROLE_WORDS]
+        if not words:
+            return None
+        core = " ".join(words)
+        matches = [
+            n for n in self._nodes
+            if core in _normalize(n.text)
+            or core in _normalize(n.content_desc)
+            or core in _normalize(n.short_id)
+        ]
+        if not matches:
+            return None
+        # Prefer what the user can tap, then the tightest label
+        return min(matches, key=lambda n: (not n.clickable, len(n.label)))
+
+    def wait_for(self, query: str, timeout_seconds: float = 10.0, poll_interval: float = 0.5) -> UINode | None:
+        """Wait for a node to appear, re-dumping each poll.
+
+        Args:
+            query: As for locate()
+            timeout_seconds: Maximum wait time
+            poll_interval: Time between dumps
+
+        Returns:
+            The node, or None on timeout
+        """
+        deadline = time.time() + timeout_seconds
+        refresh = False
+        while True:
+            node = self.locate(query, refresh=refresh)
+            if node or time.time() >= deadline:
+                return node
+            time.sleep(min(poll_interval, max(0.0, deadline - time.time())))
+            refresh = True
+
+    def tap(self, query: str | None = None, **criteria) -> bool:
+        """Tap the centre of a node.
+
+        Args:
+            query: Free-form name for locate(), or use find() criteria
+
+        Returns:
+            True if found and tapped
+        """
+        node = self.locate(query) if query is not None else self.find(**criteria)
+        if node is None:
+            return False
+        self.controller.tap(node.center_x, node.center_y)
+        return True
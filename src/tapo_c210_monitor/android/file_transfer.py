@@ -3,9 +3,12 @@
 import subprocess
 import time
 from pathlib import Path
-from typing import Generator
+from typing import TYPE_CHECKING, Generator
 from dataclasses import dataclass
 
+if TYPE_CHECKING:
+    from ..store import RecordingStore
+
 
 @dataclass
 class RemoteFile:
@@ -247,12 +250,14 @@ class FileTransfer:
         self,
         local_dir: str | Path,
         delete_after_sync: bool = False,
+        store: "RecordingStore | None" = None,
     ) -> list[Path]:
         """Sync all Tapo media files to local directory.
 
         Args:
             local_dir: Local destination directory
             delete_after_sync: Delete files from device after successful sync
+            store: Deduplicating store to index pulled videos into (optional)
 
         Returns:
             List of synced local paths
@@ -279,6 +284,8 @@ class FileTransfer:
             print(f"Syncing: {filename}")
             if self.pull_file(remote_path, local_path):
                 synced.append(local_path)
+                if store and local_path.suffix == ".mp4":
+                    store.ingest(local_path, source="android")
                 if delete_after_sync:
                     self.controller.shell(f"rm {remote_path}")
 
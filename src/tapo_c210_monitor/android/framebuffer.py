@@ -0,0 +1,136 @@
+"""In-memory screen frames from `screencap` raw output.
+
+`screencap` without `-p` writes the framebuffer as a small header followed
+by uncompressed pixels. Reading that straight from `exec-out` into a NumPy
+buffer skips the PNG encode on the device, the PNG decode on the host and
+the temp files on both sides.
+"""
+
+import io
+import struct
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# android.graphics.PixelFormat / HAL_PIXEL_FORMAT values screencap reports
+_FORMAT_RGBA_8888 = 1
+_FORMAT_RGBX_8888 = 2
+_FORMAT_RGB_888 = 3
+_FORMAT_RGB_565 = 4
+_FORMAT_BGRA_8888 = 5
+
+_BYTES_PER_PIXEL = {
+    _FORMAT_RGBA_8888: 4,
+    _FORMAT_RGBX_8888: 4,
+    _FORMAT_RGB_888: 3,
+    _FORMAT_RGB_565: 2,
+    _FORMAT_BGRA_8888: 4,
+}
+
+
+@dataclass
+class ScreenFrame:
+    """A captured screen as an RGB array, with lazy PIL/BGR views.
+
+    `scale` is the factor applied by downscaling (1.0 = native), so a
+    point found in the frame maps to screen coordinates as x / scale.
+    """
+    array: np.ndarray  # H x W x 3, RGB, uint8
+    scale: float = 1.0
+    _image: Image.Image | None = None
+
+    @property
+    def width(self) -> int:
+        return self.array.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.array.shape[0]
+
+    @property
+    def image(self) -> Image.Image:
+        """PIL view (shares the array's memory)."""
+        if self._image is None:
+            self._image = Image.fromarray(self.array, "RGB")
+        return self._image
+
+    @property
+    def bgr(self) -> np.ndarray:
+        """BGR copy for OpenCV."""
+        return cv2.cvtColor(self.array, cv2.COLOR_RGB2BGR)
+
+    def to_screen(self, x: float, y: float) -> tuple[int, int]:
+        """Map frame coordinates back to device screen coordinates."""
+        return int(round(x / self.scale)), int(round(y / self.scale))
+
+    def save(self, path, **kwargs) -> None:
+        """Save to an image file (format from the extension)."""
+        self.image.save(path, **kwargs)
+
+
+def parse_screencap(data: bytes) -> np.ndarray:
+    """Decode raw `screencap` output into an RGB array.
+
+    Handles both the 12-byte header (width, height, format) and the
+    16-byte one newer Android versions write (plus a colour space).
+
+    Args:
+        data: Bytes from `exec-out screencap`
+
+    Returns:
+        H x W x 3 RGB array
+
+    Raises:
+        ValueError: If the data is not a raw framebuffer dump
+    """
+    if len(data) < 12:
+        raise ValueError(f"screencap output too short ({len(data)} bytes)")
+
+    width, height, fmt = struct.unpack_from("<III", data, 0)
+    bpp = _BYTES_PER_PIXEL.get(fmt)
+    if bpp is None or not width or not height:
+        raise ValueError(f"Unsupported screencap format {fmt} ({width}x{height})")
+
+    pixel_bytes = width * height * bpp
+    header = len(data) - pixel_bytes
+    if header not in (12, 16):
+        raise ValueError(
+            f"screencap size mismatch: {len(data)} bytes for {width}x{height} format {fmt}"
+        )
+
+    pixels = np.frombuffer(data, dtype=np.uint8, count=pixel_bytes, offset=header)
+
+    if fmt in (_FORMAT_RGBA_8888, _FORMAT_RGBX_8888):
+        return cv2.cvtColor(pixels.reshape(height, width, 4), cv2.COLOR_RGBA2RGB)
+    if fmt == _FORMAT_BGRA_8888:
+        return cv2.cvtColor(pixels.reshape(height, width, 4), cv2.COLOR_BGRA2RGB)
+    if fmt == _FORMAT_RGB_888:
+        return pixels.reshape(height, width, 3).copy()
+    return cv2.cvtColor(pixels.reshape(height, width, 2), cv2.COLOR_BGR5652RGB)
+
+
+def decode_png(data: bytes) -> np.ndarray:
+    """Decode `screencap -p` output (fallback for devices without raw output)."""
+    return np.array(Image.open(io.BytesIO(data)).convert("RGB"))
+
+
+def make_frame(rgb: np.ndarray, max_dimension: int | None = None) -> ScreenFrame:
+    """Wrap an RGB array, downscaling so neither side exceeds max_dimension.
+
+    Args:
+        rgb: H x W x 3 RGB array
+        max_dimension: Longest allowed side (None = keep native size)
+
+    Returns:
+        ScreenFrame with the applied scale
+    """
+    height, width = rgb.shape[:2]
+    longest = max(width, height)
+    if max_dimension is None or longest <= max_dimension:
+        return ScreenFrame(rgb)
+
+    scale = max_dimension / longest
+    size = (max(1, int(width * scale)), max(1, int(height * scale)))
+    return ScreenFrame(cv2.resize(rgb, size, interpolation=cv2.INTER_AREA), scale)
@@ -0,0 +1,439 @@
+"""Low-latency input injection.
+
+The `input` command starts a JVM on the device (~300 ms per call). Touch
+gestures are instead written straight to the touchscreen's /dev/input
+node as raw input_event records, and a whole batch of gestures is sent
+as one shell script in a single round-trip. Each touch step (down, move
+or up, with its SYN_REPORT) is a single `printf` write, rather than one
+`sendevent` process per event.
+
+Key events and text still go through `input` (raw key events would need
+the device's key layout), but are folded into the same batch, and
+consecutive key events share one `input keyevent` call.
+
+If the device has no writable multitouch node, or the display is rotated
+(raw touch coordinates follow the panel, not the display), the batch
+uses `input` commands instead, still in one round-trip. The orientation
+is read once and cached; it is re-read after orientation_ttl seconds,
+after a failed write, or when refresh_orientation() is called.
+"""
+
+import re
+import shlex
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+
+# Linux input event types and codes
+EV_SYN = 0
+EV_KEY = 1
+EV_ABS = 3
+SYN_REPORT = 0
+BTN_TOUCH = 0x14A
+ABS_MT_SLOT = 0x2F
+ABS_MT_TOUCH_MAJOR = 0x30
+ABS_MT_POSITION_X = 0x35
+ABS_MT_POSITION_Y = 0x36
+ABS_MT_TRACKING_ID = 0x39
+ABS_MT_PRESSURE = 0x3A
+
+KEYCODE_ENTER = 66
+
+# Interval between interpolated swipe points (~60 Hz, like a finger)
+SWIPE_STEP_S = 0.016
+
+# Older releases print "SurfaceOrientation: 0", newer ones "orientation=0"
+# or "orientation=ROTATION_0" in the viewport line. dumpsys input is a
+# full system_server dump, so it is only run when the cache is stale.
+ORIENTATION_QUERY = "dumpsys input | grep -m1 -E 'SurfaceOrientation|orientation='"
+
+# Printed by a batch whose touch write failed
+WRITE_FAILED = "__touch_write_failed__"
+
+# struct input_event: timeval (two longs), type, code, value. The kernel
+# timestamps written events itself, so the timeval is left zero.
+_EVENT_64 = struct.Struct("<qqHHi")
+_EVENT_32 = struct.Struct("<llHHi")
+
+
+@dataclass
+class TouchDevice:
+    """A multitouch input node and its coordinate ranges."""
+    path: str
+    name: str
+    x_max: int
+    y_max: int
+    abs_codes: set[int] = field(default_factory=set)
+    key_codes: set[int] = field(default_factory=set)
+
+
+def parse_getevent(output: str) -> list[TouchDevice]:
+    """Find multitouch devices in `getevent -p` output.
+
+    Args:
+        output: Output of `getevent -p`
+
+    Returns:
+        Devices reporting ABS_MT_POSITION_X/Y
+    """
+    devices = []
+    for block in re.split(r"^add device \d+: ", output, flags=re.M)[1:]:
+        lines = block.splitlines()
+        path = lines[0].strip()
+        name_match = re.search(r'name:\s+"([^"]*)"', block)
+
+        abs_ranges: dict[int, int] = {}
+        key_codes: set[int] = set()
+        section = None
+        for line in lines[1:]:
+            header = re.match(r"\s+(\w+)\s+\(([0-9a-f]{4})\):(.*)", line)
+            if header:
+                section = header.group(1)
+                line = header.group(3)
+            if section == "ABS":
+                for code, maximum in re.findall(r"([0-9a-f]{4})\s*:\s*value -?\d+, min -?\d+, max (-?\d+)", line):
+                    abs_ranges[int(code, 16)] = int(maximum)
+            elif section == "KEY":
+                key_codes.update(int(code, 16) for code in re.findall(r"\b([0-9a-f]{4})\b", line))
+            elif header is None and not line.startswith("        "):
+                section = None
+
+        if ABS_MT_POSITION_X in abs_ranges and ABS_MT_POSITION_Y in abs_ranges:
+            devices.append(TouchDevice(
+                path=path,
+                name=name_match.group(1) if name_match else "",
+                x_max=abs_ranges[ABS_MT_POSITION_X],
+                y_max=abs_ranges[ABS_MT_POSITION_Y],
+                abs_codes=set(abs_ranges),
+                key_codes=key_codes,
+            ))
+    return devices
+
+
+def parse_orientation(output: str) -> int | None:
+    """Display rotation from ORIENTATION_QUERY output.
+
+    Returns:
+        0 for the natural orientation, non-zero when rotated, None if the
+        output has no orientation line
+    """
+    match = re.search(r"SurfaceOrientation:\s*(\d+)|orientation=(?:ROTATION_)?(\d+)", output)
+    if match is None:
+        return None
+    return int(match.group(1) or match.group(2))
+
+
+def encode_events(events: list[tuple[int, int, int]], wide: bool = True) -> bytes:
+    """Pack (type, code, value) events as struct input_event records.
+
+    Args:
+        events: Events to pack
+        wide: 64-bit userspace layout (24-byte records) rather than
+            32-bit (16 bytes)
+    """
+    layout = _EVENT_64 if wide else _EVENT_32
+    return b"".join(layout.pack(0, 0, ev_type, code, value) for ev_type, code, value in events)
+
+
+def printf_bytes(data: bytes) -> str:
+    """A printf format string that writes data verbatim.
+
+    ASCII letters pass through; every other byte becomes a three-digit
+    octal escape, so the result is safe inside single quotes and contains
+    no % directives. Digits are escaped too: printf implementations that
+    accept a \\0NNN form would read a digit after an escape as part of it.
+    """
+    return "".join(
+        chr(b) if b < 128 and chr(b).isalpha() else f"\\{b:03o}"
+        for b in data
+    )
+
+
+def text_commands(text: str) -> list[str]:
+    """`input text` commands typing text, safe for the device shell.
+
+    `input text` turns "%s" into a space and can't type a newline, so
+    spaces are sent as %s, newlines as Enter key events, and each piece
+    is single-quoted for the shell (quotes become '"'"').
+    """
+    commands = []
+    for i, line in enumerate(text.split("\n")):
+        if i:
+            commands.append(f"input keyevent {KEYCODE_ENTER}")
+        if line:
+            commands.append("input text " + shlex.quote(line.replace(" ", "%s")))
+    return commands
+
+
+class InputBatch:
+    """Gestures collected for one round-trip. Created by InputInjector.batch()."""
+
+    def __init__(self, injector: "InputInjector"):
+        self.injector = injector
+        self._ops: list[tuple] = []
+
+    def _add(self, *op) -> "InputBatch":
+        self._ops.append(op)
+        return self
+
+    def tap(self, x: int, y: int) -> "InputBatch":
+        return self._add("tap", x, y)
+
+    def swipe(self, x1: int, y1: int, x2: int, y2: int, duration_ms: int = 300) -> "InputBatch":
+        return self._add("swipe", x1, y1, x2, y2, duration_ms)
+
+    def long_press(self, x: int, y: int, duration_ms: int = 1000) -> "InputBatch":
+        return self._add("swipe", x, y, x, y, duration_ms)
+
+    def key(self, keycode: int | str) -> "InputBatch":
+        return self._add("key", str(keycode))
+
+    def text(self, text: str) -> "InputBatch":
+        return self._add("text", text)
+
+    def wait(self, seconds: float) -> "InputBatch":
+        return self._add("wait", seconds)
+
+    def _lines(self, native: bool) -> list[str]:
+        injector = self.injector
+        lines = []
+        keys: list[str] = []
+        for kind, *args in self._ops:
+            if kind == "key":
+                keys.append(args[0])
+                continue
+            if keys:
+                # One JVM start for a run of key events
+                lines.append("input keyevent " + " ".join(keys))
+                keys = []
+            if kind == "tap":
+                lines += injector._tap_lines(*args) if native else [f"input tap {args[0]} {args[1]}"]
+            elif kind == "swipe":
+                lines += injector._swipe_lines(*args) if native else ["input swipe " + " ".join(map(str, args))]
+            elif kind == "text":
+                lines += text_commands(args[0])
+            elif kind == "wait":
+                lines.append(f"sleep {args[0]:.3f}")
+        if keys:
+            lines.append("input keyevent " + " ".join(keys))
+        return lines
+
+    def script(self) -> str:
+        """The shell script this batch runs."""
+        touches = any(op[0] in ("tap", "swipe") for op in self._ops)
+        # Raw touch coordinates follow the panel, not the rotated display
+        native = touches and self.injector.available and self.injector.natural_orientation()
+        return "\n".join(self._lines(native=native))
+
+    def send(self) -> None:
+        """Run the batch in one shell round-trip."""
+        script = self.script()
+        self._ops = []
+        if not script:
+            return
+        try:
+            output = self.injector.controller.shell(script)
+        except Exception:
+            self.injector.refresh_orientation()
+            raise
+        if WRITE_FAILED in (output or ""):
+            print("Touch write failed; re-checking the input device and orientation")
+            self.injector.refresh_orientation()
+            self.injector.reprobe()
+
+    def __enter__(self) -> "InputBatch":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is None:
+            self.send()
+
+
+class InputInjector:
+    """Inject touch and key input with minimal per-gesture latency.
+
+    Usage:
+        injector = InputInjector(controller)
+        injector.tap(540, 1200)
+        with injector.batch() as b:
+            b.tap(540, 800).wait(0.2).text("user@example.com").key("KEYCODE_TAB")
+    """
+
+    def __init__(self, controller, orientation_ttl: float = 30.0):
+        """Initialize injector (the device is probed on first use).
+
+        Args:
+            controller: Connected AndroidController
+            orientation_ttl: Seconds the display orientation is trusted
+                before it is read again
+        """
+        self.controller = controller
+        self.orientation_ttl = orientation_ttl
+        self.device: TouchDevice | None = None
+        self._screen_size: tuple[int, int] | None = None
+        self._wide = True
+        self._probed = False
+        self._lock = threading.Lock()
+        self._tracking_id = 0
+        self._rotation: int | None = None
+        self._rotation_read_at = 0.0
+
+    # -- discovery --
+
+    def probe(self) -> bool:
+        """Find a writable multitouch node.
+
+        Returns:
+            True if touches can be written to the node directly
+        """
+        with self._lock:
+            if self._probed:
+                return self.device is not None
+            self._probed = True
+
+            try:
+                devices = parse_getevent(self.controller.shell("getevent -p"))
+            except Exception as e:
+                print(f"Input device discovery failed: {e}")
+                devices = []
+
+            if devices:
+                # input_event's timeval is two longs, so its size follows
+                # the userspace ABI printf runs under
+                abi = self.controller.shell("getprop ro.product.cpu.abi").strip()
+                self._wide = "64" in abi
+
+            for device in devices:
+                # A bare SYN_REPORT is harmless and tells us if we can write
+                syn = printf_bytes(encode_events([(EV_SYN, SYN_REPORT, 0)], self._wide))
+                check = self.controller.shell(f"printf '{syn}' > {device.path} && echo ok")
+                if check.strip().endswith("ok"):
+                    self.device = device
+                    self._screen_size = self.controller.get_screen_size()
+                    break
+
+            if self.device is None:
+                print("No writable touchscreen node; using 'input' commands")
+            return self.device is not None
+
+    def reprobe(self) -> None:
+        """Forget the probed device; the next touch looks for it again."""
+        with self._lock:
+            self._probed = False
+            self.device = None
+
+    @property
+    def available(self) -> bool:
+        """True if touches are written to the touch node directly."""
+        return self.probe()
+
+    def natural_orientation(self) -> bool:
+        """True if the display is not rotated (cached, see orientation_ttl)."""
+        now = time.monotonic()
+        if self._rotation is None or now - self._rotation_read_at > self.orientation_ttl:
+            try:
+                rotation = parse_orientation(self.controller.shell(ORIENTATION_QUERY))
+            except Exception as e:
+                print(f"Display orientation check failed: {e}")
+                rotation = None
+            # Unknown counts as rotated, so touches take the safe path
+            self._rotation = 1 if rotation is None else rotation
+            self._rotation_read_at = now
+        return self._rotation == 0
+
+    def refresh_orientation(self) -> None:
+        """Re-read the orientation before the next touch (call after rotating)."""
+        self._rotation = None
+
+    # -- event generation --
+
+    def _to_device(self, x: int, y: int) -> tuple[int, int]:
+        """Scale screen pixels to the touch node's coordinate range."""
+        width, height = self._screen_size
+        return (
+            round(x * self.device.x_max / max(1, width - 1)),
+            round(y * self.device.y_max / max(1, height - 1)),
+        )
+
+    def _write(self, events: list[tuple[int, int, int]]) -> str:
+        """Shell line writing one touch step to the node in a single write."""
+        data = printf_bytes(encode_events(events, self._wide))
+        return f"printf '{data}' > {self.device.path} || echo {WRITE_FAILED}"
+
+    def _down(self, x: int, y: int) -> list[tuple[int, int, int]]:
+        dx, dy = self._to_device(x, y)
+        self._tracking_id = (self._tracking_id + 1) % 0xFFFF
+        codes = self.device.abs_codes
+        events = []
+        if ABS_MT_SLOT in codes:
+            events.append((EV_ABS, ABS_MT_SLOT, 0))
+        events += [
+            (EV_ABS, ABS_MT_TRACKING_ID, self._tracking_id),
+            (EV_ABS, ABS_MT_POSITION_X, dx),
+            (EV_ABS, ABS_MT_POSITION_Y, dy),
+        ]
+        if ABS_MT_TOUCH_MAJOR in codes:
+            events.append((EV_ABS, ABS_MT_TOUCH_MAJOR, 5))
+        if ABS_MT_PRESSURE in codes:
+            events.append((EV_ABS, ABS_MT_PRESSURE, 50))
+        if BTN_TOUCH in self.device.key_codes:
+            events.append((EV_KEY, BTN_TOUCH, 1))
+        events.append((EV_SYN, SYN_REPORT, 0))
+        return events
+
+    def _move(self, x: int, y: int) -> list[tuple[int, int, int]]:
+        dx, dy = self._to_device(x, y)
+        return [
+            (EV_ABS, ABS_MT_POSITION_X, dx),
+            (EV_ABS, ABS_MT_POSITION_Y, dy),
+            (EV_SYN, SYN_REPORT, 0),
+        ]
+
+    def _up(self) -> list[tuple[int, int, int]]:
+        # -1 ends the contact
+        events = [(EV_ABS, ABS_MT_TRACKING_ID, -1)]
+        if BTN_TOUCH in self.device.key_codes:
+            events.append((EV_KEY, BTN_TOUCH, 0))
+        events.append((EV_SYN, SYN_REPORT, 0))
+        return events
+
+    def _tap_lines(self, x: int, y: int) -> list[str]:
+        # Down and up in one write; the kernel delivers them as two reports
+        return [self._write(self._down(x, y) + self._up())]
+
+    def _swipe_lines(self, x1: int, y1: int, x2: int, y2: int, duration_ms: int) -> list[str]:
+        lines = [self._write(self._down(x1, y1))]
+        if (x1, y1) == (x2, y2):
+            # Long press: hold without intermediate moves
+            lines.append(f"sleep {duration_ms / 1000:.3f}")
+            return lines + [self._write(self._up())]
+
+        # One write and one sleep per step
+        steps = max(1, int(duration_ms / 1000 / SWIPE_STEP_S))
+        for i in range(1, steps + 1):
+            t = i / steps
+            lines.append(f"sleep {SWIPE_STEP_S}")
+            lines.append(self._write(self._move(round(x1 + (x2 - x1) * t), round(y1 + (y2 - y1) * t))))
+        return lines + [self._write(self._up())]
+
+    # -- single gestures (one round-trip each) --
+
+    def batch(self) -> InputBatch:
+        """Start a batch of gestures sent together."""
+        return InputBatch(self)
+
+    def tap(self, x: int, y: int) -> None:
+        self.batch().tap(x, y).send()
+
+    def swipe(self, x1: int, y1: int, x2: int, y2: int, duration_ms: int = 300) -> None:
+        self.batch().swipe(x1, y1, x2, y2, duration_ms).send()
+
+    def long_press(self, x: int, y: int, duration_ms: int = 1000) -> None:
+        self.batch().long_press(x, y, duration_ms).send()
+
+    def key_event(self, keycode: int | str) -> None:
+        self.batch().key(keycode).send()
+
+    def text(self, text: str) -> None:
+        self.batch().text(text).send()
@@ -1,14 +1,28 @@
 """Intelligent screen capture with LLM vision for UI element detection."""
 
 import time
+from dataclasses import asdict, replace
 from pathlib import Path
 from PIL import Image
 
 from .controller import AndroidController
+from .element_locator import ElementLocator
+from .framebuffer import ScreenFrame
 from .screen import ScreenCapture
+from .screen_classifier import ScreenClassifier, ScreenMatch
+from .screen_stream import ScreenStream
 from ..vision import LLMVision, UIElement, VisionResult
 
 
+def _to_screen(frame: ScreenFrame, element: UIElement) -> UIElement:
+    """Copy of an element the LLM found in a frame, in device screen pixels."""
+    if frame.scale == 1.0:
+        return element
+    x, y = frame.to_screen(element.x, element.y)
+    right, bottom = frame.to_screen(element.x + element.width, element.y + element.height)
+    return replace(element, x=x, y=y, width=right - x, height=bottom - y)
+
+
 class IntelligentScreen:
     """Android screen with LLM-powered UI element detection.
 
@@ -21,6 +35,9 @@ class IntelligentScreen:
         controller: AndroidController,
         api_key: str | None = None,
         model: str = "gpt-4o-mini",
+        stream: ScreenStream | None = None,
+        locator: ElementLocator | None = None,
+        screen_library: str | Path | None = None,
     ):
         """Initialize intelligent screen.
 
@@ -28,9 +45,16 @@ class IntelligentScreen:
             controller: AndroidController instance
             api_key: OpenRouter API key (or set OPENROUTER_API_KEY env var)
             model: LLM model for vision (gpt-4o-mini, gpt-4o, claude-sonnet, gemini-flash)
+            stream: Optional running ScreenStream to read frames from
+            locator: ElementLocator to consult before the LLM (created if None)
+            screen_library: JSON file of known screens; answers the LLM
+                gives about a screen are saved there and reused whenever
+                the same screen is recognized (None = this session only)
         """
         self.controller = controller
-        self.screen = ScreenCapture(controller)
+        self.screen = ScreenCapture(controller, stream)
+        self.locator = locator or ElementLocator(controller)
+        self.classifier = ScreenClassifier(screen_library)
         self.vision = LLMVision(api_key=api_key, model=model)
         self._last_analysis: VisionResult | None = None
 
@@ -45,23 +69,109 @@ class IntelligentScreen:
             task: Specific task or question about the UI
 
         Returns:
-            VisionResult with detected elements
+            VisionResult with detected elements (device screen pixels)
         """
-        img = self.capture()
-        self._last_analysis = self.vision.analyze_screen(img, task)
-        return self._last_analysis
+        frame = self.screen.capture_frame()
+        result = self.vision.analyze_screen(frame.image, task)
+        result.elements = [_to_screen(frame, element) for element in result.elements]
+        self._last_analysis = result
+        return result
+
+    def identify_screen(self, frame: ScreenFrame | None = None) -> ScreenMatch:
+        """Recognize the current screen locally (no LLM call).
+
+        Args:
+            frame: Frame to classify (default: capture one)
+
+        Returns:
+            ScreenMatch; check .confident before trusting .label
+        """
+        frame = frame or self.screen.capture_frame()
+        return self.classifier.classify(frame.array)
+
+    def learn_screens(self, directory: str | Path) -> int:
+        """Seed the screen library from saved screenshots.
 
-    def find_element(self, target: str) -> UIElement | None:
+        Screenshots of screens already known are added without a call;
+        each new screen is described once by the LLM.
+
+        Args:
+            directory: Screenshot folder (e.g. sessions/<id>/screenshots)
+
+        Returns:
+            Number of screenshots added to the library
+        """
+        def label(img: Image.Image) -> str | None:
+            result = self.vision.analyze_screen(img, "Describe what screen this is and its main purpose")
+            if not result.screen_description:
+                return None
+            name = self.classifier.new_label(result.screen_description)
+            self.classifier.remember(name, "description", result.screen_description)
+            return name
+
+        added = self.classifier.add_from_directory(directory, label)
+        self.classifier.save()
+        return added
+
+    def _recall(self, frame: ScreenFrame, key: str) -> tuple[ScreenMatch, object]:
+        """Look up a fact about the current screen, if it is a known one."""
+        match = self.identify_screen(frame)
+        if match.confident:
+            return match, self.classifier.facts(match.label).get(key)
+        return match, None
+
+    def _learn(
+        self,
+        frame: ScreenFrame,
+        match: ScreenMatch,
+        key: str,
+        value,
+        hint: str | None = None,
+    ) -> None:
+        """Record an LLM answer for this screen, adding the screen if new."""
+        label = match.label if match.confident else self.classifier.new_label(hint)
+        self.classifier.add(frame.array, label)
+        self.classifier.remember(label, key, value)
+        self.classifier.save()
+
+    def find_element(self, target: str, refresh: bool = False) -> UIElement | None:
         """Find a specific UI element by description.
 
+        The view hierarchy is checked first, then positions the LLM found
+        earlier on the same (recognized) screen; the LLM is only asked when
+        neither knows the element.
+
         Args:
             target: Description of element to find (e.g., "settings button")
+            refresh: Re-dump the hierarchy instead of using the cached one
 
         Returns:
             UIElement if found, None otherwise
         """
-        img = self.capture()
-        return self.vision.find_element(img, target)
+        node = self.locator.locate(target, refresh=refresh)
+        if node:
+            return UIElement(
+                name=node.label,
+                element_type=node.class_name.rsplit(".", 1)[-1],
+                x=node.x,
+                y=node.y,
+                width=node.width,
+                height=node.height,
+                confidence=1.0,
+                description=node.resource_id,
+            )
+
+        frame = self.screen.capture_frame()
+        key = f"element:{target.lower()}"
+        match, known = self._recall(frame, key)
+        if known:
+            return UIElement(**known)
+
+        element = self.vision.find_element(frame.image, target)
+        if element:
+            element = _to_screen(frame, element)
+            self._learn(frame, match, key, asdict(element))
+        return element
 
     def tap_element(self, target: str) -> bool:
         """Find and tap a UI element.
@@ -94,12 +204,16 @@ class IntelligentScreen:
         Returns:
             UIElement if found within timeout, None otherwise
         """
-        start = time.time()
-        while time.time() - start < timeout_seconds:
-            element = self.find_element(target)
+        deadline = time.time() + timeout_seconds
+        refresh = False
+        while time.time() < deadline:
+            # With a stream, only ask the LLM again once the screen changed
+            seen = self.screen.frame_id
+            element = self.find_element(target, refresh=refresh)
             if element:
                 return element
-            time.sleep(poll_interval)
+            self.screen.wait_for_update(seen, poll_interval, deadline)
+            refresh = True
         return None
 
     def tap_and_wait(
@@ -129,26 +243,50 @@ class IntelligentScreen:
         return True
 
     def get_screen_description(self) -> str:
-        """Get LLM description of current screen.
+        """Get LLM description of current screen (cached per recognized screen).
 
         Returns:
             Natural language description of what's on screen
         """
-        result = self.analyze("Describe what screen this is and its main purpose")
-        return result.screen_description
+        frame = self.screen.capture_frame()
+        match, known = self._recall(frame, "description")
+        if known:
+            return known
+
+        result = self.vision.analyze_screen(frame.image, "Describe what screen this is and its main purpose")
+        result.elements = [_to_screen(frame, element) for element in result.elements]
+        self._last_analysis = result
+        description = result.screen_description
+        if description:
+            self._learn(frame, match, "description", description, hint=description)
+        return description
 
     def is_on_screen(self, screen_description: str) -> bool:
         """Check if we're on a specific screen.
 
+        Answered locally when the screen is recognized and the question
+        was asked about it before; otherwise the LLM decides and the
+        answer is remembered.
+
         Args:
             screen_description: Description to match against
 
         Returns:
             True if current screen matches description
         """
-        img = self.capture()
-        element = self.vision.find_element(img, f"screen matching: {screen_description}")
-        return element is not None and element.confidence > 0.7
+        frame = self.screen.capture_frame()
+        key = f"is:{screen_description.lower()}"
+        match, known = self._recall(frame, key)
+        if known is not None:
+            return known
+
+        element = self.vision.find_element(frame.image, f"screen matching: {screen_description}")
+        result = element is not None and element.confidence > 0.7
+        # A "no" doesn't say which screen this is, so only known screens
+        # (or a "yes", which names it) are recorded
+        if match.confident or result:
+            self._learn(frame, match, key, result, hint=screen_description)
+        return result
 
     def save_screenshot(self, path: str | Path) -> Path:
         """Save current screen to file."""
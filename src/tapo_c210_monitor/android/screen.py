@@ -1,30 +1,89 @@
-"""Screen capture and analysis for Android automation."""
+"""Screen capture and analysis for Android automation.
+
+Frames may be downscaled (a ScreenStream decodes at 720 px by default),
+so everything ScreenCapture returns - OCR words, template matches, tap
+points - is mapped back to device screen pixels through the frame's
+scale before it reaches the caller. Phone UI text is unreadable to
+Tesseract at stream scale, so OCR captures the device directly whenever
+the stream frame is scaled below OCR_MIN_SCALE; streaming still decides
+when there is something new to read.
+"""
 
 import io
-import tempfile
+import time
+from dataclasses import replace
 from pathlib import Path
 from typing import Callable
 import numpy as np
 from PIL import Image
 
-try:
-    import pytesseract
-    TESSERACT_AVAILABLE = True
-except ImportError:
-    TESSERACT_AVAILABLE = False
+from .framebuffer import ScreenFrame, make_frame
+from .ocr import IncrementalOCR, WordBox
+from .screen_stream import ScreenStream
+from .templates import Region, TemplateRegistry
+
+# Coarsest frame scale OCR reads reliably (a 720 px stream frame of a
+# 1080x2400 phone is 0.3; the 1900 px capture is 0.79)
+OCR_MIN_SCALE = 0.6
+
+
+def _to_screen(frame: ScreenFrame, box: WordBox) -> WordBox:
+    """Copy of a box found in a frame, in device screen pixels."""
+    if frame.scale == 1.0:
+        return box
+    x, y = frame.to_screen(box.x, box.y)
+    right, bottom = frame.to_screen(box.x + box.width, box.y + box.height)
+    return replace(box, x=x, y=y, width=right - x, height=bottom - y)
 
 
 class ScreenCapture:
     """Capture and analyze Android screen content."""
 
-    def __init__(self, controller: "AndroidController"):
+    def __init__(self, controller: "AndroidController", stream: "ScreenStream | None" = None):
         """Initialize screen capture.
 
         Args:
             controller: AndroidController instance
+            stream: Optional ScreenStream; while it runs, captures read its
+                latest frame and waiters wake on new frames instead of polling
         """
         self.controller = controller
+        self.stream = stream
         self._screen_size: tuple[int, int] | None = None
+        self._ocr: IncrementalOCR | None = None
+        self._templates: TemplateRegistry | None = None
+
+    def attach_stream(self, stream: "ScreenStream | None") -> None:
+        """Use (or stop using, with None) a live screen stream."""
+        self.stream = stream
+
+    @property
+    def streaming(self) -> bool:
+        """True if captures come from a running stream."""
+        return self.stream is not None and self.stream.running
+
+    @property
+    def frame_id(self) -> int | None:
+        """Current stream frame counter (None when not streaming)."""
+        return self.stream.frame_id if self.streaming else None
+
+    def wait_for_update(self, seen_id: int | None, poll_interval: float, deadline: float) -> None:
+        """Block until the screen may have changed.
+
+        With a stream, returns as soon as a frame newer than seen_id
+        arrives (a static screen produces none, so there is nothing to
+        re-check until then). Without one, sleeps for poll_interval.
+
+        Args:
+            seen_id: frame_id the caller last looked at
+            poll_interval: Sleep between polls without a stream
+            deadline: time.time() after which to stop waiting
+        """
+        remaining = max(0.0, deadline - time.time())
+        if seen_id is not None and self.streaming:
+            self.stream.wait_for_frame(after=seen_id, timeout=remaining)
+        else:
+            time.sleep(min(poll_interval, remaining))
 
     @property
     def screen_size(self) -> tuple[int, int]:
@@ -33,20 +92,41 @@ class ScreenCapture:
             self._screen_size = self.controller.get_screen_size()
         return self._screen_size
 
+    def capture_frame(self, max_dimension: int | None = 1900, min_scale: float | None = None) -> ScreenFrame:
+        """Capture the screen into memory.
+
+        While streaming, the stream's latest frame is returned, which may
+        be smaller than max_dimension; map points with frame.to_screen().
+        With max_dimension=None a downscaled stream is bypassed and the
+        device is captured at native resolution.
+
+        Args:
+            max_dimension: Downscale so neither side exceeds this
+                (None = native resolution)
+            min_scale: Capture the device instead of using a stream frame
+                scaled below this (None = any stream frame will do)
+
+        Returns:
+            ScreenFrame with PIL (.image) and RGB ndarray (.array) views
+        """
+        if self.streaming:
+            frame = self.stream.wait_for_frame(timeout=2.0)
+            if frame is not None and min_scale is not None and frame.scale < min_scale:
+                frame = None
+            if frame is not None and (max_dimension is not None or frame.scale == 1.0):
+                if max_dimension is None or max(frame.width, frame.height) <= max_dimension:
+                    return frame
+                smaller = make_frame(frame.array, max_dimension)
+                return ScreenFrame(smaller.array, frame.scale * smaller.scale)
+        return self.controller.capture_frame(max_dimension)
+
     def capture(self) -> Image.Image:
         """Capture current screen as PIL Image.
 
         Returns:
             PIL Image of screen
         """
-        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
-            temp_path = Path(f.name)
-
-        try:
-            self.controller.screenshot(temp_path)
-            return Image.open(temp_path)
-        finally:
-            temp_path.unlink(missing_ok=True)
+        return self.capture_frame().image
 
     def capture_numpy(self) -> np.ndarray:
         """Capture screen as numpy array (for OpenCV).
@@ -54,9 +134,7 @@ class ScreenCapture:
         Returns:
             numpy array in BGR format
         """
-        import cv2
-        img = self.capture()
-        return cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
+        return self.capture_frame().bgr
 
     def capture_region(
         self,
@@ -68,15 +146,31 @@ class ScreenCapture:
         """Capture specific region of screen.
 
         Args:
-            x, y: Top-left corner
+            x, y: Top-left corner (device screen pixels)
             width, height: Region dimensions
 
         Returns:
-            Cropped PIL Image
+            Cropped PIL Image at native resolution
         """
-        full_screen = self.capture()
+        full_screen = self.capture_frame(max_dimension=None).image
         return full_screen.crop((x, y, x + width, y + height))
 
+    @property
+    def ocr(self) -> IncrementalOCR:
+        """Shared OCR engine (created on first use)."""
+        if self._ocr is None:
+            self._ocr = IncrementalOCR()
+        return self._ocr
+
+    def read_words(self) -> list[WordBox]:
+        """OCR the current screen; unchanged regions come from the cache.
+
+        Returns:
+            Word boxes in reading order, in device screen pixels
+        """
+        frame = self.capture_frame(min_scale=OCR_MIN_SCALE)
+        return [_to_screen(frame, word) for word in self.ocr.recognize(frame.array)]
+
     def find_text(self, target_text: str) -> list[dict]:
         """Find text on screen using OCR.
 
@@ -84,35 +178,14 @@ class ScreenCapture:
             target_text: Text to find (case-insensitive)
 
         Returns:
-            List of matches with coordinates
+            List of matches with device screen coordinates
         """
-        if not TESSERACT_AVAILABLE:
-            raise RuntimeError("pytesseract not available")
-
-        img = self.capture()
-        data = pytesseract.image_to_data(img, output_type=pytesseract.Output.DICT)
-
-        matches = []
         target_lower = target_text.lower()
-
-        for i, text in enumerate(data["text"]):
-            if text and target_lower in text.lower():
-                x = data["left"][i]
-                y = data["top"][i]
-                w = data["width"][i]
-                h = data["height"][i]
-                matches.append({
-                    "text": text,
-                    "x": x,
-                    "y": y,
-                    "width": w,
-                    "height": h,
-                    "center_x": x + w // 2,
-                    "center_y": y + h // 2,
-                    "confidence": data["conf"][i],
-                })
-
-        return matches
+        return [
+            word.to_dict()
+            for word in self.read_words()
+            if target_lower in word.text.lower()
+        ]
 
     def get_all_text(self) -> str:
         """Extract all text from screen.
@@ -120,11 +193,7 @@ class ScreenCapture:
         Returns:
             All visible text
         """
-        if not TESSERACT_AVAILABLE:
-            raise RuntimeError("pytesseract not available")
-
-        img = self.capture()
-        return pytesseract.image_to_string(img)
+        return self.ocr.text(self.capture_frame(min_scale=OCR_MIN_SCALE).array)
 
     def get_text_boxes(self, min_confidence: int = 60) -> list[dict]:
         """Get all text boxes with coordinates.
@@ -135,24 +204,12 @@ class ScreenCapture:
         Returns:
             List of text box dictionaries
         """
-        if not TESSERACT_AVAILABLE:
-            raise RuntimeError("pytesseract not available")
-
-        img = self.capture()
-        data = pytesseract.image_to_data(img, output_type=pytesseract.Output.DICT)
-
         boxes = []
-        for i, text in enumerate(data["text"]):
-            if text.strip() and data["conf"][i] >= min_confidence:
-                boxes.append({
-                    "text": text,
-                    "x": data["left"][i],
-                    "y": data["top"][i],
-                    "width": data["width"][i],
-                    "height": data["height"][i],
-                    "confidence": data["conf"][i],
-                })
-
+        for word in self.read_words():
+            if word.confidence >= min_confidence:
+                box = word.to_dict()
+                del box["center_x"], box["center_y"]
+                boxes.append(box)
         return boxes
 
     def tap_text(self, target_text: str) -> bool:
@@ -190,56 +247,60 @@ class ScreenCapture:
         Returns:
             True if text found within timeout
         """
-        import time
-        start = time.time()
+        deadline = time.time() + timeout_seconds
 
-        while time.time() - start < timeout_seconds:
+        while time.time() < deadline:
+            seen = self.frame_id
             if self.find_text(target_text):
                 return True
-            time.sleep(poll_interval)
+            self.wait_for_update(seen, poll_interval, deadline)
 
         return False
 
+    @property
+    def templates(self) -> TemplateRegistry:
+        """Shared template registry (templates load once, on first use)."""
+        if self._templates is None:
+            self._templates = TemplateRegistry()
+        return self._templates
+
     def find_image(
         self,
         template_path: str | Path,
         threshold: float = 0.8,
+        region: Region | None = None,
     ) -> list[dict]:
         """Find image template on screen using template matching.
 
         Args:
             template_path: Path to template image
             threshold: Match threshold (0-1)
+            region: Optional (x, y, width, height) to search within
 
         Returns:
-            List of match locations
+            List of match locations in device screen pixels, best first
         """
-        import cv2
-
-        screen = self.capture_numpy()
-        template = cv2.imread(str(template_path))
+        return self.find_images([template_path], threshold, region)[str(template_path)]
 
-        if template is None:
-            raise ValueError(f"Could not load template: {template_path}")
-
-        result = cv2.matchTemplate(screen, template, cv2.TM_CCOEFF_NORMED)
-        locations = np.where(result >= threshold)
-
-        h, w = template.shape[:2]
-        matches = []
+    def find_images(
+        self,
+        template_paths: list[str | Path],
+        threshold: float = 0.8,
+        region: Region | None = None,
+    ) -> dict[str, list[dict]]:
+        """Find several templates in one capture and one screen pyramid.
 
-        for pt in zip(*locations[::-1]):
-            matches.append({
-                "x": pt[0],
-                "y": pt[1],
-                "width": w,
-                "height": h,
-                "center_x": pt[0] + w // 2,
-                "center_y": pt[1] + h // 2,
-                "confidence": result[pt[1], pt[0]],
-            })
+        Args:
+            template_paths: Paths to template images
+            threshold: Match threshold (0-1)
+            region: Optional (x, y, width, height) to search within
 
-        return matches
+        Returns:
+            Match locations per template path, in device screen pixels
+        """
+        frame = self.capture_frame()
+        matches = self.templates.match(frame.bgr, template_paths, threshold, region, scale=frame.scale)
+        return {name: [m.to_dict() for m in found] for name, found in matches.items()}
 
     def tap_image(
         self,
@@ -282,13 +343,13 @@ class ScreenCapture:
         Returns:
             True if template found within timeout
         """
-        import time
-        start = time.time()
+        deadline = time.time() + timeout_seconds
 
-        while time.time() - start < timeout_seconds:
+        while time.time() < deadline:
+            seen = self.frame_id
             if self.find_image(template_path, threshold):
                 return True
-            time.sleep(poll_interval)
+            self.wait_for_update(seen, poll_interval, deadline)
 
         return False
 
@@ -337,13 +398,13 @@ class ScreenCapture:
         Returns:
             True if screen changed within timeout
         """
-        import time
-
+        seen = self.frame_id
         initial = self.capture()
-        start = time.time()
+        deadline = time.time() + timeout_seconds
 
-        while time.time() - start < timeout_seconds:
-            time.sleep(poll_interval)
+        while time.time() < deadline:
+            self.wait_for_update(seen, poll_interval, deadline)
+            seen = self.frame_id
             current = self.capture()
             similarity = self.compare_screens(initial, current)
 
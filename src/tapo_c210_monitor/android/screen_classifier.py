@@ -0,0 +1,370 @@
+"""Local screen recognition for the Tapo app.
+
+The app has a few dozen distinct screens, so "which screen is this?" does
+not need a vision LLM every time. ScreenClassifier fingerprints a screen
+with a perceptual difference hash plus coarse layout features (edge
+density and colour grids) and finds the nearest labelled fingerprint in a
+library, in about a millisecond. Each label also keeps facts learned
+about that screen (its description, is-this-screen answers, element
+positions), so a known screen answers repeat questions without a call.
+
+The library is a JSON file that grows as the LLM labels screens the
+classifier does not recognize yet, or it can be seeded from labelled
+screenshot folders or session screenshots.
+"""
+
+import json
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+from PIL import Image
+
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+HASH_SIZE = 16  # 16x16 = 256-bit dHash
+GRID = (8, 16)  # Layout grid (columns, rows) for a portrait screen
+STATUS_BAR = 0.04  # Fraction of the top ignored (clock, notifications)
+
+# Weights of the hash, edge and colour distances (sum to 1)
+WEIGHTS = (0.5, 0.3, 0.2)
+
+
+@dataclass
+class ScreenSignature:
+    """Fingerprint of one screen."""
+    bits: np.ndarray  # (HASH_SIZE * HASH_SIZE,) bool
+    edges: np.ndarray  # (rows * cols,) float32 edge density
+    colors: np.ndarray  # (rows/2 * cols/2 * 3,) float32 in 0-1
+
+    def to_dict(self) -> dict:
+        return {
+            "hash": np.packbits(self.bits).tobytes().hex(),
+            "edges": [round(float(v), 4) for v in self.edges],
+            "colors": [int(round(v * 255)) for v in self.colors],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ScreenSignature":
+        bits = np.unpackbits(np.frombuffer(bytes.fromhex(data["hash"]), dtype=np.uint8)).astype(bool)
+        return cls(
+            bits=bits,
+            edges=np.array(data["edges"], dtype=np.float32),
+            colors=np.array(data["colors"], dtype=np.float32) / 255,
+        )
+
+
+@dataclass(frozen=True)
+class ScreenMatch:
+    """Nearest library screen for a query."""
+    label: str | None
+    distance: float  # 0 = identical, ~0.5+ = unrelated
+    threshold: float
+
+    @property
+    def confident(self) -> bool:
+        """True if the distance is within the acceptance threshold."""
+        return self.label is not None and self.distance <= self.threshold
+
+    @property
+    def confidence(self) -> float:
+        """Rough 0-1 score; 0.5 at the acceptance threshold."""
+        return max(0.0, 1.0 - self.distance / (2 * self.threshold))
+
+
+def compute_signature(image: np.ndarray | Image.Image) -> ScreenSignature:
+    """Fingerprint a screen.
+
+    Args:
+        image: RGB ndarray or PIL Image
+
+    Returns:
+        ScreenSignature
+    """
+    if isinstance(image, Image.Image):
+        image = np.asarray(image.convert("RGB"))
+    height, width = image.shape[:2]
+    image = image[int(height * STATUS_BAR):]
+    if width > height:
+        # Landscape (e.g. fullscreen live view): rotate so grids line up
+        image = np.rot90(image)
+    gray = cv2.cvtColor(np.ascontiguousarray(image), cv2.COLOR_RGB2GRAY)
+
+    small = cv2.resize(gray, (HASH_SIZE + 1, HASH_SIZE), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+
+    cols, rows = GRID
+    edge_map = cv2.Canny(cv2.resize(gray, (cols * 32, rows * 32), interpolation=cv2.INTER_AREA), 50, 150)
+    edges = edge_map.reshape(rows, 32, cols, 32).mean(axis=(1, 3)).ravel() / 255
+
+    colors = cv2.resize(np.ascontiguousarray(image), (cols // 2, rows // 2), interpolation=cv2.INTER_AREA)
+    return ScreenSignature(
+        bits=bits,
+        edges=edges.astype(np.float32),
+        colors=colors.ravel().astype(np.float32) / 255,
+    )
+
+
+def slugify(text: str, max_words: int = 6) -> str:
+    """Short label from free text ("Camera live view screen." -> "camera_live_view_screen")."""
+    words = re.findall(r"[a-z0-9]+", text.lower())[:max_words]
+    return "_".join(words) or "screen"
+
+
+class ScreenClassifier:
+    """Nearest-neighbour screen recognition over a persistent library.
+
+    Usage:
+        classifier = ScreenClassifier("screen_library.json")
+        classifier.add(frame.array, "camera_live_view")
+        match = classifier.classify(frame.array)
+        if match.confident:
+            print(match.label)
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        threshold: float = 0.12,
+        max_per_label: int = 12,
+    ):
+        """Initialize classifier (loads the library if path exists).
+
+        Args:
+            path: Library JSON file (None = in memory only)
+            threshold: Largest distance accepted as the same screen
+            max_per_label: Exemplars kept per label (oldest dropped)
+        """
+        if not CV2_AVAILABLE:
+            raise RuntimeError("opencv-python not available")
+
+        self.path = Path(path) if path else None
+        self.threshold = threshold
+        self.max_per_label = max_per_label
+
+        self._lock = threading.Lock()
+        self._labels: list[str] = []
+        self._signatures: list[ScreenSignature] = []
+        self._facts: dict[str, dict] = {}
+        self._matrix: tuple[np.ndarray, ...] | None = None
+
+        if self.path and self.path.exists():
+            self.load(self.path)
+
+    # -- matching --
+
+    def _stacked(self) -> tuple[np.ndarray, ...]:
+        """Exemplar matrices plus, per exemplar, its label's stable-cell masks.
+
+        Cells that differ between exemplars of the same label (the video
+        area of the live view, a clock) are left out when comparing
+        against that label, so the screen's fixed layout decides.
+        """
+        if self._matrix is None:
+            bits = np.stack([s.bits for s in self._signatures])
+            edges = np.stack([s.edges for s in self._signatures])
+            colors = np.stack([s.colors for s in self._signatures])
+            bit_mask = np.ones_like(bits)
+            edge_mask = np.ones(edges.shape, dtype=bool)
+            color_mask = np.ones(colors.shape, dtype=bool)
+
+            labels = np.array(self._labels)
+            for label in set(self._labels):
+                rows = np.flatnonzero(labels == label)
+                if len(rows) < 2:
+                    continue
+                bit_mask[rows] = (bits[rows] == bits[rows[0]]).all(axis=0)
+                edge_mask[rows] = np.ptp(edges[rows], axis=0) < 0.1
+                color_mask[rows] = np.ptp(colors[rows], axis=0) < 0.15
+
+            self._matrix = (bits, edges, colors, bit_mask, edge_mask, color_mask)
+        return self._matrix
+
+    def distances(self, signature: ScreenSignature) -> np.ndarray:
+        """Distance from a signature to every library exemplar."""
+        if not self._signatures:
+            return np.empty(0, dtype=np.float32)
+        bits, edges, colors, bit_mask, edge_mask, color_mask = self._stacked()
+
+        hash_d = np.count_nonzero((bits != signature.bits) & bit_mask, axis=1) / np.maximum(
+            bit_mask.sum(axis=1), 1
+        )
+        # Relative edge difference, so busy and sparse screens weigh alike
+        edge_diff = np.abs(edges - signature.edges) * edge_mask
+        edge_d = edge_diff.sum(axis=1) / (
+            (edges * edge_mask).sum(axis=1) + (signature.edges * edge_mask).sum(axis=1) + 1e-3
+        )
+        color_d = (np.abs(colors - signature.colors) * color_mask).sum(axis=1) / np.maximum(
+            color_mask.sum(axis=1), 1
+        )
+        w_hash, w_edge, w_color = WEIGHTS
+        return w_hash * hash_d + w_edge * edge_d + w_color * color_d
+
+    def classify(self, image: np.ndarray | Image.Image | ScreenSignature) -> ScreenMatch:
+        """Find the closest known screen.
+
+        Args:
+            image: Screen (RGB ndarray, PIL Image) or its signature
+
+        Returns:
+            ScreenMatch; label is None when the library is empty
+        """
+        signature = image if isinstance(image, ScreenSignature) else compute_signature(image)
+        with self._lock:
+            distances = self.distances(signature)
+            if len(distances) == 0:
+                return ScreenMatch(None, 1.0, self.threshold)
+            best = int(np.argmin(distances))
+            distance = float(distances[best])
+            return ScreenMatch(self._labels[best], distance, self.threshold)
+
+    # -- library --
+
+    def add(
+        self,
+        image: np.ndarray | Image.Image | ScreenSignature,
+        label: str,
+        description: str | None = None,
+    ) -> bool:
+        """Add an exemplar for a label.
+
+        Near-duplicates of an existing exemplar of the same label are
+        skipped, so the library stays small.
+
+        Args:
+            image: Screen or its signature
+            label: Screen label
+            description: Optional description to remember for the label
+
+        Returns:
+            True if a new exemplar was stored
+        """
+        signature = image if isinstance(image, ScreenSignature) else compute_signature(image)
+        with self._lock:
+            facts = self._facts.setdefault(label, {})
+            if description:
+                facts["description"] = description
+
+            distances = self.distances(signature)
+            same = [i for i, name in enumerate(self._labels) if name == label]
+            if same and float(distances[same].min()) < self.threshold / 3:
+                return False
+
+            if len(same) >= self.max_per_label:
+                del self._labels[same[0]]
+                del self._signatures[same[0]]
+            self._labels.append(label)
+            self._signatures.append(signature)
+            self._matrix = None
+            return True
+
+    def new_label(self, hint: str | None = None) -> str:
+        """Unused label derived from a hint (e.g. an LLM description)."""
+        base = slugify(hint) if hint else "screen"
+        label, n = base, 2
+        while label in self._facts:
+            label = f"{base}_{n}"
+            n += 1
+        return label
+
+    def add_from_directory(
+        self,
+        directory: str | Path,
+        labeler: Callable[[Image.Image], str | None] | None = None,
+    ) -> int:
+        """Add screenshots from a directory tree.
+
+        Without a labeler, each image's parent folder is its label
+        (library/<label>/*.png). With one (e.g. an LLM), screenshots the
+        library already recognizes are added under that label and only
+        the rest are sent to the labeler, so a session folder of repeated
+        screens costs a call per distinct screen.
+
+        Args:
+            directory: Folder of screenshots (e.g. sessions/<id>/screenshots)
+            labeler: Function returning a label for an image, or None to skip it
+
+        Returns:
+            Number of exemplars added
+        """
+        added = 0
+        for path in sorted(Path(directory).rglob("*.png")):
+            with Image.open(path) as img:
+                img = img.convert("RGB")
+            signature = compute_signature(img)
+
+            if labeler is None:
+                label = path.parent.name
+            else:
+                match = self.classify(signature)
+                label = match.label if match.confident else labeler(img)
+            if label:
+                added += self.add(signature, label)
+        return added
+
+    @property
+    def labels(self) -> list[str]:
+        """Known screen labels."""
+        return sorted(set(self._labels))
+
+    def facts(self, label: str) -> dict:
+        """Facts remembered for a screen (description, answers, elements)."""
+        return self._facts.setdefault(label, {})
+
+    def remember(self, label: str, key: str, value) -> None:
+        """Store a fact about a screen (saved with the library)."""
+        with self._lock:
+            self._facts.setdefault(label, {})[key] = value
+
+    # -- persistence --
+
+    def save(self, path: str | Path | None = None) -> Path | None:
+        """Write the library as JSON.
+
+        Args:
+            path: Output file (default: the library path)
+
+        Returns:
+            Path written, or None without a path
+        """
+        path = Path(path) if path else self.path
+        if path is None:
+            return None
+        with self._lock:
+            data = {
+                "threshold": self.threshold,
+                "screens": [
+                    {"label": label, **signature.to_dict()}
+                    for label, signature in zip(self._labels, self._signatures)
+                ],
+                "facts": self._facts,
+            }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, indent=1))
+        tmp.replace(path)
+        return path
+
+    def load(self, path: str | Path) -> None:
+        """Replace the library with one saved by save()."""
+        data = json.loads(Path(path).read_text())
+        with self._lock:
+            self._labels = [s["label"] for s in data.get("screens", [])]
+            self._signatures = [ScreenSignature.from_dict(s) for s in data.get("screens", [])]
+            self._facts = data.get("facts", {})
+            self._matrix = None
+
+    def get_stats(self) -> dict:
+        """Library size."""
+        return {
+            "screens": len(set(self._labels)),
+            "exemplars": len(self._labels),
+            "path": str(self.path) if self.path else None,
+        }
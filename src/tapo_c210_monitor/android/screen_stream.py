@@ -0,0 +1,295 @@
+"""Continuous Android screen stream.
+
+`screenrecord --output-format=h264 -` streams the screen as H.264 over
+`adb exec-out`; a local ffmpeg decodes it to raw RGB and a reader thread
+keeps the newest frame. Everything that used to poll screenshots (text and
+image waiters, the GUI mirror) reads that frame instead, at the device's
+frame rate and without a capture round-trip each.
+
+screenrecord only emits frames when the screen changes, so a static
+screen costs nothing and the last frame stays current. It also stops
+after its time limit (3 minutes); the stream respawns it.
+
+For tests and offline work the same pipeline decodes a recorded H.264/MP4
+file instead of a device (`ScreenStream.from_file`).
+"""
+
+import shutil
+import subprocess
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+
+from .framebuffer import ScreenFrame
+
+
+class ScreenStream:
+    """Latest-frame view of the device screen, decoded from screenrecord.
+
+    Usage:
+        stream = ScreenStream(controller, max_dimension=720)
+        stream.start()
+        frame = stream.wait_for_frame(timeout=2)
+        frame.image.save("now.png")
+    """
+
+    def __init__(
+        self,
+        controller=None,
+        max_dimension: int | None = 720,
+        bit_rate: int = 4_000_000,
+        source: str | Path | None = None,
+        realtime: bool = True,
+        loop: bool = False,
+    ):
+        """Initialize screen stream.
+
+        Args:
+            controller: Connected AndroidController (not needed with source)
+            max_dimension: Longest side of decoded frames (smaller = less
+                encode/decode work; None = native resolution)
+            bit_rate: screenrecord bit rate
+            source: Recorded H.264/MP4 file to decode instead of a device
+            realtime: Play the file at its native rate (file source only)
+            loop: Restart the file at the end (file source only)
+        """
+        self.controller = controller
+        self.max_dimension = max_dimension
+        self.bit_rate = bit_rate
+        self.source = Path(source) if source else None
+        self.realtime = realtime
+        self.loop = loop
+
+        self._size: tuple[int, int] | None = None
+        self._scale = 1.0
+        self._procs: list[subprocess.Popen] = []
+        self._thread: threading.Thread | None = None
+        self._running = False
+
+        self._cond = threading.Condition()
+        self._latest: ScreenFrame | None = None
+        self._frame_id = 0
+        self._frame_times: deque[float] = deque(maxlen=60)
+        self.restarts = 0
+
+    @classmethod
+    def from_file(cls, path: str | Path, realtime: bool = True, loop: bool = False) -> "ScreenStream":
+        """Create a stream that decodes a recorded file (no device needed)."""
+        return cls(source=path, max_dimension=None, realtime=realtime, loop=loop)
+
+    # -- pipeline --
+
+    def _frame_size(self) -> tuple[int, int]:
+        """Decoded frame size; even dimensions as the H.264 encoder needs."""
+        if self.source is not None:
+            import cv2
+            cap = cv2.VideoCapture(str(self.source))
+            opened = cap.isOpened()
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            cap.release()
+            # Unreadable files report -1 x -1
+            if not opened or width <= 0 or height <= 0:
+                raise ValueError(f"Could not read video size from {self.source}")
+            return width, height
+
+        width, height = self.controller.get_screen_size()
+        longest = max(width, height)
+        if self.max_dimension and longest > self.max_dimension:
+            self._scale = self.max_dimension / longest
+            width, height = int(width * self._scale), int(height * self._scale)
+        return width - width % 2, height - height % 2
+
+    def _spawn(self) -> subprocess.Popen:
+        """Start the source (adb or file) and ffmpeg; returns the decoder."""
+        width, height = self._size
+        # low_delay alone keeps frames flowing as they arrive; adding
+        # -fflags nobuffer makes ffmpeg drop all but the first frame of a
+        # raw H.264 stream
+        decode = ["ffmpeg", "-loglevel", "error", "-flags", "low_delay"]
+
+        if self.source is not None:
+            if self.realtime:
+                decode.append("-re")
+            if self.loop:
+                decode += ["-stream_loop", "-1"]
+            decode += ["-i", str(self.source)]
+            upstream = None
+        else:
+            serial = self.controller.device_serial
+            adb = ["adb"] + (["-s", serial] if serial else []) + [
+                "exec-out", "screenrecord",
+                "--output-format=h264",
+                f"--bit-rate={self.bit_rate}",
+                f"--size={width}x{height}",
+                "-",
+            ]
+            upstream = subprocess.Popen(adb, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            self._procs.append(upstream)
+            decode += ["-probesize", "32", "-analyzeduration", "0", "-f", "h264", "-i", "pipe:0"]
+
+        decode += [
+            "-vf", f"scale={width}:{height}",
+            "-f", "rawvideo", "-pix_fmt", "rgb24", "pipe:1",
+        ]
+        decoder = subprocess.Popen(
+            decode,
+            stdin=upstream.stdout if upstream else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        if upstream:
+            # Let ffmpeg own the pipe so adb sees EOF/SIGPIPE if it exits
+            upstream.stdout.close()
+        self._procs.append(decoder)
+        return decoder
+
+    def _kill(self) -> None:
+        for proc in self._procs:
+            if proc.poll() is None:
+                proc.terminate()
+                try:
+                    proc.wait(timeout=2)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+        self._procs = []
+
+    def _read_frames(self, decoder: subprocess.Popen) -> None:
+        width, height = self._size
+        frame_bytes = width * height * 3
+        while True:
+            data = decoder.stdout.read(frame_bytes)
+            if len(data) < frame_bytes:
+                return
+            if not self._running:
+                # Keep draining until EOF: ffmpeg blocked writing a frame
+                # can't act on the SIGTERM from stop()
+                continue
+            rgb = np.frombuffer(data, dtype=np.uint8).reshape(height, width, 3)
+            with self._cond:
+                self._latest = ScreenFrame(rgb, self._scale)
+                self._frame_id += 1
+                self._frame_times.append(time.monotonic())
+                self._cond.notify_all()
+
+    def _run(self) -> None:
+        while self._running:
+            try:
+                decoder = self._spawn()
+                self._read_frames(decoder)
+            except Exception as e:
+                print(f"Screen stream error: {e}")
+            finally:
+                self._kill()
+
+            if not self._running or (self.source is not None and not self.loop):
+                break
+            # screenrecord hit its time limit or the device hiccupped
+            self.restarts += 1
+            time.sleep(0.5)
+
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+
+    # -- lifecycle --
+
+    def start(self) -> bool:
+        """Start streaming.
+
+        Returns:
+            True if the pipeline was started
+        """
+        if self._running:
+            return True
+        if shutil.which("ffmpeg") is None:
+            print("ffmpeg not found; screen stream unavailable")
+            return False
+        if self.source is None and self.controller is None:
+            print("Screen stream needs a controller or a source file")
+            return False
+
+        try:
+            self._size = self._frame_size()
+        except Exception as e:
+            print(f"Screen stream setup failed: {e}")
+            return False
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        """Stop streaming and the helper processes."""
+        self._running = False
+        self._kill()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def close(self) -> None:
+        """Same as stop(), like the other android helpers' close()."""
+        self.stop()
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def __enter__(self) -> "ScreenStream":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    # -- frames --
+
+    @property
+    def frame_id(self) -> int:
+        """Counter of decoded frames (changes whenever the screen does)."""
+        return self._frame_id
+
+    @property
+    def latest(self) -> ScreenFrame | None:
+        """Most recent frame (None before the first one arrives)."""
+        return self._latest
+
+    def wait_for_frame(self, after: int | None = None, timeout: float = 1.0) -> ScreenFrame | None:
+        """Wait for a frame newer than `after`.
+
+        Args:
+            after: frame_id already seen (None = any frame, returns at once
+                if one is available)
+            timeout: Seconds to wait
+
+        Returns:
+            The newest frame, or None if nothing new arrived in time
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._running:
+                if self._latest is not None and (after is None or self._frame_id > after):
+                    return self._latest
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            if self._latest is not None and (after is None or self._frame_id > after):
+                return self._latest
+        return None
+
+    def get_stats(self) -> dict:
+        """Frame counter, recent frame rate and respawn count."""
+        times = list(self._frame_times)
+        fps = (len(times) - 1) / (times[-1] - times[0]) if len(times) > 1 and times[-1] > times[0] else 0.0
+        return {
+            "running": self._running,
+            "frames": self._frame_id,
+            "fps": fps,
+            "size": self._size,
+            "restarts": self.restarts,
+        }
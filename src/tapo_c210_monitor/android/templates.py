@@ -0,0 +1,358 @@
+"""Template matching for Android screens.
+
+TemplateRegistry loads each template once and keeps a grayscale pyramid
+of it. A search builds one pyramid of the screen, shared by every
+template in the call, finds candidates on a downscaled level, and then
+checks each candidate in full-resolution colour over a small window, so
+the expensive correlation runs on a fraction of the pixels. Peaks are
+reduced with vectorised non-maximum suppression, so one on-screen hit
+gives one match instead of a cluster of neighbouring pixels.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+# (x, y, width, height) in device screen pixels
+Region = tuple[int, int, int, int]
+
+
+@dataclass
+class Template:
+    """A preloaded template and its grayscale pyramid."""
+    name: str
+    image: np.ndarray  # BGR, full resolution
+    pyramid: list[np.ndarray] = field(default_factory=list)  # Gray, level 0 = full size
+    region: Region | None = None  # Where to look by default
+    mtime: float | None = None
+    scaled: dict = field(default_factory=dict, repr=False)  # scale -> Template
+
+    def at_scale(self, scale: float, levels: int) -> "Template":
+        """This template resized for a frame downscaled by `scale`."""
+        if scale == 1.0:
+            return self
+        key = round(scale, 4)
+        if key not in self.scaled:
+            size = (max(1, round(self.width * scale)), max(1, round(self.height * scale)))
+            image = cv2.resize(self.image, size, interpolation=cv2.INTER_AREA)
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            self.scaled[key] = Template(self.name, image, build_pyramid(gray, levels))
+        return self.scaled[key]
+
+    @property
+    def width(self) -> int:
+        return self.image.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.image.shape[0]
+
+
+@dataclass(frozen=True)
+class TemplateMatch:
+    """One template occurrence on screen."""
+    name: str
+    x: int
+    y: int
+    width: int
+    height: int
+    confidence: float
+
+    @property
+    def center_x(self) -> int:
+        return self.x + self.width // 2
+
+    @property
+    def center_y(self) -> int:
+        return self.y + self.height // 2
+
+    def to_dict(self) -> dict:
+        """Dictionary in the format ScreenCapture.find_image has always returned."""
+        return {
+            "x": self.x,
+            "y": self.y,
+            "width": self.width,
+            "height": self.height,
+            "center_x": self.center_x,
+            "center_y": self.center_y,
+            "confidence": self.confidence,
+        }
+
+
+def build_pyramid(gray: np.ndarray, levels: int) -> list[np.ndarray]:
+    """Halve an image `levels` times (level 0 is the input)."""
+    pyramid = [gray]
+    for _ in range(levels):
+        if min(pyramid[-1].shape[:2]) < 2:
+            break
+        pyramid.append(cv2.pyrDown(pyramid[-1]))
+    return pyramid
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float = 0.3) -> np.ndarray:
+    """Greedy non-maximum suppression.
+
+    Args:
+        boxes: (N, 4) array of x, y, width, height
+        scores: (N,) scores, higher is better
+        iou_threshold: Overlap above which the lower-scoring box is dropped
+
+    Returns:
+        Indices of kept boxes, best first
+    """
+    if len(boxes) == 0:
+        return np.empty(0, dtype=int)
+
+    x1 = boxes[:, 0].astype(np.float64)
+    y1 = boxes[:, 1].astype(np.float64)
+    x2 = x1 + boxes[:, 2]
+    y2 = y1 + boxes[:, 3]
+    areas = boxes[:, 2].astype(np.float64) * boxes[:, 3]
+
+    order = np.argsort(scores)[::-1]
+    keep = []
+    while order.size:
+        best, rest = order[0], order[1:]
+        keep.append(best)
+        # Overlap of the best box with all remaining ones at once
+        w = np.clip(np.minimum(x2[best], x2[rest]) - np.maximum(x1[best], x1[rest]), 0, None)
+        h = np.clip(np.minimum(y2[best], y2[rest]) - np.maximum(y1[best], y1[rest]), 0, None)
+        inter = w * h
+        iou = inter / (areas[best] + areas[rest] - inter)
+        order = rest[iou <= iou_threshold]
+    return np.array(keep, dtype=int)
+
+
+def _unscale(match: TemplateMatch, scale: float) -> TemplateMatch:
+    """Map a match on a downscaled frame to device screen pixels."""
+    x, y = round(match.x / scale), round(match.y / scale)
+    right, bottom = round((match.x + match.width) / scale), round((match.y + match.height) / scale)
+    return TemplateMatch(match.name, x, y, right - x, bottom - y, match.confidence)
+
+
+def _clip_region(region: Region | None, width: int, height: int) -> Region:
+    if region is None:
+        return 0, 0, width, height
+    x, y, w, h = region
+    x0, y0 = max(0, x), max(0, y)
+    x1, y1 = min(width, x + w), min(height, y + h)
+    return x0, y0, max(0, x1 - x0), max(0, y1 - y0)
+
+
+class TemplateRegistry:
+    """Preloaded templates matched coarse-to-fine over a shared screen pyramid.
+
+    Usage:
+        registry = TemplateRegistry()
+        registry.add("templates/play.png", region=(0, 1500, 1080, 400))
+        matches = registry.match(frame.bgr, threshold=0.85, scale=frame.scale)
+    """
+
+    def __init__(
+        self,
+        levels: int = 2,
+        min_size: int = 12,
+        coarse_slack: float = 0.2,
+        max_candidates: int = 32,
+        iou_threshold: float = 0.3,
+    ):
+        """Initialize registry.
+
+        Args:
+            levels: Pyramid levels below full resolution (each halves)
+            min_size: Smallest template side allowed at the coarse level;
+                small templates are searched on a finer level
+            coarse_slack: How far below the threshold a coarse score may be
+                and still be checked at full resolution
+            max_candidates: Coarse candidates checked per template
+            iou_threshold: NMS overlap threshold
+        """
+        if not CV2_AVAILABLE:
+            raise RuntimeError("opencv-python not available")
+
+        self.levels = levels
+        self.min_size = min_size
+        self.coarse_slack = coarse_slack
+        self.max_candidates = max_candidates
+        self.iou_threshold = iou_threshold
+        self._templates: dict[str, Template] = {}
+
+    # -- templates --
+
+    def add(
+        self,
+        path: str | Path,
+        name: str | None = None,
+        image: np.ndarray | None = None,
+        region: Region | None = None,
+    ) -> Template:
+        """Load (or register) a template.
+
+        Args:
+            path: Template image file (also the default name)
+            name: Name to register under
+            image: BGR image to use instead of reading path
+            region: Default search region for this template
+
+        Returns:
+            The registered Template
+        """
+        name = name or str(path)
+        mtime = None
+        if image is None:
+            image = cv2.imread(str(path))
+            if image is None:
+                raise ValueError(f"Could not load template: {path}")
+            mtime = Path(path).stat().st_mtime
+
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        template = Template(
+            name=name,
+            image=image,
+            pyramid=build_pyramid(gray, self.levels),
+            region=region,
+            mtime=mtime,
+        )
+        self._templates[name] = template
+        return template
+
+    def get(self, path: str | Path) -> Template:
+        """Registered template, loading or reloading it if its file changed."""
+        name = str(path)
+        template = self._templates.get(name)
+        if template is None:
+            return self.add(path)
+        if template.mtime is not None:
+            try:
+                if Path(path).stat().st_mtime != template.mtime:
+                    return self.add(path, region=template.region)
+            except OSError:
+                pass
+        return template
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._templates
+
+    @property
+    def names(self) -> list[str]:
+        return list(self._templates)
+
+    # -- matching --
+
+    def _level_for(self, template: Template) -> int:
+        """Coarsest level where the template keeps at least min_size pixels."""
+        level = 0
+        while (
+            level + 1 < len(template.pyramid)
+            and min(template.pyramid[level + 1].shape[:2]) >= self.min_size
+        ):
+            level += 1
+        return level
+
+    def _match_one(
+        self,
+        screen: np.ndarray,
+        pyramid: list[np.ndarray],
+        template: Template,
+        threshold: float,
+        region: Region | None,
+    ) -> list[TemplateMatch]:
+        height, width = screen.shape[:2]
+        rx, ry, rw, rh = _clip_region(region or template.region, width, height)
+        if rw < template.width or rh < template.height:
+            return []
+
+        # Coarse pass: every position, on a downscaled gray level
+        level = min(self._level_for(template), len(pyramid) - 1)
+        factor = 2 ** level
+        coarse_tmpl = template.pyramid[level]
+        lx, ly = rx // factor, ry // factor
+        coarse_area = pyramid[level][ly:(ry + rh) // factor, lx:(rx + rw) // factor]
+        if coarse_area.shape[0] < coarse_tmpl.shape[0] or coarse_area.shape[1] < coarse_tmpl.shape[1]:
+            return []
+
+        scores = cv2.matchTemplate(coarse_area, coarse_tmpl, cv2.TM_CCOEFF_NORMED)
+        scores = np.nan_to_num(scores, nan=0.0, posinf=0.0, neginf=0.0)
+        peaks = (scores >= threshold - self.coarse_slack) & (scores == cv2.dilate(scores, None))
+        ys, xs = np.nonzero(peaks)
+        if len(xs) == 0:
+            return []
+
+        th, tw = coarse_tmpl.shape[:2]
+        boxes = np.column_stack([xs, ys, np.full_like(xs, tw), np.full_like(ys, th)])
+        keep = nms(boxes, scores[ys, xs], self.iou_threshold)[: self.max_candidates]
+
+        # Fine pass: full-resolution colour correlation around each candidate
+        margin = factor + 1
+        matches = []
+        for x, y in zip(xs[keep], ys[keep]):
+            fx = (lx + int(x)) * factor
+            fy = (ly + int(y)) * factor
+            x0 = max(rx, fx - margin)
+            y0 = max(ry, fy - margin)
+            x1 = min(rx + rw, fx + template.width + margin)
+            y1 = min(ry + rh, fy + template.height + margin)
+            window = screen[y0:y1, x0:x1]
+            if window.shape[0] < template.height or window.shape[1] < template.width:
+                continue
+            result = cv2.matchTemplate(window, template.image, cv2.TM_CCOEFF_NORMED)
+            result = np.nan_to_num(result, nan=0.0, posinf=0.0, neginf=0.0)
+            _, best, _, (bx, by) = cv2.minMaxLoc(result)
+            if best >= threshold:
+                matches.append(TemplateMatch(
+                    template.name, x0 + bx, y0 + by, template.width, template.height, float(best)
+                ))
+
+        if not matches:
+            return []
+        boxes = np.array([(m.x, m.y, m.width, m.height) for m in matches])
+        confidence = np.array([m.confidence for m in matches])
+        return [matches[i] for i in nms(boxes, confidence, self.iou_threshold)]
+
+    def match(
+        self,
+        screen: np.ndarray,
+        names: list[str | Path] | None = None,
+        threshold: float = 0.8,
+        region: Region | None = None,
+        scale: float = 1.0,
+    ) -> dict[str, list[TemplateMatch]]:
+        """Find templates on a screen, sharing one screen pyramid.
+
+        Templates, regions and results are in device screen pixels; a
+        downscaled screen (e.g. a stream frame) is matched against
+        templates resized by the same factor.
+
+        Args:
+            screen: BGR screen image
+            names: Templates (names or paths, loaded on first use);
+                default: all registered
+            threshold: Minimum TM_CCOEFF_NORMED score
+            region: Search region for all templates (default: each
+                template's own region, else the whole screen)
+            scale: Size of screen relative to the device (ScreenFrame.scale)
+
+        Returns:
+            Matches per template name, best first
+        """
+        templates = [self.get(n) for n in names] if names is not None else list(self._templates.values())
+        gray = cv2.cvtColor(screen, cv2.COLOR_BGR2GRAY)
+        pyramid = build_pyramid(gray, self.levels)
+
+        results = {}
+        for template in templates:
+            search = region or template.region
+            if search is not None and scale != 1.0:
+                search = tuple(int(round(v * scale)) for v in search)
+            found = self._match_one(screen, pyramid, template.at_scale(scale, self.levels), threshold, search)
+            if scale != 1.0:
+                found = [_unscale(m, scale) for m in found]
+            results[template.name] = found
+        return results
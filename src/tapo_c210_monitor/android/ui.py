@@ -6,6 +6,8 @@ from dataclasses import dataclass
 from typing import Callable
 
 from .controller import AndroidController
+from .element_locator import ElementLocator
+from .ocr import TESSERACT_AVAILABLE
 from .screen import ScreenCapture
 
 
@@ -49,15 +51,18 @@ class UIAutomation:
         self,
         controller: AndroidController | None = None,
         screen: ScreenCapture | None = None,
+        locator: ElementLocator | None = None,
     ):
         """Initialize UI automation.
 
         Args:
             controller: AndroidController instance (created if None)
             screen: ScreenCapture instance (created if None)
+            locator: ElementLocator instance (created if None)
         """
         self.controller = controller or AndroidController()
         self.screen = screen or ScreenCapture(self.controller)
+        self.locator = locator or ElementLocator(self.controller)
         self._connected = False
 
     def connect(self) -> bool:
@@ -116,14 +121,24 @@ class UIAutomation:
     def tap_element(self, element_name: str) -> bool:
         """Tap on a named UI element.
 
+        Looks the name up in the view hierarchy by exact resource-id,
+        text or description first, then falls back to the calibrated
+        UI_ELEMENTS positions. No substring matching: a name like
+        "record_button" must not land on a "Recordings" label.
+
         Args:
-            element_name: Name from UI_ELEMENTS
+            element_name: Element name, resource-id or name from UI_ELEMENTS
 
         Returns:
             True if element exists and was tapped
         """
         self.ensure_connected()
 
+        node = self.locator.locate(element_name, fuzzy=False)
+        if node:
+            self.controller.tap(node.center_x, node.center_y)
+            return True
+
         if element_name not in self.UI_ELEMENTS:
             print(f"Unknown element: {element_name}")
             return False
@@ -132,6 +147,45 @@ class UIAutomation:
         self.controller.tap(elem.center_x, elem.center_y)
         return True
 
+    def find_text(self, text: str, refresh: bool = False) -> tuple[int, int] | None:
+        """Find text on screen, from the view hierarchy or else by OCR.
+
+        Args:
+            text: Text to find
+            refresh: Re-dump the hierarchy instead of using the cached one
+
+        Returns:
+            (x, y) to tap, or None if not found
+        """
+        node = self.locator.locate(text, refresh=refresh)
+        if node:
+            return node.center_x, node.center_y
+
+        # Text drawn outside native widgets (video overlays, web views)
+        if TESSERACT_AVAILABLE:
+            matches = self.screen.find_text(text)
+            if matches:
+                best = max(matches, key=lambda m: m["confidence"])
+                return best["center_x"], best["center_y"]
+        return None
+
+    def tap_text(self, text: str, refresh: bool = False) -> bool:
+        """Find text (hierarchy first, OCR as fallback) and tap it.
+
+        Args:
+            text: Text to find and tap
+            refresh: Re-dump the hierarchy instead of using the cached one
+
+        Returns:
+            True if text found and tapped
+        """
+        position = self.find_text(text, refresh)
+        if position is None:
+            print(f"Text not found: {text}")
+            return False
+        self.controller.tap(*position)
+        return True
+
     def select_camera(self, camera_name: str) -> bool:
         """Select a camera from the device list.
 
@@ -144,7 +198,7 @@ class UIAutomation:
         self.ensure_connected()
 
         # First try to find by text
-        if self.screen.tap_text(camera_name):
+        if self.tap_text(camera_name):
             time.sleep(2)
             return True
 
@@ -153,7 +207,7 @@ class UIAutomation:
         self.controller.swipe(w // 2, h * 2 // 3, w // 2, h // 3, 500)
         time.sleep(1)
 
-        return self.screen.tap_text(camera_name)
+        return self.tap_text(camera_name, refresh=True)
 
     def move_camera(self, direction: str, duration_ms: int = 300) -> None:
         """Move camera using PTZ controls.
@@ -265,9 +319,16 @@ class UIAutomation:
         """
         self.ensure_connected()
 
-        if self.screen.wait_for_text(text, timeout_seconds):
-            time.sleep(0.5)
-            return self.screen.tap_text(text)
+        deadline = time.time() + timeout_seconds
+        refresh = False
+        while time.time() < deadline:
+            seen = self.screen.frame_id
+            position = self.find_text(text, refresh=refresh)
+            if position:
+                self.controller.tap(*position)
+                return True
+            self.screen.wait_for_update(seen, 0.5, deadline)
+            refresh = True
         return False
 
     def execute_sequence(
@@ -300,7 +361,7 @@ class UIAutomation:
 
             try:
                 if action == "tap_text":
-                    success = self.screen.tap_text(step["text"])
+                    success = self.tap_text(step["text"])
                 elif action == "tap_element":
                     success = self.tap_element(step["element"])
                 elif action == "move_camera":
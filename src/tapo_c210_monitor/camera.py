@@ -1,10 +1,75 @@
 """Core TAPO C210 camera interface using pytapo."""
 
 import os
+import threading
+import time
+from dataclasses import dataclass, field
 from typing import Any
 from pytapo import Tapo
 
 
+# (field, method, params, path into result) for each status read, matching
+# what the individual pytapo getters send and unwrap
+_STATUS_REQUESTS = [
+    ("led", "getLedStatus", {"led": {"name": ["config"]}}, ("led", "config")),
+    ("privacy", "getLensMaskConfig", {"lens_mask": {"name": ["lens_mask_info"]}}, ("lens_mask", "lens_mask_info")),
+    ("motion_detection", "getDetectionConfig", {"motion_detection": {"name": ["motion_det"]}}, ("motion_detection", "motion_det")),
+    ("alarm", "getLastAlarmInfo", {"msg_alarm": {"name": ["chn1_msg_alarm_info"]}}, ("msg_alarm", "chn1_msg_alarm_info")),
+    ("time", "getClockStatus", {"system": {"name": "clock_status"}}, ()),
+    ("basic_info", "getDeviceInfo", {"device_info": {"name": ["basic_info"]}}, ()),
+]
+
+
+def _unwrap(result: dict, path: tuple[str, ...]) -> dict:
+    for key in path:
+        result = result[key]
+    return result
+
+
+@dataclass(frozen=True)
+class CameraStatus:
+    """Point-in-time camera status from one batched request.
+
+    Fields are None when the camera rejected that part of the batch; the
+    reason is in errors.
+    """
+    led: dict | None
+    privacy: dict | None
+    motion_detection: dict | None
+    alarm: dict | None
+    time: dict | None
+    basic_info: dict | None
+    fetched_at: float
+    errors: dict[str, str] = field(default_factory=dict)
+
+    @staticmethod
+    def _on(section: dict | None) -> bool | None:
+        if section is None or "enabled" not in section:
+            return None
+        return section["enabled"] == "on"
+
+    @property
+    def led_enabled(self) -> bool | None:
+        return self._on(self.led)
+
+    @property
+    def privacy_enabled(self) -> bool | None:
+        return self._on(self.privacy)
+
+    @property
+    def motion_enabled(self) -> bool | None:
+        return self._on(self.motion_detection)
+
+    @property
+    def alarm_enabled(self) -> bool | None:
+        return self._on(self.alarm)
+
+    @property
+    def age(self) -> float:
+        """Seconds since the snapshot was taken."""
+        return time.monotonic() - self.fetched_at
+
+
 class TapoCamera:
     """Wrapper class for TAPO C210 camera operations."""
 
@@ -14,6 +79,7 @@ class TapoCamera:
         username: str,
         password: str,
         cloud_password: str | None = None,
+        status_ttl: float = 2.0,
     ):
         """Initialize camera connection.
 
@@ -22,35 +88,55 @@ class TapoCamera:
             username: Camera account username (created in Tapo app)
             password: Camera account password
             cloud_password: Optional TP-Link cloud password for fallback auth
+            status_ttl: Seconds a get_status_snapshot() result is reused
         """
         self.host = host
         self.username = username
         self.password = password
         self.cloud_password = cloud_password
         self._tapo: Tapo | None = None
+        self._working_credentials: tuple[str, str] | None = None
+        self.status_ttl = status_ttl
+        self._status: CameraStatus | None = None
+        self._status_lock = threading.Lock()
+
+    def _credential_candidates(self) -> list[tuple[str, str]]:
+        """Credential pairs to try, last-working pair first."""
+        candidates = [(self.username, self.password)]
+        if self.cloud_password:
+            candidates.append(("admin", self.cloud_password))
+        if self._working_credentials in candidates:
+            candidates.remove(self._working_credentials)
+            candidates.insert(0, self._working_credentials)
+        return candidates
 
     def connect(self) -> bool:
         """Establish connection to the camera.
 
+        Tapo() authenticates and fetches basic info in its constructor, so a
+        successful construction is the connection test. The credentials that
+        worked are remembered and tried first on reconnect.
+
         Returns:
             True if connection successful, False otherwise
         """
-        try:
-            self._tapo = Tapo(self.host, self.username, self.password)
-            # Test connection by getting basic info
-            self._tapo.getBasicInfo()
-            return True
-        except Exception as e:
-            # Try fallback authentication with cloud password
-            if self.cloud_password:
-                try:
-                    self._tapo = Tapo(self.host, "admin", self.cloud_password)
-                    self._tapo.getBasicInfo()
-                    return True
-                except Exception:
-                    pass
-            print(f"Failed to connect to camera: {e}")
-            return False
+        first_error = None
+        for username, password in self._credential_candidates():
+            try:
+                self._tapo = Tapo(self.host, username, password)
+                self._working_credentials = (username, password)
+                return True
+            except Exception as e:
+                first_error = first_error or e
+
+        self._tapo = None
+        print(f"Failed to connect to camera: {first_error}")
+        return False
+
+    @property
+    def is_connected(self) -> bool:
+        """Whether connect() has succeeded."""
+        return self._tapo is not None
 
     @property
     def tapo(self) -> Tapo:
@@ -67,6 +153,73 @@ class TapoCamera:
         """Get camera time settings."""
         return self.tapo.getTime()
 
+    def _fetch_status_batched(self) -> dict[str, Any]:
+        """Fetch all status sections in one multipleRequest round-trip."""
+        requests = [
+            {"method": method, "params": params}
+            for _, method, params, _ in _STATUS_REQUESTS
+        ]
+        responses = self.tapo.executeFunction("multipleRequest", {"requests": requests})
+
+        # Responses carry their method name; don't rely on ordering
+        by_method = {r.get("method"): r for r in responses}
+        sections: dict[str, Any] = {}
+        for name, method, _, path in _STATUS_REQUESTS:
+            response = by_method.get(method)
+            if response is None:
+                sections[name] = RuntimeError("missing from batch response")
+            elif response.get("error_code", 0) != 0 or "result" not in response:
+                sections[name] = RuntimeError(f"error_code {response.get('error_code')}")
+            else:
+                try:
+                    sections[name] = _unwrap(response["result"], path)
+                except (KeyError, TypeError) as e:
+                    sections[name] = e
+        return sections
+
+    def _fetch_status_sequential(self) -> dict[str, Any]:
+        """Fetch status sections one request at a time."""
+        sections: dict[str, Any] = {}
+        for name, method, params, path in _STATUS_REQUESTS:
+            try:
+                sections[name] = _unwrap(self.tapo.executeFunction(method, params), path)
+            except Exception as e:
+                sections[name] = e
+        return sections
+
+    def get_status_snapshot(self, max_age: float | None = None) -> CameraStatus:
+        """Get LED, privacy, motion, alarm, time and basic info together.
+
+        Uses one multipleRequest round-trip (falling back to sequential
+        requests on firmware that rejects the batch). Results are cached
+        for status_ttl seconds; setters invalidate the cache.
+
+        Args:
+            max_age: Override the cache TTL for this call (0 forces a fetch)
+
+        Returns:
+            Immutable status snapshot
+        """
+        ttl = self.status_ttl if max_age is None else max_age
+        with self._status_lock:
+            if self._status is not None and self._status.age < ttl:
+                return self._status
+
+            try:
+                sections = self._fetch_status_batched()
+            except Exception as e:
+                print(f"Batched status request failed, falling back: {e}")
+                sections = self._fetch_status_sequential()
+
+            errors = {k: str(v) for k, v in sections.items() if isinstance(v, Exception)}
+            values = {k: (None if isinstance(v, Exception) else v) for k, v in sections.items()}
+            self._status = CameraStatus(fetched_at=time.monotonic(), errors=errors, **values)
+            return self._status
+
+    def invalidate_status(self) -> None:
+        """Drop the cached status snapshot."""
+        self._status = None
+
     def get_led_status(self) -> bool:
         """Get LED indicator status."""
         return self.tapo.getLED()
@@ -74,6 +227,7 @@ class TapoCamera:
     def set_led(self, enabled: bool) -> None:
         """Set LED indicator on/off."""
         self.tapo.setLED(enabled)
+        self.invalidate_status()
 
     def get_privacy_mode(self) -> bool:
         """Get privacy mode status (lens cover)."""
@@ -82,6 +236,7 @@ class TapoCamera:
     def set_privacy_mode(self, enabled: bool) -> None:
         """Enable/disable privacy mode."""
         self.tapo.setPrivacyMode(enabled)
+        self.invalidate_status()
 
     def get_motion_detection(self) -> dict[str, Any]:
         """Get motion detection settings."""
@@ -95,6 +250,7 @@ class TapoCamera:
             sensitivity: 'low', 'medium', or 'high'
         """
         self.tapo.setMotionDetection(enabled, sensitivity)
+        self.invalidate_status()
 
     def get_alarm_status(self) -> dict[str, Any]:
         """Get alarm configuration."""
@@ -103,6 +259,7 @@ class TapoCamera:
     def set_alarm(self, enabled: bool, sound_enabled: bool = True, light_enabled: bool = True) -> None:
         """Configure alarm settings."""
         self.tapo.setAlarm(enabled, sound_enabled, light_enabled)
+        self.invalidate_status()
 
     def move_motor(self, x_deg: float, y_deg: float) -> None:
         """Move camera (PTZ control).
@@ -113,6 +270,27 @@ class TapoCamera:
         """
         self.tapo.moveMotor(x_deg, y_deg)
 
+    def move_motor_to(
+        self,
+        odometry,
+        pan_deg: float,
+        tilt_deg: float | None = None,
+        tolerance_deg: float = 1.0,
+    ):
+        """Closed-loop move to an angle using visual odometry feedback.
+
+        Args:
+            odometry: VisualOdometry fed from this camera's stream
+            pan_deg: Target pan in degrees (odometry frame)
+            tilt_deg: Target tilt in degrees (None = leave tilt alone)
+            tolerance_deg: Acceptable final error
+
+        Returns:
+            Final PTZEstimate
+        """
+        from .ptz_mapper.visual_odometry import ClosedLoopPTZ
+        return ClosedLoopPTZ(odometry, tolerance_deg).move_tapo(self, pan_deg, tilt_deg)
+
     def move_motor_step(self, direction: str) -> None:
         """Move camera one step in direction.
 
@@ -0,0 +1,282 @@
+"""Asyncio facade over TapoCamera.
+
+pytapo is blocking and its session is not safe to share between threads, so
+every call runs on one dedicated worker thread. On top of that:
+
+- control commands (setters, PTZ, reboot) go through a FIFO queue and never
+  overlap on the camera
+- identical reads issued concurrently share a single request
+- every call has a timeout
+- the session token is refreshed proactively, before the camera expires it,
+  so interactive calls don't pay for a re-login
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from .camera import CameraStatus, TapoCamera
+
+
+class AsyncTapoCamera:
+    """Async wrapper around a single authenticated TapoCamera session.
+
+    Usage:
+        async with AsyncTapoCamera(TapoCamera.from_env()) as cam:
+            info, led = await asyncio.gather(cam.get_basic_info(), cam.get_led_status())
+            await cam.move_motor(10, 0)
+    """
+
+    def __init__(
+        self,
+        camera: TapoCamera,
+        call_timeout: float = 10.0,
+        keepalive_interval: float = 600.0,
+    ):
+        """Initialize facade.
+
+        Args:
+            camera: Camera to wrap (connected on start() if needed)
+            call_timeout: Default per-call timeout in seconds
+            keepalive_interval: Seconds between proactive token refreshes
+                (0 disables keep-alive)
+        """
+        self.camera = camera
+        self.call_timeout = call_timeout
+        self.keepalive_interval = keepalive_interval
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tapo")
+        self._control_queue: asyncio.Queue | None = None
+        self._control_task: asyncio.Task | None = None
+        self._keepalive_task: asyncio.Task | None = None
+        self._reads: dict[str, asyncio.Future] = {}
+        self._last_activity = 0.0
+
+        self.stats = {"calls": 0, "coalesced_reads": 0, "timeouts": 0, "refreshes": 0}
+
+    # -- lifecycle --
+
+    async def start(self) -> bool:
+        """Connect (if needed) and start the control and keep-alive tasks.
+
+        Returns:
+            True if the camera session is ready
+        """
+        if not self.camera.is_connected:
+            ok = await self._run(self.camera.connect, timeout=max(self.call_timeout, 30.0))
+            if not ok:
+                return False
+
+        self._control_queue = asyncio.Queue()
+        self._control_task = asyncio.create_task(self._control_worker())
+        if self.keepalive_interval > 0:
+            self._keepalive_task = asyncio.create_task(self._keepalive())
+        self._last_activity = time.monotonic()
+        return True
+
+    async def close(self) -> None:
+        """Stop background tasks and release the worker thread."""
+        for task in (self._control_task, self._keepalive_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._control_task = None
+        self._keepalive_task = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def __aenter__(self) -> "AsyncTapoCamera":
+        if not await self.start():
+            raise RuntimeError(f"Could not connect to camera at {self.camera.host}")
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    # -- plumbing --
+
+    async def _run(self, func: Callable, *args, timeout: float | None = None) -> Any:
+        """Run a blocking call on the session thread with a timeout."""
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, func, *args)
+        self.stats["calls"] += 1
+        try:
+            # shield() keeps a timed-out call from being reported as
+            # cancelled while the thread is still talking to the camera
+            result = await asyncio.wait_for(asyncio.shield(future), timeout or self.call_timeout)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise
+        self._last_activity = time.monotonic()
+        return result
+
+    async def _read(self, key: str, func: Callable, *args, timeout: float | None = None) -> Any:
+        """Run a read, sharing the result with concurrent callers of the same key."""
+        pending = self._reads.get(key)
+        if pending is not None:
+            self.stats["coalesced_reads"] += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._reads[key] = future
+        try:
+            result = await self._run(func, *args, timeout=timeout)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited shared failure isn't logged
+            future.exception()
+            raise
+        finally:
+            del self._reads[key]
+
+    async def _control(self, func: Callable, *args, timeout: float | None = None) -> Any:
+        """Queue a control command; commands run one at a time in FIFO order."""
+        if self._control_queue is None:
+            raise RuntimeError("AsyncTapoCamera not started. Call start() first.")
+
+        done = asyncio.get_running_loop().create_future()
+        await self._control_queue.put((func, args, timeout, done))
+        return await done
+
+    async def _control_worker(self) -> None:
+        while True:
+            func, args, timeout, done = await self._control_queue.get()
+            try:
+                if not done.cancelled():
+                    result = await self._run(func, *args, timeout=timeout)
+                    if not done.cancelled():
+                        done.set_result(result)
+            except Exception as e:
+                if not done.cancelled():
+                    done.set_exception(e)
+            finally:
+                self._control_queue.task_done()
+
+    def _refresh_session(self) -> None:
+        """Renew the session token (runs on the session thread).
+
+        pytapo 3.3 has refreshStok(); 3.4 dropped it and re-authenticates
+        inside its requests, so there a cheap getBasicInfo() keeps the
+        session alive.
+        """
+        tapo = self.camera.tapo
+        refresh = getattr(tapo, "refreshStok", None) or tapo.getBasicInfo
+        # Counted when the call starts, so a refresh still in flight at
+        # close() is counted too
+        self.stats["refreshes"] += 1
+        refresh()
+
+    async def _keepalive(self) -> None:
+        """Refresh the session token before it expires.
+
+        Skipped while the session is busy, since every successful call
+        already proves the token is valid.
+        """
+        while True:
+            await asyncio.sleep(self.keepalive_interval / 4)
+            if time.monotonic() - self._last_activity < self.keepalive_interval:
+                continue
+            try:
+                await self._run(self._refresh_session, timeout=max(self.call_timeout, 30.0))
+            except Exception as e:
+                print(f"Camera keep-alive failed: {e}")
+                # Full reconnect; connect() tries the last working credentials first
+                try:
+                    await self._run(self.camera.connect, timeout=max(self.call_timeout, 30.0))
+                except Exception:
+                    pass
+
+    # -- reads --
+
+    async def get_basic_info(self, timeout: float | None = None) -> dict[str, Any]:
+        """Get basic camera information."""
+        return await self._read("basic_info", self.camera.get_basic_info, timeout=timeout)
+
+    async def get_status_snapshot(self, timeout: float | None = None) -> CameraStatus:
+        """Get the batched status snapshot (see TapoCamera.get_status_snapshot)."""
+        return await self._read("status", self.camera.get_status_snapshot, timeout=timeout)
+
+    async def get_time(self, timeout: float | None = None) -> dict[str, Any]:
+        """Get camera time settings."""
+        return await self._read("time", self.camera.get_time, timeout=timeout)
+
+    async def get_led_status(self, timeout: float | None = None) -> bool:
+        """Get LED indicator status."""
+        return await self._read("led", self.camera.get_led_status, timeout=timeout)
+
+    async def get_privacy_mode(self, timeout: float | None = None) -> bool:
+        """Get privacy mode status (lens cover)."""
+        return await self._read("privacy", self.camera.get_privacy_mode, timeout=timeout)
+
+    async def get_motion_detection(self, timeout: float | None = None) -> dict[str, Any]:
+        """Get motion detection settings."""
+        return await self._read("motion", self.camera.get_motion_detection, timeout=timeout)
+
+    async def get_alarm_status(self, timeout: float | None = None) -> dict[str, Any]:
+        """Get alarm configuration."""
+        return await self._read("alarm", self.camera.get_alarm_status, timeout=timeout)
+
+    async def get_presets(self, timeout: float | None = None) -> dict[str, Any]:
+        """Get saved preset positions."""
+        return await self._read("presets", self.camera.get_presets, timeout=timeout)
+
+    async def get_recordings(self, date: str, timeout: float | None = None) -> list[dict[str, Any]]:
+        """Get list of recordings for a date (YYYYMMDD)."""
+        return await self._read(f"recordings:{date}", self.camera.get_recordings, date, timeout=timeout)
+
+    # -- control --
+
+    async def set_led(self, enabled: bool, timeout: float | None = None) -> None:
+        """Set LED indicator on/off."""
+        await self._control(self.camera.set_led, enabled, timeout=timeout)
+
+    async def set_privacy_mode(self, enabled: bool, timeout: float | None = None) -> None:
+        """Enable/disable privacy mode."""
+        await self._control(self.camera.set_privacy_mode, enabled, timeout=timeout)
+
+    async def set_motion_detection(
+        self,
+        enabled: bool,
+        sensitivity: str = "medium",
+        timeout: float | None = None,
+    ) -> None:
+        """Configure motion detection."""
+        await self._control(self.camera.set_motion_detection, enabled, sensitivity, timeout=timeout)
+
+    async def set_alarm(
+        self,
+        enabled: bool,
+        sound_enabled: bool = True,
+        light_enabled: bool = True,
+        timeout: float | None = None,
+    ) -> None:
+        """Configure alarm settings."""
+        await self._control(self.camera.set_alarm, enabled, sound_enabled, light_enabled, timeout=timeout)
+
+    async def move_motor(self, x_deg: float, y_deg: float, timeout: float | None = None) -> None:
+        """Move camera (PTZ control)."""
+        await self._control(self.camera.move_motor, x_deg, y_deg, timeout=timeout)
+
+    async def move_motor_step(self, direction: str, timeout: float | None = None) -> None:
+        """Move camera one step in direction."""
+        await self._control(self.camera.move_motor_step, direction, timeout=timeout)
+
+    async def set_preset(self, name: str, timeout: float | None = None) -> None:
+        """Save current position as preset."""
+        await self._control(self.camera.set_preset, name, timeout=timeout)
+
+    async def go_to_preset(self, preset_id: str, timeout: float | None = None) -> None:
+        """Move to saved preset position."""
+        await self._control(self.camera.go_to_preset, preset_id, timeout=timeout)
+
+    async def reboot(self, timeout: float | None = None) -> None:
+        """Reboot the camera."""
+        await self._control(self.camera.reboot, timeout=timeout)
@@ -0,0 +1,216 @@
+"""Shared, change-notifying cache of camera state.
+
+One background poller reads the batched status snapshot on an adaptive
+schedule and pushes diffs to subscribers, so the camera sees the same
+traffic no matter how many consumers (GUI, ChangeMonitor, health checks)
+are interested. Setters write through to the camera and publish the new
+value immediately, then switch the poller to a fast interval to confirm it.
+"""
+
+import dataclasses
+import threading
+import time
+from typing import Any, Callable
+
+from .camera import CameraStatus, TapoCamera
+
+# Snapshot fields that are diffed; "time" changes on every poll
+DIFF_FIELDS = ("led", "privacy", "motion_detection", "alarm", "basic_info")
+
+
+class CameraStateCache:
+    """Poll camera status once and fan changes out to subscribers.
+
+    Usage:
+        state = CameraStateCache(camera)
+        state.subscribe(lambda diff: print(diff))
+        state.start()
+        state.set_privacy_mode(True)
+    """
+
+    def __init__(
+        self,
+        camera: TapoCamera,
+        fast_interval: float = 1.0,
+        idle_interval: float = 30.0,
+        fast_period: float = 10.0,
+    ):
+        """Initialize state cache.
+
+        Args:
+            camera: Connected camera
+            fast_interval: Poll interval right after a write or a change
+            idle_interval: Longest poll interval when nothing changes
+            fast_period: Seconds to keep polling fast after a write
+        """
+        self.camera = camera
+        self.fast_interval = fast_interval
+        self.idle_interval = idle_interval
+        self.fast_period = fast_period
+
+        self._status: CameraStatus | None = None
+        self._subscribers: list[Callable[[dict[str, tuple[Any, Any]]], None]] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._running = False
+        self._last_write = 0.0
+        self._interval = fast_interval
+        self.poll_count = 0
+
+    # -- subscription --
+
+    def subscribe(self, callback: Callable[[dict[str, tuple[Any, Any]]], None]) -> Callable[[], None]:
+        """Register for state changes.
+
+        Args:
+            callback: Function(diff) where diff maps field name to
+                (old, new). Called from the poller or setter thread.
+
+        Returns:
+            Function that removes the subscription
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def _publish(self, status: CameraStatus) -> dict[str, tuple[Any, Any]]:
+        """Store a new status and notify subscribers of what changed."""
+        with self._lock:
+            old = self._status
+            self._status = status
+            subscribers = list(self._subscribers)
+
+        diff = {}
+        for name in DIFF_FIELDS:
+            before = getattr(old, name) if old else None
+            after = getattr(status, name)
+            # A failed read is not a change
+            if after is not None and before != after:
+                diff[name] = (before, after)
+
+        if diff:
+            for callback in subscribers:
+                try:
+                    callback(diff)
+                except Exception as e:
+                    print(f"State subscriber error: {e}")
+        return diff
+
+    # -- reads --
+
+    @property
+    def status(self) -> CameraStatus | None:
+        """Latest known status (None before the first poll)."""
+        return self._status
+
+    def refresh(self) -> CameraStatus:
+        """Poll the camera now and publish any changes."""
+        status = self.camera.get_status_snapshot(max_age=0)
+        self.poll_count += 1
+        diff = self._publish(status)
+        self._adapt_interval(bool(diff))
+        return status
+
+    def get(self) -> CameraStatus:
+        """Get the latest status, polling once if nothing is cached yet."""
+        return self._status or self.refresh()
+
+    @property
+    def privacy_enabled(self) -> bool | None:
+        return self.get().privacy_enabled
+
+    @property
+    def led_enabled(self) -> bool | None:
+        return self.get().led_enabled
+
+    @property
+    def motion_enabled(self) -> bool | None:
+        return self.get().motion_enabled
+
+    # -- write-through setters --
+
+    def _write(self, name: str, section: dict, apply: Callable, *args) -> None:
+        apply(*args)
+
+        # Publish the value we just wrote; the next (fast) poll confirms it
+        current = self._status
+        if current is not None:
+            merged = {**(getattr(current, name) or {}), **section}
+            self._publish(dataclasses.replace(current, **{name: merged}))
+
+        self._last_write = time.monotonic()
+        self._interval = self.fast_interval
+        self._wake.set()
+
+    def set_privacy_mode(self, enabled: bool) -> None:
+        """Enable/disable privacy mode."""
+        self._write("privacy", {"enabled": "on" if enabled else "off"},
+                    self.camera.set_privacy_mode, enabled)
+
+    def set_led(self, enabled: bool) -> None:
+        """Set LED indicator on/off."""
+        self._write("led", {"enabled": "on" if enabled else "off"},
+                    self.camera.set_led, enabled)
+
+    def set_motion_detection(self, enabled: bool, sensitivity: str = "medium") -> None:
+        """Configure motion detection."""
+        self._write("motion_detection", {"enabled": "on" if enabled else "off"},
+                    self.camera.set_motion_detection, enabled, sensitivity)
+
+    def set_alarm(self, enabled: bool, sound_enabled: bool = True, light_enabled: bool = True) -> None:
+        """Configure alarm settings."""
+        self._write("alarm", {"enabled": "on" if enabled else "off"},
+                    self.camera.set_alarm, enabled, sound_enabled, light_enabled)
+
+    # -- polling --
+
+    def _adapt_interval(self, changed: bool) -> None:
+        """Poll fast after writes and changes, back off exponentially when idle."""
+        if changed or time.monotonic() - self._last_write < self.fast_period:
+            self._interval = self.fast_interval
+        else:
+            self._interval = min(self._interval * 2, self.idle_interval)
+
+    def _poll_loop(self) -> None:
+        while self._running:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Camera state poll failed: {e}")
+                self._interval = min(self._interval * 2, self.idle_interval)
+
+            # A write wakes us to restart the wait at the fast interval,
+            # giving the camera a moment to apply it before we confirm
+            while self._wake.wait(self._interval) and self._running:
+                self._wake.clear()
+            self._wake.clear()
+
+    def start(self) -> None:
+        """Start the background poller."""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._poll_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background poller."""
+        self._running = False
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def __enter__(self) -> "CameraStateCache":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
@@ -0,0 +1,469 @@
+"""Incremental catalogue of local recording files.
+
+Keeps an in-memory (and on-disk) list of recordings under a directory tree,
+with sizes and timestamps parsed from filenames, so listing and time-range
+queries don't walk the filesystem on every call. Clips whose filename
+carries only one timestamp are probed once for their real duration, and the
+result is cached in the entry.
+
+Freshness is maintained two ways:
+
+- directory mtimes: a refresh only re-lists directories whose mtime changed
+  (one stat per directory instead of one per file)
+- inotify (Linux): changed directories are marked dirty as events arrive, so
+  most refreshes touch nothing at all. Network mounts don't deliver inotify
+  events for remote writers, so a periodic mtime walk still runs as a backstop.
+"""
+
+import bisect
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import struct
+import threading
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+
+from .store import parse_recording_times, probe_duration
+
+CATALOGUE_FILENAME = ".recording_catalogue.json"
+# Version 1 entries were never probed for duration
+CATALOGUE_VERSION = 2
+
+
+@dataclass
+class CatalogueEntry:
+    """A catalogued recording file."""
+    path: str
+    size: int
+    mtime_ns: int
+    start: float | None
+    end: float | None
+
+
+@dataclass
+class _DirState:
+    """Cached listing of one directory."""
+    mtime_ns: int
+    subdirs: list[str]
+    files: dict[str, CatalogueEntry]
+
+
+class _InotifyWatcher:
+    """Minimal ctypes inotify wrapper that reports changed directories."""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_Q_OVERFLOW = 0x00004000
+    IN_CLOEXEC = 0o2000000
+
+    WATCH_MASK = (
+        IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+        | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+    )
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, on_change, on_overflow):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self._on_change = on_change
+        self._on_overflow = on_overflow
+        self._wd_to_dir: dict[int, str] = {}
+        self._dir_to_wd: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def watch(self, directory: str) -> None:
+        with self._lock:
+            if directory in self._dir_to_wd:
+                return
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self.WATCH_MASK)
+            if wd < 0:
+                return  # Directory vanished or watch limit reached; mtime walk covers it
+            self._wd_to_dir[wd] = directory
+            self._dir_to_wd[directory] = wd
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            ready, _, _ = select.select([self._fd], [], [], 0.5)
+            if not ready:
+                continue
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except OSError:
+                return
+
+            offset = 0
+            while offset + self._EVENT.size <= len(data):
+                wd, mask, _cookie, length = self._EVENT.unpack_from(data, offset)
+                offset += self._EVENT.size + length
+
+                if mask & self.IN_Q_OVERFLOW:
+                    self._on_overflow()
+                    continue
+
+                with self._lock:
+                    directory = self._wd_to_dir.get(wd)
+                    if mask & self.IN_DELETE_SELF and directory:
+                        self._wd_to_dir.pop(wd, None)
+                        self._dir_to_wd.pop(directory, None)
+                if directory:
+                    self._on_change(directory)
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=2.0)
+        os.close(self._fd)
+
+
+class RecordingCatalogue:
+    """Cached, incrementally refreshed index of recordings under a directory.
+
+    Usage:
+        catalogue = RecordingCatalogue("./recordings")
+        catalogue.paths()
+        catalogue.query(datetime(2026, 1, 13, 14), datetime(2026, 1, 13, 15))
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        pattern_suffix: str = ".mp4",
+        use_inotify: bool = True,
+        min_refresh_interval: float = 2.0,
+        rescan_interval: float = 60.0,
+        default_duration: float = 60.0,
+        persist: bool = True,
+    ):
+        """Initialize catalogue.
+
+        Args:
+            root: Recordings directory
+            pattern_suffix: File suffix to catalogue
+            use_inotify: Watch directories with inotify when available
+            min_refresh_interval: Minimum seconds between mtime walks (no inotify)
+            rescan_interval: Seconds between backstop mtime walks (with inotify)
+            default_duration: Assumed clip length when the filename has only one
+                timestamp and the file's duration can't be probed
+            persist: Save catalogue to <root>/.recording_catalogue.json
+        """
+        self.root = Path(root)
+        self.suffix = pattern_suffix
+        self.min_refresh_interval = min_refresh_interval
+        self.rescan_interval = rescan_interval
+        self.default_duration = default_duration
+        self.persist = persist
+
+        self._lock = threading.RLock()
+        self._dirs: dict[str, _DirState] = {}
+        self._dirty: set[str] = set()
+        self._last_walk = 0.0
+        self._changed = True
+
+        # Range index, rebuilt lazily after changes
+        self._starts: list[float] = []
+        self._intervals: list[tuple[float, float, str]] = []
+        self._max_duration = 0.0
+
+        self._watcher: _InotifyWatcher | None = None
+        if use_inotify:
+            try:
+                self._watcher = _InotifyWatcher(self._mark_dirty, self._invalidate_all)
+            except (OSError, AttributeError):
+                self._watcher = None
+
+        self._load()
+
+    @property
+    def cache_path(self) -> Path:
+        return self.root / CATALOGUE_FILENAME
+
+    def _load(self) -> None:
+        """Load persisted catalogue; directories are revalidated by mtime on refresh."""
+        if not self.persist or not self.cache_path.exists():
+            return
+        try:
+            data = json.loads(self.cache_path.read_text())
+            if data.get("version") != CATALOGUE_VERSION:
+                return
+            for directory, state in data.get("dirs", {}).items():
+                self._dirs[directory] = _DirState(
+                    mtime_ns=state["mtime_ns"],
+                    subdirs=state["subdirs"],
+                    files={
+                        name: CatalogueEntry(**entry)
+                        for name, entry in state["files"].items()
+                    },
+                )
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Ignoring unreadable recording catalogue: {e}")
+            self._dirs.clear()
+
+    def _save(self) -> None:
+        if not self.persist or not self.root.exists():
+            return
+        data = {
+            "version": CATALOGUE_VERSION,
+            "dirs": {
+                directory: {
+                    "mtime_ns": state.mtime_ns,
+                    "subdirs": state.subdirs,
+                    "files": {name: asdict(e) for name, e in state.files.items()},
+                }
+                for directory, state in self._dirs.items()
+            },
+        }
+        tmp_path = self.cache_path.with_suffix(".tmp")
+        try:
+            tmp_path.write_text(json.dumps(data))
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Failed to save recording catalogue: {e}")
+
+    def _mark_dirty(self, directory: str) -> None:
+        with self._lock:
+            self._dirty.add(directory)
+
+    def mark_dirty(self, path: str | Path) -> None:
+        """Force a directory (or a file's directory) to be re-listed on next query.
+
+        Args:
+            path: Directory or file path
+        """
+        path = Path(path)
+        directory = path if path.is_dir() else path.parent
+        self._mark_dirty(str(directory.resolve()))
+
+    def _invalidate_all(self) -> None:
+        with self._lock:
+            self._last_walk = 0.0
+
+    def _scan_dir(self, directory: str, mtime_ns: int) -> _DirState:
+        """List one directory, reusing cached entries for unchanged files."""
+        old = self._dirs.get(directory)
+        subdirs = []
+        files = {}
+
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.name.startswith("."):
+                        continue  # Hidden artifacts (.previews, indexes)
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.name.endswith(self.suffix):
+                        st = entry.stat()
+                        cached = old.files.get(entry.name) if old else None
+                        if cached and cached.size == st.st_size and cached.mtime_ns == st.st_mtime_ns:
+                            files[entry.name] = cached
+                            continue
+                        start, end = self._recording_times(entry.path)
+                        files[entry.name] = CatalogueEntry(
+                            path=entry.path,
+                            size=st.st_size,
+                            mtime_ns=st.st_mtime_ns,
+                            start=start,
+                            end=end,
+                        )
+        except OSError:
+            pass
+
+        if self._watcher:
+            self._watcher.watch(directory)
+
+        return _DirState(mtime_ns=mtime_ns, subdirs=subdirs, files=files)
+
+    def _recording_times(self, path: str) -> tuple[float | None, float | None]:
+        """Get a clip's start/end, probing its duration if the name has only one."""
+        start, end = parse_recording_times(path)
+        if (start is None) != (end is None):
+            duration = probe_duration(path)
+            if duration is not None:
+                if start is None:
+                    start = end - duration
+                else:
+                    end = start + duration
+        return start, end
+
+    def _store_dir(self, directory: str, state: _DirState) -> _DirState:
+        """Replace a directory's cached state, noting whether its contents changed.
+
+        Saving the catalogue itself bumps the root mtime, so comparing
+        contents (not mtimes) avoids a save on every refresh.
+        """
+        old = self._dirs.get(directory)
+        if old is None or old.subdirs != state.subdirs or old.files != state.files:
+            self._changed = True
+        self._dirs[directory] = state
+        return state
+
+    def _walk(self, directory: str, seen: set[str]) -> None:
+        """Revalidate a directory subtree using directory mtimes."""
+        seen.add(directory)
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except OSError:
+            return
+
+        state = self._dirs.get(directory)
+        if state is None or state.mtime_ns != mtime_ns or directory in self._dirty:
+            state = self._store_dir(directory, self._scan_dir(directory, mtime_ns))
+            self._dirty.discard(directory)
+
+        for sub in state.subdirs:
+            self._walk(sub, seen)
+
+    def _rescan_dirty(self) -> None:
+        """Re-list only directories reported by inotify."""
+        dirty, self._dirty = self._dirty, set()
+        for directory in dirty:
+            try:
+                mtime_ns = os.stat(directory).st_mtime_ns
+            except OSError:
+                # Directory removed; drop it and its descendants
+                prefix = directory + os.sep
+                for d in [d for d in self._dirs if d == directory or d.startswith(prefix)]:
+                    del self._dirs[d]
+                self._changed = True
+                continue
+
+            old = self._dirs.get(directory)
+            state = self._store_dir(directory, self._scan_dir(directory, mtime_ns))
+
+            # New subdirectories need a full walk to pick up their contents
+            for sub in state.subdirs:
+                if not old or sub not in old.subdirs:
+                    self._walk(sub, set())
+
+    def refresh(self, force: bool = False) -> None:
+        """Bring the catalogue up to date.
+
+        Args:
+            force: Walk directory mtimes regardless of intervals
+        """
+        with self._lock:
+            now = time.monotonic()
+            interval = self.rescan_interval if self._watcher else self.min_refresh_interval
+
+            if force or now - self._last_walk >= interval:
+                root = str(self.root.resolve())
+                seen: set[str] = set()
+                self._walk(root, seen)
+                for stale in [d for d in self._dirs if d not in seen]:
+                    del self._dirs[stale]
+                    self._changed = True
+                self._last_walk = now
+            elif self._dirty:
+                self._rescan_dirty()
+
+            if self._changed:
+                self._rebuild_index()
+                self._save()
+                self._changed = False
+
+    def _rebuild_index(self) -> None:
+        """Rebuild the sorted interval index used by query()."""
+        intervals = []
+        for state in self._dirs.values():
+            for entry in state.files.values():
+                start, end = entry.start, entry.end
+                if start is None and end is None:
+                    continue
+                if start is None:
+                    start = end - self.default_duration
+                if end is None:
+                    end = start + self.default_duration
+                intervals.append((start, end, entry.path))
+
+        intervals.sort()
+        self._intervals = intervals
+        self._starts = [i[0] for i in intervals]
+        self._max_duration = max((e - s for s, e, _ in intervals), default=0.0)
+
+    def entries(self) -> list[CatalogueEntry]:
+        """Get all catalogued entries sorted by path."""
+        self.refresh()
+        with self._lock:
+            entries = [e for state in self._dirs.values() for e in state.files.values()]
+        return sorted(entries, key=lambda e: e.path)
+
+    def paths(self) -> list[Path]:
+        """Get all catalogued recording paths, sorted."""
+        return [Path(e.path) for e in self.entries()]
+
+    def total_size(self) -> int:
+        """Get total size of catalogued recordings in bytes."""
+        return sum(e.size for e in self.entries())
+
+    def query_intervals(
+        self,
+        start: datetime | float,
+        end: datetime | float,
+    ) -> list[tuple[float, float, Path]]:
+        """Find recordings overlapping a time range, with their extents.
+
+        Args:
+            start: Range start (datetime or unix seconds)
+            end: Range end (datetime or unix seconds)
+
+        Returns:
+            (start, end, path) tuples in unix seconds, ordered by start time
+        """
+        if isinstance(start, datetime):
+            start = start.timestamp()
+        if isinstance(end, datetime):
+            end = end.timestamp()
+
+        self.refresh()
+        with self._lock:
+            # Candidates start before the range ends and no earlier than
+            # the longest clip could reach back from the range start
+            hi = bisect.bisect_left(self._starts, end)
+            lo = bisect.bisect_left(self._starts, start - self._max_duration, 0, hi)
+            return [
+                (s, e, Path(path))
+                for s, e, path in self._intervals[lo:hi]
+                if e > start
+            ]
+
+    def query(
+        self,
+        start: datetime | float,
+        end: datetime | float,
+    ) -> list[Path]:
+        """Find recordings overlapping a time range.
+
+        Args:
+            start: Range start (datetime or unix seconds)
+            end: Range end (datetime or unix seconds)
+
+        Returns:
+            Recording paths ordered by start time
+        """
+        return [path for _, _, path in self.query_intervals(start, end)]
+
+    def close(self) -> None:
+        """Stop the inotify watcher."""
+        if self._watcher:
+            self._watcher.close()
+            self._watcher = None
+
+    def __enter__(self) -> "RecordingCatalogue":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
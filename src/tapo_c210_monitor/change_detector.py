@@ -27,6 +27,19 @@ class ChangeEvent:
     llm_analysis: Optional[str] = None
 
 
+def frame_signature(img: Image.Image) -> np.ndarray:
+    """Reduce a frame to a normalized 32x32 grayscale signature."""
+    img = img.convert("L").resize((32, 32), Image.Resampling.LANCZOS)
+    arr = np.array(img, dtype=np.float32)
+    return arr / 255.0
+
+
+def change_score(sig1: np.ndarray, sig2: np.ndarray) -> float:
+    """Compare two frame signatures. Returns change score 0-1."""
+    diff = np.abs(sig1 - sig2)
+    return float(np.mean(diff))
+
+
 class ChangeDetector:
     """Detects scene changes from ring buffer frames."""
 
@@ -54,15 +67,11 @@ class ChangeDetector:
 
     def _compute_frame_hash(self, frame_path: str) -> np.ndarray:
         """Compute perceptual hash of frame for comparison."""
-        img = Image.open(frame_path).convert("L")  # Grayscale
-        img = img.resize((32, 32), Image.Resampling.LANCZOS)
-        arr = np.array(img, dtype=np.float32)
-        return arr / 255.0
+        return frame_signature(Image.open(frame_path))
 
     def _compare_frames(self, hash1: np.ndarray, hash2: np.ndarray) -> float:
         """Compare two frame hashes. Returns change score 0-1."""
-        diff = np.abs(hash1 - hash2)
-        return float(np.mean(diff))
+        return change_score(hash1, hash2)
 
     def check_for_change(self, output_dir: str = "/tmp/change_detect") -> Optional[ChangeEvent]:
         """Check current frame against last frame for changes."""
@@ -241,7 +250,19 @@ class ChangeMonitor:
         change_threshold: float = 0.15,
         check_interval: float = 2.0,
         output_dir: str = "/tmp/change_monitor",
+        camera_state=None,
     ):
+        """Initialize monitor.
+
+        Args:
+            ringbuffer_url: Ring buffer server to read frames from
+            change_threshold: Change score (0-1) that counts as a change
+            check_interval: Seconds between checks
+            output_dir: Where frames around a change are saved
+            camera_state: Running CameraStateCache; detection pauses while
+                privacy mode is on (None = always detect)
+        """
+        self.camera_state = camera_state
         self.detector = ChangeDetector(
             ringbuffer_url=ringbuffer_url,
             change_threshold=change_threshold,
@@ -268,6 +289,10 @@ class ChangeMonitor:
         print(f"LLM analyzer: {'enabled' if self.analyzer else 'disabled'}")
 
         while self.running:
+            if self._privacy_active():
+                time.sleep(self.detector.check_interval)
+                continue
+
             try:
                 event = self.detector.check_for_change(self.output_dir)
 
@@ -290,6 +315,18 @@ class ChangeMonitor:
 
             time.sleep(self.detector.check_interval)
 
+    def _privacy_active(self) -> bool:
+        """Check cached privacy state, resetting the baseline while paused."""
+        if not self.camera_state:
+            return False
+        status = self.camera_state.status
+        if status is None or not status.privacy_enabled:
+            return False
+        # The lens is covered; don't compare the first frame after the
+        # cover lifts against a frame from before it went down
+        self.detector.last_frame_hash = None
+        return True
+
     def stop(self):
         """Stop monitoring."""
         self.running = False
@@ -304,13 +341,21 @@ def main():
     parser.add_argument("--threshold", type=float, default=0.15)
     parser.add_argument("--interval", type=float, default=2.0)
     parser.add_argument("--output-dir", default="/tmp/change_monitor")
+    parser.add_argument(
+        "--no-camera-state",
+        action="store_true",
+        help="Don't poll the camera for privacy mode (keep detecting while it is on)",
+    )
     args = parser.parse_args()
 
+    camera_state = None if args.no_camera_state else _start_camera_state()
+
     monitor = ChangeMonitor(
         ringbuffer_url=args.ringbuffer_url,
         change_threshold=args.threshold,
         check_interval=args.interval,
         output_dir=args.output_dir,
+        camera_state=camera_state,
     )
 
     try:
@@ -318,6 +363,28 @@ def main():
     except KeyboardInterrupt:
         print("\nStopping monitor...")
         monitor.stop()
+    finally:
+        if camera_state:
+            camera_state.stop()
+
+
+def _start_camera_state():
+    """CameraStateCache for the camera configured in the environment, or None."""
+    try:
+        from .camera import TapoCamera
+        from .camera_state import CameraStateCache
+
+        camera = TapoCamera.from_env()
+        if not camera.connect():
+            print("Warning: camera not reachable; privacy mode will not pause detection")
+            return None
+    except (ImportError, ValueError) as e:
+        print(f"Warning: camera state not available: {e}")
+        return None
+
+    camera_state = CameraStateCache(camera)
+    camera_state.start()
+    return camera_state
 
 
 if __name__ == "__main__":
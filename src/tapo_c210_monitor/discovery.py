@@ -3,13 +3,57 @@ Camera Discovery Module
 
 Discovers Tapo camera IP on local network by scanning for RTSP port.
 Includes wake mechanism for sleeping cameras.
+
+Discovery tries the cheap answers first and stops at the first hit:
+
+1. the last-known IP (and the current IP of the last-known MAC, per the
+   kernel ARP table), cached on disk with a TTL
+2. hosts already in the ARP table for the subnet
+3. an ONVIF WS-Discovery multicast probe
+4. a concurrent connect scan of the subnet, with a short first pass and a
+   second pass whose timeout adapts to the RTTs observed in the first
 """
 
+import asyncio
+import ipaddress
+import json
+import re
 import socket
 import subprocess
 import time
-import concurrent.futures
-from typing import Optional
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import AsyncIterator, Iterable, Optional
+
+DISCOVERY_CACHE_FILE = Path.home() / ".tapo_c210_discovery.json"
+WS_DISCOVERY_ADDR = ("239.255.255.250", 3702)
+
+INVENTORY_PORTS = (554, 2020, 443, 8800)
+MAX_SCAN_PREFIX = 22  # Widest network scanned (a /22 is 1022 hosts)
+
+# ONVIF GetSystemDateAndTime needs no credentials, so it works as a probe
+ONVIF_TIME_REQUEST = """<?xml version="1.0" encoding="UTF-8"?>
+<s:Envelope xmlns:s="http://www.w3.org/2003/05/soap-envelope">
+  <s:Body xmlns:tds="http://www.onvif.org/ver10/device/wsdl">
+    <tds:GetSystemDateAndTime/>
+  </s:Body>
+</s:Envelope>"""
+
+WS_DISCOVERY_PROBE = """<?xml version="1.0" encoding="UTF-8"?>
+<e:Envelope xmlns:e="http://www.w3.org/2003/05/soap-envelope"
+    xmlns:w="http://schemas.xmlsoap.org/ws/2004/08/addressing"
+    xmlns:d="http://schemas.xmlsoap.org/ws/2005/04/discovery"
+    xmlns:dn="http://www.onvif.org/ver10/network/wsdl">
+  <e:Header>
+    <w:MessageID>uuid:{message_id}</w:MessageID>
+    <w:To e:mustUnderstand="true">urn:schemas-xmlsoap-org:ws:2005:04:discovery</w:To>
+    <w:Action e:mustUnderstand="true">http://schemas.xmlsoap.org/ws/2005/04/discovery/Probe</w:Action>
+  </e:Header>
+  <e:Body>
+    <d:Probe><d:Types>dn:NetworkVideoTransmitter</d:Types></d:Probe>
+  </e:Body>
+</e:Envelope>"""
 
 
 def check_port(ip: str, port: int = 554, timeout: float = 2.0) -> bool:
@@ -25,6 +69,284 @@ def check_port(ip: str, port: int = 554, timeout: float = 2.0) -> bool:
         sock.close()
 
 
+async def async_check_port(ip: str, port: int = 554, timeout: float = 2.0) -> Optional[float]:
+    """Check if a port is open without blocking the event loop.
+
+    Returns:
+        Connect time in seconds if open, None otherwise
+    """
+    start = time.monotonic()
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return None
+    rtt = time.monotonic() - start
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return rtt
+
+
+async def _probe_rtt(ip: str, port: int, timeout: float) -> tuple[Optional[float], Optional[float]]:
+    """Connect once, returning (open_rtt, any_reply_rtt).
+
+    A refused connection still tells us the host's round-trip time, which
+    is what the adaptive scan timeout is built from.
+    """
+    start = time.monotonic()
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout)
+    except ConnectionRefusedError:
+        return None, time.monotonic() - start
+    except (OSError, asyncio.TimeoutError):
+        return None, None
+    rtt = time.monotonic() - start
+    writer.close()
+    return rtt, rtt
+
+
+def read_neighbor_table() -> dict[str, str]:
+    """Read resolved IPv4 neighbours from the kernel ARP table.
+
+    Returns:
+        Mapping of IP address to MAC address
+    """
+    neighbors = {}
+    try:
+        lines = Path("/proc/net/arp").read_text().splitlines()[1:]
+    except OSError:
+        return neighbors
+
+    for line in lines:
+        fields = line.split()
+        if len(fields) < 4:
+            continue
+        ip, flags, mac = fields[0], fields[2], fields[3].lower()
+        # 0x2 = ATF_COM (resolved)
+        if int(flags, 16) & 0x2 and mac != "00:00:00:00:00:00":
+            neighbors[ip] = mac
+    return neighbors
+
+
+class _WSDiscoveryProtocol(asyncio.DatagramProtocol):
+    def __init__(self, subnet: Optional[str]):
+        self.prefix = subnet + "." if subnet else ""
+        self.responders: dict[str, str] = {}
+        self.matched = asyncio.Event()
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        text = data.decode(errors="replace")
+        if "ProbeMatch" in text:
+            xaddrs = re.search(r"XAddrs>([^<]*)<", text)
+            self.responders[addr[0]] = xaddrs.group(1).strip() if xaddrs else ""
+            if self.prefix and addr[0].startswith(self.prefix):
+                self.matched.set()
+
+
+async def ws_discovery_probe(timeout: float = 1.0, subnet: Optional[str] = None) -> dict[str, str]:
+    """Send an ONVIF WS-Discovery probe and collect responders.
+
+    Args:
+        timeout: Seconds to wait for ProbeMatch replies
+        subnet: Return as soon as a device in this subnet replies
+
+    Returns:
+        Mapping of responder IP to its advertised service URLs
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        transport, protocol = await loop.create_datagram_endpoint(
+            lambda: _WSDiscoveryProtocol(subnet),
+            local_addr=("0.0.0.0", 0),
+            family=socket.AF_INET,
+        )
+    except OSError as e:
+        print(f"WS-Discovery unavailable: {e}")
+        return {}
+
+    try:
+        sock = transport.get_extra_info("socket")
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 2)
+        probe = WS_DISCOVERY_PROBE.format(message_id=uuid.uuid4()).encode()
+        transport.sendto(probe, WS_DISCOVERY_ADDR)
+        await asyncio.wait_for(protocol.matched.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+    except OSError as e:
+        print(f"WS-Discovery probe failed: {e}")
+    finally:
+        transport.close()
+
+    return protocol.responders
+
+
+class DiscoveryCache:
+    """Last-known camera addresses, keyed by MAC, persisted as JSON."""
+
+    def __init__(self, path: str | Path = DISCOVERY_CACHE_FILE, ttl: float = 86400.0):
+        """Initialize cache.
+
+        Args:
+            path: Cache file path
+            ttl: Seconds before an entry is no longer trusted
+        """
+        self.path = Path(path)
+        self.ttl = ttl
+
+    def _load(self) -> dict:
+        try:
+            return json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def candidates(self, subnet: str) -> list[dict]:
+        """Get fresh cached entries in a subnet, most recent first."""
+        now = time.time()
+        entries = [
+            e for e in self._load().get("by_mac", {}).values()
+            if now - e.get("found_at", 0) < self.ttl
+            and e.get("ip", "").startswith(subnet + ".")
+        ]
+        return sorted(entries, key=lambda e: e["found_at"], reverse=True)
+
+    def store(self, ip: str, mac: Optional[str], port: int) -> None:
+        """Record a discovered camera."""
+        data = self._load()
+        by_mac = data.setdefault("by_mac", {})
+        # Cameras whose MAC isn't in the ARP table are keyed by IP
+        by_mac[mac or f"ip:{ip}"] = {"ip": ip, "mac": mac, "port": port, "found_at": time.time()}
+        try:
+            self.path.write_text(json.dumps(data, indent=2))
+        except OSError as e:
+            print(f"Could not save discovery cache: {e}")
+
+
+async def _first_open(
+    ips: list[str],
+    port: int,
+    timeout: float,
+    concurrency: int,
+) -> tuple[Optional[str], list[float], list[str]]:
+    """Probe hosts concurrently, returning the first with the port open.
+
+    Returns:
+        Tuple of (IP or None, observed RTTs, hosts that never answered)
+    """
+    if not ips:
+        return None, [], []
+
+    semaphore = asyncio.Semaphore(concurrency)
+    rtts: list[float] = []
+    silent: list[str] = []
+
+    async def probe(ip: str) -> Optional[str]:
+        async with semaphore:
+            open_rtt, reply_rtt = await _probe_rtt(ip, port, timeout)
+        if reply_rtt is None:
+            silent.append(ip)
+        else:
+            rtts.append(reply_rtt)
+        return ip if open_rtt is not None else None
+
+    tasks = [asyncio.create_task(probe(ip)) for ip in ips]
+    try:
+        for task in asyncio.as_completed(tasks):
+            ip = await task
+            if ip:
+                return ip, rtts, silent
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return None, rtts, silent
+
+
+async def discover_camera_async(
+    subnet: str = "192.168.29",
+    port: int = 554,
+    timeout: float = 2.0,
+    concurrency: int = 254,
+    cache: Optional[DiscoveryCache] = None,
+    use_ws_discovery: bool = True,
+) -> Optional[str]:
+    """
+    Discover camera IP, cheapest method first.
+
+    Args:
+        subnet: Network subnet prefix (e.g., "192.168.29")
+        port: Port that identifies the camera (default: 554 for RTSP)
+        timeout: Longest per-host connect timeout for the scan
+        concurrency: Maximum simultaneous connection attempts
+        cache: Discovery cache (defaults to ~/.tapo_c210_discovery.json)
+        use_ws_discovery: Send an ONVIF WS-Discovery probe before scanning
+
+    Returns:
+        Camera IP address if found, None otherwise
+    """
+    cache = cache or DiscoveryCache()
+    fast_timeout = min(timeout, 0.3)
+    prefix = subnet + "."
+
+    def found(ip: str) -> str:
+        cache.store(ip, read_neighbor_table().get(ip), port)
+        return ip
+
+    # 1. Last-known IPs, plus wherever their MACs live now (DHCP moves)
+    neighbors = read_neighbor_table()
+    by_mac = {mac: ip for ip, mac in neighbors.items()}
+    known = []
+    for entry in cache.candidates(subnet):
+        current = by_mac.get(entry.get("mac"))
+        for ip in (current, entry["ip"]):
+            if ip and ip not in known:
+                known.append(ip)
+    ip, _, _ = await _first_open(known, port, fast_timeout, concurrency)
+    if ip:
+        return found(ip)
+
+    # 2. Hosts the kernel has talked to recently
+    arp_hosts = [n for n in neighbors if n.startswith(prefix) and n not in known]
+    ip, rtts, _ = await _first_open(arp_hosts, port, fast_timeout, concurrency)
+    if ip:
+        return found(ip)
+
+    # 3 + 4. ONVIF cameras answer WS-Discovery without a scan; run the probe
+    # alongside a short-timeout pass over the rest of the subnet
+    tried = set(known) | set(arp_hosts)
+    remaining = [f"{subnet}.{i}" for i in range(1, 255) if f"{subnet}.{i}" not in tried]
+    ws_task = None
+    if use_ws_discovery:
+        ws_task = asyncio.create_task(ws_discovery_probe(timeout=min(timeout, 1.0), subnet=subnet))
+
+    try:
+        ip, scan_rtts, silent = await _first_open(remaining, port, fast_timeout, concurrency)
+        if ip:
+            return found(ip)
+
+        if ws_task:
+            responders = await ws_task
+            onvif_hosts = [r for r in responders if r.startswith(prefix)]
+            ip, _, _ = await _first_open(onvif_hosts, port, timeout, concurrency)
+            if ip:
+                return found(ip)
+    finally:
+        if ws_task and not ws_task.done():
+            ws_task.cancel()
+
+    # Retry only the silent hosts, with a timeout derived from the RTTs
+    # seen on this network
+    rtts = rtts + scan_rtts
+    slow_timeout = min(timeout, max(fast_timeout * 2, 4 * max(rtts, default=timeout)))
+    if slow_timeout > fast_timeout:
+        ip, _, _ = await _first_open(silent, port, slow_timeout, concurrency)
+        if ip:
+            return found(ip)
+
+    return None
+
+
 def discover_camera(
     subnet: str = "192.168.29",
     port: int = 554,
@@ -34,32 +356,293 @@ def discover_camera(
     """
     Discover camera IP by scanning subnet for open RTSP port.
 
+    Blocking wrapper around discover_camera_async(); call that directly
+    from async code.
+
     Args:
         subnet: Network subnet prefix (e.g., "192.168.29")
         port: Port to scan (default: 554 for RTSP)
         timeout: Socket timeout in seconds
-        max_workers: Number of parallel workers for scanning
+        max_workers: Maximum simultaneous connection attempts
 
     Returns:
         Camera IP address if found, None otherwise
     """
-    ips = [f"{subnet}.{i}" for i in range(1, 255)]
+    return asyncio.run(discover_camera_async(
+        subnet=subnet,
+        port=port,
+        timeout=timeout,
+        concurrency=max_workers,
+    ))
+
+
+@dataclass
+class DiscoveredHost:
+    """A host with at least one camera-related port open."""
+    ip: str
+    open_ports: list[int]
+    rtt: float
+    mac: Optional[str] = None
+    is_tapo: bool = False
+    onvif: bool = False
+    fingerprint: dict = field(default_factory=dict)
+
+    @property
+    def has_rtsp(self) -> bool:
+        return 554 in self.open_ports
+
+
+@dataclass
+class NetworkInventory:
+    """Result of a multi-network discovery scan."""
+    networks: list[str]
+    hosts: list[DiscoveredHost]
+    hosts_scanned: int
+    duration: float
+
+    @property
+    def cameras(self) -> list[DiscoveredHost]:
+        """Hosts fingerprinted as Tapo cameras."""
+        return [h for h in self.hosts if h.is_tapo]
+
+    @property
+    def rtsp_hosts(self) -> list[DiscoveredHost]:
+        """Hosts with RTSP open, Tapo or not."""
+        return [h for h in self.hosts if h.has_rtsp]
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def local_networks(max_prefix: int = MAX_SCAN_PREFIX) -> list[ipaddress.IPv4Network]:
+    """List IPv4 networks attached to local interfaces.
+
+    Networks wider than max_prefix (e.g. a /16) are narrowed to the
+    /max_prefix around the interface address to keep scans bounded.
+
+    Returns:
+        Networks, excluding loopback
+    """
+    try:
+        output = subprocess.run(
+            ["ip", "-o", "-4", "addr", "show"],
+            capture_output=True, text=True, timeout=5,
+        ).stdout
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        return []
+
+    networks = []
+    for match in re.finditer(r"inet (\d+\.\d+\.\d+\.\d+/\d+)", output):
+        iface = ipaddress.IPv4Interface(match.group(1))
+        if iface.is_loopback:
+            continue
+        network = iface.network
+        if network.prefixlen < max_prefix:
+            network = ipaddress.IPv4Interface(f"{iface.ip}/{max_prefix}").network
+        if network not in networks:
+            networks.append(network)
+    return networks
+
+
+def parse_networks(
+    networks: Iterable[str | ipaddress.IPv4Network],
+    max_prefix: int = MAX_SCAN_PREFIX,
+) -> list[ipaddress.IPv4Network]:
+    """Parse CIDR ranges, refusing any too wide to scan.
+
+    Args:
+        networks: CIDR strings or networks
+        max_prefix: Shortest prefix allowed (e.g. 22 refuses a /16)
+
+    Returns:
+        Parsed networks
+
+    Raises:
+        ValueError: If a range is malformed or wider than /max_prefix
+    """
+    parsed = []
+    for network in networks:
+        network = ipaddress.IPv4Network(network, strict=False)
+        if network.prefixlen < max_prefix:
+            raise ValueError(f"{network} is too wide to scan (at most /{max_prefix})")
+        parsed.append(network)
+    return parsed
+
+
+async def fingerprint_host(ip: str, open_ports: list[int], timeout: float = 2.0) -> dict:
+    """Identify Tapo cameras from their HTTPS API and ONVIF responses.
+
+    Tapo cameras answer an unauthenticated JSON POST on 443 with a JSON
+    body carrying "error_code", and serve ONVIF on 2020.
+
+    Returns:
+        Fingerprint dict with "tapo_api", "onvif" and any details found
+    """
+    import httpx
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_ip = {
-            executor.submit(check_port, ip, port, timeout): ip
-            for ip in ips
-        }
+    result: dict = {"tapo_api": False, "onvif": False}
+    async with httpx.AsyncClient(verify=False, timeout=timeout) as client:
+        if 443 in open_ports:
+            try:
+                resp = await client.post(
+                    f"https://{ip}/",
+                    json={"method": "getDeviceInfo", "params": {"device_info": {"name": ["basic_info"]}}},
+                )
+                body = resp.json()
+                result["tapo_api"] = isinstance(body, dict) and "error_code" in body
+                result["tapo_error_code"] = body.get("error_code") if isinstance(body, dict) else None
+            except (httpx.HTTPError, ValueError):
+                pass
 
-        for future in concurrent.futures.as_completed(future_to_ip):
-            ip = future_to_ip[future]
+        if 2020 in open_ports:
             try:
-                if future.result():
-                    return ip
-            except Exception:
+                resp = await client.post(
+                    f"http://{ip}:2020/onvif/device_service",
+                    content=ONVIF_TIME_REQUEST,
+                    headers={"Content-Type": "application/soap+xml"},
+                )
+                result["onvif"] = "GetSystemDateAndTimeResponse" in resp.text
+                result["onvif_server"] = resp.headers.get("server")
+            except httpx.HTTPError:
                 pass
 
-    return None
+    return result
+
+
+async def scan_networks(
+    networks: Optional[Iterable[str | ipaddress.IPv4Network]] = None,
+    ports: Iterable[int] = INVENTORY_PORTS,
+    timeout: float = 0.5,
+    concurrency: int = 512,
+    fingerprint: bool = True,
+) -> AsyncIterator[DiscoveredHost]:
+    """Scan networks for camera-like hosts, yielding each as it is found.
+
+    All ports of a host are probed in one pass. Hosts already in the ARP
+    table are probed first, so known devices usually arrive immediately.
+
+    Args:
+        networks: CIDR ranges, /22 or narrower (defaults to local
+            interface networks)
+        ports: Ports to probe on every host
+        timeout: Per-connection timeout in seconds
+        concurrency: Maximum simultaneous connection attempts
+        fingerprint: Fingerprint hosts with 443/2020 open
+
+    Yields:
+        DiscoveredHost for every host with at least one port open
+
+    Raises:
+        ValueError: If a network is malformed or wider than /22
+    """
+    if networks is None:
+        networks = local_networks()
+    networks = parse_networks(networks)
+    ports = list(ports)
+
+    neighbors = read_neighbor_table()
+    hosts = [str(ip) for network in networks for ip in network.hosts()]
+    hosts = list(dict.fromkeys(hosts))
+    # ARP-known hosts first; they're the likeliest to answer
+    hosts.sort(key=lambda ip: ip not in neighbors)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def probe_port(ip: str, port: int) -> Optional[float]:
+        async with semaphore:
+            return await async_check_port(ip, port, timeout)
+
+    async def probe_host(ip: str) -> None:
+        rtts = await asyncio.gather(*(probe_port(ip, p) for p in ports))
+        open_ports = [p for p, rtt in zip(ports, rtts) if rtt is not None]
+        if not open_ports:
+            return
+
+        host = DiscoveredHost(
+            ip=ip,
+            open_ports=open_ports,
+            rtt=min(r for r in rtts if r is not None),
+            mac=read_neighbor_table().get(ip) or neighbors.get(ip),
+        )
+        if fingerprint and (443 in open_ports or 2020 in open_ports):
+            try:
+                host.fingerprint = await fingerprint_host(ip, open_ports)
+            except Exception as e:
+                # Still report the open ports, just unidentified
+                print(f"Fingerprinting {ip} failed: {e}")
+                host.fingerprint = {"error": str(e)}
+            host.onvif = host.fingerprint.get("onvif", False)
+            host.is_tapo = host.fingerprint.get("tapo_api", False) or (
+                host.onvif and host.has_rtsp
+            )
+        await queue.put(host)
+
+    async def safe_probe(ip: str) -> None:
+        try:
+            await probe_host(ip)
+        except Exception as e:
+            # One bad host must not end the scan for the rest
+            print(f"Probing {ip} failed: {e}")
+
+    async def run_all() -> None:
+        try:
+            await asyncio.gather(*(safe_probe(ip) for ip in hosts))
+        finally:
+            await queue.put(None)
+
+    runner = asyncio.create_task(run_all())
+    try:
+        while True:
+            host = await queue.get()
+            if host is None:
+                break
+            yield host
+    finally:
+        if not runner.done():
+            runner.cancel()
+            await asyncio.gather(runner, return_exceptions=True)
+
+
+async def discover_inventory(
+    networks: Optional[Iterable[str | ipaddress.IPv4Network]] = None,
+    ports: Iterable[int] = INVENTORY_PORTS,
+    timeout: float = 0.5,
+    concurrency: int = 512,
+    fingerprint: bool = True,
+) -> NetworkInventory:
+    """Scan networks and collect every camera-like host.
+
+    Args:
+        networks: CIDR ranges, /22 or narrower (defaults to local
+            interface networks)
+        ports: Ports to probe on every host
+        timeout: Per-connection timeout in seconds
+        concurrency: Maximum simultaneous connection attempts
+        fingerprint: Fingerprint hosts with 443/2020 open
+
+    Returns:
+        Inventory sorted by IP, Tapo cameras flagged
+
+    Raises:
+        ValueError: If a network is malformed or wider than /22
+    """
+    if networks is None:
+        networks = local_networks()
+    networks = parse_networks(networks)
+
+    start = time.monotonic()
+    hosts = [
+        host async for host in scan_networks(networks, ports, timeout, concurrency, fingerprint)
+    ]
+    hosts.sort(key=lambda h: ipaddress.IPv4Address(h.ip))
+
+    return NetworkInventory(
+        networks=[str(n) for n in networks],
+        hosts=hosts,
+        hosts_scanned=sum(n.num_addresses - 2 if n.prefixlen < 31 else n.num_addresses for n in networks),
+        duration=time.monotonic() - start,
+    )
 
 
 def get_rtsp_url(
@@ -86,6 +669,16 @@ def get_rtsp_url(
 if __name__ == "__main__":
     import sys
 
+    if "--all" in sys.argv:
+        async def _print_inventory():
+            async for host in scan_networks():
+                tag = "Tapo" if host.is_tapo else "host"
+                print(f"{tag:5} {host.ip:15} ports={host.open_ports} mac={host.mac}")
+
+        print(f"Scanning {', '.join(str(n) for n in local_networks())}...")
+        asyncio.run(_print_inventory())
+        sys.exit(0)
+
     print("Discovering camera...")
     camera_ip = discover_camera()
 
@@ -1,5 +1,12 @@
 """Experiments for testing camera control and visual detection pipelines."""
 
 from .pan_control import PanControlExperiment
+from .ptz_benchmark import PTZBenchmark, TrialResult, analyze_fixture, summarize
 
-__all__ = ["PanControlExperiment"]
+__all__ = [
+    "PanControlExperiment",
+    "PTZBenchmark",
+    "TrialResult",
+    "analyze_fixture",
+    "summarize",
+]
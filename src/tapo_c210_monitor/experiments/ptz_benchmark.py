@@ -0,0 +1,679 @@
+"""PTZ protocol benchmark harness.
+
+Measures every way we can move the camera with the same protocol and the
+same yardstick. Motion is measured from the video itself: frames are fed
+to VisualOdometry in parallel with the commands, so for each command we
+get
+
+- ack: time for the command call to return (the protocol round-trip)
+- onset: command sent -> first frame showing motion
+- settle: command sent -> picture still again
+- the pan/tilt actually travelled
+
+Protocols are wrapped in small adapters (pytapo moveMotor/moveMotorStep,
+ONVIF continuous/relative/absolute, Android app long-press) and frames
+come from a live StreamCapture, a recorded video fixture or a simulated
+camera, so the same harness also runs offline as a regression check.
+"""
+
+import json
+import statistics
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+import cv2
+import numpy as np
+
+from ..ptz_mapper.command_scheduler import PTZCommandScheduler
+from ..ptz_mapper.visual_odometry import PTZEstimate, VisualOdometry
+
+DIRECTIONS = ("left", "right", "up", "down")
+
+# Unit pan/tilt vectors per direction (right and up are positive)
+_VECTORS = {
+    "left": (-1.0, 0.0),
+    "right": (1.0, 0.0),
+    "up": (0.0, 1.0),
+    "down": (0.0, -1.0),
+}
+
+
+@dataclass
+class TrialResult:
+    """One command and the motion it produced."""
+    protocol: str
+    direction: str
+    repeat: int
+    ack_s: Optional[float] = None
+    onset_s: Optional[float] = None
+    settle_s: Optional[float] = None
+    pan_deg: float = 0.0
+    tilt_deg: float = 0.0
+    error: str = ""
+
+    @property
+    def moved(self) -> bool:
+        return self.onset_s is not None
+
+
+# -- motion analysis --
+
+class MotionTrace:
+    """Thread-safe record of (time, pan, tilt) samples."""
+
+    def __init__(self, maxlen: int = 10000):
+        self._samples: deque[tuple[float, float, float]] = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def record(self, t: float, pan: float, tilt: float) -> None:
+        with self._lock:
+            self._samples.append((t, pan, tilt))
+
+    def on_estimate(self, estimate: PTZEstimate) -> None:
+        """VisualOdometry listener."""
+        self.record(estimate.timestamp, estimate.pan, estimate.tilt)
+
+    def since(self, t0: float) -> list[tuple[float, float, float]]:
+        """Samples at or after t0, plus the last one before it as a baseline."""
+        with self._lock:
+            samples = list(self._samples)
+        before = [s for s in samples if s[0] < t0]
+        after = [s for s in samples if s[0] >= t0]
+        return before[-1:] + after
+
+
+def analyze_motion(
+    samples: list[tuple[float, float, float]],
+    t0: float,
+    onset_deg: float = 0.5,
+    still_deg: float = 0.2,
+    settle_window: float = 0.5,
+) -> dict:
+    """Find motion onset and settle time in a trace.
+
+    Args:
+        samples: (time, pan, tilt) samples, the first being the position
+            before the command
+        t0: Time the command was sent
+        onset_deg: Displacement that counts as the camera having moved
+        still_deg: Max change within settle_window to count as still
+        settle_window: How long the picture must stay still
+
+    Returns:
+        Dict with onset_s, settle_s (None if not reached) and the
+        pan_deg/tilt_deg travelled
+    """
+    result = {"onset_s": None, "settle_s": None, "pan_deg": 0.0, "tilt_deg": 0.0}
+    if len(samples) < 2:
+        return result
+
+    _, pan0, tilt0 = samples[0]
+    onset_index = None
+    for i, (t, pan, tilt) in enumerate(samples[1:], start=1):
+        if max(abs(pan - pan0), abs(tilt - tilt0)) >= onset_deg:
+            result["onset_s"] = t - t0
+            onset_index = i
+            break
+    if onset_index is None:
+        return result
+
+    # Settled at the first sample after which everything within
+    # settle_window stays within still_deg of it
+    times = [s[0] for s in samples]
+    for i in range(onset_index, len(samples)):
+        t, pan, tilt = samples[i]
+        if times[-1] - t < settle_window:
+            break
+        window_end = next((j for j in range(i, len(samples)) if times[j] - t >= settle_window), len(samples))
+        if all(
+            max(abs(samples[j][1] - pan), abs(samples[j][2] - tilt)) < still_deg
+            for j in range(i, window_end)
+        ):
+            result["settle_s"] = t - t0
+            break
+
+    _, pan1, tilt1 = samples[-1]
+    result["pan_deg"] = pan1 - pan0
+    result["tilt_deg"] = tilt1 - tilt0
+    return result
+
+
+# -- frame sources --
+
+class StreamFrameSource:
+    """Frames from a live StreamCapture."""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def attach(self, callback: Callable[[np.ndarray], None]) -> None:
+        self.stream.add_frame_callback(callback)
+
+    def start(self) -> None:
+        self.stream.start_continuous_capture()
+
+    def stop(self) -> None:
+        self.stream.stop_continuous_capture()
+
+
+class VideoFixtureSource:
+    """Replay a recorded video at its native frame rate."""
+
+    def __init__(self, path: str | Path, loop: bool = True):
+        """Initialize fixture source.
+
+        Args:
+            path: Video file
+            loop: Restart from the beginning at the end of the file
+        """
+        self.path = Path(path)
+        self.loop = loop
+        self._callbacks: list[Callable[[np.ndarray], None]] = []
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def attach(self, callback: Callable[[np.ndarray], None]) -> None:
+        self._callbacks.append(callback)
+
+    def _play(self) -> None:
+        cap = cv2.VideoCapture(str(self.path))
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        # Unreadable files report -1
+        interval = 1.0 / (fps if fps > 0 else 15.0)
+        next_at = time.monotonic()
+        played = 0  # Frames since the last (re)start of the file
+        while self._running:
+            ok, frame = cap.read()
+            if not ok:
+                if played == 0:
+                    # Nothing readable; rewinding would just spin
+                    print(f"No frames in {self.path}; fixture playback stopped")
+                    break
+                if not self.loop:
+                    break
+                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                played = 0
+                continue
+            played += 1
+            for callback in self._callbacks:
+                callback(frame)
+            next_at += interval
+            time.sleep(max(0.0, next_at - time.monotonic()))
+        self._running = False
+        cap.release()
+
+    def start(self) -> None:
+        self._running = True
+        self._thread = threading.Thread(target=self._play, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+class SimulatedPTZ:
+    """Stand-in camera: renders a textured scene at a simulated pan/tilt.
+
+    Commands take effect after an ack latency plus a motor onset delay
+    and then move at a fixed angular speed, so the harness can be
+    checked end to end (and regressions in it caught) without hardware.
+    """
+
+    def __init__(
+        self,
+        hfov_deg: float = 100.0,
+        fps: float = 15.0,
+        ack_latency: float = 0.1,
+        onset_delay: float = 0.3,
+        speed_deg_s: float = 40.0,
+        size: tuple[int, int] = (320, 180),
+    ):
+        self.hfov_deg = hfov_deg
+        self.fps = fps
+        self.ack_latency = ack_latency
+        self.onset_delay = onset_delay
+        self.speed_deg_s = speed_deg_s
+        self.size = size
+
+        self._px_per_deg = size[0] / hfov_deg
+        rng = np.random.default_rng(0)
+        noise = rng.integers(0, 255, (size[1] // 4 * 3, int(size[0] * 4.6) // 4), dtype=np.uint8)
+        scene = cv2.resize(noise, (noise.shape[1] * 4, noise.shape[0] * 4), interpolation=cv2.INTER_CUBIC)
+        self._scene = cv2.GaussianBlur(scene, (0, 0), 2)
+
+        self.pan = 0.0
+        self.tilt = 0.0
+        self._target = (0.0, 0.0)
+        self._start_at = 0.0
+        self._lock = threading.Lock()
+        self._callbacks: list[Callable[[np.ndarray], None]] = []
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def command(self, pan_delta: float, tilt_delta: float) -> None:
+        """Move by a relative angle (blocks for the ack latency)."""
+        time.sleep(self.ack_latency)
+        with self._lock:
+            self._target = (self._target[0] + pan_delta, self._target[1] + tilt_delta)
+            self._start_at = time.monotonic() + self.onset_delay
+
+    def _render(self) -> np.ndarray:
+        h, w = self._scene.shape
+        x = int(round(w / 2 + self.pan * self._px_per_deg - self.size[0] / 2))
+        y = int(round(h / 2 - self.tilt * self._px_per_deg - self.size[1] / 2))
+        x = min(max(0, x), w - self.size[0])
+        y = min(max(0, y), h - self.size[1])
+        return self._scene[y:y + self.size[1], x:x + self.size[0]]
+
+    def _step(self, dt: float) -> None:
+        with self._lock:
+            if time.monotonic() < self._start_at:
+                return
+            step = self.speed_deg_s * dt
+            for attr, target in (("pan", self._target[0]), ("tilt", self._target[1])):
+                current = getattr(self, attr)
+                setattr(self, attr, current + max(-step, min(step, target - current)))
+
+    def attach(self, callback: Callable[[np.ndarray], None]) -> None:
+        self._callbacks.append(callback)
+
+    def _run(self) -> None:
+        interval = 1.0 / self.fps
+        while self._running:
+            self._step(interval)
+            frame = self._render()
+            for callback in self._callbacks:
+                callback(frame)
+            time.sleep(interval)
+
+    def start(self) -> None:
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+# -- protocol adapters --
+
+class PTZAdapter(ABC):
+    """Sends one movement command per trial. Subclasses implement send()."""
+
+    name = "base"
+
+    @abstractmethod
+    def send(self, direction: str) -> None:
+        """Issue a move and return once the protocol has acknowledged it."""
+
+    def finish(self) -> None:
+        """Called after the settle wait (e.g. to stop a continuous move)."""
+
+    def close(self) -> None:
+        """Release anything the adapter started (called once, after all runs)."""
+
+
+class PytapoMoveMotor(PTZAdapter):
+    """pytapo moveMotor with a fixed relative angle."""
+
+    name = "pytapo_move_motor"
+
+    def __init__(self, camera, degrees: float = 20.0):
+        self.camera = camera
+        self.degrees = degrees
+
+    def send(self, direction: str) -> None:
+        dx, dy = _VECTORS[direction]
+        self.camera.move_motor(dx * self.degrees, dy * self.degrees)
+
+
+class PytapoMoveMotorStep(PTZAdapter):
+    """pytapo moveMotorStep (the app's single-step move)."""
+
+    name = "pytapo_move_motor_step"
+
+    def __init__(self, camera):
+        self.camera = camera
+
+    def send(self, direction: str) -> None:
+        self.camera.move_motor_step(direction)
+
+
+class ONVIFContinuous(PTZAdapter):
+    """ONVIF ContinuousMove for a fixed time, then Stop.
+
+    The move goes through a PTZCommandScheduler, whose worker issues the
+    Stop when the duration is up.
+    """
+
+    name = "onvif_continuous"
+
+    def __init__(self, controller, speed: float = 0.5, duration: float = 0.5, ack_timeout: float = 5.0):
+        self.scheduler = PTZCommandScheduler(controller)
+        self.speed = speed
+        self.duration = duration
+        self.ack_timeout = ack_timeout
+
+    def send(self, direction: str) -> None:
+        self.scheduler.start()
+        errors = self.scheduler.errors
+        dx, dy = _VECTORS[direction]
+        self.scheduler.move(dx * self.speed, dy * self.speed, duration=self.duration)
+        if not self.scheduler.flush(self.ack_timeout):
+            raise RuntimeError("ContinuousMove not acknowledged")
+        if self.scheduler.errors > errors:
+            raise RuntimeError("ContinuousMove failed")
+
+    def finish(self) -> None:
+        # Make sure the Stop went out before the next trial
+        self.scheduler.flush(self.duration + self.ack_timeout, include_stop=True)
+
+    def close(self) -> None:
+        self.scheduler.shutdown()
+
+
+class ONVIFRelative(PTZAdapter):
+    """ONVIF RelativeMove by a fixed normalized amount."""
+
+    name = "onvif_relative"
+
+    def __init__(self, controller, amount: float = 0.1, speed: float = 0.5):
+        self.controller = controller
+        self.amount = amount
+        self.speed = speed
+
+    def send(self, direction: str) -> None:
+        dx, dy = _VECTORS[direction]
+        if not self.controller.move_relative(dx * self.amount, dy * self.amount, self.speed):
+            raise RuntimeError("RelativeMove failed")
+
+
+class ONVIFAbsolute(PTZAdapter):
+    """ONVIF AbsoluteMove to the current position plus a fixed offset."""
+
+    name = "onvif_absolute"
+
+    def __init__(self, controller, amount: float = 0.1, speed: float = 0.5):
+        self.controller = controller
+        self.amount = amount
+        self.speed = speed
+
+    def send(self, direction: str) -> None:
+        position = self.controller.get_position()
+        if position is None:
+            raise RuntimeError("No position feedback for AbsoluteMove")
+        dx, dy = _VECTORS[direction]
+        pan = max(-1.0, min(1.0, position.pan + dx * self.amount))
+        tilt = max(-1.0, min(1.0, position.tilt + dy * self.amount))
+        if not self.controller.move_absolute(pan, tilt, self.speed):
+            raise RuntimeError("AbsoluteMove failed")
+
+
+class AndroidPan(PTZAdapter):
+    """Long-press on the Tapo app's PTZ pad.
+
+    The call blocks for the press duration, so ack includes the hold time.
+    """
+
+    name = "android_ui"
+
+    def __init__(self, controls, duration: float = 0.5):
+        self.controls = controls
+        self.duration = duration
+
+    def send(self, direction: str) -> None:
+        from ..android.camera_controls import PanDirection
+        if not self.controls.pan(PanDirection(direction), duration=self.duration):
+            raise RuntimeError("PTZ panel not available")
+
+
+class SimulatedAdapter(PTZAdapter):
+    """Commands for a SimulatedPTZ."""
+
+    name = "simulated"
+
+    def __init__(self, sim: SimulatedPTZ, degrees: float = 10.0):
+        self.sim = sim
+        self.degrees = degrees
+
+    def send(self, direction: str) -> None:
+        dx, dy = _VECTORS[direction]
+        self.sim.command(dx * self.degrees, dy * self.degrees)
+
+
+# -- harness --
+
+class PTZBenchmark:
+    """Run adapters against a frame source and collect timing results.
+
+    Usage:
+        bench = PTZBenchmark(StreamFrameSource(stream))
+        bench.start()
+        bench.run(PytapoMoveMotor(camera), directions=("left", "right"), repeats=5)
+        bench.save("results/ptz.json")
+    """
+
+    def __init__(
+        self,
+        source,
+        hfov_deg: float = 100.0,
+        settle_timeout: float = 8.0,
+        rest: float = 1.0,
+        onset_deg: float = 0.5,
+        still_deg: float = 0.2,
+        settle_window: float = 0.5,
+    ):
+        """Initialize benchmark.
+
+        Args:
+            source: Frame source with attach/start/stop
+            hfov_deg: Camera horizontal field of view (for odometry)
+            settle_timeout: Longest wait for motion to finish per trial
+            rest: Pause between trials
+            onset_deg: Displacement that counts as motion onset
+            still_deg: Max drift within settle_window to count as settled
+            settle_window: How long the picture must stay still
+        """
+        self.source = source
+        self.settle_timeout = settle_timeout
+        self.rest = rest
+        self.onset_deg = onset_deg
+        self.still_deg = still_deg
+        self.settle_window = settle_window
+
+        self.odometry = VisualOdometry(hfov_deg=hfov_deg)
+        self.trace = MotionTrace()
+        self.odometry.add_listener(self.trace.on_estimate)
+        source.attach(self.odometry.update)
+
+        self.results: list[TrialResult] = []
+
+    def start(self) -> None:
+        self.source.start()
+
+    def stop(self) -> None:
+        self.source.stop()
+
+    def _wait_for_settle(self, t0: float) -> dict:
+        deadline = t0 + self.settle_timeout
+        motion = {}
+        while time.monotonic() < deadline:
+            time.sleep(0.1)
+            motion = analyze_motion(
+                self.trace.since(t0), t0, self.onset_deg, self.still_deg, self.settle_window
+            )
+            if motion["settle_s"] is not None:
+                break
+        return motion
+
+    def trial(self, adapter: PTZAdapter, direction: str, repeat: int = 0) -> TrialResult:
+        """Send one command and measure the motion it causes."""
+        result = TrialResult(adapter.name, direction, repeat)
+        self.odometry.wait_until_still(threshold_deg=self.still_deg, timeout=self.settle_timeout)
+
+        t0 = time.monotonic()
+        try:
+            adapter.send(direction)
+        except Exception as e:
+            result.error = str(e)
+            return result
+        result.ack_s = time.monotonic() - t0
+
+        motion = self._wait_for_settle(t0)
+        adapter.finish()
+        for key, value in motion.items():
+            setattr(result, key, value)
+        return result
+
+    def run(
+        self,
+        adapter: PTZAdapter,
+        directions: tuple[str, ...] = ("left", "right"),
+        repeats: int = 5,
+    ) -> list[TrialResult]:
+        """Run repeated trials of one protocol.
+
+        Directions alternate within each repeat so the camera ends up
+        roughly where it started.
+
+        Returns:
+            Results of this run (also appended to self.results)
+        """
+        results = []
+        for repeat in range(repeats):
+            for direction in directions:
+                result = self.trial(adapter, direction, repeat)
+                results.append(result)
+                status = result.error or (
+                    f"ack {result.ack_s * 1000:.0f}ms onset {_ms(result.onset_s)} "
+                    f"settle {_ms(result.settle_s)} pan {result.pan_deg:+.1f}° tilt {result.tilt_deg:+.1f}°"
+                )
+                print(f"  {adapter.name} {direction:5s} #{repeat}: {status}")
+                time.sleep(self.rest)
+        self.results.extend(results)
+        return results
+
+    def summary(self) -> dict:
+        return summarize(self.results)
+
+    def save(self, path: str | Path, metadata: Optional[dict] = None) -> Path:
+        return save_results(path, self.results, metadata)
+
+
+def _ms(seconds: Optional[float]) -> str:
+    return "-" if seconds is None else f"{seconds * 1000:.0f}ms"
+
+
+def analyze_fixture(
+    video_path: str | Path,
+    command_times: list[tuple[float, str]],
+    protocol: str = "fixture",
+    hfov_deg: float = 100.0,
+    **thresholds,
+) -> list[TrialResult]:
+    """Measure onset/settle offline from a recorded video.
+
+    Frames are timed by their position in the file rather than the wall
+    clock, so results are deterministic for regression runs.
+
+    Args:
+        video_path: Recording of the moves
+        command_times: (seconds into the video, direction) of each command
+        protocol: Label for the results
+        hfov_deg: Camera horizontal field of view
+        **thresholds: onset_deg, still_deg, settle_window overrides
+
+    Returns:
+        One TrialResult per command (ack is not measurable offline)
+    """
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        raise FileNotFoundError(f"Could not open {video_path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 15.0
+
+    odometry = VisualOdometry(hfov_deg=hfov_deg)
+    trace = MotionTrace(maxlen=1_000_000)
+    index = 0
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        estimate = odometry.update(frame)
+        trace.record(index / fps, estimate.pan, estimate.tilt)
+        index += 1
+    cap.release()
+
+    results = []
+    ordered = sorted(command_times)
+    for i, (t0, direction) in enumerate(ordered):
+        end = ordered[i + 1][0] if i + 1 < len(ordered) else float("inf")
+        samples = [s for s in trace.since(t0) if s[0] < end]
+        motion = analyze_motion(samples, t0, **thresholds)
+        results.append(TrialResult(protocol, direction, i, **motion))
+    return results
+
+
+def summarize(results: list[TrialResult]) -> dict:
+    """Percentile summary per protocol.
+
+    Returns:
+        {protocol: {"trials", "errors", "moved", "ack_s": {...},
+        "onset_s": {...}, "settle_s": {...}, "abs_travel_deg": {...}}}
+    """
+    def stats(values: list[float]) -> dict:
+        if not values:
+            return {"count": 0}
+        values = sorted(values)
+        return {
+            "count": len(values),
+            "mean": statistics.fmean(values),
+            "p50": float(np.percentile(values, 50)),
+            "p90": float(np.percentile(values, 90)),
+            "p95": float(np.percentile(values, 95)),
+            "min": values[0],
+            "max": values[-1],
+        }
+
+    by_protocol: dict[str, list[TrialResult]] = {}
+    for result in results:
+        by_protocol.setdefault(result.protocol, []).append(result)
+
+    summary = {}
+    for protocol, trials in by_protocol.items():
+        summary[protocol] = {
+            "trials": len(trials),
+            "errors": sum(1 for t in trials if t.error),
+            "moved": sum(1 for t in trials if t.moved),
+            "ack_s": stats([t.ack_s for t in trials if t.ack_s is not None]),
+            "onset_s": stats([t.onset_s for t in trials if t.onset_s is not None]),
+            "settle_s": stats([t.settle_s for t in trials if t.settle_s is not None]),
+            "abs_travel_deg": stats([
+                max(abs(t.pan_deg), abs(t.tilt_deg)) for t in trials if t.moved
+            ]),
+        }
+    return summary
+
+
+def save_results(path: str | Path, results: list[TrialResult], metadata: Optional[dict] = None) -> Path:
+    """Write trials and their summary to a JSON results file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "metadata": metadata or {},
+        "summary": summarize(results),
+        "trials": [asdict(r) for r in results],
+    }
+    path.write_text(json.dumps(data, indent=2))
+    return path
@@ -18,6 +18,7 @@ class ControlPanel:
         camera=None,
         stream=None,
         sync=None,
+        camera_state=None,
     ):
         """Initialize control panel.
 
@@ -26,11 +27,13 @@ class ControlPanel:
             camera: TapoCamera instance for direct API
             stream: StreamCapture instance for RTSP
             sync: RecordingSync instance
+            camera_state: CameraStateCache for shared status and write-through
         """
         self.android_ui = android_ui
         self.camera = camera
         self.stream = stream
         self.sync = sync
+        self.camera_state = camera_state
 
         self.root = tk.Tk()
         self.root.title("TAPO C210 Monitor Control Panel")
@@ -40,10 +43,14 @@ class ControlPanel:
         self._preview_active = False
         self._preview_thread = None
         self._current_image = None
+        self._android_frame_id = None
 
         self._setup_styles()
         self._create_widgets()
 
+        if self.camera_state:
+            self.camera_state.subscribe(self._on_camera_state_change)
+
     def _setup_styles(self):
         """Configure ttk styles."""
         style = ttk.Style()
@@ -445,7 +452,12 @@ class ControlPanel:
         if self.android_ui:
             if self.android_ui.connect():
                 self.log("Android device connected")
-                self._refresh_android_screen()
+                stream = self.android_ui.screen.stream
+                if stream and stream.start():
+                    self.log("Android screen streaming")
+                    self._poll_android_stream()
+                else:
+                    self._refresh_android_screen()
             else:
                 self.log("Failed to connect to Android")
         else:
@@ -547,14 +559,30 @@ class ControlPanel:
             return
 
         try:
-            img = self.android_ui.screen.capture()
-            # Resize to fit canvas
-            img = img.resize((320, 569), Image.Resampling.LANCZOS)
-            self._android_image = ImageTk.PhotoImage(img)
-            self.android_canvas.create_image(0, 0, anchor=tk.NW, image=self._android_image)
+            self._show_android_image(self.android_ui.screen.capture())
         except Exception as e:
             self.log(f"Android screen error: {e}")
 
+    def _show_android_image(self, img: Image.Image):
+        """Draw a screen image on the Android canvas."""
+        # Resize to fit canvas
+        img = img.resize((320, 569), Image.Resampling.LANCZOS)
+        self._android_image = ImageTk.PhotoImage(img)
+        self.android_canvas.create_image(0, 0, anchor=tk.NW, image=self._android_image)
+
+    def _poll_android_stream(self):
+        """Mirror the live screen stream, redrawing only when a new frame arrived."""
+        screen = self.android_ui.screen
+        if not screen.streaming:
+            return
+
+        frame_id = screen.frame_id
+        if frame_id != self._android_frame_id and screen.stream.latest is not None:
+            self._android_frame_id = frame_id
+            self._show_android_image(screen.stream.latest.image)
+
+        self.root.after(66, self._poll_android_stream)
+
     def _on_android_click(self, event):
         """Handle click on Android screen canvas."""
         if not self.android_ui:
@@ -621,42 +649,63 @@ class ControlPanel:
 
     # --- Camera action handlers ---
 
+    @property
+    def _camera_control(self):
+        """Setter target: the state cache (write-through) or the camera."""
+        return self.camera_state or self.camera
+
+    def _on_camera_state_change(self, diff: dict):
+        """Log camera state changes pushed by the state cache."""
+        for name, (old, new) in diff.items():
+            if name == "basic_info":
+                continue
+            old_state = old.get("enabled") if old else None
+            new_state = new.get("enabled") if new else None
+            if old_state != new_state:
+                self.root.after(0, lambda n=name, v=new_state: self.log(f"Camera {n}: {v}"))
+
     def _privacy_on(self):
         if self.camera:
-            self.camera.set_privacy_mode(True)
+            self._camera_control.set_privacy_mode(True)
             self.log("Privacy mode enabled")
 
     def _privacy_off(self):
         if self.camera:
-            self.camera.set_privacy_mode(False)
+            self._camera_control.set_privacy_mode(False)
             self.log("Privacy mode disabled")
 
     def _led_on(self):
         if self.camera:
-            self.camera.set_led(True)
+            self._camera_control.set_led(True)
             self.log("LED enabled")
 
     def _led_off(self):
         if self.camera:
-            self.camera.set_led(False)
+            self._camera_control.set_led(False)
             self.log("LED disabled")
 
     def _motion_on(self):
         if self.camera:
-            self.camera.set_motion_detection(True)
+            self._camera_control.set_motion_detection(True)
             self.log("Motion detection enabled")
 
     def _motion_off(self):
         if self.camera:
-            self.camera.set_motion_detection(False)
+            self._camera_control.set_motion_detection(False)
             self.log("Motion detection disabled")
 
     def _get_camera_info(self):
         """Get and display camera info."""
         if self.camera:
             try:
-                info = self.camera.get_basic_info()
-                self.log(f"Camera info: {info}")
+                status = self.camera_state.get() if self.camera_state else self.camera.get_status_snapshot()
+                self.log(f"Camera info: {status.basic_info}")
+                self.log(
+                    f"LED: {status.led_enabled}, privacy: {status.privacy_enabled}, "
+                    f"motion: {status.motion_enabled}, alarm: {status.alarm_enabled}"
+                )
+                for section, error in status.errors.items():
+                    self.log(f"  {section} unavailable: {error}")
             except Exception as e:
                 self.log(f"Error getting info: {e}")
 
@@ -731,4 +780,10 @@ class ControlPanel:
     def run(self):
         """Start the GUI main loop."""
         self.log("Control panel initialized")
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            if self.android_ui and self.android_ui.screen.stream:
+                self.android_ui.screen.stream.stop()
+            if self.sync:
+                self.sync.close()
@@ -0,0 +1,464 @@
+"""Post-download processing pipeline for synced recordings.
+
+Each recording that lands on disk gets three derived artifacts:
+
+- a keyframe contact sheet (JPEG grid of evenly spaced frames)
+- a low-bitrate preview proxy (small H.264 MP4 for fast scrubbing)
+- per-minute activity scores, using the same change scoring as ChangeDetector
+
+Artifacts are written to a hidden ``.previews/<stem>/`` directory next to the
+clip, together with a ``done.json`` marker recording the source size and
+SHA-256. Clips that can't be processed (no decodable frames, or a proxy
+encode that ffmpeg rejects) get a ``failed.json`` marker with the reason
+instead, so they aren't retried on every run. A re-run only processes clips
+whose contents no longer match either marker. The marker also keeps the
+source mtime as a shortcut: a clip with the same size and mtime isn't
+re-hashed, and one whose mtime changed (e.g. hard-linked by the store's
+dedupe) is re-hashed rather than re-processed.
+
+Work is fanned out over a process pool, so submitting a clip never blocks
+the downloader.
+"""
+
+import json
+import os
+import subprocess
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from .store import hash_file
+
+PIPELINE_VERSION = 2
+PREVIEWS_DIRNAME = ".previews"
+MARKER_FILENAME = "done.json"
+FAILED_MARKER_FILENAME = "failed.json"
+
+
+@dataclass(frozen=True)
+class PipelineOptions:
+    """Tunable settings for the per-recording processing stage."""
+    sample_fps: float = 1.0
+    sheet_cols: int = 4
+    sheet_rows: int = 4
+    thumb_width: int = 320
+    proxy_height: int = 360
+    proxy_bitrate: str = "300k"
+    activity_threshold: float = 0.15
+
+
+def artifacts_dir_for(recording: str | Path) -> Path:
+    """Get the artifact directory for a recording."""
+    recording = Path(recording)
+    return recording.parent / PREVIEWS_DIRNAME / recording.stem
+
+
+def _write_marker(path: Path, data: dict) -> None:
+    """Write a marker atomically."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(data, indent=2))
+    os.replace(tmp_path, path)
+
+
+def find_marker(recording: str | Path, verify: bool = True) -> dict | None:
+    """Find the done or failed marker matching a recording's contents.
+
+    A marker matches on size plus SHA-256. When the size and mtime are
+    unchanged the hash isn't recomputed; when only the mtime moved, the
+    file is re-hashed and a match refreshes the marker's mtime.
+
+    Args:
+        recording: Path to recording file
+        verify: Re-hash the file when its mtime changed. Without it only
+            the size/mtime shortcut can match, which never reads the file.
+
+    Returns:
+        Marker contents (with "failed" set for a failure marker), or None
+    """
+    recording = Path(recording)
+    try:
+        stat = recording.stat()
+    except OSError:
+        return None
+
+    out_dir = artifacts_dir_for(recording)
+    digest = None
+
+    for name in (MARKER_FILENAME, FAILED_MARKER_FILENAME):
+        marker_path = out_dir / name
+        try:
+            data = json.loads(marker_path.read_text())
+        except (OSError, ValueError):
+            continue
+
+        if data.get("version") != PIPELINE_VERSION or data.get("size") != stat.st_size:
+            continue
+        if data.get("mtime_ns") == stat.st_mtime_ns:
+            return data
+        if not verify:
+            continue
+
+        if digest is None:
+            try:
+                digest = hash_file(recording)
+            except OSError:
+                return None
+        if data.get("sha256") == digest:
+            data["mtime_ns"] = stat.st_mtime_ns
+            try:
+                _write_marker(marker_path, data)
+            except OSError:
+                pass
+            return data
+
+    return None
+
+
+def is_processed(recording: str | Path, verify: bool = True) -> bool:
+    """Check whether a recording has an up-to-date idempotency marker.
+
+    Clips with a matching failure marker count as processed too, so they
+    are only retried once their contents change.
+
+    Args:
+        recording: Path to recording file
+        verify: Re-hash the file when its mtime changed (see find_marker)
+
+    Returns:
+        True if the current file contents were already processed
+    """
+    return find_marker(recording, verify=verify) is not None
+
+
+def _make_contact_sheet(thumbs: list, options: PipelineOptions, output_path: Path) -> bool:
+    """Tile thumbnails into a single grid image."""
+    import numpy as np
+    import cv2
+
+    if not thumbs:
+        return False
+
+    h, w = thumbs[0].shape[:2]
+    cols = options.sheet_cols
+    rows = (len(thumbs) + cols - 1) // cols
+    sheet = np.zeros((rows * h, cols * w, 3), dtype=np.uint8)
+
+    for i, thumb in enumerate(thumbs):
+        r, c = divmod(i, cols)
+        sheet[r * h:(r + 1) * h, c * w:(c + 1) * w] = thumb
+
+    return bool(cv2.imwrite(str(output_path), sheet, [cv2.IMWRITE_JPEG_QUALITY, 85]))
+
+
+def _analyze_video(recording: Path, options: PipelineOptions) -> tuple[list, list[dict]]:
+    """Single decode pass producing contact sheet thumbnails and activity scores.
+
+    Returns:
+        Tuple of (thumbnails, per-minute activity list)
+    """
+    import cv2
+    from PIL import Image
+    from .change_detector import frame_signature, change_score
+
+    cap = cv2.VideoCapture(str(recording))
+    if not cap.isOpened():
+        raise RuntimeError(f"Could not open video: {recording}")
+
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 15.0
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        step = max(1, int(round(fps / options.sample_fps)))
+
+        # Frame indices to keep for the contact sheet
+        n_thumbs = options.sheet_cols * options.sheet_rows
+        if total_frames > 0:
+            thumb_targets = sorted({
+                int((i + 0.5) * total_frames / n_thumbs) // step * step
+                for i in range(n_thumbs)
+            })
+        else:
+            thumb_targets = []
+
+        thumbs = []
+        minutes: dict[int, list[float]] = {}
+        last_sig = None
+        decoded = 0
+        index = 0
+
+        while True:
+            # grab() skips decoding to BGR for frames we don't sample
+            if not cap.grab():
+                break
+
+            if index % step == 0:
+                ok, frame = cap.retrieve()
+                if not ok:
+                    break
+                decoded += 1
+
+                h, w = frame.shape[:2]
+                small = cv2.resize(
+                    frame,
+                    (options.thumb_width, max(1, h * options.thumb_width // w)),
+                    interpolation=cv2.INTER_AREA,
+                )
+
+                sig = frame_signature(Image.fromarray(cv2.cvtColor(small, cv2.COLOR_BGR2RGB)))
+                if last_sig is not None:
+                    minute = int(index / fps // 60)
+                    minutes.setdefault(minute, []).append(change_score(last_sig, sig))
+                last_sig = sig
+
+                if thumb_targets and index >= thumb_targets[0]:
+                    thumbs.append(small)
+                    thumb_targets.pop(0)
+
+            index += 1
+    finally:
+        cap.release()
+
+    if decoded == 0:
+        raise RuntimeError(f"No decodable frames in {recording.name}")
+
+    activity = [
+        {
+            "minute": minute,
+            "mean": sum(scores) / len(scores),
+            "max": max(scores),
+            "events": sum(1 for s in scores if s > options.activity_threshold),
+        }
+        for minute, scores in sorted(minutes.items())
+    ]
+
+    return thumbs, activity
+
+
+def _make_proxy(recording: Path, options: PipelineOptions, output_path: Path) -> tuple[bool, str | None]:
+    """Transcode a low-bitrate preview proxy with ffmpeg.
+
+    Returns:
+        Tuple of (success, failure reason). The reason is None when the
+        failure isn't the clip's fault (ffmpeg missing), so it gets retried.
+    """
+    tmp_path = output_path.with_name(output_path.stem + ".tmp.mp4")
+    cmd = [
+        "ffmpeg", "-y", "-v", "error",
+        "-i", str(recording),
+        "-vf", f"scale=-2:{options.proxy_height}",
+        "-c:v", "libx264",
+        "-preset", "veryfast",
+        "-b:v", options.proxy_bitrate,
+        "-an",
+        "-movflags", "+faststart",
+        str(tmp_path),
+    ]
+
+    try:
+        result = subprocess.run(cmd, capture_output=True, timeout=3600)
+    except FileNotFoundError as e:
+        print(f"Proxy transcode failed for {recording.name}: {e}")
+        return False, None
+    except subprocess.TimeoutExpired as e:
+        print(f"Proxy transcode failed for {recording.name}: {e}")
+        tmp_path.unlink(missing_ok=True)
+        return False, f"Proxy encode timed out after {e.timeout:g} s"
+
+    if result.returncode != 0:
+        stderr = result.stderr.decode(errors="replace").strip()
+        print(f"Proxy transcode failed for {recording.name}: {stderr}")
+        tmp_path.unlink(missing_ok=True)
+        return False, f"Proxy encode failed (exit {result.returncode}): {stderr[-500:]}"
+
+    os.replace(tmp_path, output_path)
+    return True, None
+
+
+def process_recording(recording: str | Path, options: PipelineOptions | None = None) -> dict:
+    """Produce all artifacts for one recording.
+
+    Runs in a worker process. The marker is written last, so an interrupted
+    run is retried next time. A clip with no decodable frames or a rejected
+    proxy encode gets a failure marker instead, keyed on the same size and
+    hash, so it is skipped until its contents change.
+
+    Args:
+        recording: Path to recording file
+        options: Pipeline options
+
+    Returns:
+        Result dictionary with artifact paths
+    """
+    recording = Path(recording)
+    options = options or PipelineOptions()
+
+    marker = find_marker(recording)
+    if marker is not None:
+        return {"recording": str(recording), "skipped": True, "failed": marker.get("failed")}
+
+    stat = recording.stat()
+    identity = {
+        "version": PIPELINE_VERSION,
+        "size": stat.st_size,
+        "sha256": hash_file(recording),
+        "mtime_ns": stat.st_mtime_ns,
+    }
+    out_dir = artifacts_dir_for(recording)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    def fail(reason: str, result: dict) -> dict:
+        print(f"Pipeline giving up on {recording.name}: {reason}")
+        result["failed"] = reason
+        (out_dir / MARKER_FILENAME).unlink(missing_ok=True)
+        _write_marker(out_dir / FAILED_MARKER_FILENAME, {**identity, **result})
+        return result
+
+    sheet_path = out_dir / "contact_sheet.jpg"
+    proxy_path = out_dir / "proxy.mp4"
+    activity_path = out_dir / "activity.json"
+
+    try:
+        thumbs, activity = _analyze_video(recording, options)
+    except RuntimeError as e:
+        return fail(str(e), {"recording": str(recording), "skipped": False})
+
+    sheet_ok = _make_contact_sheet(thumbs, options, sheet_path)
+    activity_path.write_text(json.dumps(activity, indent=2))
+    proxy_ok, proxy_error = _make_proxy(recording, options, proxy_path)
+
+    result = {
+        "recording": str(recording),
+        "skipped": False,
+        "contact_sheet": str(sheet_path) if sheet_ok else None,
+        "proxy": str(proxy_path) if proxy_ok else None,
+        "activity": str(activity_path),
+        "peak_activity": max((m["max"] for m in activity), default=0.0),
+        "failed": None,
+    }
+
+    if proxy_error:
+        return fail(proxy_error, result)
+
+    if sheet_ok and proxy_ok:
+        (out_dir / FAILED_MARKER_FILENAME).unlink(missing_ok=True)
+        _write_marker(out_dir / MARKER_FILENAME, {**identity, **result})
+
+    return result
+
+
+class RecordingPipeline:
+    """Fan out post-download processing across a process pool.
+
+    Usage:
+        with RecordingPipeline() as pipeline:
+            sync.set_download_callback(pipeline.submit)
+            sync.sync_recent(days=7)
+            pipeline.wait()
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        options: PipelineOptions | None = None,
+    ):
+        """Initialize pipeline.
+
+        Args:
+            max_workers: Worker processes (defaults to CPU count)
+            options: Pipeline options
+        """
+        self.options = options or PipelineOptions()
+        self._executor = ProcessPoolExecutor(max_workers=max_workers)
+        self._pending: dict[str, Future] = {}
+        self._done_callback: Callable[[dict], None] | None = None
+
+    def set_done_callback(self, callback: Callable[[dict], None]) -> None:
+        """Set callback for finished recordings.
+
+        Args:
+            callback: Function(result_dict), called from a pool thread
+        """
+        self._done_callback = callback
+
+    def submit(self, recording: str | Path) -> Future | None:
+        """Queue a recording for processing without blocking.
+
+        Args:
+            recording: Path to recording file
+
+        Returns:
+            Future for the result, or None if already processed/queued
+        """
+        recording = Path(recording)
+        key = str(recording.resolve())
+
+        if key in self._pending and not self._pending[key].done():
+            return None
+        # Only the size/mtime shortcut here; hashing is left to the worker
+        if is_processed(recording, verify=False):
+            return None
+
+        future = self._executor.submit(process_recording, str(recording), self.options)
+        future.add_done_callback(self._on_done)
+        self._pending[key] = future
+        return future
+
+    def _on_done(self, future: Future) -> None:
+        """Report a finished job."""
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"Pipeline job failed: {e}")
+            return
+
+        if self._done_callback and not result.get("skipped"):
+            try:
+                self._done_callback(result)
+            except Exception as e:
+                print(f"Pipeline callback error: {e}")
+
+    def process_existing(self, root: str | Path) -> list[Future]:
+        """Queue every unprocessed recording under a directory.
+
+        Args:
+            root: Recordings directory
+
+        Returns:
+            Futures for newly queued recordings
+        """
+        futures = []
+        for path in sorted(Path(root).rglob("*.mp4")):
+            if PREVIEWS_DIRNAME in path.parts:
+                continue
+            future = self.submit(path)
+            if future is not None:
+                futures.append(future)
+        return futures
+
+    def wait(self) -> list[dict]:
+        """Block until all queued jobs finish.
+
+        Returns:
+            Results of jobs that ran to completion, including skipped
+            recordings and ones recorded as failed (check "skipped" and
+            "failed"); jobs that raised are left out and logged by the
+            done callback
+        """
+        results = []
+        for future in list(self._pending.values()):
+            try:
+                results.append(future.result())
+            except Exception:
+                pass
+        self._pending.clear()
+        return results
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the worker pool."""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def __enter__(self) -> "RecordingPipeline":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.shutdown()
@@ -2,5 +2,17 @@
 # ONVIF-based pan/tilt control for Tapo C210
 
 from .onvif_controller import ONVIFPTZController, PTZPosition
+from .command_scheduler import PTZCommandScheduler
+from .visual_odometry import VisualOdometry, ClosedLoopPTZ, PTZEstimate
+from .panorama import PanoramaMapper, PanoramaFrame
 
-__all__ = ["ONVIFPTZController", "PTZPosition"]
+__all__ = [
+    "ONVIFPTZController",
+    "PTZPosition",
+    "PTZCommandScheduler",
+    "VisualOdometry",
+    "ClosedLoopPTZ",
+    "PTZEstimate",
+    "PanoramaMapper",
+    "PanoramaFrame",
+]
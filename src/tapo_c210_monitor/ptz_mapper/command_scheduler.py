@@ -0,0 +1,266 @@
+"""Non-blocking PTZ command scheduler.
+
+Joystick-style control produces commands faster than the camera can ack
+them. Instead of queueing every one (and lagging further behind), the
+scheduler keeps a single pending slot:
+
+- a new command replaces whatever is pending, so only the latest target
+  is sent; pending relative moves are summed instead of dropped
+- a continuous move with the same velocity as the active one just extends
+  its deadline without another round-trip
+- stops are issued by the worker when a move's deadline passes, not by
+  sleeping in the caller
+
+All SOAP calls happen on one worker thread over the controller's shared
+keep-alive session, and each call's send-to-ack latency is recorded.
+"""
+
+import statistics
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+from .onvif_controller import ONVIFPTZController
+
+
+@dataclass
+class _Command:
+    kind: str  # "continuous", "absolute", "relative", "stop"
+    pan: float = 0.0
+    tilt: float = 0.0
+    speed: float = 0.5
+    duration: Optional[float] = None
+    submitted_at: float = 0.0
+
+
+class PTZCommandScheduler:
+    """Coalescing, timer-driven front end for ONVIFPTZController.
+
+    Usage:
+        scheduler = PTZCommandScheduler(ctrl)
+        scheduler.start()
+        scheduler.move(0.5, 0, duration=0.3)   # returns immediately
+        print(scheduler.get_stats())
+    """
+
+    def __init__(self, controller: ONVIFPTZController, latency_window: int = 200):
+        """Initialize scheduler.
+
+        Args:
+            controller: Connected ONVIF controller
+            latency_window: Number of recent latencies kept for stats
+        """
+        self.controller = controller
+
+        self._pending: Optional[_Command] = None
+        self._active: Optional[_Command] = None
+        self._stop_deadline: Optional[float] = None
+        self._dispatching = False
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+        self._latencies: deque[float] = deque(maxlen=latency_window)
+        self._queue_delays: deque[float] = deque(maxlen=latency_window)
+        self.sent = 0
+        self.coalesced = 0
+        self.extended = 0
+        self.errors = 0
+
+    # -- submission --
+
+    def _submit(self, command: _Command) -> None:
+        command.submitted_at = time.monotonic()
+        with self._cond:
+            pending = self._pending
+            if pending is not None:
+                self.coalesced += 1
+                if command.kind == "relative" and pending.kind == "relative":
+                    command.pan += pending.pan
+                    command.tilt += pending.tilt
+                    command.submitted_at = pending.submitted_at
+            self._pending = command
+            self._cond.notify_all()
+
+    def move(self, pan_velocity: float, tilt_velocity: float, duration: Optional[float] = None) -> None:
+        """Move at a velocity, replacing any pending command.
+
+        Args:
+            pan_velocity: -1.0 (left) to 1.0 (right)
+            tilt_velocity: -1.0 (down) to 1.0 (up)
+            duration: Seconds until an automatic stop (None = until stop())
+        """
+        if pan_velocity == 0 and tilt_velocity == 0:
+            self.stop()
+            return
+        self._submit(_Command("continuous", pan_velocity, tilt_velocity, duration=duration))
+
+    def move_absolute(self, pan: float, tilt: float, speed: float = 0.5) -> None:
+        """Move to an absolute position; only the latest target is sent."""
+        self._submit(_Command("absolute", pan, tilt, speed))
+
+    def move_relative(self, pan_delta: float, tilt_delta: float, speed: float = 0.5) -> None:
+        """Move by a relative amount; pending deltas accumulate."""
+        self._submit(_Command("relative", pan_delta, tilt_delta, speed))
+
+    def stop(self) -> None:
+        """Stop movement as soon as the worker is free."""
+        self._submit(_Command("stop"))
+
+    def flush(self, timeout: Optional[float] = None, include_stop: bool = False) -> bool:
+        """Wait until the pending command has been sent.
+
+        Args:
+            timeout: Seconds to wait (None = no limit)
+            include_stop: Also wait for the automatic stop of a timed move
+
+        Returns:
+            True if everything was sent in time
+        """
+        def drained() -> bool:
+            if self._pending is not None or self._dispatching:
+                return False
+            return not include_stop or self._stop_deadline is None
+
+        with self._cond:
+            self._cond.wait_for(lambda: drained() or not self._running, timeout)
+            return drained()
+
+    # -- worker --
+
+    def _send(self, command: _Command) -> None:
+        ctrl = self.controller
+        if command.kind == "continuous":
+            ctrl.start_continuous(command.pan, command.tilt)
+        elif command.kind == "absolute":
+            ctrl.move_absolute(command.pan, command.tilt, command.speed)
+        elif command.kind == "relative":
+            ctrl.move_relative(command.pan, command.tilt, command.speed)
+        else:
+            ctrl.stop()
+
+    def _dispatch(self, command: _Command) -> None:
+        active = self._active
+        if (
+            command.kind == "continuous"
+            and active is not None
+            and active.kind == "continuous"
+            and (active.pan, active.tilt) == (command.pan, command.tilt)
+        ):
+            # Same velocity already in effect; just move the stop deadline
+            self.extended += 1
+        else:
+            sent_at = time.monotonic()
+            try:
+                self._send(command)
+            except Exception as e:
+                self.errors += 1
+                print(f"PTZ {command.kind} failed: {e}")
+                return
+            acked_at = time.monotonic()
+            self._latencies.append(acked_at - sent_at)
+            self._queue_delays.append(sent_at - command.submitted_at)
+            self.sent += 1
+
+        if command.kind == "continuous":
+            self._active = command
+            self._stop_deadline = (
+                time.monotonic() + command.duration if command.duration is not None else None
+            )
+        else:
+            self._active = None
+            self._stop_deadline = None
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._running and self._pending is None:
+                    if self._stop_deadline is None:
+                        self._cond.wait()
+                        continue
+                    remaining = self._stop_deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                if not self._running:
+                    return
+
+                command = self._pending
+                self._pending = None
+                self._dispatching = True
+
+            if command is None:
+                # Deadline passed with nothing newer queued
+                command = _Command("stop", submitted_at=self._stop_deadline)
+            try:
+                self._dispatch(command)
+            finally:
+                with self._cond:
+                    self._dispatching = False
+                    self._cond.notify_all()
+
+    def start(self) -> None:
+        """Start the worker thread."""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def shutdown(self, stop_camera: bool = True) -> None:
+        """Stop the worker thread.
+
+        Args:
+            stop_camera: Send a final Stop if a move is active
+        """
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if stop_camera and self._active is not None:
+            try:
+                self.controller.stop()
+            except Exception as e:
+                print(f"PTZ stop failed: {e}")
+            self._active = None
+
+    def __enter__(self) -> "PTZCommandScheduler":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.shutdown()
+
+    # -- stats --
+
+    def get_stats(self) -> dict:
+        """Get command counts and latency percentiles (milliseconds).
+
+        "ack" is send-to-response time of the SOAP call; "queue" is the
+        time a command waited before being sent.
+        """
+        def summary(values) -> dict:
+            values = sorted(values)
+            if not values:
+                return {"count": 0}
+            return {
+                "count": len(values),
+                "mean_ms": statistics.fmean(values) * 1000,
+                "p50_ms": values[len(values) // 2] * 1000,
+                "p95_ms": values[min(len(values) - 1, int(len(values) * 0.95))] * 1000,
+                "max_ms": values[-1] * 1000,
+            }
+
+        return {
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "extended": self.extended,
+            "errors": self.errors,
+            "ack": summary(self._latencies),
+            "queue": summary(self._queue_delays),
+        }
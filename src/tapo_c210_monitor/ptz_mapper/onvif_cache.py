@@ -0,0 +1,143 @@
+"""Caches that make ONVIF controller (re)connects cheap.
+
+Two layers:
+
+- ONVIF clients (parsed WSDLs plus the device/PTZ/media services) are kept
+  per process, keyed by host, port and user, so a reconnect reuses them.
+  WSDL/XSD documents are also cached on disk by zeep's SqliteCache.
+- Discovered capabilities and the profile token are persisted per device
+  in a JSON file, keyed by firmware version, so start-up only needs one
+  GetDeviceInformation call to confirm they still apply.
+"""
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+DEVICE_CACHE_FILE = Path.home() / ".tapo_c210_onvif_cache.json"
+
+_clients: dict[tuple[str, int, str], dict] = {}
+_clients_lock = threading.Lock()
+
+
+def get_onvif_client(
+    host: str,
+    port: int,
+    username: str,
+    password: str,
+    timeout: float = 5.0,
+) -> dict:
+    """Get (or build once per process) the ONVIF camera and its services.
+
+    Args:
+        host: Camera IP address
+        port: ONVIF port
+        username: Camera account username
+        password: Camera account password
+        timeout: HTTP timeout for SOAP calls
+
+    Returns:
+        Dict with "camera", "ptz", "media" and "session"
+    """
+    key = (host, port, username)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is not None:
+            return client
+
+        import requests
+        from onvif import ONVIFCamera
+        from zeep.cache import SqliteCache
+        from zeep.transports import Transport
+
+        # One keep-alive HTTP session shared by all services, so PTZ
+        # commands don't pay a TCP handshake each
+        session = requests.Session()
+        transport = Transport(
+            session=session,
+            cache=SqliteCache(),
+            timeout=timeout,
+            operation_timeout=timeout,
+        )
+
+        camera = ONVIFCamera(host, port, username, password, transport=transport)
+        client = {
+            "camera": camera,
+            "ptz": camera.create_ptz_service(),
+            "media": camera.create_media_service(),
+            "session": session,
+        }
+        _clients[key] = client
+        return client
+
+
+def drop_onvif_client(host: str, port: int, username: str) -> None:
+    """Forget a cached client (e.g. after the camera rebooted or moved)."""
+    with _clients_lock:
+        client = _clients.pop((host, port, username), None)
+    if client:
+        client["session"].close()
+
+
+class ONVIFDeviceCache:
+    """Persisted per-device capabilities, invalidated by firmware version."""
+
+    def __init__(self, path: str | Path = DEVICE_CACHE_FILE):
+        """Initialize cache.
+
+        Args:
+            path: JSON cache file
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict:
+        try:
+            return json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, device_key: str, firmware: str) -> Optional[dict]:
+        """Get cached capabilities if they were recorded for this firmware.
+
+        Args:
+            device_key: Device identifier (host:port)
+            firmware: Current firmware version
+
+        Returns:
+            Capability dict or None
+        """
+        with self._lock:
+            entry = self._load().get(device_key)
+        if entry and entry.get("firmware") == firmware:
+            return entry.get("capabilities")
+        return None
+
+    def put(self, device_key: str, firmware: str, capabilities: dict) -> None:
+        """Store capabilities for a device.
+
+        Args:
+            device_key: Device identifier (host:port)
+            firmware: Firmware version they were discovered on
+            capabilities: Capability dict
+        """
+        with self._lock:
+            data = self._load()
+            data[device_key] = {
+                "firmware": firmware,
+                "capabilities": capabilities,
+                "updated_at": time.time(),
+            }
+            try:
+                self.path.write_text(json.dumps(data, indent=2))
+            except OSError as e:
+                print(f"Could not save ONVIF cache: {e}")
+
+    def invalidate(self, device_key: str) -> None:
+        """Remove a device's cached capabilities."""
+        with self._lock:
+            data = self._load()
+            if data.pop(device_key, None) is not None:
+                self.path.write_text(json.dumps(data, indent=2))
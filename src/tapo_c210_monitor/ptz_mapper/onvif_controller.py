@@ -5,11 +5,13 @@ Provides pan/tilt control via ONVIF protocol (port 2020).
 
 import os
 import time
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from typing import Optional, Tuple
 from pathlib import Path
 from dotenv import load_dotenv
 
+from .onvif_cache import ONVIFDeviceCache, drop_onvif_client, get_onvif_client
+
 # Load environment
 env_path = Path(__file__).parent.parent.parent.parent / ".env"
 load_dotenv(env_path)
@@ -41,13 +43,19 @@ class ONVIFPTZController:
         port: int = 2020,
         username: Optional[str] = None,
         password: Optional[str] = None,
+        timeout: float = 5.0,
+        device_cache: Optional[ONVIFDeviceCache] = None,
     ):
         self.host = host or os.getenv("TAPO_HOST", "192.168.29.183")
         self.port = port
         self.username = username or os.getenv("TAPO_USERNAME", "")
         self.password = password or os.getenv("TAPO_PASSWORD", "")
+        self.timeout = timeout
+        self.device_cache = device_cache or ONVIFDeviceCache()
+        self.firmware: Optional[str] = None
 
         self.camera = None
+        self.session = None
         self.ptz_service = None
         self.media_service = None
         self.profile_token = None
@@ -59,22 +67,40 @@ class ONVIFPTZController:
         self.supports_position_feedback = False
         self.ptz_limits: Optional[PTZLimits] = None
 
-    def connect(self) -> bool:
-        """Connect to camera ONVIF service and discover capabilities."""
-        try:
-            from onvif import ONVIFCamera
+    @property
+    def device_key(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    def connect(self, use_cache: bool = True) -> bool:
+        """Connect to camera ONVIF service and discover capabilities.
 
+        ONVIF clients are reused across reconnects within the process, and
+        capabilities discovered on a previous run are reused when the
+        camera's firmware version hasn't changed.
+
+        Args:
+            use_cache: Reuse persisted capabilities (False forces discovery)
+        """
+        try:
             print(f"Connecting to ONVIF at {self.host}:{self.port}...")
-            self.camera = ONVIFCamera(
-                self.host,
-                self.port,
-                self.username,
-                self.password
+            client = get_onvif_client(
+                self.host, self.port, self.username, self.password, self.timeout
             )
+            self.camera = client["camera"]
+            self.session = client["session"]
+            self.ptz_service = client["ptz"]
+            self.media_service = client["media"]
 
-            # Get services
-            self.ptz_service = self.camera.create_ptz_service()
-            self.media_service = self.camera.create_media_service()
+            try:
+                info = self.camera.devicemgmt.GetDeviceInformation()
+                self.firmware = f"{info.Model}/{info.FirmwareVersion}"
+            except Exception as e:
+                print(f"GetDeviceInformation failed: {e}")
+                self.firmware = None
+
+            if use_cache and self.firmware and self._load_capabilities():
+                print(f"Using cached capabilities for firmware {self.firmware}")
+                return True
 
             # Get profile
             profiles = self.media_service.GetProfiles()
@@ -88,12 +114,43 @@ class ONVIFPTZController:
             # Discover PTZ capabilities
             self._discover_capabilities()
 
+            if self.firmware:
+                self.device_cache.put(self.device_key, self.firmware, self._capabilities())
+
             return True
 
         except Exception as e:
             print(f"ONVIF connection failed: {e}")
+            # Don't keep a client that may be bound to a stale address
+            drop_onvif_client(self.host, self.port, self.username)
+            return False
+
+    def _capabilities(self) -> dict:
+        """Capabilities in the persisted cache format."""
+        return {
+            "profile_token": self.profile_token,
+            "supports_absolute_move": self.supports_absolute_move,
+            "supports_relative_move": self.supports_relative_move,
+            "supports_continuous_move": self.supports_continuous_move,
+            "supports_position_feedback": self.supports_position_feedback,
+            "ptz_limits": asdict(self.ptz_limits) if self.ptz_limits else None,
+        }
+
+    def _load_capabilities(self) -> bool:
+        """Apply persisted capabilities for the current firmware."""
+        cached = self.device_cache.get(self.device_key, self.firmware)
+        if not cached or not cached.get("profile_token"):
             return False
 
+        self.profile_token = cached["profile_token"]
+        self.supports_absolute_move = cached["supports_absolute_move"]
+        self.supports_relative_move = cached["supports_relative_move"]
+        self.supports_continuous_move = cached["supports_continuous_move"]
+        self.supports_position_feedback = cached["supports_position_feedback"]
+        limits = cached.get("ptz_limits")
+        self.ptz_limits = PTZLimits(**limits) if limits else None
+        return True
+
     def _discover_capabilities(self):
         """Discover what PTZ operations the camera supports."""
         try:
@@ -177,6 +234,19 @@ class ONVIFPTZController:
             tilt_velocity: -1.0 (down) to 1.0 (up)
             duration: How long to move (seconds)
         """
+        self.start_continuous(pan_velocity, tilt_velocity)
+        time.sleep(duration)
+        self.stop()
+
+    def start_continuous(self, pan_velocity: float, tilt_velocity: float):
+        """Start moving at specified velocity and return immediately.
+
+        The camera keeps moving until stop() or another move command.
+
+        Args:
+            pan_velocity: -1.0 (left) to 1.0 (right)
+            tilt_velocity: -1.0 (down) to 1.0 (up)
+        """
         if not self.ptz_service:
             raise RuntimeError("Not connected")
 
@@ -185,8 +255,6 @@ class ONVIFPTZController:
         request.Velocity = {'PanTilt': {'x': pan_velocity, 'y': tilt_velocity}}
 
         self.ptz_service.ContinuousMove(request)
-        time.sleep(duration)
-        self.stop()
 
     def move_absolute(self, pan: float, tilt: float, speed: float = 0.5) -> bool:
         """Move to absolute position (if supported).
@@ -242,6 +310,27 @@ class ONVIFPTZController:
             print(f"RelativeMove error: {e}")
             return False
 
+    def move_to_angle(
+        self,
+        odometry,
+        pan_deg: float,
+        tilt_deg: Optional[float] = None,
+        tolerance_deg: float = 1.0,
+    ):
+        """Closed-loop move to an angle using visual odometry feedback.
+
+        Args:
+            odometry: VisualOdometry fed from this camera's stream
+            pan_deg: Target pan in degrees (odometry frame)
+            tilt_deg: Target tilt in degrees (None = leave tilt alone)
+            tolerance_deg: Acceptable final error
+
+        Returns:
+            Final PTZEstimate
+        """
+        from .visual_odometry import ClosedLoopPTZ
+        return ClosedLoopPTZ(odometry, tolerance_deg).move_onvif(self, pan_deg, tilt_deg)
+
     def stop(self):
         """Stop all PTZ movement."""
         if self.ptz_service:
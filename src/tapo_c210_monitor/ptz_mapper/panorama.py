@@ -0,0 +1,417 @@
+"""Panorama / PTZ coverage map.
+
+Frames from a pan/tilt sweep are warped onto a cylinder and blended into
+a canvas laid out in angle space: x is pan, y is tilt, at a fixed number
+of pixels per degree. That makes the angle <-> pixel lookup a linear map,
+so a click on the panorama turns into one absolute (or single relative)
+move.
+
+Stitching is incremental: each new frame is placed at its estimated
+angle and only refined against the part of the canvas it overlaps (one
+phase correlation on downscaled images), so adding a frame costs the
+same no matter how many came before. The cylindrical warp maps are
+computed once per frame size and cached.
+"""
+
+import json
+import math
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+import cv2
+import numpy as np
+
+
+@dataclass(frozen=True)
+class PanoramaFrame:
+    """A frame placed on the panorama."""
+    pan: float  # Refined pan of the frame centre (degrees)
+    tilt: float  # Refined tilt of the frame centre (degrees)
+    estimated_pan: float
+    estimated_tilt: float
+    response: float  # Refinement confidence (0 if not refined)
+
+
+class PanoramaMapper:
+    """Incrementally stitch a cylindrical panorama from PTZ sweep frames.
+
+    Usage:
+        mapper = PanoramaMapper(hfov_deg=100)
+        mapper.sweep(frame_source, odometry, move_to)
+        cv2.imwrite("pano.jpg", mapper.render())
+        pan, tilt = mapper.pixel_to_angle(x, y)
+        mapper.point_at(x, y, camera=camera, current=odometry.estimate)
+    """
+
+    def __init__(
+        self,
+        hfov_deg: float = 100.0,
+        px_per_deg: float = 4.0,
+        pan_range: tuple[float, float] = (-180.0, 180.0),
+        tilt_range: tuple[float, float] = (-45.0, 45.0),
+        refine: bool = True,
+        min_response: float = 0.1,
+    ):
+        """Initialize mapper.
+
+        Args:
+            hfov_deg: Horizontal field of view of the frames
+            px_per_deg: Panorama resolution
+            pan_range: Pan angles covered by the canvas (frame centres plus
+                half a field of view are clipped to this)
+            tilt_range: Tilt angles covered by the canvas
+            refine: Refine frame placement against the existing canvas
+            min_response: Correlation peak needed to accept a refinement
+        """
+        self.hfov_deg = hfov_deg
+        self.px_per_deg = px_per_deg
+        self.pan_range = pan_range
+        self.tilt_range = tilt_range
+        self.refine = refine
+        self.min_response = min_response
+
+        width = int(round((pan_range[1] - pan_range[0]) * px_per_deg))
+        height = int(round((tilt_range[1] - tilt_range[0]) * px_per_deg))
+        self._sum = np.zeros((height, width, 3), dtype=np.float32)
+        self._weight = np.zeros((height, width), dtype=np.float32)
+
+        self._warp_cache: dict[tuple[int, int], tuple] = {}
+        self.frames: list[PanoramaFrame] = []
+        self._calibration: list[tuple[float, float, float, float]] = []
+
+    # -- geometry --
+
+    @property
+    def size(self) -> tuple[int, int]:
+        """Canvas (width, height) in pixels."""
+        return self._weight.shape[1], self._weight.shape[0]
+
+    def angle_to_pixel(self, pan: float, tilt: float) -> tuple[float, float]:
+        """Map a pan/tilt angle to panorama pixel coordinates."""
+        x = (pan - self.pan_range[0]) * self.px_per_deg
+        y = (self.tilt_range[1] - tilt) * self.px_per_deg
+        return x, y
+
+    def pixel_to_angle(self, x: float, y: float) -> tuple[float, float]:
+        """Map panorama pixel coordinates to a pan/tilt angle."""
+        pan = self.pan_range[0] + x / self.px_per_deg
+        tilt = self.tilt_range[1] - y / self.px_per_deg
+        return pan, tilt
+
+    def lookup_grid(self, step_deg: float = 1.0) -> dict:
+        """Angle -> pixel lookup table for the covered area.
+
+        Args:
+            step_deg: Grid spacing in degrees
+
+        Returns:
+            Dict with "pan" and "tilt" axes and "x"/"y" pixel arrays
+            (x[i] for pan[i], y[j] for tilt[j]), plus a "covered" mask
+            [tilt, pan] of grid points that have panorama content
+        """
+        pans = np.arange(self.pan_range[0], self.pan_range[1] + 1e-9, step_deg)
+        tilts = np.arange(self.tilt_range[1], self.tilt_range[0] - 1e-9, -step_deg)
+        xs = (pans - self.pan_range[0]) * self.px_per_deg
+        ys = (self.tilt_range[1] - tilts) * self.px_per_deg
+
+        w, h = self.size
+        xi = np.clip(xs.astype(int), 0, w - 1)
+        yi = np.clip(ys.astype(int), 0, h - 1)
+        covered = self._weight[np.ix_(yi, xi)] > 0
+
+        return {
+            "pan": pans.tolist(),
+            "tilt": tilts.tolist(),
+            "x": xs.tolist(),
+            "y": ys.tolist(),
+            "covered": covered.tolist(),
+        }
+
+    def _warp_maps(self, frame_w: int, frame_h: int) -> tuple:
+        """Cylindrical warp maps for a frame size (cached).
+
+        The frame is resampled so that one cylinder pixel spans
+        1/px_per_deg degrees of pan.
+        """
+        key = (frame_w, frame_h)
+        if key in self._warp_cache:
+            return self._warp_cache[key]
+
+        # Focal length (in source pixels) from the field of view, and the
+        # cylinder radius that gives px_per_deg
+        f_src = (frame_w / 2) / math.tan(math.radians(self.hfov_deg) / 2)
+        radius = self.px_per_deg * 180 / math.pi
+        out_w = int(round(self.hfov_deg * self.px_per_deg))
+        vfov = 2 * math.degrees(math.atan((frame_h / 2) / f_src))
+        out_h = int(round(vfov * self.px_per_deg))
+
+        theta = (np.arange(out_w, dtype=np.float32) - out_w / 2) / radius
+        height = (np.arange(out_h, dtype=np.float32) - out_h / 2) / radius
+        theta, height = np.meshgrid(theta, height)
+
+        map_x = (f_src * np.tan(theta) + frame_w / 2).astype(np.float32)
+        map_y = (f_src * height / np.cos(theta) + frame_h / 2).astype(np.float32)
+        valid = (map_x >= 0) & (map_x < frame_w - 1) & (map_y >= 0) & (map_y < frame_h - 1)
+
+        # Feathered blend weights: highest in the middle, zero at the edges
+        wx = 1.0 - np.abs(np.linspace(-1, 1, out_w, dtype=np.float32))
+        wy = 1.0 - np.abs(np.linspace(-1, 1, out_h, dtype=np.float32))
+        feather = np.outer(wy, wx) * valid
+
+        self._warp_cache[key] = (map_x, map_y, feather.astype(np.float32))
+        return self._warp_cache[key]
+
+    # -- stitching --
+
+    def _region(self, x0: int, y0: int, w: int, h: int):
+        """Clip a placement to the canvas; returns canvas and patch slices."""
+        cw, ch = self.size
+        cx0, cy0 = max(0, x0), max(0, y0)
+        cx1, cy1 = min(cw, x0 + w), min(ch, y0 + h)
+        if cx0 >= cx1 or cy0 >= cy1:
+            return None
+        canvas = (slice(cy0, cy1), slice(cx0, cx1))
+        patch = (slice(cy0 - y0, cy1 - y0), slice(cx0 - x0, cx1 - x0))
+        return canvas, patch
+
+    def _refine(self, warped: np.ndarray, feather: np.ndarray, x0: int, y0: int) -> tuple[int, int, float]:
+        """Correct a placement by correlating with the overlapping canvas."""
+        h, w = feather.shape
+        region = self._region(x0, y0, w, h)
+        if region is None:
+            return 0, 0, 0.0
+        canvas_sl, patch_sl = region
+
+        existing = self._weight[canvas_sl]
+        overlap = (existing > 0) & (feather[patch_sl] > 0)
+        if overlap.mean() < 0.15:
+            return 0, 0, 0.0
+
+        # Correlate the bounding box of the overlap; zeroing the rest
+        # instead would give both images the same edge and pull the peak
+        # to zero shift
+        rows = np.flatnonzero(overlap.any(axis=1))
+        cols = np.flatnonzero(overlap.any(axis=0))
+        box = (slice(rows[0], rows[-1] + 1), slice(cols[0], cols[-1] + 1))
+        if rows.size < 16 or cols.size < 16:
+            return 0, 0, 0.0
+
+        existing = existing[box]
+        canvas_gray = cv2.cvtColor(
+            (self._sum[canvas_sl][box] / np.maximum(existing, 1e-6)[..., None]).astype(np.uint8),
+            cv2.COLOR_BGR2GRAY,
+        ).astype(np.float32)
+        new_gray = cv2.cvtColor(warped[patch_sl][box], cv2.COLOR_BGR2GRAY).astype(np.float32)
+
+        window = cv2.createHanningWindow((new_gray.shape[1], new_gray.shape[0]), cv2.CV_32F)
+        (dx, dy), response = cv2.phaseCorrelate(canvas_gray, new_gray, window)
+        if response < self.min_response:
+            return 0, 0, float(response)
+
+        # Content appearing shifted by +dx means the frame belongs dx left
+        return -int(round(dx)), -int(round(dy)), float(response)
+
+    def add_frame(self, frame: np.ndarray, pan: float, tilt: float) -> PanoramaFrame:
+        """Warp a frame onto the canvas at (approximately) its angle.
+
+        Args:
+            frame: BGR frame
+            pan: Estimated pan of the frame centre (degrees)
+            tilt: Estimated tilt of the frame centre (degrees)
+
+        Returns:
+            Placement record with the refined angle
+        """
+        # Work at panorama resolution: shrink the frame first so the warp
+        # and correlation only touch as many pixels as end up on the canvas
+        target_w = int(round(2 * (self.px_per_deg * 180 / math.pi) * math.tan(math.radians(self.hfov_deg) / 2)))
+        if frame.shape[1] > target_w:
+            scale = target_w / frame.shape[1]
+            frame = cv2.resize(frame, (target_w, max(1, int(frame.shape[0] * scale))), interpolation=cv2.INTER_AREA)
+
+        map_x, map_y, feather = self._warp_maps(frame.shape[1], frame.shape[0])
+        warped = cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT)
+
+        h, w = feather.shape
+        cx, cy = self.angle_to_pixel(pan, tilt)
+        x0, y0 = int(round(cx - w / 2)), int(round(cy - h / 2))
+
+        dx = dy = 0
+        response = 0.0
+        if self.refine and self.frames:
+            dx, dy, response = self._refine(warped, feather, x0, y0)
+            # Don't trust corrections bigger than a quarter frame
+            if abs(dx) > w / 4 or abs(dy) > h / 4:
+                dx = dy = 0
+            x0 += dx
+            y0 += dy
+
+        region = self._region(x0, y0, w, h)
+        if region is not None:
+            canvas_sl, patch_sl = region
+            weight = feather[patch_sl]
+            self._sum[canvas_sl] += warped[patch_sl].astype(np.float32) * weight[..., None]
+            self._weight[canvas_sl] += weight
+
+        refined_pan = pan + dx / self.px_per_deg
+        refined_tilt = tilt - dy / self.px_per_deg
+        placed = PanoramaFrame(refined_pan, refined_tilt, pan, tilt, response)
+        self.frames.append(placed)
+        return placed
+
+    def render(self) -> np.ndarray:
+        """Get the blended panorama (BGR, black where uncovered)."""
+        weight = np.maximum(self._weight, 1e-6)[..., None]
+        return np.clip(self._sum / weight, 0, 255).astype(np.uint8)
+
+    # -- sweep and pointing --
+
+    def add_calibration(self, pan_deg: float, tilt_deg: float, onvif_pan: float, onvif_tilt: float) -> None:
+        """Record an (angle, ONVIF normalized position) pair for absolute moves."""
+        self._calibration.append((pan_deg, tilt_deg, onvif_pan, onvif_tilt))
+
+    def angle_to_onvif(self, pan: float, tilt: float) -> Optional[tuple[float, float]]:
+        """Convert an angle to ONVIF normalized coordinates.
+
+        Uses a linear fit over the calibration pairs collected during the
+        sweep; None until at least two distinct pans have been recorded.
+        """
+        samples = np.array(self._calibration)
+        if len(samples) < 2 or np.ptp(samples[:, 0]) == 0:
+            return None
+
+        a_pan, b_pan = np.polyfit(samples[:, 0], samples[:, 2], 1)
+        if np.ptp(samples[:, 1]) > 0:
+            a_tilt, b_tilt = np.polyfit(samples[:, 1], samples[:, 3], 1)
+            onvif_tilt = a_tilt * tilt + b_tilt
+        else:
+            onvif_tilt = float(samples[:, 3].mean())
+
+        return (
+            float(np.clip(a_pan * pan + b_pan, -1.0, 1.0)),
+            float(np.clip(onvif_tilt, -1.0, 1.0)),
+        )
+
+    def sweep(
+        self,
+        frame_source: Callable[[], Optional[np.ndarray]],
+        odometry,
+        move_to: Callable[[float, float], object],
+        pan_range: Optional[tuple[float, float]] = None,
+        tilt_levels: tuple[float, ...] = (0.0,),
+        overlap: float = 0.5,
+        controller=None,
+    ) -> int:
+        """Drive a pan/tilt sweep and stitch every stop into the panorama.
+
+        Args:
+            frame_source: Returns the latest BGR frame (e.g.
+                StreamCapture.get_latest_frame)
+            odometry: VisualOdometry fed from the same stream
+            move_to: Function(pan_deg, tilt_deg) performing a closed-loop
+                move (e.g. ClosedLoopPTZ(odometry).move_tapo bound to a
+                camera)
+            pan_range: Pans to cover (defaults to the canvas range minus
+                half a field of view at each end)
+            tilt_levels: Tilt angles of the sweep rows
+            overlap: Fraction of the field of view shared by neighbours
+            controller: ONVIFPTZController; if given, its reported
+                position is recorded for angle_to_onvif()
+
+        Returns:
+            Number of frames added
+        """
+        if pan_range is None:
+            half = self.hfov_deg / 2
+            pan_range = (self.pan_range[0] + half, self.pan_range[1] - half)
+        step = self.hfov_deg * (1.0 - overlap)
+        pans = list(np.arange(pan_range[0], pan_range[1] + 1e-9, step))
+
+        added = 0
+        for row, tilt in enumerate(tilt_levels):
+            # Serpentine order avoids a long return move between rows
+            row_pans = pans if row % 2 == 0 else pans[::-1]
+            for pan in row_pans:
+                move_to(pan, tilt)
+                est = odometry.wait_until_still()
+                frame = frame_source()
+                if frame is None:
+                    print(f"No frame at pan={pan:.1f} tilt={tilt:.1f}")
+                    continue
+
+                placed = self.add_frame(frame, est.pan, est.tilt)
+                added += 1
+
+                if controller is not None:
+                    position = controller.get_position()
+                    if position is not None:
+                        self.add_calibration(placed.pan, placed.tilt, position.pan, position.tilt)
+
+        return added
+
+    def point_at(
+        self,
+        x: float,
+        y: float,
+        camera=None,
+        controller=None,
+        current=None,
+    ) -> tuple[float, float]:
+        """Point the camera at a panorama pixel with a single move.
+
+        Args:
+            x: Panorama x coordinate
+            y: Panorama y coordinate
+            camera: TapoCamera (one relative move_motor from current)
+            controller: ONVIFPTZController (one AbsoluteMove, needs
+                calibration from the sweep)
+            current: Current PTZEstimate (required for camera)
+
+        Returns:
+            Target (pan, tilt) in degrees
+        """
+        pan, tilt = self.pixel_to_angle(x, y)
+
+        if controller is not None:
+            target = self.angle_to_onvif(pan, tilt)
+            if target is None:
+                print("No ONVIF calibration; run sweep() with controller=")
+            else:
+                controller.move_absolute(*target)
+        elif camera is not None:
+            if current is None:
+                raise ValueError("current estimate required for relative moves")
+            camera.move_motor(pan - current.pan, tilt - current.tilt)
+
+        return pan, tilt
+
+    # -- persistence --
+
+    def save(self, directory: str | Path) -> Path:
+        """Save the panorama image, lookup grid and placements.
+
+        Args:
+            directory: Output directory
+
+        Returns:
+            Path to the metadata JSON
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        cv2.imwrite(str(directory / "panorama.jpg"), self.render())
+
+        meta = {
+            "created_at": time.time(),
+            "hfov_deg": self.hfov_deg,
+            "px_per_deg": self.px_per_deg,
+            "pan_range": list(self.pan_range),
+            "tilt_range": list(self.tilt_range),
+            "frames": [f.__dict__ for f in self.frames],
+            "calibration": self._calibration,
+            "grid": self.lookup_grid(),
+        }
+        meta_path = directory / "panorama.json"
+        meta_path.write_text(json.dumps(meta))
+        return meta_path
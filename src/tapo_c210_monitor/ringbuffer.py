@@ -0,0 +1,106 @@
+"""HTTP client for the Go ring buffer service (ringbuffer/main.go)."""
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import httpx
+
+if TYPE_CHECKING:
+    from .store import RecordingStore
+
+
+class RingBufferClient:
+    """Thin wrapper around the ring buffer's HTTP endpoints."""
+
+    def __init__(self, url: str = "http://localhost:8085", timeout: float = 30.0):
+        """Initialize client.
+
+        Args:
+            url: Base URL of the ring buffer service
+            timeout: Request timeout in seconds
+        """
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def status(self) -> dict:
+        """Get buffer status (segment count, size, oldest/newest)."""
+        resp = httpx.get(f"{self.url}/status", timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.json()
+
+    def segments(self, include_incomplete: bool = False) -> list[dict]:
+        """List buffered segments.
+
+        Args:
+            include_incomplete: Include the segment ffmpeg is still writing
+
+        Returns:
+            List of {"path", "start", "end", "size", "complete"} dicts with
+            unix-second timestamps, oldest first
+        """
+        resp = httpx.get(f"{self.url}/segments", timeout=self.timeout)
+        resp.raise_for_status()
+        segments = resp.json().get("segments") or []
+        if include_incomplete:
+            return segments
+        return [s for s in segments if s.get("complete", True)]
+
+    def save(
+        self,
+        seconds: int = 0,
+        size_mb: int = 0,
+        output: str | None = None,
+        store: "RecordingStore | None" = None,
+    ) -> dict:
+        """Save recent footage to a file.
+
+        Args:
+            seconds: Seconds of footage to save (0 = whole buffer)
+            size_mb: Size cap in MB (0 = no cap)
+            output: Output path (server picks one if None)
+            store: Deduplicating store to index the saved clip into; a
+                clip written outside the store's root is copied in
+
+        Returns:
+            Server response with the saved file path ("saved_path"), plus
+            "stored_path" when the clip was indexed into a store
+        """
+        params = {"seconds": seconds, "size_mb": size_mb}
+        if output:
+            params["output"] = output
+        resp = httpx.post(f"{self.url}/save", params=params, timeout=max(self.timeout, 120))
+        resp.raise_for_status()
+        result = resp.json()
+
+        saved = result.get("saved_path")
+        if store is not None and saved:
+            path = Path(saved).resolve()
+            if not path.is_relative_to(store.root.resolve()):
+                record = store.import_file(path, source="ringbuffer")
+            else:
+                try:
+                    record = store.ingest(path, source="ringbuffer")
+                except OSError as e:
+                    print(f"Failed to index {path}: {e}")
+                    record = None
+            if record:
+                result["stored_path"] = record.path
+        return result
+
+    def frames(self, seconds_ago: list[float], output_dir: str) -> list[str]:
+        """Extract frames at offsets from now.
+
+        Args:
+            seconds_ago: Offsets in seconds
+            output_dir: Directory to write JPEGs into
+
+        Returns:
+            Paths of extracted frames
+        """
+        params = {
+            "seconds_ago": ",".join(str(s) for s in seconds_ago),
+            "output_dir": output_dir,
+        }
+        resp = httpx.get(f"{self.url}/frames", params=params, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.json().get("frames", [])
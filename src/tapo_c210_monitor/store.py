@@ -0,0 +1,475 @@
+"""Content-addressed, deduplicating store for local recordings.
+
+Recordings arrive from several places (SD card sync, the phone's Tapo media
+folder, ring buffer saves) and the same footage often lands more than once
+under different names. The store keeps a SHA-256 -> paths index on disk,
+replaces byte-identical copies with hard links to a single canonical file,
+and flags clips from the same camera whose time ranges overlap.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+
+CHUNK_SIZE = 1024 * 1024
+INDEX_FILENAME = ".recording_index.json"
+
+# recording_<start>_<end>.mp4 (RecordingSync.download_recording, unix seconds)
+_UNIX_RANGE_RE = re.compile(r"(\d{10})_(\d{10})")
+# <YYYYMMDD>_<start>.mp4 (RecordingSync.sync_date) / segment_<unix>.mp4 (ring buffer)
+_UNIX_START_RE = re.compile(r"(?:^|_)(\d{10})(?:$|_)")
+# recording_YYYYMMDD_HHMMSS.mp4 (ring buffer SaveBuffer) / phone media names
+_DATETIME_RE = re.compile(r"(\d{8})_(\d{6})")
+
+
+def parse_recording_times(path: str | Path) -> tuple[float | None, float | None]:
+    """Extract start/end unix timestamps from a recording filename.
+
+    Understands the naming schemes used by RecordingSync, the ring buffer
+    and the Tapo app. Missing values are returned as None.
+
+    Args:
+        path: Recording path
+
+    Returns:
+        Tuple of (start, end)
+    """
+    stem = Path(path).stem
+
+    match = _UNIX_RANGE_RE.search(stem)
+    if match:
+        return float(match.group(1)), float(match.group(2))
+
+    match = _UNIX_START_RE.search(stem)
+    if match:
+        return float(match.group(1)), None
+
+    match = _DATETIME_RE.search(stem)
+    if match:
+        try:
+            dt = datetime.strptime(match.group(1) + match.group(2), "%Y%m%d%H%M%S")
+        except ValueError:
+            return None, None
+        if stem.startswith("recording_"):
+            # SaveBuffer names files by save time, i.e. the end of the clip
+            return None, dt.timestamp()
+        return dt.timestamp(), None
+
+    return None, None
+
+
+def probe_duration(path: str | Path) -> float | None:
+    """Get video duration in seconds, or None if it can't be read."""
+    try:
+        import cv2
+    except ImportError:
+        return None
+
+    cap = cv2.VideoCapture(str(path))
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frames = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        if fps > 0 and frames > 0:  # Both are -1 when the file can't be opened
+            return frames / fps
+        return None
+    finally:
+        cap.release()
+
+
+def hash_file(path: str | Path) -> str:
+    """Compute SHA-256 of a file in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class StoredRecording:
+    """Index entry for one recording file."""
+    path: str
+    digest: str
+    size: int
+    mtime_ns: int
+    camera: str
+    source: str
+    start: float | None = None
+    end: float | None = None
+
+
+class HashingWriter:
+    """Binary file writer that hashes data as it is written.
+
+    Closing the writer registers the file with the store using the digest
+    computed on the fly, so the file is never read back.
+    """
+
+    def __init__(self, store: "RecordingStore", path: Path, source: str, camera: str | None):
+        self.store = store
+        self.path = path
+        self.source = source
+        self.camera = camera
+        self.record: StoredRecording | None = None
+        self._hash = hashlib.sha256()
+        self._file = open(path, "wb")
+
+    def write(self, data: bytes) -> int:
+        self._hash.update(data)
+        return self._file.write(data)
+
+    def close(self) -> StoredRecording | None:
+        if self._file.closed:
+            return self.record
+        self._file.close()
+        self.record = self.store.ingest(
+            self.path,
+            source=self.source,
+            camera=self.camera,
+            digest=self._hash.hexdigest(),
+        )
+        return self.record
+
+    def __enter__(self) -> "HashingWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is not None:
+            # Don't index a partial file
+            self._file.close()
+            self.path.unlink(missing_ok=True)
+            return
+        self.close()
+
+
+class RecordingStore:
+    """Deduplicating index of local recordings.
+
+    Usage:
+        store = RecordingStore("./recordings")
+        store.scan()                      # index files already on disk
+        store.ingest(path, source="sd_card")
+        print(store.get_stats())
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        index_path: str | Path | None = None,
+        camera: str = "c210",
+    ):
+        """Initialize store.
+
+        Args:
+            root: Directory that holds recordings
+            index_path: Index file (defaults to <root>/.recording_index.json)
+            camera: Default camera id for ingested files
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.index_path = Path(index_path) if index_path else self.root / INDEX_FILENAME
+        self.camera = camera
+
+        self._lock = threading.RLock()
+        self._files: dict[str, StoredRecording] = {}
+        self._by_digest: dict[str, list[str]] = {}
+        self.reclaimed_bytes = 0
+
+        self._load()
+
+    def _load(self) -> None:
+        """Load index from disk."""
+        if not self.index_path.exists():
+            return
+        try:
+            data = json.loads(self.index_path.read_text())
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable recording index: {e}")
+            return
+
+        self.reclaimed_bytes = data.get("reclaimed_bytes", 0)
+        for entry in data.get("files", []):
+            record = StoredRecording(**entry)
+            self._add(record)
+
+    def save(self) -> None:
+        """Write index to disk atomically."""
+        with self._lock:
+            data = {
+                "version": 1,
+                "reclaimed_bytes": self.reclaimed_bytes,
+                "files": [asdict(r) for r in self._files.values()],
+            }
+            tmp_path = self.index_path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(data))
+            os.replace(tmp_path, self.index_path)
+
+    def _add(self, record: StoredRecording) -> None:
+        self._files[record.path] = record
+        self._by_digest.setdefault(record.digest, []).append(record.path)
+
+    def _remove(self, path: str) -> None:
+        record = self._files.pop(path, None)
+        if record is None:
+            return
+        paths = self._by_digest.get(record.digest, [])
+        if path in paths:
+            paths.remove(path)
+        if not paths:
+            self._by_digest.pop(record.digest, None)
+
+    def open_write(
+        self,
+        path: str | Path,
+        source: str = "unknown",
+        camera: str | None = None,
+    ) -> HashingWriter:
+        """Open a file for writing with on-the-fly hashing.
+
+        Args:
+            path: Destination path
+            source: Origin label (sd_card, android, ringbuffer)
+            camera: Camera id (defaults to store camera)
+
+        Returns:
+            HashingWriter (use as context manager)
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return HashingWriter(self, path, source, camera)
+
+    def import_file(
+        self,
+        src: str | Path,
+        dest_name: str | None = None,
+        source: str = "unknown",
+        camera: str | None = None,
+    ) -> StoredRecording | None:
+        """Copy an external file into the store, hashing while copying.
+
+        Args:
+            src: Source file (e.g. a ring buffer SaveBuffer output)
+            dest_name: Name relative to store root (defaults to src name)
+            source: Origin label
+            camera: Camera id
+
+        Returns:
+            Stored record, or None if the copy failed
+        """
+        src = Path(src)
+        dest = self.root / (dest_name or src.name)
+
+        try:
+            with open(src, "rb") as fin, self.open_write(dest, source, camera) as writer:
+                shutil.copyfileobj(fin, writer, CHUNK_SIZE)
+        except OSError as e:
+            print(f"Failed to import {src}: {e}")
+            return None
+
+        return writer.record
+
+    def ingest(
+        self,
+        path: str | Path,
+        source: str = "unknown",
+        camera: str | None = None,
+        digest: str | None = None,
+        autosave: bool = True,
+    ) -> StoredRecording:
+        """Index a file, hard-linking it to an existing copy if identical.
+
+        Args:
+            path: File to index
+            source: Origin label
+            camera: Camera id (defaults to store camera)
+            digest: Precomputed SHA-256 (hashed from disk if None)
+            autosave: Write the index after adding the entry
+
+        Returns:
+            Stored record
+        """
+        path = Path(path).resolve()
+        key = str(path)
+        stat = path.stat()
+
+        with self._lock:
+            existing = self._files.get(key)
+            if (
+                digest is None
+                and existing
+                and existing.size == stat.st_size
+                and existing.mtime_ns == stat.st_mtime_ns
+            ):
+                return existing
+
+        if digest is None:
+            digest = hash_file(path)
+
+        start, end = parse_recording_times(path)
+        if start is None or end is None:
+            duration = probe_duration(path)
+            if duration is not None:
+                if start is None and end is not None:
+                    start = end - duration
+                elif start is not None and end is None:
+                    end = start + duration
+
+        with self._lock:
+            self._remove(key)
+            self._link_duplicate(path, digest, stat)
+
+            stat = path.stat()
+            record = StoredRecording(
+                path=key,
+                digest=digest,
+                size=stat.st_size,
+                mtime_ns=stat.st_mtime_ns,
+                camera=camera or self.camera,
+                source=source,
+                start=start,
+                end=end,
+            )
+            self._add(record)
+            if autosave:
+                self.save()
+            return record
+
+    def _link_duplicate(self, path: Path, digest: str, stat: os.stat_result) -> None:
+        """Replace path with a hard link to an existing file of the same digest."""
+        for other in self._by_digest.get(digest, []):
+            other_path = Path(other)
+            try:
+                other_stat = other_path.stat()
+            except OSError:
+                continue
+
+            if other_stat.st_ino == stat.st_ino and other_stat.st_dev == stat.st_dev:
+                return  # Already linked
+            if other_stat.st_dev != stat.st_dev or other_stat.st_size != stat.st_size:
+                continue
+
+            tmp_path = path.with_name(f".{path.name}.link")
+            try:
+                os.link(other_path, tmp_path)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                tmp_path.unlink(missing_ok=True)
+                print(f"Could not hard-link duplicate {path.name}: {e}")
+                continue
+
+            self.reclaimed_bytes += stat.st_size
+            print(f"Deduplicated {path.name} -> {other_path.name}")
+            return
+
+    def scan(self, root: str | Path | None = None, source: str = "local") -> int:
+        """Index all recordings under a directory.
+
+        Unchanged files (same size and mtime) are not re-hashed.
+
+        Args:
+            root: Directory to scan (defaults to store root)
+            source: Origin label for new files
+
+        Returns:
+            Number of files indexed
+        """
+        root = Path(root) if root else self.root
+        count = 0
+
+        for path in root.rglob("*.mp4"):
+            if any(part.startswith(".") for part in path.relative_to(root).parts):
+                continue
+            self.ingest(path, source=source, autosave=False)
+            count += 1
+
+        if not self.prune():
+            self.save()
+        return count
+
+    def prune(self) -> int:
+        """Drop index entries for files that no longer exist.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            missing = [p for p in self._files if not os.path.exists(p)]
+            for p in missing:
+                self._remove(p)
+            if missing:
+                self.save()
+            return len(missing)
+
+    def paths(self) -> list[Path]:
+        """Get all indexed recording paths, sorted."""
+        with self._lock:
+            return sorted(Path(p) for p in self._files)
+
+    def get(self, path: str | Path) -> StoredRecording | None:
+        """Get the index entry for a path."""
+        with self._lock:
+            return self._files.get(str(Path(path).resolve()))
+
+    def duplicates(self) -> dict[str, list[str]]:
+        """Get digests that are stored under more than one path."""
+        with self._lock:
+            return {d: list(p) for d, p in self._by_digest.items() if len(p) > 1}
+
+    def find_overlaps(self, camera: str | None = None) -> list[tuple[StoredRecording, StoredRecording]]:
+        """Find distinct recordings from the same camera with overlapping time ranges.
+
+        Args:
+            camera: Restrict to one camera (None for all)
+
+        Returns:
+            List of (earlier, later) record pairs
+        """
+        with self._lock:
+            records = [
+                r for r in self._files.values()
+                if r.start is not None and r.end is not None
+                and (camera is None or r.camera == camera)
+            ]
+
+        overlaps = []
+        by_camera: dict[str, list[StoredRecording]] = {}
+        for r in records:
+            by_camera.setdefault(r.camera, []).append(r)
+
+        for cam_records in by_camera.values():
+            cam_records.sort(key=lambda r: r.start)
+            active: list[StoredRecording] = []
+            for r in cam_records:
+                # Sweep: keep only clips still running at r.start
+                active = [a for a in active if a.end > r.start]
+                for a in active:
+                    if a.digest != r.digest:
+                        overlaps.append((a, r))
+                active.append(r)
+
+        return overlaps
+
+    def get_stats(self) -> dict:
+        """Get store statistics.
+
+        Returns:
+            Dictionary with counts and sizes (apparent and on-disk)
+        """
+        with self._lock:
+            records = list(self._files.values())
+            unique = {r.digest: r.size for r in records}
+
+        return {
+            "file_count": len(records),
+            "unique_count": len(unique),
+            "total_size_mb": sum(r.size for r in records) / (1024 * 1024),
+            "disk_size_mb": sum(unique.values()) / (1024 * 1024),
+            "reclaimed_mb": self.reclaimed_bytes / (1024 * 1024),
+            "duplicate_groups": sum(1 for p in self._by_digest.values() if len(p) > 1),
+        }
@@ -2,21 +2,163 @@
 
 import os
 import subprocess
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Callable
 from pytapo import Tapo
 from pytapo.media_stream.downloader import Downloader
 
+from .catalogue import RecordingCatalogue
+from .store import RecordingStore
+
+
+def recording_fields(recording: dict) -> dict:
+    """Get the dict carrying startTime/endTime from a getRecordings() entry.
+
+    Depending on firmware, entries are either flat or wrapped in a single
+    key (e.g. {"video0": {"startTime": ..., "endTime": ...}}).
+    """
+    if "startTime" in recording:
+        return recording
+    for value in recording.values():
+        if isinstance(value, dict) and "startTime" in value:
+            return value
+    return recording
+
+
+@dataclass
+class _Listing:
+    recordings: list[dict]
+    fetched_at: float
+    final: bool  # Fetched after the day ended, so it won't change
+
+
+class _InFlight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.recordings: list[dict] | None = None
+        self.error: Exception | None = None
+
+
+class RecordingListingCache:
+    """Cache of per-day getRecordings() listings.
+
+    - Past days are immutable once fetched after the day ended
+    - Today's listing is refetched after a short TTL
+    - Concurrent callers for the same day share one in-flight request
+    - Failures are never cached; every waiter sees the same exception
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], list[dict]],
+        today_ttl: float = 30.0,
+    ):
+        """Initialize cache.
+
+        Args:
+            fetch: Function(YYYYMMDD) returning the camera's listing; may raise
+            today_ttl: Seconds before a listing for the current day is refetched
+        """
+        self._fetch = fetch
+        self.today_ttl = today_ttl
+        self._listings: dict[str, _Listing] = {}
+        self._inflight: dict[str, _InFlight] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _is_fresh(self, listing: _Listing) -> bool:
+        return listing.final or time.monotonic() - listing.fetched_at < self.today_ttl
+
+    def get(self, date_str: str) -> list[dict]:
+        """Get the listing for a day, fetching it if needed.
+
+        Args:
+            date_str: Date in YYYYMMDD format
+
+        Returns:
+            List of recording metadata dictionaries
+        """
+        with self._lock:
+            listing = self._listings.get(date_str)
+            if listing and self._is_fresh(listing):
+                self.hits += 1
+                return list(listing.recordings)
+
+            flight = self._inflight.get(date_str)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[date_str] = _InFlight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error:
+                raise flight.error
+            return list(flight.recordings)
+
+        try:
+            recordings = self._fetch(date_str) or []
+            final = date_str < datetime.now().strftime("%Y%m%d")
+            flight.recordings = recordings
+            with self._lock:
+                self._listings[date_str] = _Listing(recordings, time.monotonic(), final)
+            return list(recordings)
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[date_str]
+            flight.event.set()
+
+    def invalidate(self, date_str: str | None = None) -> None:
+        """Drop a cached listing (or all of them).
+
+        Args:
+            date_str: Date in YYYYMMDD format, or None for everything
+        """
+        with self._lock:
+            if date_str is None:
+                self._listings.clear()
+            else:
+                self._listings.pop(date_str, None)
+
+    def get_stats(self) -> dict:
+        """Get cache statistics."""
+        with self._lock:
+            total = self.hits + self.misses + self.coalesced
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_rate": (self.hits + self.coalesced) / total if total else 0.0,
+                "cached_days": len(self._listings),
+            }
+
 
 class RecordingSync:
-    """Synchronize recordings from TAPO C210 SD card to local storage."""
+    """Synchronize recordings from TAPO C210 SD card to local storage.
+
+    The local recording catalogue (and its inotify watcher) is only
+    created when something lists local files; call close() or use the
+    sync as a context manager to release it.
+    """
 
     def __init__(
         self,
         tapo: Tapo,
         output_dir: str | Path,
         window_size: int = 50,
+        store: RecordingStore | None = None,
+        listing_ttl: float = 30.0,
     ):
         """Initialize recording sync.
 
@@ -24,12 +166,37 @@ class RecordingSync:
             tapo: Connected Tapo instance
             output_dir: Directory to save recordings
             window_size: Download window size (pytapo parameter)
+            store: Deduplicating store to index downloads into (optional)
+            listing_ttl: Seconds to reuse today's recording listing
         """
         self.tapo = tapo
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.window_size = window_size
+        self.store = store
+        self._catalogue: RecordingCatalogue | None = None
+        self.listings = RecordingListingCache(self.tapo.getRecordings, today_ttl=listing_ttl)
         self._progress_callback: Callable[[str, float], None] | None = None
+        self._download_callback: Callable[[Path], None] | None = None
+
+    @property
+    def catalogue(self) -> RecordingCatalogue:
+        """Catalogue of local recordings, created on first use."""
+        if self._catalogue is None:
+            self._catalogue = RecordingCatalogue(self.output_dir)
+        return self._catalogue
+
+    def close(self) -> None:
+        """Stop the catalogue's inotify watcher, if one was started."""
+        if self._catalogue is not None:
+            self._catalogue.close()
+            self._catalogue = None
+
+    def __enter__(self) -> "RecordingSync":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
 
     def set_progress_callback(self, callback: Callable[[str, float], None]) -> None:
         """Set callback for download progress updates.
@@ -39,6 +206,17 @@ class RecordingSync:
         """
         self._progress_callback = callback
 
+    def set_download_callback(self, callback: Callable[[Path], None]) -> None:
+        """Set callback for each newly downloaded recording.
+
+        Called from the sync thread right after a file lands, so it should
+        only hand the path off (e.g. RecordingPipeline.submit).
+
+        Args:
+            callback: Function(path)
+        """
+        self._download_callback = callback
+
     def get_recordings_for_date(self, date: str | datetime) -> list[dict]:
         """Get list of recordings for a specific date.
 
@@ -52,8 +230,7 @@ class RecordingSync:
             date = date.strftime("%Y%m%d")
 
         try:
-            recordings = self.tapo.getRecordings(date)
-            return recordings if recordings else []
+            return self.listings.get(date)
         except Exception as e:
             print(f"Failed to get recordings for {date}: {e}")
             return []
@@ -141,6 +318,61 @@ class RecordingSync:
             print(f"Failed to download recording: {e}")
             return None
 
+    def ensure_local(
+        self,
+        recording: dict,
+        date_str: str | None = None,
+        skip_existing: bool = True,
+    ) -> Path | None:
+        """Download one SD card recording into the library layout.
+
+        Files land in <output_dir>/<YYYYMMDD>/<YYYYMMDD>_<startTime>_<endTime>.mp4,
+        the same place sync_date() puts them. The end time in the name lets
+        the catalogue place the clip on a timeline without opening it.
+
+        Args:
+            recording: Recording metadata from getRecordings()
+            date_str: Date directory (derived from startTime if None)
+            skip_existing: Return the existing file instead of re-downloading
+
+        Returns:
+            Path to the local file or None if failed
+        """
+        recording = recording_fields(recording)
+        start_time = recording.get("startTime", "")
+        end_time = recording.get("endTime")
+        if date_str is None:
+            try:
+                date_str = datetime.fromtimestamp(int(start_time)).strftime("%Y%m%d")
+            except (TypeError, ValueError):
+                print(f"Recording has no usable startTime: {recording}")
+                return None
+
+        date_dir = self.output_dir / date_str
+        date_dir.mkdir(exist_ok=True)
+        legacy_filename = f"{date_str}_{start_time}.mp4"
+        filename = f"{date_str}_{start_time}_{end_time}.mp4" if end_time else legacy_filename
+
+        if skip_existing:
+            # Older syncs named files by start time only
+            for existing in (filename, legacy_filename):
+                if (date_dir / existing).exists():
+                    print(f"  Skipping existing: {existing}")
+                    return date_dir / existing
+
+        result = self.download_recording(
+            recording,
+            output_filename=str(date_dir / filename),
+        )
+        if result:
+            if self._catalogue is not None:
+                self._catalogue.mark_dirty(result)
+            if self.store:
+                self.store.ingest(result, source="sd_card")
+            if self._download_callback:
+                self._download_callback(result)
+        return result
+
     def sync_date(
         self,
         date: str | datetime,
@@ -166,24 +398,9 @@ class RecordingSync:
             return []
 
         downloaded = []
-        date_dir = self.output_dir / date_str
-        date_dir.mkdir(exist_ok=True)
-
         for i, recording in enumerate(recordings):
             print(f"Downloading recording {i + 1}/{len(recordings)} for {date_str}")
-
-            start_time = recording.get("startTime", str(i))
-            filename = f"{date_str}_{start_time}.mp4"
-
-            if skip_existing and (date_dir / filename).exists():
-                print(f"  Skipping existing: {filename}")
-                downloaded.append(date_dir / filename)
-                continue
-
-            result = self.download_recording(
-                recording,
-                output_filename=str(date_dir / filename),
-            )
+            result = self.ensure_local(recording, date_str, skip_existing=skip_existing)
             if result:
                 downloaded.append(result)
 
@@ -234,10 +451,27 @@ class RecordingSync:
         Returns:
             List of recording file paths
         """
-        recordings = []
-        for path in self.output_dir.rglob("*.mp4"):
-            recordings.append(path)
-        return sorted(recordings)
+        if self.store:
+            return self.store.paths()
+
+        # Hidden dirs (e.g. .previews/) are skipped by the catalogue
+        return self.catalogue.paths()
+
+    def list_local_recordings_between(
+        self,
+        start: datetime,
+        end: datetime,
+    ) -> list[Path]:
+        """List locally synced recordings overlapping a time range.
+
+        Args:
+            start: Range start
+            end: Range end
+
+        Returns:
+            Recording paths ordered by start time
+        """
+        return self.catalogue.query(start, end)
 
     def get_sync_status(self) -> dict:
         """Get synchronization status.
@@ -245,15 +479,28 @@ class RecordingSync:
         Returns:
             Status dictionary with local and remote recording counts
         """
-        local_recordings = self.list_local_recordings()
-
         # Get today's recordings from camera
         today = datetime.now().strftime("%Y%m%d")
         remote_today = self.get_recordings_for_date(today)
 
+        if self.store:
+            stats = self.store.get_stats()
+            return {
+                "local_count": stats["file_count"],
+                "local_size_mb": stats["total_size_mb"],
+                "disk_size_mb": stats["disk_size_mb"],
+                "reclaimed_mb": stats["reclaimed_mb"],
+                "remote_today_count": len(remote_today),
+                "listing_cache": self.listings.get_stats(),
+                "output_dir": str(self.output_dir),
+            }
+
+        entries = self.catalogue.entries()
+
         return {
-            "local_count": len(local_recordings),
-            "local_size_mb": sum(p.stat().st_size for p in local_recordings) / (1024 * 1024),
+            "local_count": len(entries),
+            "local_size_mb": sum(e.size for e in entries) / (1024 * 1024),
             "remote_today_count": len(remote_today),
+            "listing_cache": self.listings.get_stats(),
             "output_dir": str(self.output_dir),
         }
@@ -0,0 +1,5 @@
+"""Test doubles for running the monitor without cameras or devices."""
+
+from .fake_adb import FakeAdbServer
+
+__all__ = ["FakeAdbServer"]
@@ -0,0 +1,132 @@
+"""In-process stand-in for the ADB server.
+
+Speaks enough of the adb server's socket protocol (host:version,
+host:devices, host:track-devices) for DeviceTracker, DeviceMonitor and
+DevicePool to run without adb or a device, in tests and benchmarks.
+"""
+
+import socket
+import socketserver
+import threading
+
+from ..android.adb_protocol import DEFAULT_HOST, encode_request, read_message
+
+
+class _ThreadingServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+    request_queue_size = 128  # Pools poll often; don't drop connections
+
+
+class FakeAdbServer:
+    """In-process stand-in for the ADB server, for tests and benchmarks.
+
+    Answers host:version, host:devices and host:track-devices from a
+    device table that can be changed while it runs.
+
+    Usage:
+        with FakeAdbServer({"emulator-5554": "device"}) as server:
+            list_devices(port=server.port)
+            server.set_device("emulator-5554", "offline")
+    """
+
+    def __init__(self, devices: dict[str, str] | None = None, host: str = DEFAULT_HOST, port: int = 0):
+        """Initialize server (call start(), or use as a context manager).
+
+        Args:
+            devices: Initial {serial: state}
+            host: Listen address
+            port: Listen port (0 = any free port)
+        """
+        self.devices = dict(devices or {})
+        self._cond = threading.Condition()
+        self._version = 0
+        self._closed = False
+        self.requests: list[str] = []
+
+        fake = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                fake._handle(self.request)
+
+        self._server = _ThreadingServer((host, port), Handler)
+        self.host, self.port = self._server.server_address[:2]
+        self._thread: threading.Thread | None = None
+
+    # -- device table --
+
+    def set_device(self, serial: str, state: str = "device") -> None:
+        """Add a device or change its state."""
+        with self._cond:
+            self.devices[serial] = state
+            self._version += 1
+            self._cond.notify_all()
+
+    def remove_device(self, serial: str) -> None:
+        """Unplug a device."""
+        with self._cond:
+            self.devices.pop(serial, None)
+            self._version += 1
+            self._cond.notify_all()
+
+    def _payload(self) -> bytes:
+        text = "".join(f"{serial}\t{state}\n" for serial, state in self.devices.items())
+        return encode_request(text)
+
+    # -- protocol --
+
+    def _handle(self, sock: socket.socket) -> None:
+        try:
+            service = read_message(sock)
+        except (ConnectionError, ValueError):
+            return
+        self.requests.append(service)
+
+        if service == "host:version":
+            sock.sendall(b"OKAY" + encode_request("0029"))
+        elif service == "host:devices":
+            with self._cond:
+                sock.sendall(b"OKAY" + self._payload())
+        elif service == "host:track-devices":
+            self._track(sock)
+        else:
+            sock.sendall(b"FAIL" + encode_request(f"unknown service {service}"))
+
+    def _track(self, sock: socket.socket) -> None:
+        """Stream the device list now and after every change."""
+        with self._cond:
+            version = self._version
+            payload = b"OKAY" + self._payload()
+        try:
+            while True:
+                sock.sendall(payload)
+                with self._cond:
+                    self._cond.wait_for(lambda: self._version != version or self._closed)
+                    if self._closed:
+                        return
+                    version = self._version
+                    payload = self._payload()
+        except OSError:
+            return  # Client went away
+
+    # -- lifecycle --
+
+    def start(self) -> "FakeAdbServer":
+        # Short poll so close() returns promptly between tests
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeAdbServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
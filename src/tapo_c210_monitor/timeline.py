@@ -0,0 +1,365 @@
+"""Unified timeline over SD card recordings, ring buffer segments and local clips.
+
+Each source reports footage as (start, end) intervals in unix seconds:
+
+- local: synced clips, via the RecordingSync catalogue
+- ringbuffer: recent segments, via the ring buffer /segments endpoint
+- sd_card: recordings listed by getRecordings() for each day in range
+
+plan() sweeps the merged intervals once and, for every sub-range, picks the
+cheapest source that covers it, so "14:02-14:07 yesterday" resolves to a
+short list of (file, inpoint, outpoint) pieces. stream_clip() feeds those
+pieces straight to ffmpeg's concat demuxer and yields MPEG-TS bytes;
+frames() decodes them in place. Neither writes intermediate files.
+"""
+
+import heapq
+import subprocess
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+
+from .ringbuffer import RingBufferClient
+from .sync import RecordingSync, recording_fields
+
+# Relative cost of reading footage from each source. Local and ring buffer
+# files are read in place; SD card footage has to be pulled over the
+# camera's relay first.
+SOURCE_COST = {
+    "local": 0,
+    "ringbuffer": 1,
+    "sd_card": 10,
+}
+
+
+@dataclass(frozen=True)
+class TimelineSegment:
+    """A span of footage available from one source."""
+    start: float
+    end: float
+    source: str
+    location: str  # File path, or "" for SD card recordings
+    recording: dict = field(default_factory=dict, compare=False, hash=False)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+@dataclass(frozen=True)
+class ClipPiece:
+    """A sub-range of the output clip, read from one segment."""
+    start: float
+    end: float
+    segment: TimelineSegment
+
+    @property
+    def inpoint(self) -> float:
+        """Offset into the segment's file where this piece begins."""
+        return self.start - self.segment.start
+
+    @property
+    def outpoint(self) -> float:
+        """Offset into the segment's file where this piece ends."""
+        return self.end - self.segment.start
+
+
+def _to_unix(value: datetime | float) -> float:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return float(value)
+
+
+class TimelineService:
+    """Answer time-range queries across all footage sources.
+
+    Usage:
+        timeline = TimelineService(sync, RingBufferClient())
+        start = datetime(2026, 1, 11, 14, 2)
+        for chunk in timeline.stream_clip(start, start + timedelta(minutes=5)):
+            out.write(chunk)
+    """
+
+    def __init__(
+        self,
+        sync: RecordingSync | None = None,
+        ringbuffer: RingBufferClient | None = None,
+        include_sd_card: bool = True,
+    ):
+        """Initialize timeline.
+
+        Args:
+            sync: Recording sync (local catalogue and SD card listings)
+            ringbuffer: Ring buffer client
+            include_sd_card: Query the camera for footage not held locally
+        """
+        self.sync = sync
+        self.ringbuffer = ringbuffer
+        self.include_sd_card = include_sd_card
+
+    def _local_segments(self, start: float, end: float) -> list[TimelineSegment]:
+        if not self.sync:
+            return []
+        return [
+            TimelineSegment(s, e, "local", str(path))
+            for s, e, path in self.sync.catalogue.query_intervals(start, end)
+        ]
+
+    def _ringbuffer_segments(self, start: float, end: float) -> list[TimelineSegment]:
+        if not self.ringbuffer:
+            return []
+        try:
+            segments = self.ringbuffer.segments()
+        except Exception as e:
+            print(f"Ring buffer unavailable: {e}")
+            return []
+        return [
+            TimelineSegment(float(s["start"]), float(s["end"]), "ringbuffer", s["path"])
+            for s in segments
+            if s["end"] > start and s["start"] < end
+        ]
+
+    def _sd_card_segments(self, start: float, end: float) -> list[TimelineSegment]:
+        if not (self.sync and self.include_sd_card):
+            return []
+
+        segments = []
+        day = datetime.fromtimestamp(start).date()
+        last_day = datetime.fromtimestamp(end).date()
+        while day <= last_day:
+            for recording in self.sync.get_recordings_for_date(day.strftime("%Y%m%d")):
+                fields = recording_fields(recording)
+                try:
+                    s = float(fields["startTime"])
+                    e = float(fields["endTime"])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                if e > start and s < end:
+                    segments.append(TimelineSegment(s, e, "sd_card", "", fields))
+            day += timedelta(days=1)
+        return segments
+
+    def intervals(
+        self,
+        start: datetime | float,
+        end: datetime | float,
+    ) -> list[TimelineSegment]:
+        """List footage from all sources overlapping a time range.
+
+        Args:
+            start: Range start (datetime or unix seconds)
+            end: Range end (datetime or unix seconds)
+
+        Returns:
+            Segments ordered by start time
+        """
+        start, end = _to_unix(start), _to_unix(end)
+        segments = (
+            self._local_segments(start, end)
+            + self._ringbuffer_segments(start, end)
+            + self._sd_card_segments(start, end)
+        )
+        segments.sort(key=lambda s: (s.start, SOURCE_COST.get(s.source, 99)))
+        return segments
+
+    def plan(
+        self,
+        start: datetime | float,
+        end: datetime | float,
+        segments: list[TimelineSegment] | None = None,
+    ) -> list[ClipPiece]:
+        """Choose the cheapest source for every sub-range of a time range.
+
+        Sweeps the segment boundaries in order, keeping the segments that
+        cover the current point in a heap keyed by source cost. Segments
+        that have ended are dropped lazily when they reach the top, so the
+        whole plan is O(n log n) in the number of segments.
+
+        Args:
+            start: Range start (datetime or unix seconds)
+            end: Range end (datetime or unix seconds)
+            segments: Pre-fetched segments (queried if None)
+
+        Returns:
+            Pieces in time order; uncovered sub-ranges are simply absent
+        """
+        start, end = _to_unix(start), _to_unix(end)
+        if segments is None:
+            segments = self.intervals(start, end)
+
+        segments = sorted(
+            (s for s in segments if s.end > start and s.start < end),
+            key=lambda s: s.start,
+        )
+        boundaries = sorted(
+            {start, end}
+            | {s.start for s in segments if s.start > start}
+            | {s.end for s in segments if s.end < end}
+        )
+
+        pieces: list[ClipPiece] = []
+        heap: list[tuple[int, float, int, TimelineSegment]] = []
+        next_segment = 0
+
+        for lo, hi in zip(boundaries, boundaries[1:]):
+            while next_segment < len(segments) and segments[next_segment].start <= lo:
+                seg = segments[next_segment]
+                # Prefer the longest-running segment among equal-cost ones
+                # to avoid needless cuts
+                heapq.heappush(heap, (SOURCE_COST.get(seg.source, 99), -seg.end, next_segment, seg))
+                next_segment += 1
+
+            while heap and heap[0][3].end <= lo:
+                heapq.heappop(heap)
+            if not heap:
+                continue
+
+            seg = heap[0][3]
+            if pieces and pieces[-1].segment == seg and pieces[-1].end == lo:
+                pieces[-1] = ClipPiece(pieces[-1].start, hi, seg)
+            else:
+                pieces.append(ClipPiece(lo, hi, seg))
+
+        return pieces
+
+    def gaps(
+        self,
+        start: datetime | float,
+        end: datetime | float,
+        pieces: list[ClipPiece] | None = None,
+    ) -> list[tuple[float, float]]:
+        """Find sub-ranges with no footage from any source.
+
+        Args:
+            start: Range start (datetime or unix seconds)
+            end: Range end (datetime or unix seconds)
+            pieces: Pre-computed plan (computed if None)
+
+        Returns:
+            (start, end) tuples in unix seconds
+        """
+        start, end = _to_unix(start), _to_unix(end)
+        if pieces is None:
+            pieces = self.plan(start, end)
+
+        gaps = []
+        cursor = start
+        for piece in pieces:
+            if piece.start > cursor:
+                gaps.append((cursor, piece.start))
+            cursor = max(cursor, piece.end)
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def _resolve(self, piece: ClipPiece) -> Path | None:
+        """Get a readable file for a piece.
+
+        SD card footage can only be fetched to a file, so it is synced into
+        the local library, where later queries will find it as "local".
+        """
+        if piece.segment.source != "sd_card":
+            return Path(piece.segment.location)
+        if not self.sync:
+            return None
+        return self.sync.ensure_local(piece.segment.recording)
+
+    def stream_clip(
+        self,
+        start: datetime | float,
+        end: datetime | float,
+        chunk_size: int = 64 * 1024,
+    ) -> Iterator[bytes]:
+        """Stream a time range as one MPEG-TS clip.
+
+        The pieces are passed to ffmpeg's concat demuxer with in/out points
+        and remuxed without re-encoding, so output starts flowing before the
+        whole range has been read.
+
+        Args:
+            start: Range start (datetime or unix seconds)
+            end: Range end (datetime or unix seconds)
+            chunk_size: Bytes per yielded chunk
+
+        Yields:
+            MPEG-TS data
+        """
+        lines = ["ffconcat version 1.0"]
+        for piece in self.plan(start, end):
+            path = self._resolve(piece)
+            if path is None:
+                print(f"Skipping unavailable footage {piece.start:.0f}-{piece.end:.0f}")
+                continue
+            escaped = str(path.resolve()).replace("'", "'\\''")
+            lines.append(f"file '{escaped}'")
+            lines.append(f"inpoint {piece.inpoint:.3f}")
+            lines.append(f"outpoint {piece.outpoint:.3f}")
+
+        if len(lines) == 1:
+            return
+
+        cmd = [
+            "ffmpeg", "-v", "error",
+            "-f", "concat", "-safe", "0",
+            "-protocol_whitelist", "file,pipe",
+            "-i", "pipe:0",
+            "-c", "copy",
+            "-f", "mpegts", "pipe:1",
+        ]
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        try:
+            proc.stdin.write(("\n".join(lines) + "\n").encode())
+            proc.stdin.close()
+            while True:
+                chunk = proc.stdout.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+            proc.wait()
+
+    def frames(
+        self,
+        start: datetime | float,
+        end: datetime | float,
+        fps: float = 1.0,
+    ) -> Iterator[tuple[float, np.ndarray]]:
+        """Decode frames across a time range.
+
+        Args:
+            start: Range start (datetime or unix seconds)
+            end: Range end (datetime or unix seconds)
+            fps: Frames per second to yield
+
+        Yields:
+            (unix timestamp, BGR frame) tuples in time order
+        """
+        import cv2
+
+        interval = 1.0 / fps
+        for piece in self.plan(start, end):
+            path = self._resolve(piece)
+            if path is None:
+                continue
+
+            cap = cv2.VideoCapture(str(path))
+            if not cap.isOpened():
+                print(f"Could not open video: {path}")
+                continue
+
+            try:
+                t = piece.start
+                while t < piece.end:
+                    cap.set(cv2.CAP_PROP_POS_MSEC, (t - piece.segment.start) * 1000)
+                    ok, frame = cap.read()
+                    if not ok:
+                        break
+                    yield t, frame
+                    t += interval
+            finally:
+                cap.release()
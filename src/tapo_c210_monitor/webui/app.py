@@ -4,13 +4,14 @@ Web UI for Tapo C210 Monitor Configuration
 A simple web interface to collect camera settings and test connections.
 """
 
+import asyncio
 import os
 import json
 from pathlib import Path
 from fastapi import FastAPI, Request
 from fastapi.responses import HTMLResponse, JSONResponse
 
-from ..discovery import discover_camera, check_port, get_rtsp_url
+from ..discovery import discover_camera_async, discover_inventory, async_check_port, get_rtsp_url
 
 app = FastAPI(title="Tapo C210 Monitor Setup")
 
@@ -134,18 +135,30 @@ async def index():
 
 @app.get("/api/discover")
 async def api_discover(subnet: str = "192.168.29"):
-    camera_ip = discover_camera(subnet=subnet)
+    camera_ip = await discover_camera_async(subnet=subnet)
     if camera_ip:
-        ports_open = [p for p in [554, 2020, 443, 8800] if check_port(camera_ip, p)]
+        ports = [554, 2020, 443, 8800]
+        rtts = await asyncio.gather(*(async_check_port(camera_ip, p, timeout=1.0) for p in ports))
+        ports_open = [p for p, rtt in zip(ports, rtts) if rtt is not None]
         return {"camera_ip": camera_ip, "ports_open": ports_open}
     return {"camera_ip": None, "ports_open": []}
 
 
+@app.get("/api/inventory")
+async def api_inventory(cidr: str | None = None):
+    try:
+        inventory = await discover_inventory([cidr] if cidr else None)
+    except ValueError as e:
+        # Malformed, or wider than a /22 (a /8 would list 16M hosts)
+        return JSONResponse({"error": str(e)}, status_code=400)
+    return inventory.to_dict()
+
+
 @app.post("/api/test")
 async def api_test(request: Request):
     import subprocess
     data = await request.json()
-    camera_ip = discover_camera(subnet=data.get("subnet", "192.168.29"))
+    camera_ip = await discover_camera_async(subnet=data.get("subnet", "192.168.29"))
     if not camera_ip:
         return {"success": False, "error": "Camera not found"}
     url = f"rtsp://{data['username']}:{data['password']}@{camera_ip}/stream1"
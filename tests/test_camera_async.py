@@ -0,0 +1,376 @@
+"""AsyncTapoCamera against a local stand-in for the camera's control endpoint.
+
+The endpoint speaks pytapo's request shape (login, then multipleRequest
+batches) as plain JSON over HTTP. EndpointTapo replaces pytapo.Tapo inside
+TapoCamera, so connect(), the status batch and every facade call make real
+blocking round-trips on the session thread.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from tapo_c210_monitor import camera as camera_module
+from tapo_c210_monitor.camera import TapoCamera
+from tapo_c210_monitor.camera_async import AsyncTapoCamera
+
+USERNAME = "monitor"
+PASSWORD = "secret"
+CLOUD_PASSWORD = "cloud-secret"
+
+RESULTS = {
+    "getDeviceInfo": {"device_info": {"basic_info": {"device_type": "SMART.IPCAMERA", "device_model": "C210"}}},
+    "getLedStatus": {"led": {"config": {"enabled": "on"}}},
+    "getLensMaskConfig": {"lens_mask": {"lens_mask_info": {"enabled": "off"}}},
+    "getDetectionConfig": {"motion_detection": {"motion_det": {"enabled": "on", "sensitivity": "medium"}}},
+    "getLastAlarmInfo": {"msg_alarm": {"chn1_msg_alarm_info": {"enabled": "off"}}},
+    "getClockStatus": {"system": {"clock_status": {"seconds_from_1970": 1768300000}}},
+    "setLedStatus": {},
+    "motorMove": {},
+}
+
+
+class FakeCameraEndpoint(ThreadingHTTPServer):
+    """Camera control endpoint that records every request it serves."""
+
+    daemon_threads = True
+
+    def __init__(self, accept=(USERNAME, PASSWORD)):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.accept = accept
+        self.delays: dict[str, float] = {}
+        self.failing: set[str] = set()
+        self.logins: list[tuple[str, str]] = []
+        self.batches: list[list[str]] = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        threading.Thread(target=self.serve_forever, args=(0.05,), daemon=True).start()
+
+    @property
+    def host(self) -> str:
+        return f"127.0.0.1:{self.server_address[1]}"
+
+    def calls(self, method: str) -> int:
+        return sum(batch.count(method) for batch in self.batches)
+
+    def close(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def handle_call(self, request: dict) -> dict:
+        params = request.get("params", {})
+        if request["method"] == "login":
+            credentials = (params.get("username"), params.get("password"))
+            with self.lock:
+                self.logins.append(credentials)
+            if credentials != self.accept:
+                return {"error_code": -40401}
+            return {"error_code": 0, "result": {"stok": "stok"}}
+
+        methods = [r["method"] for r in params["requests"]]
+        with self.lock:
+            self.batches.append(methods)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(max(self.delays.get(m, 0.0) for m in methods))
+            responses = [
+                {"method": m, "error_code": -1} if m in self.failing
+                else {"method": m, "error_code": 0, "result": RESULTS[m]}
+                for m in methods
+            ]
+        finally:
+            with self.lock:
+                self.active -= 1
+        return {"error_code": 0, "result": {"responses": responses}}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        body = json.dumps(self.server.handle_call(request)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class EndpointTapo:
+    """The slice of pytapo.Tapo (3.4) that TapoCamera uses, over the fake endpoint.
+
+    Like pytapo, the constructor logs in and fetches basic info, raising if
+    either fails. As in pytapo 3.4 there is no public refreshStok().
+    """
+
+    def __init__(self, host, user, password):
+        self.url = f"http://{host}/"
+        self.user = user
+        self.password = password
+        self._login()
+        self.basicInfo = self.getBasicInfo()
+
+    def _post(self, request: dict) -> dict:
+        response = httpx.post(self.url, json=request, timeout=5.0).json()
+        if response.get("error_code", 0) != 0:
+            raise Exception(f"Error: {response['error_code']}")
+        return response["result"]
+
+    def _login(self):
+        return self._post({"method": "login", "params": {"username": self.user, "password": self.password}})
+
+    def executeFunction(self, method, params):
+        requests = params["requests"] if method == "multipleRequest" else [{"method": method, "params": params}]
+        responses = self._post({"method": "multipleRequest", "params": {"requests": requests}})["responses"]
+        if method == "multipleRequest":
+            return responses
+        if responses[0]["error_code"] != 0:
+            raise Exception(f"Error: {responses[0]['error_code']}")
+        return responses[0]["result"]
+
+    def getBasicInfo(self):
+        return self.executeFunction("getDeviceInfo", {"device_info": {"name": ["basic_info"]}})
+
+    def getLED(self):
+        return self.executeFunction("getLedStatus", {"led": {"name": ["config"]}})["led"]["config"]["enabled"] == "on"
+
+    def setLED(self, enabled):
+        self.executeFunction("setLedStatus", {"led": {"config": {"enabled": "on" if enabled else "off"}}})
+
+    def moveMotor(self, x, y):
+        self.executeFunction("motorMove", {"motor": {"move": {"x_coord": str(x), "y_coord": str(y)}}})
+
+
+class LegacyEndpointTapo(EndpointTapo):
+    """pytapo 3.3, which re-logs in through refreshStok()."""
+
+    def refreshStok(self):
+        return self._login()
+
+
+@pytest.fixture
+def endpoint(monkeypatch):
+    monkeypatch.setattr(camera_module, "Tapo", EndpointTapo)
+    server = FakeCameraEndpoint()
+    yield server
+    server.close()
+
+
+def make_facade(endpoint, **kwargs) -> AsyncTapoCamera:
+    camera = TapoCamera(endpoint.host, USERNAME, PASSWORD, cloud_password=CLOUD_PASSWORD)
+    kwargs.setdefault("keepalive_interval", 0)
+    return AsyncTapoCamera(camera, **kwargs)
+
+
+def test_start_connects_once(endpoint):
+    async def main():
+        cam = make_facade(endpoint)
+        assert await cam.start()
+        assert cam.camera.is_connected
+        await cam.close()
+
+    asyncio.run(main())
+    assert endpoint.logins == [(USERNAME, PASSWORD)]
+
+
+def test_connect_falls_back_to_cloud_password_and_remembers_it(endpoint):
+    endpoint.accept = ("admin", CLOUD_PASSWORD)
+
+    async def main():
+        cam = make_facade(endpoint)
+        assert await cam.start()
+        await cam.close()
+        return cam.camera
+
+    camera = asyncio.run(main())
+    assert endpoint.logins == [(USERNAME, PASSWORD), ("admin", CLOUD_PASSWORD)]
+
+    endpoint.logins.clear()
+    assert camera.connect()
+    assert endpoint.logins == [("admin", CLOUD_PASSWORD)]
+
+
+def test_start_reports_rejected_credentials(endpoint):
+    endpoint.accept = ("nobody", "nothing")
+
+    async def main():
+        cam = make_facade(endpoint)
+        assert not await cam.start()
+        with pytest.raises(RuntimeError, match="Could not connect"):
+            async with make_facade(endpoint):
+                pass
+
+    asyncio.run(main())
+
+
+def test_start_reports_unreachable_camera(endpoint):
+    endpoint.close()
+
+    async def main():
+        cam = make_facade(endpoint)
+        assert not await cam.start()
+
+    asyncio.run(main())
+
+
+def test_concurrent_reads_share_one_request(endpoint):
+    async def main():
+        async with make_facade(endpoint) as cam:
+            endpoint.batches.clear()
+            endpoint.delays["getDeviceInfo"] = 0.2
+            results = await asyncio.gather(*(cam.get_basic_info() for _ in range(5)))
+            return cam, results
+
+    cam, results = asyncio.run(main())
+    assert endpoint.calls("getDeviceInfo") == 1
+    assert cam.stats["coalesced_reads"] == 4
+    assert all(r == results[0] for r in results)
+
+
+def test_sequential_reads_are_not_coalesced(endpoint):
+    async def main():
+        async with make_facade(endpoint) as cam:
+            endpoint.batches.clear()
+            assert await cam.get_led_status()
+            assert await cam.get_led_status()
+
+    asyncio.run(main())
+    assert endpoint.calls("getLedStatus") == 2
+
+
+def test_status_snapshot_is_one_batched_request(endpoint):
+    endpoint.failing.add("getLastAlarmInfo")
+
+    async def main():
+        async with make_facade(endpoint) as cam:
+            endpoint.batches.clear()
+            return await cam.get_status_snapshot()
+
+    status = asyncio.run(main())
+    assert len(endpoint.batches) == 1
+    assert len(endpoint.batches[0]) == 6
+    assert status.led_enabled is True
+    assert status.privacy_enabled is False
+    assert status.motion_enabled is True
+    assert status.alarm is None
+    assert "alarm" in status.errors
+
+
+def test_control_commands_run_in_order_without_overlap(endpoint):
+    endpoint.delays["setLedStatus"] = 0.05
+    endpoint.delays["motorMove"] = 0.05
+
+    async def main():
+        async with make_facade(endpoint) as cam:
+            endpoint.batches.clear()
+            endpoint.max_active = 0
+            await asyncio.gather(
+                cam.set_led(False),
+                cam.move_motor(10, 0),
+                cam.set_led(True),
+                cam.move_motor(-10, 0),
+            )
+
+    asyncio.run(main())
+    assert [b[0] for b in endpoint.batches] == ["setLedStatus", "motorMove", "setLedStatus", "motorMove"]
+    assert endpoint.max_active == 1
+
+
+def test_control_requires_start(endpoint):
+    async def main():
+        cam = make_facade(endpoint)
+        with pytest.raises(RuntimeError, match="not started"):
+            await cam.set_led(True)
+
+    asyncio.run(main())
+
+
+def test_read_timeout(endpoint):
+    async def main():
+        async with make_facade(endpoint) as cam:
+            endpoint.delays["getLedStatus"] = 0.5
+            with pytest.raises(asyncio.TimeoutError):
+                await cam.get_led_status(timeout=0.05)
+            return cam
+
+    cam = asyncio.run(main())
+    assert cam.stats["timeouts"] == 1
+
+
+def test_shared_read_failure_reaches_every_caller(endpoint):
+    endpoint.failing.add("getLedStatus")
+    endpoint.delays["getLedStatus"] = 0.1
+
+    async def main():
+        async with make_facade(endpoint) as cam:
+            endpoint.batches.clear()
+            results = await asyncio.gather(
+                *(cam.get_led_status() for _ in range(3)),
+                return_exceptions=True,
+            )
+            assert endpoint.calls("getLedStatus") == 1
+
+            # The failed read isn't cached; the next call asks again
+            endpoint.failing.clear()
+            assert await cam.get_led_status()
+            return results
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, Exception) for r in results)
+    assert endpoint.calls("getLedStatus") == 2
+
+
+def test_failed_control_command_does_not_stall_queue(endpoint):
+    endpoint.failing.add("motorMove")
+
+    async def main():
+        async with make_facade(endpoint) as cam:
+            with pytest.raises(Exception, match="-1"):
+                await cam.move_motor(10, 0)
+            await asyncio.wait_for(cam.set_led(True), timeout=2)
+
+    asyncio.run(main())
+    assert endpoint.calls("setLedStatus") == 1
+
+
+def run_idle(endpoint, seconds: float) -> AsyncTapoCamera:
+    async def main():
+        async with make_facade(endpoint, keepalive_interval=0.2) as cam:
+            endpoint.batches.clear()
+            await asyncio.sleep(seconds)
+            return cam
+
+    cam = asyncio.run(main())
+    # Let a refresh that was in flight at close() reach the endpoint
+    cam._executor.shutdown(wait=True)
+    return cam
+
+
+def test_keepalive_refreshes_idle_session(endpoint):
+    cam = run_idle(endpoint, 0.5)
+
+    assert cam.stats["refreshes"] >= 1
+    # pytapo 3.4 has no refreshStok; a basic-info call keeps the session
+    # alive without logging in again
+    assert endpoint.logins == [(USERNAME, PASSWORD)]
+    assert endpoint.calls("getDeviceInfo") == cam.stats["refreshes"]
+
+
+def test_keepalive_uses_refresh_stok_when_available(endpoint, monkeypatch):
+    monkeypatch.setattr(camera_module, "Tapo", LegacyEndpointTapo)
+
+    cam = run_idle(endpoint, 0.5)
+
+    assert cam.stats["refreshes"] >= 1
+    # Refreshes reuse the working credentials instead of a full reconnect
+    assert len(endpoint.logins) == 1 + cam.stats["refreshes"]
+    assert endpoint.calls("getDeviceInfo") == 0
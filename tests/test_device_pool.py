@@ -0,0 +1,201 @@
+"""DevicePool against FakeAdbServer.
+
+Devices come and go through the fake server's track-devices stream, so
+the pool's tracker, monitors and workers run for real; only the
+AndroidController is replaced by FakeController.
+"""
+
+import threading
+import time
+from concurrent.futures import CancelledError
+
+import pytest
+
+from tapo_c210_monitor.android.device_pool import DevicePool
+from tapo_c210_monitor.testing.fake_adb import FakeAdbServer
+
+SERIALS = ["emulator-5554", "emulator-5556", "emulator-5558"]
+
+
+class FakeController:
+    """Stands in for AndroidController; records the jobs it ran."""
+
+    def __init__(self, serial: str):
+        self.device_serial = serial
+        self.ran: list = []
+        self.closed = False
+
+    def connect(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def wait_until(predicate, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.01)
+
+
+def work(controller, item, seconds: float = 0.02):
+    """Job recording where it ran."""
+    time.sleep(seconds)
+    controller.ran.append(item)
+    return controller.device_serial, item
+
+
+@pytest.fixture
+def server():
+    with FakeAdbServer({serial: "device" for serial in SERIALS}) as srv:
+        yield srv
+
+
+@pytest.fixture
+def controllers():
+    return {}
+
+
+def make_pool(server, controllers, **kwargs) -> DevicePool:
+    def factory(serial):
+        controllers[serial] = FakeController(serial)
+        return controllers[serial]
+
+    kwargs.setdefault("check_interval", 0.1)
+    return DevicePool(port=server.port, controller_factory=factory, **kwargs)
+
+
+@pytest.fixture
+def pool(server, controllers):
+    with make_pool(server, controllers) as p:
+        assert p.wait_for_devices(len(SERIALS), timeout=2)
+        yield p
+
+
+def test_map_spreads_jobs_over_devices(pool, controllers):
+    results = pool.map(work, range(12), timeout=5)
+
+    assert [item for _, item in results] == list(range(12))
+    assert {serial for serial, _ in results} == set(SERIALS)
+    assert sum(len(c.ran) for c in controllers.values()) == 12
+
+
+def test_map_reraises_job_error(pool):
+    def boom(controller, item):
+        raise ValueError(f"bad item {item}")
+
+    with pytest.raises(ValueError, match="bad item"):
+        pool.map(boom, [1], timeout=5)
+
+
+def test_pinned_jobs_run_on_their_device(pool, controllers):
+    futures = [pool.submit(work, i, serial=SERIALS[1]) for i in range(5)]
+
+    assert [f.result(timeout=5)[0] for f in futures] == [SERIALS[1]] * 5
+    assert controllers[SERIALS[1]].ran == list(range(5))
+
+
+def test_pinning_to_unknown_device_raises(pool):
+    with pytest.raises(KeyError):
+        pool.submit(work, 0, serial="emulator-9999")
+
+
+def test_job_retried_after_connection_error(pool):
+    attempts = []
+
+    def flaky(controller):
+        attempts.append(controller.device_serial)
+        if len(attempts) == 1:
+            raise OSError("device went away")
+        return controller.device_serial
+
+    serial = pool.submit(flaky, retries=1).result(timeout=5)
+
+    assert len(attempts) == 2
+    assert serial == attempts[1]
+    stats = pool.get_stats()["devices"]
+    assert stats[attempts[0]]["failures"] == 1
+
+    # The failing device sat out, then went back to the server's listing
+    wait_until(lambda: attempts[0] in pool.healthy_devices)
+
+
+def test_job_without_retries_fails(pool):
+    def broken(controller):
+        raise OSError("device went away")
+
+    with pytest.raises(OSError):
+        pool.submit(broken).result(timeout=5)
+
+
+def test_close_fails_queued_retries_without_hanging(controllers):
+    with FakeAdbServer({SERIALS[0]: "device"}) as server:
+        # The failing device sits out longer than the test runs, so the
+        # retry stays queued
+        pool = make_pool(server, controllers, check_interval=30).start()
+        assert pool.wait_for_devices(1, timeout=2)
+
+        def broken(controller):
+            raise OSError("device went away")
+
+        retried = pool.submit(broken, retries=3)
+        wait_until(lambda: pool.get_stats()["devices"][SERIALS[0]]["failures"] == 1)
+        never_started = pool.submit(work, 0)
+
+        start = time.monotonic()
+        pool.close()
+        assert time.monotonic() - start < 2
+
+    with pytest.raises(CancelledError):
+        retried.result(timeout=0)
+    assert never_started.cancelled()
+    assert controllers[SERIALS[0]].closed
+
+
+def test_lease_pauses_its_worker(pool, controllers):
+    leased = SERIALS[0]
+
+    with pool.lease(serial=leased, timeout=2) as controller:
+        assert controller is controllers[leased]
+        pinned = pool.submit(work, "pinned", serial=leased)
+        results = pool.map(work, range(6), timeout=5)
+        time.sleep(0.1)
+        assert not pinned.done()
+
+    assert leased not in {serial for serial, _ in results}
+    assert pinned.result(timeout=5) == (leased, "pinned")
+
+
+def test_lease_any_device_times_out_when_all_leased(pool):
+    with pool.lease(serial=SERIALS[0]), pool.lease(serial=SERIALS[1]), pool.lease(serial=SERIALS[2]):
+        with pytest.raises(TimeoutError):
+            with pool.lease(timeout=0.1):
+                pass
+
+
+def test_devices_join_and_leave_through_tracker(server, pool, controllers):
+    new = "emulator-5560"
+    server.set_device(new, "device")
+    assert pool.wait_for_devices(len(SERIALS) + 1, timeout=2)
+    assert pool.submit(work, "hello", serial=new).result(timeout=5) == (new, "hello")
+
+    server.remove_device(SERIALS[0])
+    wait_until(lambda: SERIALS[0] not in pool.healthy_devices)
+    assert pool.get_stats()["devices"][SERIALS[0]]["state"] == "disconnected"
+    before = list(controllers[SERIALS[0]].ran)
+    pool.map(work, range(8), timeout=5)
+    assert controllers[SERIALS[0]].ran == before
+
+    server.set_device(SERIALS[0], "device")
+    wait_until(lambda: SERIALS[0] in pool.healthy_devices)
+    assert pool.submit(work, "back", serial=SERIALS[0]).result(timeout=5) == (SERIALS[0], "back")
+
+
+def test_pool_limited_to_given_serials(server, controllers):
+    with make_pool(server, controllers, serials=[SERIALS[2]]) as pool:
+        assert pool.wait_for_devices(1, timeout=2)
+        server.set_device("emulator-5560", "device")
+        time.sleep(0.1)
+        assert pool.devices == [SERIALS[2]]
@@ -0,0 +1,384 @@
+"""DeviceTracker and DeviceMonitor against FakeAdbServer.
+
+Device lists come from an in-process FakeAdbServer speaking the adb
+server protocol. The heartbeat's `adb shell` is a stand-in script on PATH
+that runs a local sh, with `getprop` answering from a file the test
+controls.
+"""
+
+import os
+import stat
+import threading
+import time
+
+import pytest
+
+from tapo_c210_monitor.android.adb_protocol import DeviceTracker
+from tapo_c210_monitor.android.device_monitor import DeviceMonitor, DeviceState
+from tapo_c210_monitor.testing.fake_adb import FakeAdbServer
+
+SERIAL = "emulator-5554"
+OTHER = "emulator-5556"
+
+
+class Recorder:
+    """Collects callback arguments and lets tests wait for them."""
+
+    def __init__(self):
+        self.events: list[tuple] = []
+        self.times: list[float] = []
+        self._cond = threading.Condition()
+
+    def __call__(self, *args) -> None:
+        with self._cond:
+            self.events.append(args)
+            self.times.append(time.perf_counter())
+            self._cond.notify_all()
+
+    def wait_for(self, count: int, timeout: float = 2.0) -> list[tuple]:
+        with self._cond:
+            if not self._cond.wait_for(lambda: len(self.events) >= count, timeout):
+                raise AssertionError(f"expected {count} events, got {self.events}")
+            return list(self.events)
+
+    def wait_until(self, event: tuple, timeout: float = 2.0) -> None:
+        with self._cond:
+            if not self._cond.wait_for(lambda: event in self.events, timeout):
+                raise AssertionError(f"{event} not in {self.events}")
+
+
+def write_script(path, body: str) -> None:
+    path.write_text("#!/bin/sh\n" + body)
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+
+
+@pytest.fixture
+def boot_completed(tmp_path, monkeypatch):
+    """Put stand-in adb and getprop on PATH; returns the getprop value file."""
+    value = tmp_path / "boot_completed"
+    value.write_text("1\n")
+    write_script(tmp_path / "adb", '[ "$1" = "-s" ] && shift 2\nshift\nexec sh\n')
+    write_script(tmp_path / "getprop", f'cat "{value}"\n')
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    return value
+
+
+@pytest.fixture
+def server():
+    with FakeAdbServer({SERIAL: "device"}) as srv:
+        yield srv
+
+
+@pytest.fixture
+def tracker(server):
+    with DeviceTracker(port=server.port, reconnect_delay=0.05) as trk:
+        assert trk.wait_connected(timeout=2)
+        yield trk
+
+
+def wait_state(monitor: DeviceMonitor, state: DeviceState, timeout: float = 3.0) -> None:
+    deadline = time.monotonic() + timeout
+    while monitor.state != state:
+        if time.monotonic() > deadline:
+            raise AssertionError(f"monitor stayed {monitor.state}, expected {state}")
+        time.sleep(0.01)
+
+
+# -- DeviceTracker --
+
+
+def test_tracker_reports_initial_devices(server):
+    server.set_device(OTHER, "offline")
+    recorder = Recorder()
+    tracker = DeviceTracker(port=server.port)
+    tracker.add_callback(recorder)
+    with tracker:
+        events = recorder.wait_for(2)
+
+    assert tracker.devices == {SERIAL: "device", OTHER: "offline"}
+    assert sorted(events) == [(SERIAL, None, "device"), (OTHER, None, "offline")]
+    assert "host:track-devices" in server.requests
+
+
+def test_tracker_reports_only_changed_devices(server, tracker):
+    server.set_device(OTHER, "device")
+    assert tracker.wait_for(OTHER, timeout=2) == OTHER
+
+    recorder = Recorder()
+    tracker.add_callback(recorder)
+
+    server.set_device(SERIAL, "offline")
+    recorder.wait_for(1)
+    server.remove_device(OTHER)
+    recorder.wait_for(2)
+    server.set_device("192.168.1.5:5555", "unauthorized")
+    recorder.wait_for(3)
+    server.set_device(SERIAL, "device")
+
+    assert recorder.wait_for(4) == [
+        (SERIAL, "device", "offline"),
+        (OTHER, "device", None),
+        ("192.168.1.5:5555", None, "unauthorized"),
+        (SERIAL, "offline", "device"),
+    ]
+    time.sleep(0.05)
+    assert len(recorder.events) == 4
+
+
+def test_tracker_coalesces_changes_made_between_updates(server, tracker):
+    recorder = Recorder()
+    tracker.add_callback(recorder)
+
+    # Like the real server, a burst of changes can arrive as one list;
+    # the diff still ends at the right state
+    server.set_device(SERIAL, "offline")
+    server.set_device(OTHER, "device")
+    server.remove_device(OTHER)
+    server.set_device(SERIAL, "device")
+    server.set_device(OTHER, "recovery")
+
+    tracker.wait_for(OTHER, "recovery", timeout=2)
+    assert tracker.devices == {SERIAL: "device", OTHER: "recovery"}
+    final = {serial: new for serial, _, new in recorder.events}
+    assert final[OTHER] == "recovery"
+    assert final.get(SERIAL, "device") == "device"
+
+
+def test_tracker_callbacks_arrive_within_milliseconds(server, tracker):
+    recorder = Recorder()
+    tracker.add_callback(recorder)
+
+    latencies = []
+    for i in range(20):
+        state = "offline" if i % 2 == 0 else "device"
+        start = time.perf_counter()
+        server.set_device(SERIAL, state)
+        recorder.wait_for(i + 1)
+        latencies.append(recorder.times[i] - start)
+
+    latencies.sort()
+    assert latencies[len(latencies) // 2] < 0.05
+
+
+def test_failing_callback_does_not_stop_tracking(server, tracker):
+    def broken(serial, old, new):
+        raise RuntimeError("boom")
+
+    recorder = Recorder()
+    tracker.add_callback(broken)
+    tracker.add_callback(recorder)
+
+    server.set_device(SERIAL, "offline")
+    recorder.wait_for(1)
+    server.set_device(SERIAL, "device")
+    assert recorder.wait_for(2)[-1] == (SERIAL, "offline", "device")
+
+
+def test_removed_callback_is_not_called(server, tracker):
+    recorder = Recorder()
+    tracker.add_callback(recorder)
+    tracker.remove_callback(recorder)
+    tracker.remove_callback(recorder)  # Removing twice is harmless
+
+    server.set_device(SERIAL, "offline")
+    tracker.wait_for(SERIAL, "offline", timeout=2)
+    assert recorder.events == []
+
+
+def test_wait_for_device_to_appear(server, tracker):
+    threading.Timer(0.1, server.set_device, (OTHER, "device")).start()
+    start = time.monotonic()
+    assert tracker.wait_for(OTHER, timeout=2) == OTHER
+    assert time.monotonic() - start < 1.0
+
+
+def test_wait_for_any_device(server, tracker):
+    server.set_device(SERIAL, "offline")
+    tracker.wait_for(SERIAL, "offline", timeout=2)
+
+    threading.Timer(0.1, server.set_device, (OTHER, "device")).start()
+    assert tracker.wait_for(timeout=2) == OTHER
+
+
+def test_wait_for_device_to_leave(server, tracker):
+    threading.Timer(0.1, server.remove_device, (SERIAL,)).start()
+    assert tracker.wait_for(SERIAL, None, timeout=2) == SERIAL
+    assert tracker.wait_until_empty(timeout=2) is True
+
+
+def test_wait_until_empty_times_out(server, tracker):
+    server.set_device(OTHER, "device")
+    tracker.wait_for(OTHER, timeout=2)
+
+    assert tracker.wait_until_empty(timeout=0.1) is False
+    with pytest.raises(ValueError):
+        tracker.wait_for(state=None, timeout=0.1)
+
+
+def test_wait_for_times_out(tracker):
+    start = time.monotonic()
+    assert tracker.wait_for(OTHER, timeout=0.2) is None
+    assert 0.2 <= time.monotonic() - start < 1.0
+
+
+def test_wait_connected_without_server():
+    with FakeAdbServer() as srv:
+        port = srv.port
+    with DeviceTracker(port=port, reconnect_delay=0.05) as tracker:
+        assert not tracker.wait_connected(timeout=0.2)
+        assert tracker.devices == {}
+
+
+def test_tracker_reconnects_and_diffs_against_last_list(server, tracker):
+    recorder = Recorder()
+    tracker.add_callback(recorder)
+    port = server.port
+
+    server.close()
+    with tracker._cond:
+        assert tracker._cond.wait_for(lambda: not tracker.connected, 2)
+    # The last known list survives the outage
+    assert tracker.devices == {SERIAL: "device"}
+
+    with FakeAdbServer({SERIAL: "device", OTHER: "device"}, port=port):
+        assert tracker.wait_connected(timeout=2)
+        assert recorder.wait_for(1) == [(OTHER, None, "device")]
+    assert tracker.updates >= 2
+
+
+def test_tracker_close_stops_thread(server):
+    tracker = DeviceTracker(port=server.port).start()
+    assert tracker.wait_connected(timeout=2)
+    thread = tracker._thread
+
+    start = time.monotonic()
+    tracker.close()
+    assert time.monotonic() - start < 1.0
+    assert not thread.is_alive()
+
+
+# -- DeviceMonitor --
+
+
+@pytest.fixture
+def monitor(tracker, boot_completed):
+    mon = DeviceMonitor(
+        device_serial=SERIAL,
+        tracker=tracker,
+        auto_recover=False,
+        check_interval=0.1,
+        heartbeat_timeout=2.0,
+    )
+    yield mon
+    mon.stop_monitoring()
+
+
+def test_monitor_connects_through_tracker_and_heartbeat(monitor):
+    recorder = Recorder()
+    monitor.add_state_callback(recorder)
+    monitor.start_monitoring()
+
+    wait_state(monitor, DeviceState.CONNECTED)
+    assert recorder.events == [(DeviceState.DISCONNECTED, DeviceState.CONNECTED)]
+
+
+def test_monitor_sees_disconnect_within_milliseconds(server, monitor):
+    monitor.check_interval = 30.0  # Only tracker events can wake the loop
+    monitor.start_monitoring()
+    monitor._wake.set()
+    wait_state(monitor, DeviceState.CONNECTED)
+
+    recorder = Recorder()
+    monitor.add_state_callback(recorder)
+    start = time.perf_counter()
+    server.set_device(SERIAL, "offline")
+    recorder.wait_until((DeviceState.CONNECTED, DeviceState.OFFLINE))
+    assert recorder.times[0] - start < 0.1
+
+    # Coming back wakes the loop, which confirms with a heartbeat
+    server.set_device(SERIAL, "device")
+    recorder.wait_until((DeviceState.OFFLINE, DeviceState.CONNECTED))
+
+
+def test_monitor_marks_unplugged_device_disconnected(server, monitor):
+    monitor.start_monitoring()
+    wait_state(monitor, DeviceState.CONNECTED)
+
+    server.remove_device(SERIAL)
+    wait_state(monitor, DeviceState.DISCONNECTED, timeout=0.5)
+
+
+def test_monitor_ignores_other_devices_when_pinned(server, monitor):
+    monitor.start_monitoring()
+    wait_state(monitor, DeviceState.CONNECTED)
+    recorder = Recorder()
+    monitor.add_state_callback(recorder)
+
+    server.set_device(OTHER, "device")
+    server.set_device(OTHER, "offline")
+    time.sleep(0.3)
+    assert monitor.device_serial == SERIAL
+    assert recorder.events == []
+
+
+def test_monitor_adopts_first_device_when_unpinned(server, tracker, boot_completed):
+    server.remove_device(SERIAL)
+    tracker.wait_for(SERIAL, None, timeout=2)
+
+    monitor = DeviceMonitor(tracker=tracker, auto_recover=False, check_interval=0.1)
+    try:
+        monitor.start_monitoring()
+        server.set_device(OTHER, "device")
+        wait_state(monitor, DeviceState.CONNECTED)
+        assert monitor.device_serial == OTHER
+    finally:
+        monitor.stop_monitoring()
+
+
+def test_monitor_flags_unresponsive_device(monitor, boot_completed):
+    monitor.start_monitoring()
+    wait_state(monitor, DeviceState.CONNECTED)
+
+    boot_completed.write_text("0\n")
+    wait_state(monitor, DeviceState.OFFLINE)
+
+    boot_completed.write_text("1\n")
+    wait_state(monitor, DeviceState.CONNECTED)
+
+
+def test_heartbeat_reuses_one_shell(monitor):
+    assert monitor.check_device_connected()
+    for _ in range(5):
+        assert monitor.check_device_responsive()
+    assert monitor._shell.commands == 5
+    assert monitor._shell.respawns == 0
+
+
+def test_wait_for_device_wakes_on_tracker_event(server, monitor):
+    server.remove_device(SERIAL)
+    monitor.tracker.wait_for(SERIAL, None, timeout=2)
+
+    threading.Timer(0.2, server.set_device, (SERIAL, "device")).start()
+    start = time.monotonic()
+    assert monitor.wait_for_device(timeout=10)
+    assert time.monotonic() - start < 1.0
+    assert monitor.state == DeviceState.CONNECTED
+
+
+def test_wait_for_device_times_out(server, monitor):
+    server.remove_device(SERIAL)
+    monitor.tracker.wait_for(SERIAL, None, timeout=2)
+
+    assert not monitor.wait_for_device(timeout=0.3)
+    assert monitor.state == DeviceState.DISCONNECTED
+
+
+def test_stop_monitoring_leaves_shared_tracker_running(server, tracker, monitor):
+    monitor.start_monitoring()
+    wait_state(monitor, DeviceState.CONNECTED)
+    monitor.stop_monitoring()
+
+    assert monitor.tracker is tracker
+    assert monitor._on_device_event not in tracker._callbacks
+    server.set_device(OTHER, "device")
+    assert tracker.wait_for(OTHER, timeout=2) == OTHER
@@ -0,0 +1,244 @@
+"""discover_camera_async and DiscoveryCache against local stand-in sockets.
+
+The "subnet" is 127.0.0.x: every address in it is local on Linux, so a
+listener bound to one of them is the camera and the other 253 hosts refuse
+the connection.
+"""
+
+import asyncio
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from tapo_c210_monitor import discovery
+from tapo_c210_monitor.discovery import DiscoveryCache, discover_camera_async, ws_discovery_probe
+
+SUBNET = "127.0.0"
+CAMERA_IP = "127.0.0.77"
+CAMERA_MAC = "aa:bb:cc:dd:ee:ff"
+
+PROBE_MATCH = """<?xml version="1.0" encoding="UTF-8"?>
+<e:Envelope xmlns:e="http://www.w3.org/2003/05/soap-envelope"
+    xmlns:d="http://schemas.xmlsoap.org/ws/2005/04/discovery">
+  <e:Body><d:ProbeMatches><d:ProbeMatch>
+    <d:XAddrs>http://{ip}:2020/onvif/device_service</d:XAddrs>
+  </d:ProbeMatch></d:ProbeMatches></e:Body>
+</e:Envelope>"""
+
+
+def free_port(ip: str = CAMERA_IP) -> int:
+    with socket.socket() as sock:
+        sock.bind((ip, 0))
+        return sock.getsockname()[1]
+
+
+class FakeCamera:
+    """TCP listener standing in for the camera's RTSP port."""
+
+    def __init__(self, ip: str, port: int):
+        self.port = port
+        self.sock = socket.socket()
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((ip, port))
+        self.sock.listen(64)
+
+    def close(self) -> None:
+        self.sock.close()
+
+
+class FakeWSDiscoveryResponder:
+    """UDP listener answering WS-Discovery probes with a ProbeMatch.
+
+    The camera's RTSP port is only opened once a probe arrives, after
+    wake_delay seconds, so the connect scan running alongside the probe
+    misses it and only the WS-Discovery answer can find it.
+    """
+
+    def __init__(self, ip: str, camera_port: int, wake_delay: float = 0.5):
+        self.ip = ip
+        self.camera_port = camera_port
+        self.wake_delay = wake_delay
+        self.camera: FakeCamera | None = None
+        self.probes: list[bytes] = []
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((ip, 0))
+        self.sock.settimeout(0.1)
+        self.address = self.sock.getsockname()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self) -> None:
+        while not self._stop.is_set():
+            try:
+                data, addr = self.sock.recvfrom(65536)
+            except socket.timeout:
+                continue
+            self.probes.append(data)
+            if b"Probe" not in data:
+                continue
+            time.sleep(self.wake_delay)
+            if self.camera is None:
+                self.camera = FakeCamera(self.ip, self.camera_port)
+            self.sock.sendto(b"<NotAMatch/>", addr)
+            self.sock.sendto(PROBE_MATCH.format(ip=self.ip).encode(), addr)
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.sock.close()
+        if self.camera:
+            self.camera.close()
+
+
+@pytest.fixture
+def neighbors(monkeypatch):
+    """Replace the kernel ARP table with a dict the test controls."""
+    table: dict[str, str] = {}
+    monkeypatch.setattr(discovery, "read_neighbor_table", lambda: dict(table))
+    return table
+
+
+@pytest.fixture
+def probes(monkeypatch):
+    """Record every host the discovery connects to."""
+    seen: list[str] = []
+    real_probe = discovery._probe_rtt
+
+    async def counting_probe(ip, port, timeout):
+        seen.append(ip)
+        return await real_probe(ip, port, timeout)
+
+    monkeypatch.setattr(discovery, "_probe_rtt", counting_probe)
+    return seen
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DiscoveryCache(tmp_path / "discovery.json")
+
+
+@pytest.fixture
+def camera():
+    cam = FakeCamera(CAMERA_IP, free_port())
+    yield cam
+    cam.close()
+
+
+def discover(cache, port, **kwargs):
+    kwargs.setdefault("use_ws_discovery", False)
+    return asyncio.run(discover_camera_async(SUBNET, port=port, timeout=1.0, cache=cache, **kwargs))
+
+
+def test_cold_scan_finds_camera_and_caches_it(camera, cache, neighbors, probes):
+    assert discover(cache, camera.port) == CAMERA_IP
+    assert len(set(probes)) > 1
+
+    entry = json.loads(cache.path.read_text())["by_mac"][f"ip:{CAMERA_IP}"]
+    assert entry["ip"] == CAMERA_IP
+    assert entry["port"] == camera.port
+
+
+def test_cached_rediscovery_probes_only_last_known_ip(camera, cache, neighbors, probes):
+    cache.store(CAMERA_IP, None, camera.port)
+
+    start = time.monotonic()
+    assert discover(cache, camera.port) == CAMERA_IP
+    assert time.monotonic() - start < 0.2
+    assert probes == [CAMERA_IP]
+
+
+def test_cached_mac_follows_dhcp_move(camera, cache, neighbors, probes):
+    cache.store("127.0.0.50", CAMERA_MAC, camera.port)
+    neighbors[CAMERA_IP] = CAMERA_MAC
+
+    assert discover(cache, camera.port) == CAMERA_IP
+    # The MAC's current address goes first; no scan beyond the cached hosts
+    assert probes[0] == CAMERA_IP
+    assert set(probes) <= {CAMERA_IP, "127.0.0.50"}
+    # Re-stored under the same MAC with the new address
+    assert cache.candidates(SUBNET)[0]["ip"] == CAMERA_IP
+
+
+def test_arp_neighbours_are_tried_before_scanning(camera, cache, neighbors, probes):
+    neighbors["127.0.0.20"] = "11:11:11:11:11:11"
+    neighbors[CAMERA_IP] = CAMERA_MAC
+
+    assert discover(cache, camera.port) == CAMERA_IP
+    assert set(probes) == {"127.0.0.20", CAMERA_IP}
+    assert cache.candidates(SUBNET)[0]["mac"] == CAMERA_MAC
+
+
+def test_expired_cache_entry_falls_back_to_scan(camera, tmp_path, neighbors, probes):
+    cache = DiscoveryCache(tmp_path / "discovery.json", ttl=0)
+    cache.store("127.0.0.50", None, camera.port)
+
+    assert cache.candidates(SUBNET) == []
+    assert discover(cache, camera.port) == CAMERA_IP
+    assert len(set(probes)) > 1
+
+
+def test_stale_cache_entry_falls_back_to_scan(camera, cache, neighbors, probes):
+    cache.store("127.0.0.50", None, camera.port)
+
+    assert discover(cache, camera.port) == CAMERA_IP
+    assert probes[0] == "127.0.0.50"
+    assert len(set(probes)) > 2
+
+
+def test_no_camera(cache, neighbors):
+    assert discover(cache, free_port()) is None
+    assert not cache.path.exists()
+
+
+def test_unreadable_cache_is_ignored(camera, cache, neighbors):
+    cache.path.write_text("not json")
+    assert cache.candidates(SUBNET) == []
+    assert discover(cache, camera.port) == CAMERA_IP
+
+
+def test_ws_discovery_finds_camera_the_scan_missed(cache, neighbors, probes, monkeypatch):
+    port = free_port()
+    responder = FakeWSDiscoveryResponder(CAMERA_IP, port)
+    monkeypatch.setattr(discovery, "WS_DISCOVERY_ADDR", responder.address)
+    try:
+        assert discover(cache, port, use_ws_discovery=True) == CAMERA_IP
+    finally:
+        responder.close()
+
+    assert len(responder.probes) == 1
+    # Once refused by the scan, then probed again as a WS-Discovery responder
+    assert probes.count(CAMERA_IP) == 2
+
+
+def test_ws_discovery_probe_collects_responders(monkeypatch):
+    responder = FakeWSDiscoveryResponder(CAMERA_IP, free_port(), wake_delay=0)
+    monkeypatch.setattr(discovery, "WS_DISCOVERY_ADDR", responder.address)
+    try:
+        start = time.monotonic()
+        responders = asyncio.run(ws_discovery_probe(timeout=2.0, subnet=SUBNET))
+        elapsed = time.monotonic() - start
+    finally:
+        responder.close()
+
+    assert responders == {CAMERA_IP: f"http://{CAMERA_IP}:2020/onvif/device_service"}
+    # Returns on the first match in the subnet instead of waiting out the timeout
+    assert elapsed < 1.0
+    assert b"NetworkVideoTransmitter" in responder.probes[0]
+
+
+def test_ws_discovery_probe_waits_out_timeout_without_subnet_match(monkeypatch):
+    responder = FakeWSDiscoveryResponder(CAMERA_IP, free_port(), wake_delay=0)
+    monkeypatch.setattr(discovery, "WS_DISCOVERY_ADDR", responder.address)
+    try:
+        start = time.monotonic()
+        responders = asyncio.run(ws_discovery_probe(timeout=0.3, subnet="10.9.8"))
+        elapsed = time.monotonic() - start
+    finally:
+        responder.close()
+
+    assert CAMERA_IP in responders
+    assert elapsed >= 0.3
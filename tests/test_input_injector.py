@@ -0,0 +1,215 @@
+"""InputInjector's generated scripts, without a device.
+
+FakeController answers the discovery commands (getevent -p, getprop, the
+orientation query) and records every batch script. The byte-level test
+runs a script in the local /bin/sh with the touch node redirected to a
+file and decodes what printf wrote.
+"""
+
+import subprocess
+
+import pytest
+
+from tapo_c210_monitor.android.input_injector import (
+    ABS_MT_POSITION_X,
+    ABS_MT_POSITION_Y,
+    ABS_MT_TRACKING_ID,
+    BTN_TOUCH,
+    EV_ABS,
+    EV_KEY,
+    EV_SYN,
+    SYN_REPORT,
+    WRITE_FAILED,
+    InputInjector,
+    _EVENT_32,
+    _EVENT_64,
+    encode_events,
+    parse_orientation,
+    printf_bytes,
+)
+
+NODE = "/dev/input/event1"
+
+GETEVENT = f"""add device 1: {NODE}
+  name:     "sample_touchscreen"
+  events:
+    KEY (0001): 014a
+    ABS (0003): 002f  : value 0, min 0, max 9, fuzz 0, flat 0, resolution 0
+                0035  : value 0, min 0, max 4095, fuzz 0, flat 0, resolution 0
+                0036  : value 0, min 0, max 4095, fuzz 0, flat 0, resolution 0
+                0039  : value 0, min 0, max 65535, fuzz 0, flat 0, resolution 0
+"""
+
+
+class FakeController:
+    """Answers discovery commands and records batch scripts."""
+
+    def __init__(self, rotation: int = 0, abi: str = "arm64-v8a"):
+        self.rotation = rotation
+        self.abi = abi
+        self.orientation_queries = 0
+        self.scripts: list[str] = []
+        self.output = ""
+
+    def shell(self, command: str) -> str:
+        if command == "getevent -p":
+            return GETEVENT
+        if command.startswith("getprop"):
+            return self.abi + "\n"
+        if command.startswith("dumpsys input"):
+            self.orientation_queries += 1
+            return f"    SurfaceOrientation: {self.rotation}\n"
+        if command.endswith("&& echo ok"):
+            return "ok\n"
+        self.scripts.append(command)
+        return self.output
+
+    def get_screen_size(self) -> tuple[int, int]:
+        return (1080, 2400)
+
+
+def writes(script: str) -> list[str]:
+    return [line for line in script.splitlines() if line.startswith("printf")]
+
+
+def run_locally(script: str, node, layout=_EVENT_64) -> list[tuple[int, int, int]]:
+    """Run a batch script in /bin/sh; returns the events written."""
+    subprocess.run(["/bin/sh", "-c", script.replace(NODE, str(node))], check=True)
+    data = node.read_bytes()
+    assert len(data) % layout.size == 0
+    return [layout.unpack(data[i:i + layout.size])[2:] for i in range(0, len(data), layout.size)]
+
+
+@pytest.mark.parametrize(
+    "output, rotation",
+    [
+        ("    SurfaceOrientation: 0", 0),
+        ("    SurfaceOrientation: 1", 1),
+        ("Viewport INTERNAL: displayId=0, orientation=0, logicalFrame=[0, 0, 1080, 2400]", 0),
+        ("Viewport INTERNAL: displayId=0, orientation=ROTATION_270, ...", 270),
+        ("", None),
+    ],
+)
+def test_parse_orientation(output, rotation):
+    assert parse_orientation(output) == rotation
+
+
+def test_printf_bytes_has_no_bare_digits_or_directives():
+    data = encode_events([(EV_ABS, ABS_MT_POSITION_X, 0x3739), (EV_SYN, SYN_REPORT, 0)])
+    text = printf_bytes(data)
+
+    assert "%" not in text and "'" not in text
+    # Every digit belongs to a three-digit escape
+    assert all(part[:3].isdigit() for part in text.split("\\")[1:])
+
+
+def test_tap_writes_events_in_one_go(tmp_path):
+    controller = FakeController()
+    injector = InputInjector(controller)
+
+    injector.tap(540, 1200)
+
+    [script] = controller.scripts
+    assert len(writes(script)) == 1
+    assert "sendevent" not in script and "dumpsys" not in script
+
+    events = run_locally(script, tmp_path / "event1")
+    dx, dy = injector._to_device(540, 1200)
+    assert events == [
+        (EV_ABS, 0x2F, 0),
+        (EV_ABS, ABS_MT_TRACKING_ID, 1),
+        (EV_ABS, ABS_MT_POSITION_X, dx),
+        (EV_ABS, ABS_MT_POSITION_Y, dy),
+        (EV_KEY, BTN_TOUCH, 1),
+        (EV_SYN, SYN_REPORT, 0),
+        (EV_ABS, ABS_MT_TRACKING_ID, -1),
+        (EV_KEY, BTN_TOUCH, 0),
+        (EV_SYN, SYN_REPORT, 0),
+    ]
+
+
+def test_32_bit_userland_writes_short_records(tmp_path):
+    controller = FakeController(abi="armeabi-v7a")
+    injector = InputInjector(controller)
+
+    injector.tap(10, 10)
+
+    events = run_locally(controller.scripts[0], tmp_path / "event1", _EVENT_32)
+    assert len(events) == 9
+    assert events[-3:] == [(EV_ABS, ABS_MT_TRACKING_ID, -1), (EV_KEY, BTN_TOUCH, 0), (EV_SYN, SYN_REPORT, 0)]
+
+
+def test_swipe_is_one_write_per_step():
+    controller = FakeController()
+    injector = InputInjector(controller)
+
+    injector.swipe(540, 1800, 540, 600, 320)
+
+    lines = controller.scripts[0].splitlines()
+    steps = 20
+    assert len(writes(controller.scripts[0])) == 1 + steps + 1
+    assert sum(line.startswith("sleep") for line in lines) == steps
+    assert len(lines) == 2 + 2 * steps
+
+
+def test_orientation_read_once_per_injector():
+    controller = FakeController()
+    injector = InputInjector(controller)
+
+    for _ in range(5):
+        injector.tap(100, 100)
+    injector.swipe(100, 100, 200, 200, 100)
+
+    assert controller.orientation_queries == 1
+    assert all(writes(script) for script in controller.scripts)
+
+
+def test_refresh_orientation_after_rotating():
+    controller = FakeController()
+    injector = InputInjector(controller)
+    injector.tap(100, 100)
+
+    controller.rotation = 1
+    injector.tap(100, 100)
+    assert writes(controller.scripts[-1])  # Still cached
+
+    injector.refresh_orientation()
+    injector.tap(100, 100)
+
+    assert controller.orientation_queries == 2
+    assert controller.scripts[-1] == "input tap 100 100"
+
+
+def test_orientation_expires_after_ttl():
+    controller = FakeController()
+    injector = InputInjector(controller, orientation_ttl=0)
+    injector.tap(100, 100)
+    injector.tap(100, 100)
+
+    assert controller.orientation_queries == 2
+
+
+def test_failed_write_rechecks_device_and_orientation():
+    controller = FakeController()
+    injector = InputInjector(controller)
+    injector.tap(100, 100)
+
+    controller.output = WRITE_FAILED + "\n"
+    controller.rotation = 1
+    injector.tap(100, 100)
+    controller.output = ""
+    injector.tap(100, 100)
+
+    assert controller.orientation_queries == 2
+    assert controller.scripts[-1] == "input tap 100 100"
+
+
+def test_batch_without_touches_skips_orientation():
+    controller = FakeController()
+    injector = InputInjector(controller)
+
+    with injector.batch() as b:
+        b.key("KEYCODE_TAB").text("hi")
+
+    assert controller.orientation_queries == 0
+    assert controller.scripts == ["input keyevent KEYCODE_TAB\ninput text hi"]
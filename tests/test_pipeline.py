@@ -0,0 +1,156 @@
+"""process_recording's idempotency and failure markers.
+
+Clips are short synthetic videos written with OpenCV. A stand-in ffmpeg on
+PATH copies the input to the proxy path, or exits non-zero when the test
+asks it to, and logs every invocation.
+"""
+
+import json
+import os
+import stat
+
+import cv2
+import numpy as np
+import pytest
+
+from tapo_c210_monitor.pipeline import (
+    FAILED_MARKER_FILENAME,
+    MARKER_FILENAME,
+    PipelineOptions,
+    artifacts_dir_for,
+    is_processed,
+    process_recording,
+)
+
+OPTIONS = PipelineOptions(sheet_cols=2, sheet_rows=2, thumb_width=32)
+
+
+def write_clip(path, frames: int = 30, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), 15, (64, 48))
+    for _ in range(frames):
+        writer.write(rng.integers(0, 255, (48, 64, 3), dtype=np.uint8))
+    writer.release()
+    return path
+
+
+@pytest.fixture
+def ffmpeg(tmp_path, monkeypatch):
+    """Put a stand-in ffmpeg on PATH; returns its invocation log."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    log = tmp_path / "ffmpeg.log"
+    script = bin_dir / "ffmpeg"
+    script.write_text(
+        "#!/bin/sh\n"
+        f'echo "$@" >> "{log}"\n'
+        f'[ -e "{tmp_path}/ffmpeg_fails" ] && {{ echo "Invalid data" >&2; exit 1; }}\n'
+        'for last; do :; done\n'
+        'cp "$5" "$last"\n'
+    )
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    log.touch()
+    return log
+
+
+def encodes(log) -> int:
+    return len(log.read_text().splitlines())
+
+
+def test_processes_clip_and_writes_marker(tmp_path, ffmpeg):
+    clip = write_clip(tmp_path / "clip.mp4")
+
+    result = process_recording(clip, OPTIONS)
+
+    assert not result["skipped"]
+    assert result["failed"] is None
+    assert result["contact_sheet"] and result["proxy"]
+    marker = json.loads((artifacts_dir_for(clip) / MARKER_FILENAME).read_text())
+    assert marker["size"] == clip.stat().st_size
+    assert len(marker["sha256"]) == 64
+    assert is_processed(clip)
+
+
+def test_rerun_skips_unchanged_clip(tmp_path, ffmpeg):
+    clip = write_clip(tmp_path / "clip.mp4")
+    process_recording(clip, OPTIONS)
+
+    assert process_recording(clip, OPTIONS)["skipped"]
+    assert encodes(ffmpeg) == 1
+
+
+def test_new_mtime_with_same_contents_is_not_reprocessed(tmp_path, ffmpeg):
+    clip = write_clip(tmp_path / "clip.mp4")
+    process_recording(clip, OPTIONS)
+
+    # What the store's dedupe does: replace the file with a hard link to
+    # an identical copy that has its own mtime
+    twin = tmp_path / "twin.mp4"
+    twin.write_bytes(clip.read_bytes())
+    os.utime(twin, ns=(0, 10**18))
+    clip.unlink()
+    os.link(twin, clip)
+
+    assert not is_processed(clip, verify=False)
+    assert process_recording(clip, OPTIONS)["skipped"]
+    assert encodes(ffmpeg) == 1
+
+    # The marker picked up the new mtime, so the cheap check matches again
+    assert is_processed(clip, verify=False)
+
+
+def test_changed_contents_are_reprocessed(tmp_path, ffmpeg):
+    clip = write_clip(tmp_path / "clip.mp4")
+    process_recording(clip, OPTIONS)
+
+    # Same size, one byte of frame data different
+    data = bytearray(clip.read_bytes())
+    data[len(data) // 2] ^= 0xFF
+    clip.write_bytes(data)
+
+    assert not is_processed(clip)
+    assert not process_recording(clip, OPTIONS)["skipped"]
+
+
+def test_clip_without_frames_gets_failure_marker(tmp_path, ffmpeg):
+    clip = tmp_path / "junk.mp4"
+    clip.write_bytes(b"\x00" * 4096)
+
+    result = process_recording(clip, OPTIONS)
+
+    assert result["failed"]
+    marker = json.loads((artifacts_dir_for(clip) / FAILED_MARKER_FILENAME).read_text())
+    assert marker["failed"] == result["failed"]
+    assert process_recording(clip, OPTIONS) == {"recording": str(clip), "skipped": True, "failed": result["failed"]}
+    assert encodes(ffmpeg) == 0
+
+
+def test_rejected_proxy_encode_gets_failure_marker(tmp_path, ffmpeg):
+    clip = write_clip(tmp_path / "clip.mp4")
+    (tmp_path / "ffmpeg_fails").touch()
+
+    result = process_recording(clip, OPTIONS)
+
+    assert "Invalid data" in result["failed"]
+    assert result["contact_sheet"]
+    assert not (artifacts_dir_for(clip) / MARKER_FILENAME).exists()
+    assert process_recording(clip, OPTIONS)["skipped"]
+    assert encodes(ffmpeg) == 1
+
+    # A new version of the clip is tried again and clears the failure
+    (tmp_path / "ffmpeg_fails").unlink()
+    write_clip(clip, frames=40)
+    assert process_recording(clip, OPTIONS)["failed"] is None
+    assert not (artifacts_dir_for(clip) / FAILED_MARKER_FILENAME).exists()
+
+
+def test_missing_ffmpeg_is_retried(tmp_path, monkeypatch):
+    monkeypatch.setenv("PATH", str(tmp_path / "empty"))
+    clip = write_clip(tmp_path / "clip.mp4")
+
+    result = process_recording(clip, OPTIONS)
+
+    assert result["proxy"] is None
+    assert result["failed"] is None
+    assert not is_processed(clip)
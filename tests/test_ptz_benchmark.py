@@ -0,0 +1,178 @@
+"""PTZ benchmark analysis on synthetic video.
+
+The clips are crops of a blurred noise texture written with OpenCV: the
+crop window stands still, slides sideways like a panning camera, and
+stands still again, so onset and settle times are known from the frame
+numbers.
+"""
+
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from tapo_c210_monitor.experiments.ptz_benchmark import (
+    ONVIFContinuous,
+    PTZAdapter,
+    TrialResult,
+    VideoFixtureSource,
+    analyze_fixture,
+    summarize,
+)
+
+FPS = 15
+SIZE = (320, 180)
+HFOV = 100.0
+PX_PER_DEG = SIZE[0] / HFOV
+
+
+def scene() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    noise = rng.integers(0, 255, (SIZE[1] // 4 + 8, SIZE[0] // 2), dtype=np.uint8)
+    texture = cv2.resize(noise, (noise.shape[1] * 4, noise.shape[0] * 4), interpolation=cv2.INTER_CUBIC)
+    return cv2.GaussianBlur(texture, (0, 0), 2)
+
+
+def write_pan_clip(path, moves: list[tuple[int, int, float]], frames: int) -> None:
+    """Write a clip of the crop window panning.
+
+    Args:
+        moves: (first frame, frame count, degrees) of each pan
+        frames: Clip length
+    """
+    texture = scene()
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), FPS, SIZE)
+    x = (texture.shape[1] - SIZE[0]) / 2
+    for i in range(frames):
+        for start, count, degrees in moves:
+            if start <= i < start + count:
+                x += degrees * PX_PER_DEG / count
+        crop = texture[16:16 + SIZE[1], int(round(x)):int(round(x)) + SIZE[0]]
+        writer.write(cv2.cvtColor(crop, cv2.COLOR_GRAY2BGR))
+    writer.release()
+
+
+@pytest.fixture
+def clip(tmp_path):
+    path = tmp_path / "pan.mp4"
+    # Right 10° over frames 15-23, then left 10° over frames 60-68
+    write_pan_clip(path, [(15, 9, 10.0), (60, 9, -10.0)], frames=105)
+    return path
+
+
+def test_analyze_fixture_measures_onset_settle_and_travel(clip):
+    results = analyze_fixture(clip, [(0.8, "right"), (3.8, "left")], protocol="synthetic", hfov_deg=HFOV)
+
+    right, left = results
+    assert (right.protocol, right.direction, right.repeat) == ("synthetic", "right", 0)
+    assert left.repeat == 1
+    # Motion starts at frames 15 and 60, 0.2 s after each command
+    assert right.onset_s == pytest.approx(0.2, abs=0.1)
+    assert left.onset_s == pytest.approx(0.2, abs=0.1)
+    # ...and is over at frame 24 (1.6 s)
+    assert right.settle_s == pytest.approx(0.8, abs=0.15)
+    assert right.pan_deg == pytest.approx(10.0, abs=1.5)
+    assert left.pan_deg == pytest.approx(-10.0, abs=1.5)
+    assert abs(right.tilt_deg) < 1.0
+
+
+def test_analyze_fixture_reports_no_motion(clip):
+    [result] = analyze_fixture(clip, [(0.0, "up")], hfov_deg=HFOV, onset_deg=50.0)
+
+    assert not result.moved
+    assert result.settle_s is None
+
+
+def test_analyze_fixture_rejects_unreadable_file(tmp_path):
+    junk = tmp_path / "junk.mp4"
+    junk.write_bytes(b"\x00" * 256)
+
+    with pytest.raises(FileNotFoundError):
+        analyze_fixture(junk, [(0.0, "left")])
+
+
+def test_summarize_groups_by_protocol():
+    results = [
+        TrialResult("a", "left", 0, ack_s=0.1, onset_s=0.3, settle_s=1.0, pan_deg=-5.0),
+        TrialResult("a", "right", 0, ack_s=0.3, onset_s=0.5, settle_s=1.4, pan_deg=5.0, tilt_deg=7.0),
+        TrialResult("a", "left", 1, error="timeout"),
+        TrialResult("b", "up", 0, ack_s=0.2),
+    ]
+
+    summary = summarize(results)
+
+    a = summary["a"]
+    assert (a["trials"], a["errors"], a["moved"]) == (3, 1, 2)
+    assert a["ack_s"]["count"] == 2
+    assert a["ack_s"]["mean"] == pytest.approx(0.2)
+    assert a["onset_s"]["p50"] == pytest.approx(0.4)
+    assert (a["settle_s"]["min"], a["settle_s"]["max"]) == (1.0, 1.4)
+    assert a["abs_travel_deg"]["max"] == 7.0
+    assert summary["b"]["moved"] == 0
+    assert summary["b"]["onset_s"] == {"count": 0}
+
+
+def test_adapter_must_implement_send():
+    class Incomplete(PTZAdapter):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_fixture_source_stops_on_unreadable_file(tmp_path):
+    junk = tmp_path / "junk.mp4"
+    junk.write_bytes(b"\x00" * 256)
+    source = VideoFixtureSource(junk, loop=True)
+
+    source.start()
+    source._thread.join(timeout=2)
+
+    assert not source._thread.is_alive()
+    source.stop()
+
+
+def test_fixture_source_loops(tmp_path):
+    path = tmp_path / "short.mp4"
+    write_pan_clip(path, [], frames=5)
+    frames = []
+    source = VideoFixtureSource(path, loop=True)
+    source.attach(frames.append)
+
+    source.start()
+    deadline = time.monotonic() + 5
+    while len(frames) <= 5 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    source.stop()
+
+    assert len(frames) > 5
+
+
+class RecordingController:
+    """ONVIF controller stand-in recording continuous moves and stops."""
+
+    def __init__(self):
+        self.calls: list[tuple] = []
+
+    def start_continuous(self, pan: float, tilt: float) -> None:
+        self.calls.append(("move", pan, tilt, time.monotonic()))
+
+    def stop(self) -> None:
+        self.calls.append(("stop", 0.0, 0.0, time.monotonic()))
+
+
+def test_onvif_continuous_stops_through_scheduler():
+    controller = RecordingController()
+    adapter = ONVIFContinuous(controller, speed=0.5, duration=0.2)
+
+    adapter.send("left")
+    assert [c[:3] for c in controller.calls] == [("move", -0.5, 0.0)]
+
+    adapter.finish()
+    assert [c[0] for c in controller.calls] == ["move", "stop"]
+    assert controller.calls[1][3] - controller.calls[0][3] == pytest.approx(0.2, abs=0.05)
+
+    adapter.send("up")
+    adapter.close()
+    assert [c[:3] for c in controller.calls][2:] == [("move", 0.0, 0.5), ("stop", 0.0, 0.0)]
@@ -0,0 +1,296 @@
+"""PTZCommandScheduler against a stub ONVIF PTZ service.
+
+The stub takes the place of the zeep PTZ service inside a real
+ONVIFPTZController, so commands go through the controller's request
+building and every SOAP operation is recorded with its arrival time.
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from tapo_c210_monitor.ptz_mapper.command_scheduler import PTZCommandScheduler
+from tapo_c210_monitor.ptz_mapper.onvif_cache import ONVIFDeviceCache
+from tapo_c210_monitor.ptz_mapper.onvif_controller import ONVIFPTZController
+from tapo_c210_monitor.ptz_mapper.visual_odometry import ClosedLoopPTZ, PTZEstimate
+
+
+class StubPTZService:
+    """Records PTZ operations the way a camera would receive them."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls: list[tuple[str, tuple, float]] = []
+        self.failing: set[str] = set()
+        self.in_flight = threading.Event()
+        self._lock = threading.Lock()
+
+    def create_type(self, name):
+        return SimpleNamespace()
+
+    def _call(self, operation: str, args: tuple) -> None:
+        self.in_flight.set()
+        time.sleep(self.latency)
+        with self._lock:
+            self.calls.append((operation, args, time.monotonic()))
+        if operation in self.failing:
+            self.failing.discard(operation)
+            raise RuntimeError(f"{operation} fault")
+
+    def ContinuousMove(self, request):
+        velocity = request.Velocity["PanTilt"]
+        self._call("ContinuousMove", (velocity["x"], velocity["y"]))
+
+    def AbsoluteMove(self, request):
+        position = request.Position["PanTilt"]
+        self._call("AbsoluteMove", (position["x"], position["y"]))
+
+    def RelativeMove(self, request):
+        translation = request.Translation["PanTilt"]
+        self._call("RelativeMove", (translation["x"], translation["y"]))
+
+    def Stop(self, request):
+        self._call("Stop", ())
+
+    def operations(self) -> list[str]:
+        return [op for op, _, _ in self.calls]
+
+    def args(self, operation: str) -> list[tuple]:
+        return [args for op, args, _ in self.calls if op == operation]
+
+    def wait_for(self, count: int, timeout: float = 2.0) -> None:
+        deadline = time.monotonic() + timeout
+        while len(self.calls) < count:
+            if time.monotonic() > deadline:
+                raise AssertionError(f"expected {count} calls, got {self.operations()}")
+            time.sleep(0.005)
+
+
+@pytest.fixture
+def service():
+    return StubPTZService()
+
+
+@pytest.fixture
+def controller(service, tmp_path):
+    ctrl = ONVIFPTZController(
+        host="127.0.0.1",
+        username="user",
+        password="pass",
+        device_cache=ONVIFDeviceCache(tmp_path / "onvif.json"),
+    )
+    ctrl.ptz_service = service
+    ctrl.profile_token = "profile_1"
+    ctrl.supports_absolute_move = True
+    ctrl.supports_relative_move = True
+    ctrl.supports_continuous_move = True
+    return ctrl
+
+
+@pytest.fixture
+def scheduler(controller):
+    sched = PTZCommandScheduler(controller)
+    sched.start()
+    yield sched
+    sched.shutdown(stop_camera=False)
+
+
+def hold_worker(service: StubPTZService, scheduler: PTZCommandScheduler) -> None:
+    """Put a slow command in flight so the next submissions have to wait."""
+    service.latency = 0.1
+    scheduler.move_absolute(0.0, 0.0)
+    assert service.in_flight.wait(1.0)
+
+
+def test_move_returns_before_ack(service, scheduler):
+    service.latency = 0.2
+    start = time.monotonic()
+    scheduler.move(0.5, 0)
+    assert time.monotonic() - start < 0.05
+
+    service.wait_for(1)
+    assert service.args("ContinuousMove") == [(0.5, 0)]
+
+
+def test_latest_velocity_wins(service, scheduler):
+    hold_worker(service, scheduler)
+    for velocity in (0.1, 0.2, 0.3, 0.4):
+        scheduler.move(velocity, 0)
+
+    service.wait_for(2)
+    time.sleep(0.15)
+    assert service.args("ContinuousMove") == [(0.4, 0)]
+    assert scheduler.get_stats()["coalesced"] == 3
+
+
+def test_latest_absolute_target_wins(service, scheduler):
+    hold_worker(service, scheduler)
+    scheduler.move_absolute(0.1, 0.1)
+    scheduler.move_absolute(0.2, -0.2)
+
+    service.wait_for(2)
+    time.sleep(0.15)
+    assert service.args("AbsoluteMove") == [(0.0, 0.0), (0.2, -0.2)]
+
+
+def test_pending_relative_moves_accumulate(service, scheduler):
+    hold_worker(service, scheduler)
+    for _ in range(3):
+        scheduler.move_relative(0.05, -0.01)
+
+    service.wait_for(2)
+    time.sleep(0.15)
+    [(pan, tilt)] = service.args("RelativeMove")
+    assert pan == pytest.approx(0.15)
+    assert tilt == pytest.approx(-0.03)
+
+
+def test_newer_command_replaces_pending_relative_move(service, scheduler):
+    hold_worker(service, scheduler)
+    scheduler.move_relative(0.05, 0)
+    scheduler.stop()
+
+    service.wait_for(2)
+    time.sleep(0.15)
+    assert service.operations() == ["AbsoluteMove", "Stop"]
+
+
+def test_commands_are_sent_in_submission_order(service, scheduler):
+    scheduler.move(0.3, 0)
+    service.wait_for(1)
+    scheduler.move_relative(0.1, 0)
+    service.wait_for(2)
+    scheduler.move_absolute(0.5, 0.5)
+    service.wait_for(3)
+    scheduler.stop()
+    service.wait_for(4)
+
+    assert service.operations() == ["ContinuousMove", "RelativeMove", "AbsoluteMove", "Stop"]
+
+
+def test_stop_issued_when_duration_expires(service, scheduler):
+    scheduler.move(0.5, 0, duration=0.1)
+    service.wait_for(2)
+
+    (_, _, moved_at), (op, _, stopped_at) = service.calls
+    assert op == "Stop"
+    assert 0.08 <= stopped_at - moved_at < 0.3
+
+
+def test_repeated_velocity_extends_move_without_round_trip(service, scheduler):
+    scheduler.move(0.5, 0, duration=0.2)
+    service.wait_for(1)
+    for _ in range(3):
+        time.sleep(0.1)
+        last_submit = time.monotonic()
+        scheduler.move(0.5, 0, duration=0.2)
+
+    service.wait_for(2)
+    assert service.operations() == ["ContinuousMove", "Stop"]
+    assert service.calls[1][2] - last_submit >= 0.18
+    assert scheduler.get_stats()["extended"] == 3
+
+
+def test_move_without_duration_runs_until_stop(service, scheduler):
+    scheduler.move(0.5, 0)
+    service.wait_for(1)
+    time.sleep(0.2)
+    assert service.operations() == ["ContinuousMove"]
+
+    scheduler.stop()
+    service.wait_for(2)
+    assert service.operations() == ["ContinuousMove", "Stop"]
+
+
+def test_zero_velocity_is_a_stop(service, scheduler):
+    scheduler.move(0, 0)
+    service.wait_for(1)
+    assert service.operations() == ["Stop"]
+
+
+def test_stop_cancels_pending_timer(service, scheduler):
+    scheduler.move(0.5, 0, duration=0.1)
+    service.wait_for(1)
+    scheduler.stop()
+    service.wait_for(2)
+    time.sleep(0.2)
+
+    # The explicit stop replaced the timed one
+    assert service.operations() == ["ContinuousMove", "Stop"]
+
+
+def test_shutdown_stops_active_move(service, controller):
+    scheduler = PTZCommandScheduler(controller)
+    scheduler.start()
+    scheduler.move(0.5, 0)
+    service.wait_for(1)
+
+    scheduler.shutdown()
+    assert service.operations() == ["ContinuousMove", "Stop"]
+
+
+def test_shutdown_without_active_move_sends_nothing(service, controller):
+    with PTZCommandScheduler(controller) as scheduler:
+        scheduler.move_absolute(0.1, 0.1)
+        service.wait_for(1)
+
+    assert service.operations() == ["AbsoluteMove"]
+
+
+def test_failed_command_does_not_stop_worker(service, scheduler):
+    service.failing.add("ContinuousMove")
+    scheduler.move(0.5, 0)
+    service.wait_for(1)
+    scheduler.move_absolute(0.2, 0.2)
+    service.wait_for(2)
+
+    stats = scheduler.get_stats()
+    assert stats["errors"] == 1
+    assert stats["sent"] == 1
+    assert service.operations() == ["ContinuousMove", "AbsoluteMove"]
+
+
+def test_stats_report_ack_latency(service, scheduler):
+    service.latency = 0.05
+    for i in range(3):
+        scheduler.move_absolute(0.1 * i, 0)
+        service.wait_for(i + 1)
+    time.sleep(0.01)
+
+    stats = scheduler.get_stats()
+    assert stats["sent"] == 3
+    assert stats["ack"]["count"] == 3
+    assert stats["ack"]["p50_ms"] >= 45
+    assert stats["queue"]["count"] == 3
+
+
+class FakeOdometry:
+    """Pans at a fixed rate from the moment it's created."""
+
+    def __init__(self, deg_per_s: float):
+        self.deg_per_s = deg_per_s
+        self.started = time.monotonic()
+
+    @property
+    def estimate(self) -> PTZEstimate:
+        now = time.monotonic()
+        return PTZEstimate((now - self.started) * self.deg_per_s, 0.0, 1.0, now)
+
+    def wait_until_still(self) -> PTZEstimate:
+        return self.estimate
+
+
+def test_closed_loop_move_keeps_measuring_during_slow_acks(service, controller):
+    service.latency = 0.1
+    loop = ClosedLoopPTZ(FakeOdometry(deg_per_s=10.0), tolerance_deg=1.0, timeout=5.0)
+
+    start = time.monotonic()
+    loop.move_onvif(controller, target_pan=5.0)
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 1.0
+    assert service.operations()[-1] == "Stop"
+    velocities = [pan for pan, _ in service.args("ContinuousMove")]
+    assert velocities == sorted(velocities, reverse=True)
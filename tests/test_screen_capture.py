@@ -0,0 +1,93 @@
+"""ScreenCapture choosing between stream frames and device captures.
+
+FakeStream hands out downscaled frames like a running ScreenStream,
+FakeController counts the captures that go to the device, and FakeOCR
+reports which frame sizes it was asked to read.
+"""
+
+import numpy as np
+
+from tapo_c210_monitor.android.framebuffer import ScreenFrame, make_frame
+from tapo_c210_monitor.android.ocr import WordBox
+from tapo_c210_monitor.android.screen import OCR_MIN_SCALE, ScreenCapture
+
+SCREEN = (1080, 2400)
+
+
+class FakeController:
+    def __init__(self):
+        self.captures: list[int | None] = []
+
+    def capture_frame(self, max_dimension=None) -> ScreenFrame:
+        self.captures.append(max_dimension)
+        return make_frame(np.zeros((SCREEN[1], SCREEN[0], 3), np.uint8), max_dimension)
+
+
+class FakeStream:
+    running = True
+    frame_id = 1
+
+    def __init__(self, max_dimension: int):
+        self.frame = make_frame(np.zeros((SCREEN[1], SCREEN[0], 3), np.uint8), max_dimension)
+
+    def wait_for_frame(self, after=None, timeout=1.0):
+        return self.frame
+
+
+class FakeOCR:
+    def __init__(self):
+        self.sizes: list[tuple[int, int]] = []
+
+    def recognize(self, image):
+        height, width = image.shape[:2]
+        self.sizes.append((width, height))
+        # "Settings" at device (540, 1200), in this image's pixels
+        scale = height / SCREEN[1]
+        return [WordBox("Settings", int(500 * scale), int(1180 * scale), int(80 * scale), int(40 * scale), 95.0)]
+
+    def text(self, image):
+        return " ".join(word.text for word in self.recognize(image))
+
+
+def make_capture(stream_dimension: int | None) -> ScreenCapture:
+    screen = ScreenCapture(FakeController(), FakeStream(stream_dimension) if stream_dimension else None)
+    screen._ocr = FakeOCR()
+    return screen
+
+
+def test_capture_uses_stream_frame():
+    screen = make_capture(720)
+
+    frame = screen.capture_frame()
+
+    assert frame is screen.stream.frame
+    assert screen.controller.captures == []
+
+
+def test_ocr_bypasses_coarse_stream_frame():
+    screen = make_capture(720)
+    assert screen.stream.frame.scale < OCR_MIN_SCALE
+
+    [match] = screen.find_text("settings")
+
+    assert screen.controller.captures == [1900]
+    assert screen._ocr.sizes == [(855, 1900)]
+    assert abs(match["center_x"] - 540) <= 2
+    assert abs(match["center_y"] - 1200) <= 2
+    assert screen.get_all_text() == "Settings"
+    assert screen.controller.captures == [1900, 1900]
+
+
+def test_ocr_reads_stream_frame_that_is_fine_enough():
+    screen = make_capture(1900)
+
+    assert screen.find_text("settings")
+    assert screen.controller.captures == []
+    assert screen._ocr.sizes == [(855, 1900)]
+
+
+def test_wait_for_text_reads_device_capture_while_streaming():
+    screen = make_capture(720)
+
+    assert screen.wait_for_text("Settings", timeout_seconds=1)
+    assert screen.controller.captures == [1900]
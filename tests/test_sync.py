@@ -0,0 +1,145 @@
+"""RecordingListingCache under concurrent callers.
+
+CountingFetch stands in for Tapo.getRecordings: it counts calls per day
+and can hold them open on a gate, so several threads are guaranteed to
+ask while a fetch is still in flight.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+
+from tapo_c210_monitor.sync import RecordingListingCache
+
+PAST_DAY = "20200101"
+
+
+class CountingFetch:
+    """getRecordings stand-in that counts calls and can be held open."""
+
+    def __init__(self):
+        self.calls: dict[str, int] = {}
+        self.gate = threading.Event()
+        self.gate.set()
+        self.started = threading.Event()
+        self.error: Exception | None = None
+        self._lock = threading.Lock()
+
+    def __call__(self, date_str: str) -> list[dict]:
+        with self._lock:
+            self.calls[date_str] = self.calls.get(date_str, 0) + 1
+            n = self.calls[date_str]
+        self.started.set()
+        self.gate.wait(5)
+        if self.error:
+            raise self.error
+        return [{"video0": {"startTime": n, "endTime": n + 60}}]
+
+
+def today() -> str:
+    return datetime.now().strftime("%Y%m%d")
+
+
+def fetch_concurrently(cache, fetch, date_str: str, callers: int = 8) -> list:
+    """Start callers while the first fetch is held, then release it."""
+    fetch.gate.clear()
+    with ThreadPoolExecutor(callers) as pool:
+        futures = [pool.submit(cache.get, date_str) for _ in range(callers)]
+        assert fetch.started.wait(2)
+        # Let every caller reach the cache before the fetch completes
+        deadline = time.monotonic() + 2
+        while cache.get_stats()["coalesced"] < callers - 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        fetch.gate.set()
+        return [f.exception(timeout=5) or f.result() for f in futures]
+
+
+def test_concurrent_callers_share_one_fetch():
+    fetch = CountingFetch()
+    cache = RecordingListingCache(fetch)
+
+    results = fetch_concurrently(cache, fetch, PAST_DAY)
+
+    assert fetch.calls == {PAST_DAY: 1}
+    assert all(r == results[0] for r in results)
+    # Callers get their own copies
+    results[0].append({"mutated": True})
+    assert cache.get(PAST_DAY) == results[1]
+    stats = cache.get_stats()
+    assert (stats["misses"], stats["coalesced"], stats["hits"]) == (1, 7, 1)
+
+
+def test_failed_fetch_reaches_every_waiter_and_is_not_cached():
+    fetch = CountingFetch()
+    fetch.error = ConnectionError("camera unreachable")
+    cache = RecordingListingCache(fetch)
+
+    results = fetch_concurrently(cache, fetch, PAST_DAY, callers=4)
+
+    assert all(isinstance(r, ConnectionError) for r in results)
+    assert fetch.calls == {PAST_DAY: 1}
+
+    fetch.error = None
+    assert cache.get(PAST_DAY)
+    assert fetch.calls == {PAST_DAY: 2}
+    assert cache.get_stats()["cached_days"] == 1
+
+
+def test_past_days_never_expire():
+    fetch = CountingFetch()
+    cache = RecordingListingCache(fetch, today_ttl=0.05)
+
+    first = cache.get(PAST_DAY)
+    time.sleep(0.1)
+
+    assert cache.get(PAST_DAY) == first
+    assert fetch.calls == {PAST_DAY: 1}
+
+
+def test_today_is_refetched_after_ttl():
+    fetch = CountingFetch()
+    cache = RecordingListingCache(fetch, today_ttl=0.1)
+
+    first = cache.get(today())
+    assert cache.get(today()) == first
+    assert fetch.calls == {today(): 1}
+
+    time.sleep(0.15)
+    assert cache.get(today()) != first
+    assert fetch.calls == {today(): 2}
+
+
+def test_concurrent_callers_for_different_days_fetch_separately():
+    fetch = CountingFetch()
+    cache = RecordingListingCache(fetch)
+    days = [f"202001{d:02d}" for d in range(1, 6)]
+
+    with ThreadPoolExecutor(10) as pool:
+        list(pool.map(cache.get, days * 4))
+
+    assert fetch.calls == {day: 1 for day in days}
+    stats = cache.get_stats()
+    assert stats["misses"] == len(days)
+    assert stats["hits"] + stats["coalesced"] == 3 * len(days)
+
+
+def test_stats_and_invalidate():
+    fetch = CountingFetch()
+    cache = RecordingListingCache(fetch)
+    assert cache.get_stats()["hit_rate"] == 0.0
+
+    cache.get(PAST_DAY)
+    cache.get(PAST_DAY)
+    cache.get(PAST_DAY)
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+    assert stats["hit_rate"] == pytest.approx(2 / 3)
+
+    cache.invalidate(PAST_DAY)
+    cache.get(PAST_DAY)
+    assert fetch.calls == {PAST_DAY: 2}
+    cache.invalidate()
+    assert cache.get_stats()["cached_days"] == 0